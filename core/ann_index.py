@@ -0,0 +1,338 @@
+"""
+Approximate Nearest Neighbour Index - In-Process IVF
+====================================================
+
+Cosine-similarity ANN index for the primitive library when the library
+grows past what brute-force search handles and no vector database is
+reachable (air-gapped builds). Pure NumPy, no extra dependencies.
+
+Structure (IVF-Flat):
+- vectors are L2-normalized and kept in one float32 buffer
+- a spherical k-means coarse quantizer splits them into nlist cells
+- a query scores the centroids, scans the nprobe best cells exactly and
+  returns the top-k of those candidates
+
+Below train_threshold vectors the index stays flat (exact search).
+Inserts are incremental: new vectors go to their nearest cell, and the
+quantizer is retrained once the index has grown 4x since the last
+training so the cells stay balanced.
+
+Benchmark recall/latency against the exact NumPy path with:
+    python -m core.ann_index --rows 50000 --dim 384
+
+Author: Universal STEM Diagram Generator
+Date: November 18, 2025
+"""
+
+import json
+import math
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+def _normalized(vectors: Any) -> np.ndarray:
+    matrix = np.array(vectors, dtype=np.float32, ndmin=2)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the k highest scores, best first (ties by position)"""
+    if k < len(scores):
+        best = np.argpartition(-scores, k - 1)[:k]
+    else:
+        best = np.arange(len(scores))
+    return best[np.lexsort((best, -scores[best]))]
+
+
+class IVFIndex:
+    """
+    Inverted-file cosine index with incremental inserts and npz persistence
+
+    Example:
+        >>> index = IVFIndex(nprobe=8)
+        >>> ids = index.add(embeddings)
+        >>> [(ids, scores)] = index.search([query], k=5)
+        >>> index.save("data/primitive_library/ann/index.npz")
+    """
+
+    RETRAIN_GROWTH = 4  # Retrain the quantizer when the index grows by this factor
+    TRAIN_ITERATIONS = 12
+    SAMPLES_PER_LIST = 64
+
+    def __init__(self,
+                 nlist: Optional[int] = None,
+                 nprobe: int = 8,
+                 train_threshold: int = 2048,
+                 seed: int = 0):
+        """
+        Args:
+            nlist: Number of cells (None = 4 * sqrt(rows) at training time)
+            nprobe: Cells scanned per query (more = higher recall, slower)
+            train_threshold: Rows needed before the index leaves flat mode
+            seed: RNG seed for k-means sampling
+        """
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_threshold = train_threshold
+        self.seed = seed
+        self.dim: Optional[int] = None
+        self.centroids: Optional[np.ndarray] = None
+        self.trained_on = 0
+        self.trainings = 0
+        self._buffer = np.zeros((0, 0), dtype=np.float32)
+        self._count = 0
+        self._lists: List[np.ndarray] = []
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """Normalized vectors, row i = id i"""
+        return self._buffer[:self._count]
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    # ========== Inserts ==========
+
+    def add(self, vectors: Any) -> np.ndarray:
+        """Insert vectors; returns their ids (consecutive row numbers)"""
+        batch = _normalized(vectors)
+        if batch.shape[0] == 0:
+            return np.arange(0)
+        if self.dim is None:
+            self.dim = batch.shape[1]
+            self._buffer = np.zeros((max(64, batch.shape[0]), self.dim), dtype=np.float32)
+        elif batch.shape[1] != self.dim:
+            raise ValueError(f"Vector dimension {batch.shape[1]} does not match index dimension {self.dim}")
+
+        needed = self._count + batch.shape[0]
+        if needed > self._buffer.shape[0]:
+            grown = np.zeros((max(needed, 2 * self._buffer.shape[0]), self.dim), dtype=np.float32)
+            grown[:self._count] = self.vectors
+            self._buffer = grown
+        ids = np.arange(self._count, needed)
+        self._buffer[self._count:needed] = batch
+        self._count = needed
+
+        if self.centroids is None:
+            if self._count >= self.train_threshold:
+                self.train()
+        elif self._count >= self.RETRAIN_GROWTH * self.trained_on:
+            self.train()
+        else:
+            self._assign(ids)
+        return ids
+
+    def train(self) -> None:
+        """(Re)build the coarse quantizer with spherical k-means over a sample"""
+        rows = self._count
+        nlist = self.nlist or int(4 * math.sqrt(rows))
+        nlist = max(1, min(nlist, rows // 39 or 1))
+        rng = np.random.default_rng(self.seed)
+        sample_size = min(rows, nlist * self.SAMPLES_PER_LIST)
+        sample = self.vectors[np.sort(rng.choice(rows, sample_size, replace=False))]
+
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+        for _ in range(self.TRAIN_ITERATIONS):
+            assignment = self._nearest(sample, centroids)
+            order = np.argsort(assignment, kind='stable')
+            cells, starts = np.unique(assignment[order], return_index=True)
+            sums = np.add.reduceat(sample[order], starts, axis=0)
+            empty = np.setdiff1d(np.arange(nlist), cells)
+            centroids[cells] = sums
+            # Re-seed empty cells from random sample points
+            if len(empty):
+                centroids[empty] = sample[rng.choice(sample_size, len(empty), replace=False)]
+            centroids = _normalized(centroids)
+
+        self.centroids = centroids
+        self.trained_on = rows
+        self.trainings += 1
+        self._lists = [np.zeros(0, dtype=np.int64) for _ in range(nlist)]
+        self._assign(np.arange(rows))
+
+    def _nearest(self, vectors: np.ndarray, centroids: np.ndarray, chunk: int = 8192) -> np.ndarray:
+        out = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), chunk):
+            out[start:start + chunk] = np.argmax(vectors[start:start + chunk] @ centroids.T, axis=1)
+        return out
+
+    def _assign(self, ids: np.ndarray) -> None:
+        assignment = self._nearest(self.vectors[ids], self.centroids)
+        order = np.argsort(assignment, kind='stable')
+        cells, starts = np.unique(assignment[order], return_index=True)
+        for cell, members in zip(cells, np.split(ids[order], starts[1:])):
+            self._lists[cell] = np.concatenate((self._lists[cell], members))
+
+    # ========== Search ==========
+
+    def search(self,
+               queries: Any,
+               k: int,
+               nprobe: Optional[int] = None,
+               allowed: Optional[np.ndarray] = None) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Approximate top-k cosine search
+
+        Args:
+            queries: One or more query vectors
+            k: Results per query
+            nprobe: Cells to scan (default: self.nprobe)
+            allowed: Optional boolean mask over ids; probing widens until k
+                allowed candidates are found
+
+        Returns:
+            (ids, scores) per query, best first
+        """
+        matrix = _normalized(queries)
+        if not self._count or k <= 0 or matrix.shape[1] != self.dim:
+            return [(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)) for _ in matrix]
+        if self.centroids is None:
+            return self.search_exact(matrix, k, allowed)
+
+        nprobe = max(1, min(nprobe or self.nprobe, len(self._lists)))
+        centroid_scores = matrix @ self.centroids.T
+        results = []
+        for query, row_scores in zip(matrix, centroid_scores):
+            ranked = np.argsort(-row_scores)
+            probed = nprobe
+            while True:
+                candidates = np.concatenate([self._lists[cell] for cell in ranked[:probed]])
+                if allowed is not None:
+                    candidates = candidates[allowed[candidates]]
+                if len(candidates) >= k or probed >= len(ranked):
+                    break
+                probed = min(len(ranked), probed * 2)
+            scores = self.vectors[candidates] @ query
+            best = _top_k(scores, k)
+            results.append((candidates[best], scores[best]))
+        return results
+
+    def search_exact(self,
+                     queries: Any,
+                     k: int,
+                     allowed: Optional[np.ndarray] = None) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Brute-force top-k over every vector (the reference for recall)"""
+        matrix = _normalized(queries)
+        if allowed is None:
+            rows = np.arange(self._count)
+            scores = matrix @ self.vectors.T
+        else:
+            rows = np.flatnonzero(allowed[:self._count])
+            scores = matrix @ self.vectors[rows].T
+        results = []
+        for row_scores in scores:
+            best = _top_k(row_scores, k)
+            results.append((rows[best], row_scores[best]))
+        return results
+
+    # ========== Persistence ==========
+
+    def save(self, path: str) -> None:
+        """Write the index to an .npz file (atomically)"""
+        lists = self._lists if self.centroids is not None else []
+        meta = {
+            'nlist': self.nlist, 'nprobe': self.nprobe, 'train_threshold': self.train_threshold,
+            'seed': self.seed, 'dim': self.dim, 'trained_on': self.trained_on, 'trainings': self.trainings,
+        }
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp-{os.getpid()}.npz"
+        np.savez(
+            tmp_path,
+            vectors=self.vectors,
+            centroids=self.centroids if self.centroids is not None else np.zeros((0, self.dim or 0), np.float32),
+            list_sizes=np.array([len(ids) for ids in lists], dtype=np.int64),
+            list_ids=np.concatenate(lists) if lists else np.zeros(0, dtype=np.int64),
+            meta=np.array(json.dumps(meta)),
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'IVFIndex':
+        """Read an index written by save()"""
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            index = cls(nlist=meta['nlist'], nprobe=meta['nprobe'],
+                        train_threshold=meta['train_threshold'], seed=meta['seed'])
+            index.dim = meta['dim']
+            index.trained_on = meta['trained_on']
+            index.trainings = meta['trainings']
+            index._buffer = np.array(data['vectors'], dtype=np.float32)
+            index._count = index._buffer.shape[0]
+            if data['centroids'].shape[0]:
+                index.centroids = np.array(data['centroids'], dtype=np.float32)
+                index._lists = np.split(data['list_ids'], np.cumsum(data['list_sizes'])[:-1])
+        return index
+
+
+def benchmark(rows: int = 50000,
+              dim: int = 384,
+              queries: int = 200,
+              k: int = 10,
+              nprobe: int = 8,
+              clusters: int = 1000,
+              spread: float = 1.5,
+              seed: int = 0) -> Dict[str, float]:
+    """
+    Recall@k and per-query latency of the IVF index vs exact NumPy search
+
+    Data is a normalized Gaussian mixture, which is closer to sentence
+    embeddings than uniform noise; larger spread = less clustered data
+    and lower recall at the same nprobe.
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, rows + queries)
+    data = centers[labels] + spread * rng.standard_normal((rows + queries, dim)).astype(np.float32)
+    base, probes = data[:rows], data[rows:]
+
+    index = IVFIndex(nprobe=nprobe, seed=seed)
+    start = time.perf_counter()
+    index.add(base[: rows // 2])
+    for chunk in np.array_split(base[rows // 2:], 10):  # Incremental inserts
+        index.add(chunk)
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    exact = [index.search_exact(query, k)[0][0] for query in probes]
+    exact_ms = (time.perf_counter() - start) * 1000 / queries
+
+    start = time.perf_counter()
+    approx = [index.search(query, k)[0][0] for query in probes]
+    ann_ms = (time.perf_counter() - start) * 1000 / queries
+
+    recall = float(np.mean([len(np.intersect1d(a, e)) / k for a, e in zip(approx, exact)]))
+    return {
+        'rows': rows, 'dim': dim, 'k': k, 'nlist': len(index._lists), 'nprobe': nprobe,
+        'build_seconds': build_seconds, 'exact_ms_per_query': exact_ms,
+        'ann_ms_per_query': ann_ms, 'recall_at_k': recall,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the IVF index against exact search")
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--nprobe', type=int, nargs='+', default=[4, 8, 16, 32])
+    parser.add_argument('--spread', type=float, default=1.5)
+    args = parser.parse_args()
+
+    for nprobe in args.nprobe:
+        result = benchmark(args.rows, args.dim, args.queries, args.k, nprobe, spread=args.spread)
+        print(f"nprobe={nprobe:3d} nlist={result['nlist']} recall@{args.k}={result['recall_at_k']:.3f} "
+              f"ann={result['ann_ms_per_query']:.2f}ms exact={result['exact_ms_per_query']:.2f}ms "
+              f"build={result['build_seconds']:.1f}s")
@@ -0,0 +1,629 @@
+"""
+Columnar Property Graph - Compact Storage Backend
+=================================================
+
+Drop-in PropertyGraph backend for large, long-lived knowledge graphs.
+
+PropertyGraph keeps every node twice (a GraphNode in its index and an
+attribute dict on a networkx MultiDiGraph). This backend stores each fact
+once, in flat columns:
+
+- Node IDs are interned to dense integer indexes
+- Node/edge types are small integer codes in typed arrays
+- Node properties live in per-key columns: int and float columns are
+  array('q')/array('d'); a column holding anything else is a plain list.
+  Each node records its key tuple ("shape", shared between nodes with the
+  same keys), so dict order and presence survive the round trip
+- Edges are parallel arrays (source, target, type, confidence, label);
+  properties and metadata are stored only for edges that have them
+- Adjacency is CSR (offsets + edge indexes per node), built lazily and
+  refreshed once enough edges have been appended since the last build
+- The networkx MultiDiGraph behind `graph` is materialized on demand
+  (find_paths, find_shortest_path) and cached until the next mutation
+
+GraphNode/GraphEdge objects returned by the API are built on read, so
+mutating them does not write back: use merge_node_properties /
+merge_node_metadata (as the pipeline already does) or add_node again.
+Removed nodes leave a tombstone slot; their IDs can be re-added.
+
+Author: Universal STEM Diagram Generator
+Date: November 18, 2025
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from array import array
+import sys
+
+import networkx as nx
+
+from core.property_graph import PropertyGraph, GraphNode, GraphEdge, NodeType, EdgeType
+
+
+_INT64_MIN, _INT64_MAX = -(1 << 63), (1 << 63) - 1
+
+
+class _PropertyColumn:
+    """Values of one property key, indexed by node index"""
+
+    __slots__ = ('kind', 'values')
+
+    def __init__(self):
+        self.kind = 'empty'  # 'empty' -> 'int' | 'float' | 'object'
+        self.values: Any = []
+
+    @staticmethod
+    def _kind_of(value: Any) -> str:
+        if type(value) is int and _INT64_MIN <= value <= _INT64_MAX:
+            return 'int'
+        if type(value) is float:
+            return 'float'
+        if type(value) is str:
+            return 'str'
+        return 'object'
+
+    def set(self, index: int, value: Any) -> None:
+        kind = self._kind_of(value)
+        if self.kind == 'empty':
+            self.kind = kind if kind in ('int', 'float') else 'object'
+            self.values = array('q' if self.kind == 'int' else 'd') if self.kind != 'object' else []
+        elif self.kind != kind and self.kind != 'object':
+            # Mixed types: fall back to a list (keeps 1 and 1.0 distinct)
+            self.values = list(self.values)
+            self.kind = 'object'
+        if kind == 'str':
+            value = sys.intern(value)
+        values = self.values
+        if index >= len(values):
+            filler = None if self.kind == 'object' else 0
+            values.extend([filler] * (index + 1 - len(values)))
+        values[index] = value
+
+    def get(self, index: int) -> Any:
+        return self.values[index]
+
+    def clear(self, index: int) -> None:
+        if self.kind == 'object' and index < len(self.values):
+            self.values[index] = None  # release the reference
+
+    def nbytes(self) -> int:
+        if isinstance(self.values, array):
+            return self.values.itemsize * len(self.values)
+        return sys.getsizeof(self.values)
+
+
+class _CSR:
+    """Compressed adjacency for one direction over edges [0, edge_count)"""
+
+    __slots__ = ('offsets', 'edges', 'edge_count')
+
+    def __init__(self, keys: array, node_count: int, edge_count: int, alive: bytearray):
+        counts = [0] * (node_count + 1)
+        for e in range(edge_count):
+            if alive[e]:
+                counts[keys[e] + 1] += 1
+        for i in range(node_count):
+            counts[i + 1] += counts[i]
+        self.offsets = array('q', counts)
+        cursor = list(counts[:-1])
+        edges = array('q', bytes(8 * counts[-1]))
+        for e in range(edge_count):
+            if alive[e]:
+                node = keys[e]
+                edges[cursor[node]] = e
+                cursor[node] += 1
+        self.edges = edges
+        self.edge_count = edge_count
+
+    def at(self, node: int) -> array:
+        if node + 1 >= len(self.offsets):
+            return self.edges[0:0]
+        return self.edges[self.offsets[node]:self.offsets[node + 1]]
+
+
+class ColumnarPropertyGraph(PropertyGraph):
+    """
+    PropertyGraph with interned IDs, typed property columns and CSR adjacency
+
+    Same public API as PropertyGraph; pick it with
+    create_property_graph('columnar') or
+    UnifiedDiagramPipeline config property_graph_backend='columnar'.
+    """
+
+    # Rebuild CSR once this many edges (or a quarter of all edges) are pending
+    CSR_REBUILD_MIN = 64
+
+    def __init__(self):
+        """Initialize empty columnar property graph"""
+        # Nodes
+        self._ids: List[Optional[str]] = []  # node index -> ID (None = removed)
+        self._index_of: Dict[str, int] = {}  # interned ID -> node index
+        self._node_types = array('H')  # node index -> type code
+        self._labels: List[Optional[str]] = []
+        self._node_shapes = array('l')  # node index -> shape code
+        self._shape_keys: List[Tuple[str, ...]] = [()]
+        self._shape_codes: Dict[Tuple[str, ...], int] = {(): 0}
+        self._columns: Dict[str, _PropertyColumn] = {}
+        self._node_metadata: Dict[int, Dict[str, Any]] = {}  # sparse
+        self._nodes_by_type: Dict[int, Dict[int, None]] = {}  # type code -> ordered node indexes
+        self._property_value_index: Dict[str, Dict[Any, List[int]]] = {}  # lazy, like PropertyGraph
+
+        # Edges
+        self._edge_sources = array('q')
+        self._edge_targets = array('q')
+        self._edge_types = array('H')
+        self._edge_labels: List[Optional[str]] = []
+        self._edge_confidence = array('d')
+        self._edge_properties: Dict[int, Dict[str, Any]] = {}  # sparse
+        self._edge_metadata: Dict[int, Dict[str, Any]] = {}  # sparse
+        self._edge_alive = bytearray()
+        self._live_edges = 0
+        self._edges_by_type: Dict[int, array] = {}
+
+        # Lazily built adjacency: CSR plus edges appended since the last build
+        self._out_csr: Optional[_CSR] = None
+        self._in_csr: Optional[_CSR] = None
+        self._pending_out: Dict[int, List[int]] = {}
+        self._pending_in: Dict[int, List[int]] = {}
+
+        # Type codes (NodeType/EdgeType members, or anything hashable)
+        self._node_type_table: List[Any] = list(NodeType)
+        self._node_type_codes: Dict[Any, int] = {t: i for i, t in enumerate(self._node_type_table)}
+        self._edge_type_table: List[Any] = list(EdgeType)
+        self._edge_type_codes: Dict[Any, int] = {t: i for i, t in enumerate(self._edge_type_table)}
+
+        # networkx view, rebuilt on demand after mutations
+        self._version = 0
+        self._nx_graph: Optional[nx.MultiDiGraph] = None
+        self._nx_version = -1
+
+    # ========== networkx view ==========
+
+    @property
+    def graph(self) -> nx.MultiDiGraph:
+        """networkx MultiDiGraph with PropertyGraph's attribute layout (read-only view)"""
+        if self._nx_graph is None or self._nx_version != self._version:
+            view = nx.MultiDiGraph()
+            for node in self.get_all_nodes():
+                view.add_node(node.id, type=node.type, label=node.label,
+                              properties=node.properties, metadata=node.metadata)
+            for edge in self.get_edges():
+                view.add_edge(edge.source, edge.target, type=edge.type, label=edge.label,
+                              properties=edge.properties, metadata=edge.metadata,
+                              confidence=edge.confidence)
+            self._nx_graph = view
+            self._nx_version = self._version
+        return self._nx_graph
+
+    def _touch(self) -> None:
+        self._version += 1
+        self._property_value_index.clear()
+
+    # ========== Node Operations ==========
+
+    def add_node(self, node: GraphNode) -> None:
+        """
+        Add a node to the graph (re-adding an ID replaces its attributes, keeps its edges)
+
+        Args:
+            node: GraphNode to add
+        """
+        index = self._index_of.get(node.id)
+        if index is None:
+            node_id = sys.intern(node.id) if type(node.id) is str else node.id
+            index = len(self._ids)
+            self._ids.append(node_id)
+            self._index_of[node_id] = index
+            self._node_types.append(0)
+            self._labels.append(None)
+            self._node_shapes.append(0)
+        else:
+            self._nodes_by_type[self._node_types[index]].pop(index, None)
+            self._clear_properties(index)
+
+        type_code = self._code(self._node_type_table, self._node_type_codes, node.type)
+        self._node_types[index] = type_code
+        self._nodes_by_type.setdefault(type_code, {})[index] = None
+        self._labels[index] = node.label
+        self._store_properties(index, node.properties or {})
+        if node.metadata:
+            self._node_metadata[index] = node.metadata
+        else:
+            self._node_metadata.pop(index, None)
+        self._touch()
+
+    def get_node(self, node_id: str) -> Optional[GraphNode]:
+        """
+        Get a node by ID
+
+        Args:
+            node_id: ID of the node
+
+        Returns:
+            GraphNode if found, None otherwise
+        """
+        index = self._index_of.get(node_id)
+        return None if index is None else self._node_at(index)
+
+    def remove_node(self, node_id: str) -> None:
+        """
+        Remove a node and all its edges
+
+        Args:
+            node_id: ID of the node to remove
+        """
+        index = self._index_of.pop(node_id, None)
+        if index is None:
+            return
+        for edge_index in list(self._out(index)) + list(self._in(index)):
+            self._kill_edge(edge_index)
+        typed = self._nodes_by_type.get(self._node_types[index])
+        if typed is not None:
+            typed.pop(index, None)
+        self._clear_properties(index)
+        self._node_metadata.pop(index, None)
+        self._ids[index] = None
+        self._labels[index] = None
+        self._touch()
+
+    def has_node(self, node_id: str) -> bool:
+        """Check if node exists"""
+        return node_id in self._index_of
+
+    def get_all_nodes(self, node_type: Optional[NodeType] = None) -> List[GraphNode]:
+        """
+        Get all nodes, optionally filtered by type
+
+        Args:
+            node_type: Optional NodeType to filter by
+
+        Returns:
+            List of GraphNode objects
+        """
+        if node_type is None:
+            return [self._node_at(index) for index in self._index_of.values()]
+        code = self._node_type_codes.get(node_type)
+        if code is None:
+            return []
+        return [self._node_at(index) for index in self._nodes_by_type.get(code, {})]
+
+    def iter_nodes(self) -> Iterator[GraphNode]:
+        """Iterate over all nodes, building each GraphNode as it is reached"""
+        for index in list(self._index_of.values()):
+            yield self._node_at(index)
+
+    def count_nodes(self, node_type: Optional[NodeType] = None) -> int:
+        """Number of nodes, optionally of one type"""
+        if node_type is None:
+            return len(self._index_of)
+        code = self._node_type_codes.get(node_type)
+        return 0 if code is None else len(self._nodes_by_type.get(code, {}))
+
+    def find_nodes_by_property(self, key: str, value: Any) -> List[GraphNode]:
+        """
+        Nodes whose property `key` equals `value` (hashable values only)
+
+        The per-key index is built from the column on first use and dropped
+        on every mutation.
+        """
+        try:
+            hash(value)
+        except TypeError:
+            return [node for node in self.get_all_nodes() if node.properties.get(key) == value]
+        index = self._property_value_index.get(key)
+        if index is None:
+            index = {}
+            column = self._columns.get(key)
+            has_key = [key in keys for keys in self._shape_keys]
+            for node_index in self._index_of.values():
+                prop = column.get(node_index) if has_key[self._node_shapes[node_index]] else None
+                try:
+                    index.setdefault(prop, []).append(node_index)
+                except TypeError:
+                    continue  # unhashable values are never equal to a hashable query
+            self._property_value_index[key] = index
+        return [self._node_at(node_index) for node_index in index.get(value, [])]
+
+    def merge_node_properties(self, node_id: str, properties: Dict[str, Any]) -> None:
+        """Merge additional properties into a node"""
+        if not properties:
+            return
+        index = self._index_of.get(node_id)
+        if index is None:
+            raise KeyError(f"Node {node_id} not found")
+        # Same semantics as PropertyGraph._merge_dict_values, written column by column
+        keys = self._shape_keys[self._node_shapes[index]]
+        added = tuple(key for key in properties if key not in keys)
+        for key, value in properties.items():
+            if key in keys:
+                existing = self._columns[key].get(index)
+                if isinstance(existing, (list, dict)) and isinstance(value, type(existing)):
+                    value = self._merge_dict_values({key: existing}, {key: value})[key]
+            column = self._columns.get(key)
+            if column is None:
+                column = self._columns[key] = _PropertyColumn()
+            column.set(index, value)
+        if added:
+            self._node_shapes[index] = self._shape_code(keys + added)
+        self._touch()
+
+    def merge_node_metadata(self, node_id: str, metadata: Dict[str, Any]) -> None:
+        """Merge metadata payload into a node"""
+        if not metadata:
+            return
+        index = self._index_of.get(node_id)
+        if index is None:
+            raise KeyError(f"Node {node_id} not found")
+        self._node_metadata[index] = self._merge_dict_values(self._node_metadata.get(index), metadata)
+        self._touch()
+
+    # ========== Edge Operations ==========
+
+    def add_edge(self, edge: GraphEdge) -> None:
+        """
+        Add an edge to the graph
+
+        Args:
+            edge: GraphEdge to add
+        """
+        source = self._index_of.get(edge.source)
+        target = self._index_of.get(edge.target)
+        if source is None:
+            raise ValueError(f"Source node {edge.source} does not exist")
+        if target is None:
+            raise ValueError(f"Target node {edge.target} does not exist")
+
+        edge_index = len(self._edge_sources)
+        type_code = self._code(self._edge_type_table, self._edge_type_codes, edge.type)
+        self._edge_sources.append(source)
+        self._edge_targets.append(target)
+        self._edge_types.append(type_code)
+        self._edge_labels.append(sys.intern(edge.label) if type(edge.label) is str else edge.label)
+        self._edge_confidence.append(edge.confidence)
+        if edge.properties:
+            self._edge_properties[edge_index] = edge.properties
+        if edge.metadata:
+            self._edge_metadata[edge_index] = edge.metadata
+        self._edge_alive.append(1)
+        self._live_edges += 1
+        self._edges_by_type.setdefault(type_code, array('q')).append(edge_index)
+        self._pending_out.setdefault(source, []).append(edge_index)
+        self._pending_in.setdefault(target, []).append(edge_index)
+        self._version += 1
+
+    def get_edges(self, source: Optional[str] = None, target: Optional[str] = None,
+                  edge_type: Optional[EdgeType] = None) -> List[GraphEdge]:
+        """
+        Get edges, optionally filtered by source, target, and/or type
+
+        Filtered lookups walk the CSR adjacency (O(degree)). Returned
+        GraphEdge objects are built on read.
+
+        Args:
+            source: Optional source node ID
+            target: Optional target node ID
+            edge_type: Optional EdgeType to filter by
+
+        Returns:
+            List of GraphEdge objects
+        """
+        type_code = None
+        if edge_type:
+            type_code = self._edge_type_codes.get(edge_type)
+            if type_code is None:
+                return []
+
+        if source or target:
+            source_index = self._index_of.get(source) if source else None
+            target_index = self._index_of.get(target) if target else None
+            if (source and source_index is None) or (target and target_index is None):
+                return []
+            if source and target:
+                outgoing = self._out(source_index)
+                incoming = self._in(target_index)
+                if len(outgoing) <= len(incoming):
+                    candidates = [e for e in outgoing if self._edge_targets[e] == target_index]
+                else:
+                    candidates = [e for e in incoming if self._edge_sources[e] == source_index]
+            elif source:
+                candidates = self._out(source_index)
+            else:
+                candidates = self._in(target_index)
+            if type_code is not None:
+                types = self._edge_types
+                candidates = [e for e in candidates if types[e] == type_code]
+        elif type_code is not None:
+            candidates = self._edges_by_type.get(type_code, ())
+        else:
+            candidates = range(len(self._edge_sources))
+
+        alive = self._edge_alive
+        return [self._edge_at(e) for e in candidates if alive[e]]
+
+    def iter_edges(self) -> Iterator[GraphEdge]:
+        """Iterate over all edges, building each GraphEdge as it is reached"""
+        alive = self._edge_alive
+        for edge_index in range(len(self._edge_sources)):
+            if alive[edge_index]:
+                yield self._edge_at(edge_index)
+
+    def edge_count(self, edge_type: Optional[EdgeType] = None) -> int:
+        """Number of edges, optionally of one type"""
+        if edge_type:
+            code = self._edge_type_codes.get(edge_type)
+            if code is None:
+                return 0
+            alive = self._edge_alive
+            return sum(1 for e in self._edges_by_type.get(code, ()) if alive[e])
+        return self._live_edges
+
+    def get_neighbors(self, node_id: str, direction: str = 'both') -> List[str]:
+        """
+        Get neighbor node IDs
+
+        Args:
+            node_id: ID of the node
+            direction: 'out', 'in', or 'both'
+
+        Returns:
+            List of neighbor node IDs
+        """
+        index = self._index_of.get(node_id)
+        if index is None:
+            raise nx.NetworkXError(f"The node {node_id} is not in the digraph.")
+        neighbours: Dict[int, None] = {}
+        if direction in ('out', 'both'):
+            neighbours.update((self._edge_targets[e], None) for e in self._out(index))
+        if direction in ('in', 'both'):
+            neighbours.update((self._edge_sources[e], None) for e in self._in(index))
+        return [self._ids[other] for other in neighbours]
+
+    # ========== Graph Analysis ==========
+
+    def get_connected_components(self) -> List[Set[str]]:
+        """
+        Get connected components (treating graph as undirected)
+
+        Union-find over the edge arrays; no networkx graph is built.
+
+        Returns:
+            List of sets of node IDs, each set is a connected component
+        """
+        parent = list(range(len(self._ids)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        alive = self._edge_alive
+        for e in range(len(self._edge_sources)):
+            if alive[e]:
+                a, b = find(self._edge_sources[e]), find(self._edge_targets[e])
+                if a != b:
+                    parent[b] = a
+
+        components: Dict[int, Set[str]] = {}
+        for node_id, index in self._index_of.items():
+            components.setdefault(find(index), set()).add(node_id)
+        return list(components.values())
+
+    def get_node_degree(self, node_id: str) -> Dict[str, int]:
+        """
+        Get degree statistics for a node
+
+        Returns:
+            Dict with 'in', 'out', and 'total' degree counts
+        """
+        index = self._index_of[node_id]
+        in_degree = len(self._in(index))
+        out_degree = len(self._out(index))
+        return {'in': in_degree, 'out': out_degree, 'total': in_degree + out_degree}
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Approximate bytes held by the column arrays (excludes shared value objects)"""
+        arrays = (self._node_types, self._node_shapes, self._edge_sources, self._edge_targets,
+                  self._edge_types, self._edge_confidence)
+        usage = {
+            'node_index': sys.getsizeof(self._index_of) + sys.getsizeof(self._ids) + sys.getsizeof(self._labels),
+            'typed_arrays': sum(a.itemsize * len(a) for a in arrays) + len(self._edge_alive),
+            'property_columns': sum(column.nbytes() for column in self._columns.values()),
+            'adjacency': sum(csr.offsets.itemsize * (len(csr.offsets) + len(csr.edges))
+                             for csr in (self._out_csr, self._in_csr) if csr is not None),
+        }
+        usage['total'] = sum(usage.values())
+        return usage
+
+    # ========== Column Internals ==========
+
+    @staticmethod
+    def _code(table: List[Any], codes: Dict[Any, int], value: Any) -> int:
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(table)
+            table.append(value)
+        return code
+
+    def _store_properties(self, index: int, properties: Dict[str, Any]) -> None:
+        keys = tuple(sys.intern(key) if type(key) is str else key for key in properties)
+        self._node_shapes[index] = self._shape_code(keys)
+        for key, value in zip(keys, properties.values()):
+            column = self._columns.get(key)
+            if column is None:
+                column = self._columns[key] = _PropertyColumn()
+            column.set(index, value)
+
+    def _shape_code(self, keys: Tuple[str, ...]) -> int:
+        shape = self._shape_codes.get(keys)
+        if shape is None:
+            shape = self._shape_codes[keys] = len(self._shape_keys)
+            self._shape_keys.append(keys)
+        return shape
+
+    def _clear_properties(self, index: int) -> None:
+        for key in self._shape_keys[self._node_shapes[index]]:
+            self._columns[key].clear(index)
+        self._node_shapes[index] = 0
+
+    def _properties_at(self, index: int) -> Dict[str, Any]:
+        columns = self._columns
+        return {key: columns[key].get(index) for key in self._shape_keys[self._node_shapes[index]]}
+
+    def _node_at(self, index: int) -> GraphNode:
+        return GraphNode(
+            id=self._ids[index],
+            type=self._node_type_table[self._node_types[index]],
+            label=self._labels[index],
+            properties=self._properties_at(index),
+            metadata=self._node_metadata.get(index, {})
+        )
+
+    def _edge_at(self, edge_index: int) -> GraphEdge:
+        return GraphEdge(
+            source=self._ids[self._edge_sources[edge_index]],
+            target=self._ids[self._edge_targets[edge_index]],
+            type=self._edge_type_table[self._edge_types[edge_index]],
+            label=self._edge_labels[edge_index],
+            properties=self._edge_properties.get(edge_index, {}),
+            metadata=self._edge_metadata.get(edge_index, {}),
+            confidence=self._edge_confidence[edge_index]
+        )
+
+    def _kill_edge(self, edge_index: int) -> None:
+        if not self._edge_alive[edge_index]:
+            return
+        self._edge_alive[edge_index] = 0
+        self._live_edges -= 1
+        self._edge_labels[edge_index] = None
+        self._edge_properties.pop(edge_index, None)
+        self._edge_metadata.pop(edge_index, None)
+
+    # ========== Adjacency Internals ==========
+
+    def _out(self, index: int) -> List[int]:
+        """Live outgoing edge indexes of a node, in insertion order"""
+        self._refresh_csr()
+        return self._adjacent(self._out_csr, self._pending_out, index)
+
+    def _in(self, index: int) -> List[int]:
+        """Live incoming edge indexes of a node, in insertion order"""
+        self._refresh_csr()
+        return self._adjacent(self._in_csr, self._pending_in, index)
+
+    def _adjacent(self, csr: Optional[_CSR], pending: Dict[int, List[int]], index: int) -> List[int]:
+        alive = self._edge_alive
+        edges = [e for e in csr.at(index) if alive[e]] if csr is not None else []
+        edges.extend(e for e in pending.get(index, ()) if alive[e])
+        return edges
+
+    def _refresh_csr(self) -> None:
+        """Fold pending edges into CSR once enough have accumulated"""
+        built = self._out_csr.edge_count if self._out_csr is not None else 0
+        pending = len(self._edge_sources) - built
+        if pending < max(self.CSR_REBUILD_MIN, built // 4):
+            return
+        edge_count = len(self._edge_sources)
+        self._out_csr = _CSR(self._edge_sources, len(self._ids), edge_count, self._edge_alive)
+        self._in_csr = _CSR(self._edge_targets, len(self._ids), edge_count, self._edge_alive)
+        self._pending_out = {}
+        self._pending_in = {}
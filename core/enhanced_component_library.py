@@ -14,9 +14,12 @@ Date: November 5, 2025
 """
 
 from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, astuple
+import functools
 import math
 
+from core.svg_symbols import GLYPH_FRAGMENTS, LABEL_PLACEHOLDER, hashable_key, symbol_id
+
 
 @dataclass
 class ComponentStyle:
@@ -76,16 +79,74 @@ class EnhancedSVGElement:
         return result
 
 
+def _symbolized(kind: str):
+    """Route a create_enhanced_* method through a memoized <symbol> when use_symbols is on"""
+    def decorate(create):
+        @functools.wraps(create)
+        def wrapper(self, x, y, width, height, label="", *args, **kwargs):
+            if self.use_symbols:
+                instance = self._symbol_instance(kind, create, x, y, width, height, label, args, kwargs)
+                if instance is not None:
+                    return instance
+            return create(self, x, y, width, height, label, *args, **kwargs)
+        return wrapper
+    return decorate
+
+
 class EnhancedComponentLibrary:
     """
     Enhanced component library with professional, detailed components
+
+    With use_symbols=True, resistors, capacitors and batteries are emitted
+    as <use> of one <symbol> per distinct shape; the <symbol> definition
+    travels inside the first instance of each shape, so call
+    begin_document() before building each new diagram.
     """
 
-    def __init__(self, style: ComponentStyle = None):
+    def __init__(self, style: ComponentStyle = None, use_symbols: bool = False):
         self.style = style or ComponentStyle()
+        self.use_symbols = use_symbols
+        self._emitted_symbols: set = set()
+
+    def begin_document(self) -> None:
+        """Start a new diagram: symbols are defined again on their next use"""
+        self._emitted_symbols = set()
+
+    def _symbol_instance(self, kind: str, create, x: float, y: float, width: float, height: float,
+                         label: str, args: tuple, kwargs: Dict) -> Optional[EnhancedSVGElement]:
+        key = hashable_key('enhanced', kind, width, height, args, tuple(sorted(kwargs.items())), astuple(self.style))
+        if key is None:
+            return None
+
+        def build() -> Tuple[EnhancedSVGElement, Optional[EnhancedSVGElement]]:
+            # Built at the origin with a placeholder label so the label can be re-anchored
+            template = create(self, 0, 0, width, height, LABEL_PLACEHOLDER, *args, **kwargs)
+            symbol = EnhancedSVGElement("symbol", id=symbol_id(kind, key[2:]), overflow="visible")
+            label_template = None
+            for child in template.children:
+                if child.tag == "text" and child.text_content == LABEL_PLACEHOLDER:
+                    label_template = child
+                else:
+                    symbol.add_child(child)
+            return symbol, label_template
+
+        symbol, label_template = GLYPH_FRAGMENTS.get_or_build(key, build)
+        sid = symbol.attributes['id']
+        group = EnhancedSVGElement("g", id=f"{kind}_{x}_{y}")
+        if sid not in self._emitted_symbols:
+            self._emitted_symbols.add(sid)
+            group.add_child(EnhancedSVGElement("defs").add_child(symbol))
+        group.add_child(EnhancedSVGElement("use", href=f"#{sid}", transform=f"translate({x} {y})"))
+        if label and label_template is not None:
+            attributes = dict(label_template.attributes)
+            attributes['x'] = x + attributes['x']
+            attributes['y'] = y + attributes['y']
+            group.add_child(EnhancedSVGElement("text", **attributes).set_text(label))
+        return group
 
     # ==================== ELECTRONICS COMPONENTS ====================
 
+    @_symbolized("resistor")
     def create_enhanced_resistor(self, x: float, y: float, width: float, height: float,
                                 label: str = "", orientation: str = "horizontal") -> EnhancedSVGElement:
         """
@@ -223,6 +284,7 @@ class EnhancedComponentLibrary:
 
         return group
 
+    @_symbolized("capacitor")
     def create_enhanced_capacitor(self, x: float, y: float, width: float, height: float,
                                  label: str = "", capacitor_type: str = "standard") -> EnhancedSVGElement:
         """
@@ -347,6 +409,7 @@ class EnhancedComponentLibrary:
 
         return group
 
+    @_symbolized("battery")
     def create_enhanced_battery(self, x: float, y: float, width: float, height: float,
                                label: str = "", num_cells: int = 1) -> EnhancedSVGElement:
         """
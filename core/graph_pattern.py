@@ -0,0 +1,251 @@
+"""
+Graph Pattern Matcher - Subgraph Matching for Property Graphs
+=============================================================
+
+Backtracking subgraph matcher shared by PropertyGraph.query_pattern and
+GraphQueryEngine.match_pattern.
+
+A pattern is a set of node variables (optional type, property equality and
+filter objects with an evaluate(properties) method) and edges between them
+(optional type, properties, filters). Matching:
+
+1. Candidates per variable come from the graph's node type index and, for
+   hashable property values, its property index; the smallest bucket is then
+   checked against the remaining conditions.
+2. Variables are joined most-selective first, preferring ones connected to
+   already-bound variables, so each step extends along adjacency.
+3. Backtracking binds a variable by walking the typed adjacency index of a
+   bound neighbour, then checks every other pattern edge to bound variables.
+4. Search stops at the result limit.
+
+Node variables bind to distinct graph nodes by default (subgraph
+isomorphism); injective=False allows two variables to share a node.
+
+Author: Universal STEM Diagram Generator
+Date: November 18, 2025
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+from dataclasses import dataclass, field
+import itertools
+
+from core.property_graph import PropertyGraph, GraphNode, GraphEdge, NodeType, EdgeType
+
+
+@dataclass
+class PatternNode:
+    """Node variable in a pattern"""
+    var: str
+    type: Optional[NodeType] = None
+    properties: Dict[str, Any] = field(default_factory=dict)  # equality conditions
+    filters: List[Any] = field(default_factory=list)  # objects with evaluate(properties)
+
+
+@dataclass
+class PatternEdge:
+    """Directed edge between two node variables"""
+    source: str
+    target: str
+    type: Optional[EdgeType] = None
+    properties: Dict[str, Any] = field(default_factory=dict)
+    filters: List[Any] = field(default_factory=list)
+    var: Optional[str] = None  # name for the bound edge in expanded matches
+
+
+@dataclass
+class PatternMatch:
+    """One match: node variables -> node IDs, edge variables -> GraphEdge"""
+    nodes: Dict[str, str]
+    edges: Dict[str, GraphEdge] = field(default_factory=dict)
+
+
+class PatternMatcher:
+    """
+    Subgraph pattern matcher over a PropertyGraph
+
+    Usage:
+        matcher = PatternMatcher(graph)
+        nodes = [PatternNode('f', NodeType.FORCE), PatternNode('b', NodeType.BODY)]
+        edges = [PatternEdge('f', 'b', EdgeType.ACTS_ON)]
+        for match in matcher.match(nodes, edges, limit=10):
+            print(match.nodes['f'], match.nodes['b'])
+    """
+
+    def __init__(self, graph: PropertyGraph):
+        self.graph = graph
+
+    @classmethod
+    def parse(cls, pattern: Dict) -> Tuple[List[PatternNode], List[PatternEdge]]:
+        """Convert the dict form used by PropertyGraph.query_pattern"""
+        nodes = [
+            PatternNode(
+                var=spec['id'],
+                type=spec.get('type'),
+                properties=dict(spec.get('properties') or {}),
+                filters=list(spec.get('filters') or [])
+            )
+            for spec in pattern.get('nodes', [])
+        ]
+        edges = [
+            PatternEdge(
+                source=spec['source'],
+                target=spec['target'],
+                type=spec.get('type'),
+                properties=dict(spec.get('properties') or {}),
+                filters=list(spec.get('filters') or []),
+                var=spec.get('id')
+            )
+            for spec in pattern.get('edges', [])
+        ]
+        return nodes, edges
+
+    def match(self, nodes: Sequence[PatternNode], edges: Sequence[PatternEdge] = (),
+              limit: Optional[int] = None, injective: bool = True,
+              expand_edges: bool = False) -> List[PatternMatch]:
+        """
+        Find matches of the pattern
+
+        Args:
+            nodes: Node variables
+            edges: Edges between node variables
+            limit: Stop after this many matches
+            injective: Bind node variables to distinct nodes
+            expand_edges: Return one match per combination of matching edges
+                (with PatternMatch.edges filled in) instead of one per node binding
+
+        Returns:
+            List of PatternMatch
+        """
+        if limit is not None and limit <= 0:
+            return []
+        return list(itertools.islice(self.iter_matches(nodes, edges, injective, expand_edges), limit))
+
+    def iter_matches(self, nodes: Sequence[PatternNode], edges: Sequence[PatternEdge] = (),
+                     injective: bool = True, expand_edges: bool = False) -> Iterator[PatternMatch]:
+        """Lazily enumerate matches (see match)"""
+        by_var = {node.var: node for node in nodes}
+        for edge in edges:
+            if edge.source not in by_var or edge.target not in by_var:
+                raise ValueError(f"Pattern edge {edge.source}->{edge.target} references an undeclared node")
+        if not by_var:
+            return
+
+        candidates = {var: self._candidates(node) for var, node in by_var.items()}
+        if any(not ids for ids in candidates.values()):
+            return
+        order = self._join_order(list(by_var), edges, candidates)
+        candidate_sets = {var: set(ids) for var, ids in candidates.items()}
+
+        # For each variable, the pattern edges that connect it to earlier variables
+        position = {var: index for index, var in enumerate(order)}
+        joins: Dict[str, List[PatternEdge]] = {var: [] for var in order}
+        for edge in edges:
+            later = edge.source if position[edge.source] >= position[edge.target] else edge.target
+            joins[later].append(edge)
+
+        assignment: Dict[str, str] = {}
+        used: Set[str] = set()
+
+        def extend(depth: int) -> Iterator[Dict[str, str]]:
+            if depth == len(order):
+                yield dict(assignment)
+                return
+            var = order[depth]
+            for node_id in self._expansions(var, joins[var], assignment, candidates, candidate_sets):
+                if injective and node_id in used:
+                    continue
+                assignment[var] = node_id
+                if all(self._edges_between(edge, assignment) for edge in joins[var]):
+                    used.add(node_id)
+                    yield from extend(depth + 1)
+                    used.discard(node_id)
+                del assignment[var]
+
+        for binding in extend(0):
+            if not expand_edges:
+                yield PatternMatch(nodes=binding)
+                continue
+            names = [edge.var or f"e{index}" for index, edge in enumerate(edges)]
+            options = [self._edges_between(edge, binding) for edge in edges]
+            for combo in itertools.product(*options):
+                yield PatternMatch(nodes=binding, edges=dict(zip(names, combo)))
+
+    # ========== Planning ==========
+
+    def _candidates(self, node: PatternNode) -> List[str]:
+        """Node IDs satisfying a variable's own conditions, via the narrowest index"""
+        pool: Optional[List[GraphNode]] = None
+        if node.type is not None:
+            pool = self.graph.get_all_nodes(node.type)
+        for key, value in node.properties.items():
+            try:
+                hash(value)
+            except TypeError:
+                continue
+            bucket = self.graph.find_nodes_by_property(key, value)
+            if pool is None or len(bucket) < len(pool):
+                pool = bucket
+        if pool is None:
+            pool = self.graph.get_all_nodes()
+        return [candidate.id for candidate in pool if self._node_ok(node, candidate)]
+
+    def _node_ok(self, pattern: PatternNode, node: GraphNode) -> bool:
+        if pattern.type is not None and node.type != pattern.type:
+            return False
+        properties = node.properties or {}
+        if any(properties.get(key) != value for key, value in pattern.properties.items()):
+            return False
+        return all(f.evaluate(properties) for f in pattern.filters)
+
+    def _join_order(self, variables: List[str], edges: Sequence[PatternEdge],
+                    candidates: Dict[str, List[str]]) -> List[str]:
+        """Greedy order: fewest candidates first, then connected variables by selectivity"""
+        neighbours: Dict[str, Set[str]] = {var: set() for var in variables}
+        for edge in edges:
+            neighbours[edge.source].add(edge.target)
+            neighbours[edge.target].add(edge.source)
+        declared = {var: index for index, var in enumerate(variables)}
+
+        def cost(var: str) -> Tuple[int, int]:
+            return (len(candidates[var]), declared[var])
+
+        order: List[str] = []
+        remaining = set(variables)
+        while remaining:
+            frontier = {var for var in remaining if neighbours[var] & set(order)}
+            var = min(frontier or remaining, key=cost)
+            order.append(var)
+            remaining.discard(var)
+        return order
+
+    # ========== Search ==========
+
+    def _expansions(self, var: str, joins: List[PatternEdge], assignment: Dict[str, str],
+                    candidates: Dict[str, List[str]], candidate_sets: Dict[str, Set[str]]) -> List[str]:
+        """Candidate IDs for var, reached through the smallest bound adjacency list"""
+        best: Optional[List[str]] = None
+        for edge in joins:
+            if edge.source == edge.target:
+                continue
+            if edge.target == var:
+                reached = [e.target for e in self.graph.get_edges(source=assignment[edge.source], edge_type=edge.type)]
+            else:
+                reached = [e.source for e in self.graph.get_edges(target=assignment[edge.target], edge_type=edge.type)]
+            if best is None or len(reached) < len(best):
+                best = reached
+        if best is None:
+            return candidates[var]
+        allowed = candidate_sets[var]
+        return [node_id for node_id in dict.fromkeys(best) if node_id in allowed]
+
+    def _edges_between(self, edge: PatternEdge, assignment: Dict[str, str]) -> List[GraphEdge]:
+        """Graph edges realising a pattern edge under the current binding"""
+        found = self.graph.get_edges(source=assignment[edge.source], target=assignment[edge.target],
+                                     edge_type=edge.type)
+        if not edge.properties and not edge.filters:
+            return found
+        return [
+            candidate for candidate in found
+            if all((candidate.properties or {}).get(key) == value for key, value in edge.properties.items())
+            and all(f.evaluate(candidate.properties or {}) for f in edge.filters)
+        ]
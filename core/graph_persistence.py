@@ -0,0 +1,415 @@
+"""
+Graph Database Persistence - Batched Background Sync
+====================================================
+
+Pushes property graph snapshots to a graph database off the request path.
+
+- GraphStore backends own one long-lived, pooled client (neo4j driver /
+  python-arango client) and write a whole graph with batched calls:
+  UNWIND for Neo4j, import_bulk for ArangoDB
+- GraphPersistenceWorker accepts snapshots through a bounded queue and
+  writes them on a background thread, retrying failed writes with
+  exponential backoff. submit() never blocks: when the queue is full the
+  snapshot is dropped and counted
+- metrics() reports queue depth, write lag (enqueue -> stored) and
+  success / failure / retry / drop counters
+- InMemoryGraphStore is an in-process store with the same batching, for
+  tests and local runs without a database
+
+Author: Universal STEM Diagram Generator
+Date: November 18, 2025
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+from collections import deque
+from dataclasses import dataclass, field
+import atexit
+import json
+import logging
+import queue
+import random
+import threading
+import time
+
+from core.property_graph import PropertyGraph
+from core.property_graph_io import GraphSnapshot
+
+try:
+    from neo4j import GraphDatabase
+    NEO4J_AVAILABLE = True
+except ImportError:
+    NEO4J_AVAILABLE = False
+
+try:
+    from arango import ArangoClient
+    ARANGO_AVAILABLE = True
+except ImportError:
+    ARANGO_AVAILABLE = False
+
+
+@dataclass
+class GraphWriteJob:
+    """One queued graph snapshot"""
+    request_id: str
+    snapshot: GraphSnapshot
+    enqueued_at: float = field(default_factory=time.time)
+    attempts: int = 0
+
+
+def _type_name(value: Any) -> str:
+    return value.value if hasattr(value, 'value') else str(value)
+
+
+def _batches(rows: Sequence[Any], size: int) -> Iterator[Sequence[Any]]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+class GraphStore:
+    """Backend interface: write one request's graph, replacing any previous copy"""
+
+    name = "store"
+
+    def __init__(self, batch_size: int = 500):
+        self.batch_size = max(1, batch_size)
+
+    def write_graph(self, request_id: str, snapshot: GraphSnapshot) -> Dict[str, int]:
+        """Write the snapshot; returns {'nodes_synced', 'edges_synced', 'batches'}"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class InMemoryGraphStore(GraphStore):
+    """
+    In-process store with Neo4j-like replace semantics
+
+    Keeps graphs[request_id] = {'nodes': {node_id: row}, 'edges': {relation_id: row}}
+    and records the size of every batch it receives.
+    """
+
+    name = "memory"
+
+    def __init__(self, batch_size: int = 500):
+        super().__init__(batch_size)
+        self.graphs: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.batch_sizes: List[int] = []
+        self._lock = threading.Lock()
+
+    def write_graph(self, request_id: str, snapshot: GraphSnapshot) -> Dict[str, int]:
+        nodes: Dict[str, Any] = {}
+        edges: Dict[str, Any] = {}
+        batches = 0
+        for batch in _batches(snapshot.nodes, self.batch_size):
+            nodes.update((node.id, {'label': node.label, 'type': _type_name(node.type),
+                                    'properties': node.properties, 'metadata': node.metadata})
+                         for node in batch)
+            self.batch_sizes.append(len(batch))
+            batches += 1
+        for batch in _batches(snapshot.edges, self.batch_size):
+            edges.update((f"{edge.source}->{edge.target}:{edge.label}",
+                          {'source': edge.source, 'target': edge.target, 'type': _type_name(edge.type),
+                           'properties': edge.properties, 'confidence': edge.confidence})
+                         for edge in batch)
+            self.batch_sizes.append(len(batch))
+            batches += 1
+        with self._lock:
+            self.graphs[request_id] = {'nodes': nodes, 'edges': edges}
+        return {'nodes_synced': len(snapshot.nodes), 'edges_synced': len(snapshot.edges), 'batches': batches}
+
+
+class Neo4jGraphStore(GraphStore):
+    """
+    Neo4j backend: one pooled driver, UNWIND batches per transaction
+
+    Nested properties/metadata are stored as JSON strings (Neo4j properties
+    cannot hold maps).
+    """
+
+    name = "neo4j"
+
+    NODE_QUERY = """
+        UNWIND $rows AS row
+        MERGE (n:DiagramNode {request_id: $request_id, node_id: row.node_id})
+        SET n += row.props
+    """
+    EDGE_QUERY = """
+        UNWIND $rows AS row
+        MATCH (source:DiagramNode {request_id: $request_id, node_id: row.source_id})
+        MATCH (target:DiagramNode {request_id: $request_id, node_id: row.target_id})
+        MERGE (source)-[r:DIAGRAM_RELATION {request_id: $request_id, relation_id: row.relation_id}]->(target)
+        SET r += row.props
+    """
+    CLEAR_QUERY = "MATCH (n:DiagramNode {request_id: $request_id}) DETACH DELETE n"
+
+    def __init__(self, uri: str, auth: Optional[tuple] = None, database: Optional[str] = None,
+                 batch_size: int = 500, max_connection_pool_size: int = 10):
+        if not NEO4J_AVAILABLE:
+            raise ImportError("neo4j driver not installed")
+        super().__init__(batch_size)
+        self.database = database
+        self.driver = GraphDatabase.driver(uri, auth=auth, max_connection_pool_size=max_connection_pool_size)
+
+    def write_graph(self, request_id: str, snapshot: GraphSnapshot) -> Dict[str, int]:
+        node_rows = [{
+            'node_id': node.id,
+            'props': {
+                'label': node.label,
+                'type': _type_name(node.type),
+                'properties': json.dumps(node.properties, default=str),
+                'metadata': json.dumps(node.metadata, default=str)
+            }
+        } for node in snapshot.nodes]
+        edge_rows = [{
+            'source_id': edge.source,
+            'target_id': edge.target,
+            'relation_id': f"{edge.source}->{edge.target}:{edge.label}",
+            'props': {
+                'type': _type_name(edge.type),
+                'label': edge.label,
+                'properties': json.dumps(edge.properties, default=str),
+                'metadata': json.dumps(edge.metadata, default=str),
+                'confidence': edge.confidence
+            }
+        } for edge in snapshot.edges]
+
+        def _write(tx):
+            tx.run(self.CLEAR_QUERY, request_id=request_id)
+            count = 0
+            for query, rows in ((self.NODE_QUERY, node_rows), (self.EDGE_QUERY, edge_rows)):
+                for batch in _batches(rows, self.batch_size):
+                    tx.run(query, request_id=request_id, rows=list(batch))
+                    count += 1
+            return count
+
+        session_args = {'database': self.database} if self.database else {}
+        with self.driver.session(**session_args) as session:
+            # One transaction: a retried write never leaves a half-replaced graph
+            execute_write = getattr(session, 'execute_write', None) or session.write_transaction
+            batches = execute_write(_write)
+        return {'nodes_synced': len(node_rows), 'edges_synced': len(edge_rows), 'batches': batches}
+
+    def close(self) -> None:
+        self.driver.close()
+
+
+class ArangoGraphStore(GraphStore):
+    """ArangoDB backend: one client (pooled HTTP session), import_bulk batches"""
+
+    name = "arango"
+
+    def __init__(self, uri: str, username: Optional[str] = None, password: Optional[str] = None,
+                 database: str = "_system", collection_base: str = "diagram_property_graphs",
+                 batch_size: int = 500):
+        if not ARANGO_AVAILABLE:
+            raise ImportError("python-arango not installed")
+        super().__init__(batch_size)
+        self.client = ArangoClient(hosts=uri)
+        self.db = self.client.db(database, username=username, password=password, verify=True)
+        self.vertex_collection_name = f"{collection_base}_nodes"
+        self.edge_collection_name = f"{collection_base}_edges"
+        if not self.db.has_collection(self.vertex_collection_name):
+            self.db.create_collection(self.vertex_collection_name)
+        if not self.db.has_collection(self.edge_collection_name):
+            self.db.create_collection(self.edge_collection_name, edge=True)
+
+    def write_graph(self, request_id: str, snapshot: GraphSnapshot) -> Dict[str, int]:
+        vertices = self.db.collection(self.vertex_collection_name)
+        edges = self.db.collection(self.edge_collection_name)
+        vertex_docs = [{
+            '_key': f"{request_id}_{node.id}",
+            'request_id': request_id,
+            'original_id': node.id,
+            'label': node.label,
+            'type': _type_name(node.type),
+            'properties': node.properties,
+            'metadata': node.metadata
+        } for node in snapshot.nodes]
+        edge_docs = [{
+            '_key': f"{request_id}_{idx}",
+            '_from': f"{self.vertex_collection_name}/{request_id}_{edge.source}",
+            '_to': f"{self.vertex_collection_name}/{request_id}_{edge.target}",
+            'request_id': request_id,
+            'type': _type_name(edge.type),
+            'label': edge.label,
+            'properties': edge.properties,
+            'metadata': edge.metadata,
+            'confidence': edge.confidence
+        } for idx, edge in enumerate(snapshot.edges)]
+
+        batches = 0
+        for collection, docs in ((vertices, vertex_docs), (edges, edge_docs)):
+            for batch in _batches(docs, self.batch_size):
+                result = collection.import_bulk(list(batch), on_duplicate='replace', halt_on_error=True)
+                if isinstance(result, dict) and result.get('errors'):
+                    raise RuntimeError(f"ArangoDB bulk import reported {result['errors']} errors")
+                batches += 1
+        return {'nodes_synced': len(vertex_docs), 'edges_synced': len(edge_docs), 'batches': batches}
+
+    def close(self) -> None:
+        self.client.close()
+
+
+def create_graph_store(backend: str, uri: str, username: Optional[str] = None, password: Optional[str] = None,
+                       database: Optional[str] = None, collection: str = "diagram_property_graphs",
+                       batch_size: int = 500) -> GraphStore:
+    """
+    Build a graph store backend
+
+    Args:
+        backend: 'neo4j', 'arango' or 'memory'
+
+    Raises:
+        ImportError: The backend's client library is not installed
+        ValueError: Unknown backend
+    """
+    backend = (backend or "").lower()
+    if backend == "neo4j":
+        auth = (username, password or "") if username else None
+        return Neo4jGraphStore(uri, auth=auth, database=database, batch_size=batch_size)
+    if backend == "arango":
+        return ArangoGraphStore(uri, username=username, password=password, database=database or "_system",
+                                collection_base=collection, batch_size=batch_size)
+    if backend == "memory":
+        return InMemoryGraphStore(batch_size=batch_size)
+    raise ValueError(f'Unknown backend "{backend}"')
+
+
+class GraphPersistenceWorker:
+    """
+    Background writer for graph database persistence
+
+    Usage:
+        worker = GraphPersistenceWorker(create_graph_store('neo4j', uri, ...))
+        worker.submit(property_graph, request_id)   # snapshot + enqueue, never blocks
+        worker.metrics()                            # queue depth, lag, counters
+        worker.close()                              # drain and stop
+    """
+
+    def __init__(self, store: GraphStore, max_queue: int = 64, max_retries: int = 3,
+                 backoff_base: float = 0.5, backoff_max: float = 10.0):
+        self.store = store
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.logger = logging.getLogger(__name__)
+
+        self._queue: "queue.Queue[Optional[GraphWriteJob]]" = queue.Queue(maxsize=max_queue)
+        self._enqueue_times: deque = deque()  # FIFO mirror of the queue, for oldest-pending age
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._outstanding = 0
+        self._stop = threading.Event()
+        self._counters = {'enqueued': 0, 'written': 0, 'failed': 0, 'dropped': 0, 'retries': 0}
+        self._lag_total = 0.0
+        self._lag_max = 0.0
+        self._last_lag: Optional[float] = None
+        self._last_error: Optional[str] = None
+        self.last_results: Dict[str, Dict[str, Any]] = {}
+
+        self._thread = threading.Thread(target=self._run, name=f"graphdb-{store.name}", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, graph: PropertyGraph, request_id: str) -> bool:
+        """Snapshot the graph and enqueue it; returns False if the queue is full or closed"""
+        if self._stop.is_set():
+            return False
+        job = GraphWriteJob(request_id=request_id, snapshot=GraphSnapshot.of(graph))
+        with self._lock:
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                self._counters['dropped'] += 1
+                self.logger.warning(f"Graph DB queue full ({self.max_queue}); dropped graph for {request_id}")
+                return False
+            self._enqueue_times.append(job.enqueued_at)
+            self._counters['enqueued'] += 1
+            self._outstanding += 1
+        return True
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            with self._lock:
+                self._enqueue_times.popleft()
+            result = self._write_with_retry(job)
+            with self._lock:
+                self.last_results[job.request_id] = result
+                if len(self.last_results) > self.max_queue:
+                    self.last_results.pop(next(iter(self.last_results)))
+                self._outstanding -= 1
+                if self._outstanding == 0:
+                    self._idle.notify_all()
+
+    def _write_with_retry(self, job: GraphWriteJob) -> Dict[str, Any]:
+        while True:
+            job.attempts += 1
+            try:
+                stats = self.store.write_graph(job.request_id, job.snapshot)
+            except Exception as exc:
+                if job.attempts > self.max_retries or self._stop.is_set():
+                    with self._lock:
+                        self._counters['failed'] += 1
+                        self._last_error = str(exc)
+                    self.logger.warning(f"Graph DB write for {job.request_id} failed after "
+                                        f"{job.attempts} attempts: {exc}")
+                    return {'status': 'error', 'backend': self.store.name, 'reason': str(exc),
+                            'attempts': job.attempts}
+                with self._lock:
+                    self._counters['retries'] += 1
+                delay = min(self.backoff_max, self.backoff_base * (2 ** (job.attempts - 1)))
+                self._stop.wait(delay * (0.5 + random.random() / 2))  # jittered; cut short by close()
+                continue
+
+            lag = time.time() - job.enqueued_at
+            with self._lock:
+                self._counters['written'] += 1
+                self._lag_total += lag
+                self._lag_max = max(self._lag_max, lag)
+                self._last_lag = lag
+            return {'status': 'success', 'backend': self.store.name, 'attempts': job.attempts,
+                    'lag': lag, **stats}
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth, lag (seconds) and counters"""
+        with self._lock:
+            written = self._counters['written']
+            return {
+                'backend': self.store.name,
+                'queue_depth': self._queue.qsize(),
+                'max_queue': self.max_queue,
+                'in_flight': self._outstanding - self._queue.qsize(),
+                'oldest_pending_seconds': (time.time() - self._enqueue_times[0]) if self._enqueue_times else 0.0,
+                'last_lag_seconds': self._last_lag,
+                'avg_lag_seconds': (self._lag_total / written) if written else None,
+                'max_lag_seconds': self._lag_max,
+                'last_error': self._last_error,
+                **self._counters
+            }
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued graph is written or failed; returns False on timeout"""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._outstanding == 0, timeout=timeout)
+
+    def close(self, timeout: Optional[float] = 30.0) -> None:
+        """Drain the queue (up to timeout), stop the thread and close the store"""
+        if self._stop.is_set():
+            return
+        self.flush(timeout)
+        self._stop.set()
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            self.logger.warning("Graph DB queue still full at shutdown; abandoning pending writes")
+        self._thread.join(timeout)
+        try:
+            self.store.close()
+        except Exception as exc:
+            self.logger.debug(f"Graph store close failed: {exc}")
+        atexit.unregister(self.close)
@@ -20,6 +20,7 @@ from enum import Enum
 import re
 
 from core.property_graph import PropertyGraph, GraphNode, GraphEdge, NodeType, EdgeType
+from core.graph_pattern import PatternMatcher, PatternNode, PatternEdge, PatternMatch
 
 
 class QueryOperator(Enum):
@@ -200,7 +201,8 @@ class GraphQueryEngine:
                       target_type: Optional[NodeType] = None,
                       source_filters: Optional[List[QueryFilter]] = None,
                       edge_filters: Optional[List[QueryFilter]] = None,
-                      target_filters: Optional[List[QueryFilter]] = None) -> List[Dict[str, Any]]:
+                      target_filters: Optional[List[QueryFilter]] = None,
+                      limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Match graph pattern: (source)-[edge]->(target)
 
@@ -211,6 +213,7 @@ class GraphQueryEngine:
             source_filters: Optional filters for source node
             edge_filters: Optional filters for edge
             target_filters: Optional filters for target node
+            limit: Optional maximum number of matches
 
         Returns:
             List of matches, each match is a dict with 'source', 'edge', 'target' keys
@@ -223,36 +226,52 @@ class GraphQueryEngine:
                 target_type=NodeType.BODY
             )
         """
-        matches = []
+        nodes = [
+            PatternNode('source', type=source_type, filters=list(source_filters or [])),
+            PatternNode('target', type=target_type, filters=list(target_filters or []))
+        ]
+        edges = [PatternEdge('source', 'target', type=edge_type, filters=list(edge_filters or []), var='edge')]
+
+        # Self-loops match with source == target, as before
+        matches = self.match_subgraph(nodes, edges, limit=limit, injective=False, expand_edges=True)
+        return [
+            {
+                'source': self.graph.get_node(match.nodes['source']),
+                'edge': match.edges['edge'],
+                'target': self.graph.get_node(match.nodes['target'])
+            }
+            for match in matches
+        ]
 
-        # Get candidate source nodes
-        source_nodes = self.match_nodes(node_type=source_type, filters=source_filters)
+    def match_subgraph(self,
+                       nodes: List[PatternNode],
+                       edges: Optional[List[PatternEdge]] = None,
+                       limit: Optional[int] = None,
+                       injective: bool = True,
+                       expand_edges: bool = False) -> List[PatternMatch]:
+        """
+        Match a multi-node pattern (subgraph matching)
 
-        for source_node in source_nodes:
-            # Get outgoing edges from source
-            edges = self.match_edges(edge_type=edge_type, source=source_node.id, filters=edge_filters)
+        Args:
+            nodes: Pattern node variables (type, properties, filters)
+            edges: Pattern edges between node variables
+            limit: Optional maximum number of matches
+            injective: Bind node variables to distinct graph nodes
+            expand_edges: Return one match per combination of matching edges
 
-            for edge in edges:
-                # Get target node
-                target_node = self.graph.get_node(edge.target)
-
-                if target_node:
-                    # Check target type and filters
-                    if target_type and target_node.type != target_type:
-                        continue
-
-                    if target_filters:
-                        if not all(f.evaluate(target_node.properties) for f in target_filters):
-                            continue
-
-                    # Match found
-                    matches.append({
-                        'source': source_node,
-                        'edge': edge,
-                        'target': target_node
-                    })
-
-        return matches
+        Returns:
+            List of PatternMatch (variable -> node ID, edge variable -> GraphEdge)
+
+        Example:
+            # Forces acting on a body that is above another body
+            matches = engine.match_subgraph(
+                [PatternNode('f', NodeType.FORCE), PatternNode('top', NodeType.BODY),
+                 PatternNode('bottom', NodeType.BODY)],
+                [PatternEdge('f', 'top', EdgeType.ACTS_ON), PatternEdge('top', 'bottom', EdgeType.ABOVE)]
+            )
+        """
+        return PatternMatcher(self.graph).match(nodes, edges or [], limit=limit,
+                                                injective=injective, expand_edges=expand_edges)
 
     # ========== Path Queries ==========
 
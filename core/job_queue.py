@@ -0,0 +1,186 @@
+"""
+Diagram Job Queue
+=================
+
+Bounded background execution for long-running diagram generation, so an
+API server never runs the synchronous pipeline on its event loop.
+
+- submit() enqueues a job on a fixed-size worker pool and returns at once;
+  QueueFullError is raised when running + queued jobs reach the limit
+  (the HTTP layer turns this into 429)
+- each Job records per-stage progress events (see StageRun.on_stage)
+- cancel() drops a queued job immediately; a running job gets its
+  cancel_event set and stops at the next stage boundary
+- finished jobs are kept for polling and pruned oldest-first
+
+Author: Universal STEM Diagram Generator
+Date: November 18, 2025
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Raised by JobQueue.submit when no queue slot is free"""
+
+
+class JobState(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+FINAL_STATES = frozenset({JobState.SUCCEEDED, JobState.FAILED, JobState.CANCELLED})
+
+
+@dataclass
+class Job:
+    """One queued unit of work and its progress"""
+    id: str
+    state: JobState = JobState.QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    result: Any = None
+    error: Optional[str] = None
+    cancel_event: threading.Event = field(default_factory=threading.Event, repr=False)
+    future: Optional[Future] = field(default=None, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.state in FINAL_STATES
+
+    def emit(self, event_type: str, **data: Any) -> None:
+        """Append a progress event (list append is atomic; readers poll by index)"""
+        self.events.append({'type': event_type, 'time': time.time(), **data})
+
+    def _set_state(self, state: JobState, error: Optional[str] = None) -> None:
+        self.state = state
+        self.error = error
+        if state == JobState.RUNNING:
+            self.started_at = time.time()
+        elif state in FINAL_STATES:
+            self.finished_at = time.time()
+        self.emit('state', state=state.value, **({'error': error} if error else {}))
+
+
+class JobQueue:
+    """
+    Fixed worker pool with a bounded backlog of jobs
+
+    Example:
+        >>> queue = JobQueue(max_workers=1, max_pending=8)
+        >>> job = queue.submit(lambda job: pipeline.generate(text, cancel_event=job.cancel_event))
+        >>> queue.get(job.id).state
+    """
+
+    def __init__(self, max_workers: int = 1, max_pending: int = 16, max_finished: int = 256):
+        """
+        Args:
+            max_workers: Jobs executed concurrently
+            max_pending: Jobs allowed to wait for a worker
+            max_finished: Finished jobs kept for status queries
+        """
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(0, max_pending)
+        self.max_finished = max_finished
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="diagram-job")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[[Job], Any], job_id: Optional[str] = None) -> Job:
+        """
+        Queue fn(job) for execution
+
+        Raises:
+            QueueFullError: If max_workers + max_pending jobs are already active
+        """
+        with self._lock:
+            active = sum(1 for job in self._jobs.values() if not job.done)
+            if active >= self.max_workers + self.max_pending:
+                raise QueueFullError(f"Job queue full ({active} active jobs)")
+            job = Job(id=job_id or str(uuid.uuid4()))
+            job.emit('state', state=JobState.QUEUED.value)
+            self._jobs[job.id] = job
+            job.future = self._executor.submit(self._run, job, fn)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Request cancellation; returns the job (None if unknown)
+
+        Queued jobs are cancelled at once, running jobs at their next
+        stage boundary. Finished jobs are returned unchanged.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.done:
+                return job
+            job.cancel_event.set()
+            if job.state == JobState.QUEUED and job.future is not None and job.future.cancel():
+                job._set_state(JobState.CANCELLED)
+                self._prune()
+        return job
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            counts = {state.value: 0 for state in JobState}
+            for job in self._jobs.values():
+                counts[job.state.value] += 1
+        counts['capacity'] = self.max_workers + self.max_pending
+        return counts
+
+    def shutdown(self, cancel: bool = True) -> None:
+        """Stop the pool; with cancel=True queued and running jobs are cancelled"""
+        if cancel:
+            for job_id in list(self._jobs):
+                self.cancel(job_id)
+        self._executor.shutdown(wait=True)
+
+    # ========== Internals ==========
+
+    def _run(self, job: Job, fn: Callable[[Job], Any]) -> None:
+        with self._lock:
+            if job.cancel_event.is_set():
+                job._set_state(JobState.CANCELLED)
+                return
+            job._set_state(JobState.RUNNING)
+        try:
+            result = fn(job)
+        except Exception as exc:
+            with self._lock:
+                if job.cancel_event.is_set():
+                    job._set_state(JobState.CANCELLED)
+                else:
+                    logger.exception("Job %s failed", job.id)
+                    job._set_state(JobState.FAILED, error=f"{type(exc).__name__}: {exc}")
+                self._prune()
+            return
+        with self._lock:
+            job.result = result
+            job._set_state(JobState.SUCCEEDED)
+            self._prune()
+
+    def _prune(self) -> None:
+        """Drop the oldest finished jobs beyond max_finished (lock held)"""
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
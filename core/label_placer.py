@@ -13,10 +13,11 @@ Author: STEM-AI Pipeline Team
 Date: November 11, 2025
 """
 
-from typing import List, Optional, Tuple, Dict
+from typing import List, Optional, Tuple, Dict, Union
 from dataclasses import dataclass
 import math
 from core.scene.schema_v1 import Scene, SceneObject, PrimitiveType, Position, RenderLayer
+from core.spatial_index import SceneSpatialIndex
 
 
 @dataclass
@@ -79,29 +80,32 @@ class IntelligentLabelPlacer:
 
         print(f"  📍 IntelligentLabelPlacer: Positioning {len(labels)} labels")
 
+        # Spatial indexes: candidate scoring only visits nearby shapes/labels
+        shape_index = SceneSpatialIndex.build(shapes, self._get_bounds)
+        placed_labels = SceneSpatialIndex(self._get_placed_label_bounds)
+
         # Process each label
-        placed_labels = []
         for label in labels:
             # Get target object (if specified)
             target_obj_id = label.properties.get("target_object")
             target_obj = None
 
             if target_obj_id:
-                target_obj = next((obj for obj in shapes if obj.id == target_obj_id), None)
+                target_obj = shape_index.get(target_obj_id)
 
             if target_obj and target_obj.position:
                 # Find best position near target
                 best_pos = self._find_best_label_position(
-                    label, target_obj, shapes, placed_labels
+                    label, target_obj, shape_index, placed_labels
                 )
                 label.position = best_pos
                 print(f"     ✓ Placed '{label.id}' near '{target_obj.id}'")
             elif label.position is None:
                 # No target specified and no position - place in safe area
-                label.position = self._get_safe_default_position(label, shapes, placed_labels)
+                label.position = self._get_safe_default_position(label, shape_index, placed_labels)
                 print(f"     ⚠️  Placed '{label.id}' in default position (no target specified)")
 
-            placed_labels.append(label)
+            placed_labels.insert(label)
 
         return scene
 
@@ -109,8 +113,8 @@ class IntelligentLabelPlacer:
         self,
         label: SceneObject,
         target: SceneObject,
-        shapes: List[SceneObject],
-        other_labels: List[SceneObject]
+        shapes: Union[List[SceneObject], SceneSpatialIndex],
+        other_labels: Union[List[SceneObject], SceneSpatialIndex]
     ) -> Dict[str, float]:
         """
         Find best position for label near target object
@@ -222,8 +226,8 @@ class IntelligentLabelPlacer:
         position: Dict[str, float],
         label_width: float,
         label_height: float,
-        shapes: List[SceneObject],
-        other_labels: List[SceneObject],
+        shapes: Union[List[SceneObject], SceneSpatialIndex],
+        other_labels: Union[List[SceneObject], SceneSpatialIndex],
         target: SceneObject
     ) -> float:
         """
@@ -234,8 +238,8 @@ class IntelligentLabelPlacer:
             position: Candidate position
             label_width: Estimated label width
             label_height: Estimated label height
-            shapes: All shapes to avoid
-            other_labels: Already-placed labels to avoid
+            shapes: All shapes to avoid (list or spatial index)
+            other_labels: Already-placed labels to avoid (list or spatial index)
             target: Target object
 
         Returns:
@@ -248,6 +252,12 @@ class IntelligentLabelPlacer:
             position, label_width, label_height
         )
 
+        # Only objects near the candidate can overlap it
+        if isinstance(shapes, SceneSpatialIndex):
+            shapes = shapes.query(label_bounds)
+        if isinstance(other_labels, SceneSpatialIndex):
+            other_labels = other_labels.query(label_bounds)
+
         # Penalty for overlapping shapes (except target)
         for shape in shapes:
             if shape.id == target.id:
@@ -347,6 +357,13 @@ class IntelligentLabelPlacer:
         else:  # center
             return (x - width/2, y - height/2, x + width/2, y + height/2)
 
+    def _get_placed_label_bounds(self, label: SceneObject) -> Optional[Tuple[float, float, float, float]]:
+        """Bounds of an already-placed label (used to index placed labels)"""
+        if not label.position:
+            return None
+        label_w, label_h = self._estimate_label_size(label)
+        return self._get_label_bounds_at_position(label.position, label_w, label_h)
+
     def _bounds_overlap(
         self,
         bounds1: Tuple[float, float, float, float],
@@ -382,8 +399,8 @@ class IntelligentLabelPlacer:
     def _get_safe_default_position(
         self,
         label: SceneObject,
-        shapes: List[SceneObject],
-        other_labels: List[SceneObject]
+        shapes: Union[List[SceneObject], SceneSpatialIndex],
+        other_labels: Union[List[SceneObject], SceneSpatialIndex]
     ) -> Dict[str, float]:
         """Get safe default position for label without target"""
         # Try to place in top-right corner
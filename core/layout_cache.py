@@ -0,0 +1,318 @@
+"""
+Layout Solution Cache
+=====================
+
+Reuses solved layouts for recurring constraint topologies (series capacitors,
+parallel plates with dielectric, block on incline, ...).
+
+Keys are a canonical fingerprint of the layout problem: object types and
+dimensions, constraint types/parameters and the objects they connect, canvas
+size and a solver signature. Object IDs never enter the key: objects are put
+into a canonical order by colour refinement over the constraint graph (ties
+broken by input order), and the whole problem is serialized against that
+order. Two problems share a key only if they are identical up to renaming,
+so a hit can be replayed by mapping the cached positions, stored per
+canonical slot, onto the new IDs.
+
+Backends:
+- memory: per-process LRU
+- sqlite: on-disk tier shared by workers on the host (core.sqlite_blob_store),
+  fronted by the LRU
+
+Author: Universal STEM Diagram Generator
+Date: November 18, 2025
+"""
+
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from enum import Enum
+import hashlib
+import json
+import logging
+import threading
+
+from core.sqlite_blob_store import SQLiteBlobStore, build_cache
+
+
+# Bump when the fingerprint layout or the stored payload changes
+LAYOUT_CACHE_SCHEMA_VERSION = 1
+
+# Colour refinement rounds; small diagrams stabilise in two or three
+_REFINEMENT_ROUNDS = 4
+
+
+@dataclass(frozen=True)
+class LayoutFingerprint:
+    """Canonical key plus the object IDs in canonical slot order"""
+    key: str
+    order: Tuple[str, ...]
+
+
+@dataclass
+class CachedLayout:
+    """Layout replayed from the cache, already mapped onto the caller's IDs"""
+    positions: Dict[str, Tuple[float, float]]
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+def _canonical_value(value: Any) -> Any:
+    """JSON-stable form of constraint parameters"""
+    if isinstance(value, Enum):
+        return _canonical_value(value.value)
+    if isinstance(value, Mapping):
+        return {str(key): _canonical_value(item) for key, item in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (list, tuple)):
+        return [_canonical_value(item) for item in value]
+    if isinstance(value, float):
+        return round(value, 3)
+    if isinstance(value, (str, int, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def _digest(payload: Any) -> str:
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    ).hexdigest()
+
+
+def fingerprint_layout(objects: Sequence[Tuple[str, Any, float, float]],
+                       constraints: Sequence[Tuple[Any, Sequence[str], Mapping[str, Any]]],
+                       canvas: Sequence[Any],
+                       signature: str = "",
+                       positions: Optional[Mapping[str, Tuple[float, float]]] = None) -> LayoutFingerprint:
+    """
+    Canonical fingerprint of a layout problem
+
+    Args:
+        objects: (object_id, type, width, height) in a deterministic input order
+        constraints: (type, object_ids, parameters); the order of object_ids is
+            significant (e.g. left_of), the order of constraints is not
+        canvas: Canvas size and margins
+        signature: Solver/mode description; different solvers never share entries
+        positions: Optional input positions, for solvers whose answer depends on them
+
+    Returns:
+        LayoutFingerprint (key is invariant to renaming the object IDs)
+    """
+    ids = [obj_id for obj_id, _, _, _ in objects]
+    slot = {obj_id: index for index, obj_id in enumerate(ids)}
+
+    base = []
+    for obj_id, obj_type, width, height in objects:
+        label = [_canonical_value(obj_type), round(float(width), 2), round(float(height), 2)]
+        if positions is not None:
+            position = positions.get(obj_id)
+            label.append([round(float(position[0]), 1), round(float(position[1]), 1)] if position else None)
+        base.append(label)
+
+    edges = []
+    for constraint_type, members, parameters in constraints:
+        indices = [slot[obj_id] for obj_id in members if obj_id in slot]
+        if len(indices) != len(members):
+            continue  # references an object outside this problem
+        edges.append((_digest([_canonical_value(constraint_type), _canonical_value(parameters or {})]), indices))
+
+    # Colour refinement: an object's colour folds in the colours of its constraint neighbours
+    colours = [_digest(label) for label in base]
+    for _ in range(_REFINEMENT_ROUNDS):
+        signatures: List[List[Any]] = [[colour] for colour in colours]
+        for edge_label, indices in edges:
+            member_colours = [colours[i] for i in indices]
+            for position, index in enumerate(indices):
+                signatures[index].append((edge_label, position, member_colours))
+        refined = [_digest([sig[0], sorted(sig[1:])]) for sig in signatures]
+        stable = len(set(refined)) == len(set(colours))
+        colours = refined
+        if stable:
+            break
+
+    order = sorted(range(len(ids)), key=lambda index: (colours[index], index))
+    canonical_slot = {index: rank for rank, index in enumerate(order)}
+    payload = {
+        'schema': LAYOUT_CACHE_SCHEMA_VERSION,
+        'signature': signature,
+        'canvas': _canonical_value(list(canvas)),
+        'objects': [base[index] for index in order],
+        'constraints': sorted([edge_label, [canonical_slot[i] for i in indices]] for edge_label, indices in edges)
+    }
+    return LayoutFingerprint(key=_digest(payload), order=tuple(ids[index] for index in order))
+
+
+def _encode_entry(entry: Mapping[str, Any]) -> bytes:
+    return json.dumps(entry, separators=(',', ':'), default=str).encode('utf-8')
+
+
+def _decode_entry(payload: bytes) -> Dict[str, Any]:
+    return json.loads(payload.decode('utf-8'))
+
+
+class LayoutSolutionCache:
+    """
+    In-memory LRU of solved layouts stored by canonical slot.
+
+    Subclasses add a persistent tier by overriding _load/_save.
+    """
+
+    backend = "memory"
+
+    def __init__(self, max_entries: int = 128):
+        self.logger = logging.getLogger(__name__)
+        self.max_entries = max(0, max_entries)
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, fingerprint: Optional[LayoutFingerprint]) -> Optional[CachedLayout]:
+        """Cached layout remapped onto fingerprint.order, or None on a miss"""
+        if fingerprint is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(fingerprint.key)
+            if entry is not None:
+                self._entries.move_to_end(fingerprint.key)
+        if entry is None:
+            entry = self._load(fingerprint.key)
+            if entry is not None and len(entry.get('slots', ())) == len(fingerprint.order):
+                self._remember(fingerprint.key, entry)
+            else:
+                entry = None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if entry is None:
+            return None
+        positions = {
+            obj_id: (float(slot[0]), float(slot[1]))
+            for obj_id, slot in zip(fingerprint.order, entry['slots'])
+            if slot is not None
+        }
+        return CachedLayout(positions=positions, metadata=dict(entry.get('metadata', {})))
+
+    def put(self, fingerprint: Optional[LayoutFingerprint], positions: Mapping[str, Tuple[float, float]],
+            metadata: Optional[Mapping[str, Any]] = None) -> None:
+        """Store positions by canonical slot (objects without a position stay empty)"""
+        if fingerprint is None or not positions:
+            return
+        entry = {
+            'slots': [
+                [float(positions[obj_id][0]), float(positions[obj_id][1])] if obj_id in positions else None
+                for obj_id in fingerprint.order
+            ],
+            'metadata': json.loads(json.dumps(dict(metadata or {}), default=str))
+        }
+        self._remember(fingerprint.key, entry)
+        try:
+            self._save(fingerprint.key, entry)
+        except Exception as exc:
+            self.logger.warning(f"Layout cache write failed: {exc}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'backend': self.backend,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / lookups) if lookups else 0.0,
+                'evictions': self.evictions,
+                'memory_entries': len(self._entries)
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def close(self) -> None:
+        pass
+
+    def _remember(self, key: str, entry: Dict[str, Any]) -> None:
+        if not self.max_entries:
+            return
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                if self.backend == "memory":
+                    self.evictions += 1
+
+    def _forget(self, keys) -> None:
+        """Drop keys evicted from the persistent tier"""
+        if not keys:
+            return
+        with self._lock:
+            self.evictions += len(keys)
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        return None
+
+    def _save(self, key: str, entry: Dict[str, Any]) -> None:
+        pass
+
+
+class SQLiteLayoutSolutionCache(LayoutSolutionCache):
+    """
+    SQLite-backed layout cache shared by all workers on a host.
+
+    Rows live in a SQLiteBlobStore table (WAL, compressed, LRU-evicted past
+    max_bytes); this class only adds the JSON encoding of the entries.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, path: str = "cache/layout_solutions.sqlite3",
+                 max_bytes: int = 64 * 1024 * 1024,
+                 memory_entries: int = 128):
+        super().__init__(max_entries=memory_entries)
+        self.store = SQLiteBlobStore(path, table="layout_solutions", max_bytes=max_bytes)
+        self.path = self.store.path
+        self.max_bytes = max_bytes
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        payload = self.store.load(key)
+        if payload is None:
+            return None
+        try:
+            return _decode_entry(payload)
+        except Exception as exc:
+            self.logger.warning(f"Discarding unreadable layout cache entry {key[:12]}: {exc}")
+            return None
+
+    def _save(self, key: str, entry: Dict[str, Any]) -> None:
+        self._forget(self.store.save(key, _encode_entry(entry)))
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats.update(self.store.stats())
+        return stats
+
+    def close(self) -> None:
+        self.store.close()
+
+
+def create_layout_cache(backend: str = "memory",
+                        path: str = "cache/layout_solutions.sqlite3",
+                        max_bytes: int = 64 * 1024 * 1024,
+                        memory_entries: int = 128) -> Optional[LayoutSolutionCache]:
+    """
+    Build a layout solution cache
+
+    Args:
+        backend: 'sqlite', 'memory', or 'none'
+        path: SQLite file (sqlite backend only)
+        max_bytes: On-disk size budget before eviction (sqlite backend only)
+        memory_entries: Size of the in-process LRU
+    """
+    return build_cache(
+        backend, "layout",
+        memory=lambda: LayoutSolutionCache(max_entries=memory_entries),
+        sqlite=lambda: SQLiteLayoutSolutionCache(path=path, max_bytes=max_bytes, memory_entries=memory_entries)
+    )
@@ -0,0 +1,287 @@
+"""
+NLP Result Cache
+================
+
+Content-addressed cache for Phase 0 NLP enrichment outputs.
+
+Keys are a SHA-256 digest of the problem text plus the active tool set and
+each tool's version string, so they are stable across processes and
+restarts (unlike Python's salted ``hash``). Cached results are normalized
+to plain JSON-shaped data, then frozen (read-only dicts/tuples) and shared
+between callers instead of being deep-copied on every get and put.
+
+Backends:
+- memory: per-process LRU (default for tests / single worker)
+- sqlite: on-disk store shared by every worker on the host, with
+  size-based eviction (core.sqlite_blob_store), fronted by a small
+  in-memory LRU of frozen results
+
+Author: Universal STEM Diagram Generator
+Date: November 18, 2025
+"""
+
+from typing import Any, Dict, Mapping, Optional
+from collections import OrderedDict
+from dataclasses import asdict, is_dataclass
+from enum import Enum
+import hashlib
+import json
+import logging
+import threading
+
+from core.sqlite_blob_store import SQLiteBlobStore, build_cache
+
+
+# Bump when the shape of the per-tool entries built in the pipeline changes
+NLP_RESULT_SCHEMA_VERSION = 1
+
+# Entry keys that hold live tool objects; dropped when results are normalized
+_NON_PERSISTENT_KEYS = ('raw_result',)
+
+
+class FrozenDict(dict):
+    """Read-only dict used for cached NLP entries (still JSON-serializable)"""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("cached NLP results are read-only")
+
+    __setitem__ = _readonly
+    __delitem__ = _readonly
+    clear = _readonly
+    pop = _readonly
+    popitem = _readonly
+    setdefault = _readonly
+    update = _readonly
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+def freeze(value: Any) -> Any:
+    """Recursively convert dicts/lists/sets into read-only equivalents"""
+    if isinstance(value, FrozenDict):
+        return value
+    if isinstance(value, Mapping):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(freeze(item) for item in value)
+    return value
+
+
+def tool_version(tool: Any) -> str:
+    """Best-effort version string for an NLP tool instance"""
+    parts = [f"{type(tool).__module__}.{type(tool).__qualname__}"]
+    for attr in ('version', 'model_name', 'model', 'pipeline_name'):
+        value = getattr(tool, attr, None)
+        if isinstance(value, (str, int, float)):
+            parts.append(f"{attr}={value}")
+    return ";".join(parts)
+
+
+def make_nlp_cache_key(text: str, tool_versions: Mapping[str, str]) -> str:
+    """Stable digest of text + tool set + tool versions"""
+    digest = hashlib.sha256()
+    digest.update(f"schema={NLP_RESULT_SCHEMA_VERSION}\n".encode('utf-8'))
+    for name in sorted(tool_versions):
+        digest.update(f"{name}={tool_versions[name]}\n".encode('utf-8'))
+    digest.update(b"\x00")
+    digest.update(text.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _to_jsonable(value: Any) -> Any:
+    if is_dataclass(value) and not isinstance(value, type):
+        return _to_jsonable(asdict(value))
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, Mapping):
+        return {str(key): _to_jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [_to_jsonable(item) for item in value]
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    return str(value)
+
+
+def normalize_results(results: Mapping[str, Mapping[str, Any]]) -> Dict[str, Any]:
+    """
+    Plain-data form of NLP results
+
+    Live tool objects (raw_result) are dropped and dataclasses, enums and
+    arrays become dicts, values and lists, so a fresh run, a memory hit and
+    a disk hit all hand downstream code the same shapes.
+    """
+    return _to_jsonable({
+        tool: {key: item for key, item in entry.items() if key not in _NON_PERSISTENT_KEYS}
+        for tool, entry in results.items()
+    })
+
+
+def _encode_results(results: Mapping[str, Mapping[str, Any]]) -> bytes:
+    return json.dumps(results, separators=(',', ':')).encode('utf-8')
+
+
+def _decode_results(payload: bytes) -> Dict[str, Any]:
+    return json.loads(payload.decode('utf-8'))
+
+
+class NLPResultCache:
+    """
+    In-memory LRU of frozen NLP results.
+
+    Subclasses add a persistent tier by overriding _load/_save.
+    """
+
+    backend = "memory"
+
+    def __init__(self, max_entries: int = 32):
+        self.logger = logging.getLogger(__name__)
+        self.max_entries = max(0, max_entries)
+        self._entries: "OrderedDict[str, FrozenDict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Optional[str]) -> Optional[FrozenDict]:
+        """Return frozen results for key, or None on a miss"""
+        if not key:
+            return None
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+        if cached is None:
+            payload = self._load(key)
+            if payload is not None:
+                cached = freeze(payload)
+                self._remember(key, cached)
+        with self._lock:
+            if cached is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return cached
+
+    def put(self, key: Optional[str], results: Mapping[str, Any]) -> Optional[FrozenDict]:
+        """Normalize, freeze and store results; returns the frozen value"""
+        if not key or not results:
+            return None
+        frozen = freeze(normalize_results(results))
+        self._remember(key, frozen)
+        try:
+            self._save(key, frozen)
+        except Exception as exc:
+            self.logger.warning(f"NLP cache write failed: {exc}")
+        return frozen
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'backend': self.backend,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / lookups) if lookups else 0.0,
+                'evictions': self.evictions,
+                'memory_entries': len(self._entries)
+            }
+
+    def close(self) -> None:
+        pass
+
+    def _remember(self, key: str, frozen: FrozenDict) -> None:
+        if not self.max_entries:
+            return
+        with self._lock:
+            self._entries[key] = frozen
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                if self.backend == "memory":
+                    self.evictions += 1
+
+    def _forget(self, keys) -> None:
+        """Drop keys evicted from the persistent tier"""
+        if not keys:
+            return
+        with self._lock:
+            self.evictions += len(keys)
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        return None
+
+    def _save(self, key: str, frozen: FrozenDict) -> None:
+        pass
+
+
+class SQLiteNLPResultCache(NLPResultCache):
+    """
+    SQLite-backed cache shared by all workers on a host.
+
+    Rows live in a SQLiteBlobStore table (WAL, compressed, LRU-evicted past
+    max_bytes); this class only adds the JSON encoding of the results.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, path: str = "cache/nlp_results.sqlite3",
+                 max_bytes: int = 256 * 1024 * 1024,
+                 memory_entries: int = 32):
+        super().__init__(max_entries=memory_entries)
+        self.store = SQLiteBlobStore(path, table="nlp_results", max_bytes=max_bytes)
+        self.path = self.store.path
+        self.max_bytes = max_bytes
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        payload = self.store.load(key)
+        if payload is None:
+            return None
+        try:
+            return _decode_results(payload)
+        except Exception as exc:
+            self.logger.warning(f"Discarding unreadable NLP cache entry {key[:12]}: {exc}")
+            return None
+
+    def _save(self, key: str, frozen: FrozenDict) -> None:
+        self._forget(self.store.save(key, _encode_results(frozen)))
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats.update(self.store.stats())
+        return stats
+
+    def close(self) -> None:
+        self.store.close()
+
+
+def create_nlp_cache(backend: str = "memory",
+                     path: str = "cache/nlp_results.sqlite3",
+                     max_bytes: int = 256 * 1024 * 1024,
+                     memory_entries: int = 32) -> Optional[NLPResultCache]:
+    """
+    Build an NLP result cache
+
+    Args:
+        backend: 'sqlite', 'memory', or 'none'
+        path: SQLite file (sqlite backend only)
+        max_bytes: On-disk size budget before eviction (sqlite backend only)
+        memory_entries: Size of the in-process LRU of frozen results
+    """
+    return build_cache(
+        backend, "NLP",
+        memory=lambda: NLPResultCache(max_entries=memory_entries),
+        sqlite=lambda: SQLiteNLPResultCache(path=path, max_bytes=max_bytes, memory_entries=memory_entries)
+    )
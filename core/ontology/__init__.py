@@ -17,6 +17,7 @@ from core.ontology.ontology_manager import (
     create_biology_ontology,
     validate_diagram_semantics
 )
+from core.ontology.ontology_pool import OntologyPool, DomainTBox, OverlayStore
 
 __all__ = [
     'OntologyManager',
@@ -28,5 +29,8 @@ __all__ = [
     'create_physics_ontology',
     'create_chemistry_ontology',
     'create_biology_ontology',
-    'validate_diagram_semantics'
+    'validate_diagram_semantics',
+    'OntologyPool',
+    'DomainTBox',
+    'OverlayStore'
 ]
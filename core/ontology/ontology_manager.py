@@ -18,10 +18,12 @@ Ontologies include:
 - Biology: Cells, organisms, processes, pathways
 """
 
-from typing import Dict, List, Any, Optional, Tuple, Set
+from typing import Dict, List, Any, Optional, Tuple, Set, Iterable
 from dataclasses import dataclass, field
+from collections import OrderedDict
 from enum import Enum
 import logging
+import threading
 
 from core.property_graph import PropertyGraph, GraphNode, GraphEdge, NodeType, EdgeType
 from core.problem_spec import CanonicalProblemSpec
@@ -45,6 +47,47 @@ except ImportError:
     owlrl = None
 
 
+# Prepared SPARQL queries shared by all managers, keyed by query text + prefixes
+_PREPARED_QUERY_LIMIT = 256
+_prepared_queries: 'OrderedDict[Tuple, Any]' = OrderedDict()
+_prepared_queries_lock = threading.Lock()
+
+
+def _prepare_query(sparql_query: str, namespaces: Dict[str, Any]):
+    """Return the parsed/translated form of a query, parsing each text once"""
+    key = (sparql_query, frozenset(namespaces.items()))
+    with _prepared_queries_lock:
+        prepared = _prepared_queries.get(key)
+        if prepared is not None:
+            _prepared_queries.move_to_end(key)
+            return prepared
+    prepared = prepareQuery(sparql_query, initNs=namespaces)
+    with _prepared_queries_lock:
+        _prepared_queries[key] = prepared
+        if len(_prepared_queries) > _PREPARED_QUERY_LIMIT:
+            _prepared_queries.popitem(last=False)
+    return prepared
+
+
+def validation_candidates(triples: Iterable[Tuple]) -> Tuple[List[Tuple], List[Any]]:
+    """
+    Collect what validate() checks from a set of triples
+
+    Returns:
+        (instance, class) pairs of rdf:type triples, and the predicates
+        that must be defined properties (one entry per triple)
+    """
+    type_refs = []
+    property_uses = []
+    untyped = (RDF.type, RDFS.subClassOf, RDFS.comment)
+    for s, p, o in triples:
+        if p == RDF.type and isinstance(o, URIRef):
+            type_refs.append((s, o))
+        if p not in untyped:
+            property_uses.append(p)
+    return type_refs, property_uses
+
+
 class Domain(Enum):
     """Scientific domains"""
     PHYSICS = "physics"
@@ -106,7 +149,8 @@ class OntologyManager:
     def __init__(self,
                  domain: Domain = Domain.GENERAL,
                  enable_reasoning: bool = True,
-                 verbose: bool = False):
+                 verbose: bool = False,
+                 tbox: Optional[Any] = None):
         """
         Initialize ontology manager
 
@@ -114,6 +158,8 @@ class OntologyManager:
             domain: Scientific domain
             enable_reasoning: Enable OWL-RL reasoning
             verbose: Enable verbose logging
+            tbox: Shared DomainTBox from an OntologyPool; the graph then
+                overlays it instead of rebuilding the domain ontology
 
         Raises:
             ImportError: If rdflib not installed
@@ -128,8 +174,13 @@ class OntologyManager:
         self.verbose = verbose
         self.logger = logging.getLogger(__name__)
 
-        # Initialize RDF graph
-        self.graph = Graph()
+        # Initialize RDF graph (copy-on-write over the pooled TBox if given)
+        self.tbox = tbox
+        if tbox is not None:
+            from core.ontology.ontology_pool import OverlayStore
+            self.graph = Graph(store=OverlayStore(tbox.raw))
+        else:
+            self.graph = Graph()
 
         # Define namespaces
         self.BASE = Namespace("http://stem-diagrams.org/ontology/")
@@ -147,8 +198,12 @@ class OntologyManager:
         self.graph.bind("rdf", RDF)
         self.graph.bind("rdfs", RDFS)
 
+        # Defined classes/properties, rebuilt lazily after TBox changes
+        self._schema_terms: Optional[Tuple[Set, Set]] = None
+
         # Initialize domain ontology
-        self._initialize_domain_ontology(domain)
+        if tbox is None:
+            self._initialize_domain_ontology(domain)
 
         if self.verbose:
             self.logger.info(f"Initialized OntologyManager for {domain.value}")
@@ -316,6 +371,7 @@ class OntologyManager:
         obj_uri = self._to_uri_or_literal(obj)
 
         self.graph.add((subj_uri, pred_uri, obj_uri))
+        self._note_schema_write(pred_uri, obj_uri)
 
     def add_instance(self, instance_id: str, class_uri: str, properties: Optional[Dict] = None) -> None:
         """
@@ -335,6 +391,7 @@ class OntologyManager:
 
         # Add type declaration
         self.graph.add((instance_uri, RDF.type, class_ref))
+        self._note_schema_write(RDF.type, class_ref)
 
         # Add properties
         if properties:
@@ -343,6 +400,25 @@ class OntologyManager:
                 value_ref = self._to_uri_or_literal(value)
                 self.graph.add((instance_uri, prop_uri, value_ref))
 
+    def _note_schema_write(self, predicate: URIRef, obj: Any) -> None:
+        """Drop the defined class/property sets when a write declares a class or property"""
+        if predicate == RDF.type and obj in (OWL.Class, OWL.ObjectProperty, OWL.DatatypeProperty):
+            self._schema_terms = None
+
+    def invalidate_schema_cache(self) -> None:
+        """Call after editing self.graph directly in a way that adds or removes definitions"""
+        self._schema_terms = None
+
+    def _defined_terms(self) -> Tuple[Set, Set]:
+        """Defined classes and properties of the current graph"""
+        if self._schema_terms is None:
+            classes = set(self.graph.subjects(RDF.type, OWL.Class))
+            properties = set(self.graph.subjects(RDF.type, OWL.ObjectProperty))
+            properties.update(self.graph.subjects(RDF.type, OWL.DatatypeProperty))
+            properties.update((RDF.type, RDFS.subClassOf, RDFS.comment, OWL.Class))
+            self._schema_terms = (classes, properties)
+        return self._schema_terms
+
     def _to_uri(self, name: str) -> URIRef:
         """Convert name to URIRef"""
         # Handle namespace prefixes
@@ -398,7 +474,14 @@ class OntologyManager:
 
         # Apply OWL-RL reasoning
         try:
-            owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(self.graph)
+            if self.tbox is not None:
+                # Pooled: TBox closure is precomputed, only the ABox is reasoned over
+                self.tbox.expand(self.graph)
+            else:
+                owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(self.graph)
+
+            # The closure may declare new classes/properties
+            self._schema_terms = None
 
             # Get new triple count
             final_count = len(self.graph)
@@ -437,29 +520,29 @@ class OntologyManager:
         """
         errors = []
         warnings = []
+        issues = errors if level == ValidationLevel.STRICT else warnings
+        classes, properties = self._defined_terms()
+
+        # Pooled managers only scan their own triples; the shared TBox's
+        # candidates are collected once per TBox graph
+        store = self.graph.store
+        if self.tbox is not None and hasattr(store, 'overlay_triples') and not store.tombstones:
+            base_types, base_uses = self.tbox.validation_candidates(store.base)
+            types, uses = validation_candidates(store.overlay_triples())
+            types, uses = base_types + types, base_uses + uses
+        else:
+            types, uses = validation_candidates(self.graph)
 
         # Check for basic consistency
         # 1. Check that all referenced classes exist
-        for s, p, o in self.graph:
-            if p == RDF.type and isinstance(o, URIRef):
-                # Check if class is defined
-                if not self._is_class_defined(o):
-                    msg = f"Instance {s} references undefined class {o}"
-                    if level == ValidationLevel.STRICT:
-                        errors.append(msg)
-                    else:
-                        warnings.append(msg)
+        for s, o in types:
+            if o not in classes:
+                issues.append(f"Instance {s} references undefined class {o}")
 
         # 2. Check property domains and ranges
-        for s, p, o in self.graph:
-            if p not in [RDF.type, RDFS.subClassOf, RDFS.comment]:
-                # Check if property is defined
-                if not self._is_property_defined(p):
-                    msg = f"Use of undefined property {p}"
-                    if level == ValidationLevel.STRICT:
-                        errors.append(msg)
-                    else:
-                        warnings.append(msg)
+        for p in uses:
+            if p not in properties:
+                issues.append(f"Use of undefined property {p}")
 
         # 3. Domain-specific validation
         domain_errors, domain_warnings = self._validate_domain_constraints(level)
@@ -487,13 +570,11 @@ class OntologyManager:
 
     def _is_class_defined(self, class_uri: URIRef) -> bool:
         """Check if class is defined in ontology"""
-        return (class_uri, RDF.type, OWL.Class) in self.graph
+        return class_uri in self._defined_terms()[0]
 
     def _is_property_defined(self, prop_uri: URIRef) -> bool:
         """Check if property is defined in ontology"""
-        return ((prop_uri, RDF.type, OWL.ObjectProperty) in self.graph or
-                (prop_uri, RDF.type, OWL.DatatypeProperty) in self.graph or
-                prop_uri in [RDF.type, RDFS.subClassOf, RDFS.comment, OWL.Class])
+        return prop_uri in self._defined_terms()[1]
 
     def _validate_domain_constraints(self, level: ValidationLevel) -> Tuple[List[str], List[str]]:
         """Validate domain-specific constraints"""
@@ -502,21 +583,19 @@ class OntologyManager:
 
         if self.domain == Domain.PHYSICS:
             # Check that forces have magnitude and direction
-            for s, p, o in self.graph:
-                if p == RDF.type and o == self.PHYS.Force:
-                    # Check magnitude
-                    if not list(self.graph.objects(s, self.PHYS.hasMagnitude)):
-                        warnings.append(f"Force {s} missing magnitude")
-                    # Check direction
-                    if not list(self.graph.objects(s, self.PHYS.hasDirection)):
-                        warnings.append(f"Force {s} missing direction")
+            for s in self.graph.subjects(RDF.type, self.PHYS.Force):
+                # Check magnitude
+                if (s, self.PHYS.hasMagnitude, None) not in self.graph:
+                    warnings.append(f"Force {s} missing magnitude")
+                # Check direction
+                if (s, self.PHYS.hasDirection, None) not in self.graph:
+                    warnings.append(f"Force {s} missing direction")
 
         elif self.domain == Domain.CHEMISTRY:
             # Check that ionic bonds have charged atoms
-            for s, p, o in self.graph:
-                if p == RDF.type and o == self.CHEM.IonicBond:
-                    # Check that bonded atoms have charges
-                    warnings.append(f"Ionic bond {s} should be between charged atoms (check manually)")
+            for s in self.graph.subjects(RDF.type, self.CHEM.IonicBond):
+                # Check that bonded atoms have charges
+                warnings.append(f"Ionic bond {s} should be between charged atoms (check manually)")
 
         return errors, warnings
 
@@ -545,7 +624,8 @@ class OntologyManager:
             ...     print(f"Force: {row['force']}, Magnitude: {row['magnitude']}")
         """
         try:
-            results = self.graph.query(sparql_query)
+            prepared = _prepare_query(sparql_query, dict(self.graph.namespaces()))
+            results = self.graph.query(prepared)
 
             # Convert to list of dicts
             result_list = []
@@ -724,6 +804,7 @@ class OntologyManager:
             format: RDF format
         """
         self.graph.parse(data=rdf_data, format=format)
+        self._schema_terms = None
 
     def get_class_hierarchy(self, class_uri: Optional[str] = None) -> Dict[str, List[str]]:
         """
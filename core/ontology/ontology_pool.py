@@ -0,0 +1,437 @@
+"""
+Ontology Pool - Shared Per-Domain TBoxes and OWL-RL Closures
+============================================================
+
+Building an OntologyManager rebuilds the domain TBox, and validation
+then runs a full OWL-RL closure over TBox + instances on every request,
+although only the instances (the ABox) change between requests.
+
+The pool keeps, per domain:
+- the raw TBox graph the manager would have built
+- its OWL-RL closure, computed once (optionally persisted to disk,
+  keyed by a fingerprint of the TBox and the owlrl/rdflib versions)
+- the class/property tables of the closure used by the incremental rules
+
+Each acquired manager writes into an OverlayStore: a copy-on-write
+view that reads through to the shared TBox and stores only the request's
+own triples. Reasoning swaps the read-only base to the closed TBox and
+applies the OWL-RL instance rules (cax-sco, prp-dom, prp-rng, prp-spo1,
+prp-inv, prp-symp, prp-trp, eq-ref, dt-type2) to the new triples only.
+When the ABox touches schema vocabulary or the TBox uses constructs those
+rules do not cover, the full owlrl closure is run instead, so the result
+always matches the non-pooled manager.
+
+Author: Universal STEM Diagram Generator
+Date: November 18, 2025
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from core.ontology.ontology_manager import (
+    OntologyManager, Domain, RDFLIB_AVAILABLE, OWLRL_AVAILABLE, owlrl, validation_candidates
+)
+
+try:
+    import rdflib
+    from rdflib import Graph, Literal, RDF, RDFS, OWL
+    from rdflib.plugins.stores.memory import Memory
+    from rdflib.util import from_n3
+except ImportError:
+    rdflib = Graph = Literal = RDF = RDFS = OWL = None
+    Memory = object
+    from_n3 = None
+
+try:
+    from owlrl.XsdDatatypes import OWL_RL_Datatypes, OWL_Datatype_Subsumptions
+    from owlrl.OWLRL import OWLRL_Datatypes_Disjointness
+    from owlrl.DatatypeHandling import AltXSDToPYTHON
+except ImportError:
+    OWL_RL_Datatypes, OWL_Datatype_Subsumptions = set(), {}
+    OWLRL_Datatypes_Disjointness, AltXSDToPYTHON = [], {}
+
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA_NAMESPACES = (
+    "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
+    "http://www.w3.org/2000/01/rdf-schema#",
+    "http://www.w3.org/2002/07/owl#",
+)
+
+# TBox vocabulary whose instance-level rules are not implemented
+# incrementally (restrictions, keys, chains, cardinalities, equality)
+_UNSUPPORTED_TBOX_PREDICATES = {
+    "onProperty", "someValuesFrom", "allValuesFrom", "hasValue", "intersectionOf",
+    "unionOf", "oneOf", "complementOf", "hasKey", "propertyChainAxiom", "maxCardinality",
+    "maxQualifiedCardinality", "propertyDisjointWith", "members", "distinctMembers",
+    "differentFrom", "sourceIndividual",
+}
+_UNSUPPORTED_TBOX_TYPES = {
+    "FunctionalProperty", "InverseFunctionalProperty", "IrreflexiveProperty",
+    "AsymmetricProperty", "AllDisjointClasses", "AllDisjointProperties",
+    "AllDifferent", "NegativePropertyAssertion",
+}
+# Annotations that any instance may carry without changing the schema
+_ANNOTATION_PREDICATES = ("label", "comment", "seeAlso", "isDefinedBy")
+
+
+def _is_schema_term(term) -> bool:
+    return isinstance(term, rdflib.URIRef) and str(term).startswith(_SCHEMA_NAMESPACES)
+
+
+class OverlayStore(Memory):
+    """
+    Copy-on-write rdflib store over a shared, read-only base graph
+
+    Reads see base + overlay; writes only touch the overlay. Triples
+    already in the base are not duplicated, and removing one records a
+    tombstone instead of mutating the shared graph. Contexts are ignored
+    for base triples (the pool's graphs are plain default-context graphs).
+    """
+
+    def __init__(self, base: 'Graph'):
+        super().__init__()
+        self.base = base
+        self.tombstones: Set[Tuple] = set()
+
+    def _in_base(self, triple) -> bool:
+        return triple in self.base and triple not in self.tombstones
+
+    def add(self, triple, context, quoted=False):
+        if self._in_base(triple):
+            return
+        if triple in self.tombstones:
+            self.tombstones.discard(triple)
+            return
+        super().add(triple, context, quoted=quoted)
+
+    def remove(self, triple_pattern, context=None):
+        for triple in self.base.triples(triple_pattern):
+            self.tombstones.add(triple)
+        super().remove(triple_pattern, context=context)
+
+    def triples(self, triple_pattern, context=None):
+        tombstones = self.tombstones
+        for triple in self.base.triples(triple_pattern):
+            if triple not in tombstones:
+                yield triple, iter(())
+        yield from super().triples(triple_pattern, context=context)
+
+    def __len__(self, context=None):
+        return len(self.base) - len(self.tombstones) + super().__len__(context=context)
+
+    def overlay_triples(self) -> List[Tuple]:
+        """Triples written on top of the base"""
+        return [triple for triple, _ in super().triples((None, None, None))]
+
+    def rebase(self, base: 'Graph') -> None:
+        """Swap the base graph, dropping overlay triples the new base already holds"""
+        if self.tombstones:
+            raise ValueError("Cannot rebase an overlay with removed base triples")
+        duplicates = [triple for triple in self.overlay_triples() if triple in base]
+        for triple in duplicates:
+            super().remove(triple, context=None)
+        self.base = base
+
+
+@dataclass
+class DomainTBox:
+    """Raw and closed TBox of one domain plus the tables used by the incremental rules"""
+    domain: Domain
+    raw: 'Graph'
+    closed: Optional['Graph'] = None
+    fingerprint: str = ""
+    source: str = "computed"  # 'computed' or 'disk'
+    closure_seconds: float = 0.0
+    incremental: bool = False
+    unsupported: List[str] = field(default_factory=list)
+    super_classes: Dict = field(default_factory=dict)
+    super_properties: Dict = field(default_factory=dict)
+    domains: Dict = field(default_factory=dict)
+    ranges: Dict = field(default_factory=dict)
+    inverses: Dict = field(default_factory=dict)
+    symmetric: Set = field(default_factory=set)
+    transitive: Set = field(default_factory=set)
+    used_datatypes: Set = field(default_factory=set)
+    incremental_runs: int = 0
+    full_runs: int = 0
+    _candidates: Dict = field(default_factory=dict, repr=False)
+
+    def validation_candidates(self, graph: 'Graph') -> Tuple[List, List]:
+        """validate() candidates of the raw or closed TBox, collected once per graph"""
+        key = id(graph)
+        cached = self._candidates.get(key)
+        if cached is None:
+            cached = self._candidates[key] = validation_candidates(graph)
+        return cached
+
+    def index_closure(self) -> None:
+        """Build rule tables from the closed TBox and check it stays within the incremental rules"""
+        closed = self.closed
+        unsupported = set()
+        for s, p, o in closed:
+            if not _is_schema_term(p):
+                continue
+            name = p.fragment
+            if name in _UNSUPPORTED_TBOX_PREDICATES:
+                unsupported.add(name)
+            elif p == RDF.type and _is_schema_term(o) and o.fragment in _UNSUPPORTED_TBOX_TYPES:
+                unsupported.add(o.fragment)
+            elif p == OWL.sameAs and s != o:
+                unsupported.add("sameAs")
+            elif p == OWL.disjointWith and not (s in OWL_RL_Datatypes and o in OWL_RL_Datatypes):
+                unsupported.add("disjointWith")
+            elif p == RDFS.subClassOf:
+                self.super_classes.setdefault(s, set()).add(o)
+            elif p == RDFS.subPropertyOf:
+                self.super_properties.setdefault(s, set()).add(o)
+            elif p == RDFS.domain:
+                self.domains.setdefault(s, set()).add(o)
+            elif p == RDFS.range:
+                self.ranges.setdefault(s, set()).add(o)
+            elif p == OWL.inverseOf:
+                self.inverses.setdefault(s, set()).add(o)
+                self.inverses.setdefault(o, set()).add(s)
+            elif p == RDF.type:
+                if o == OWL.SymmetricProperty:
+                    self.symmetric.add(s)
+                elif o == OWL.TransitiveProperty:
+                    self.transitive.add(s)
+                elif o in OWL_RL_Datatypes:
+                    self.used_datatypes.add(o)
+        self.unsupported = sorted(unsupported)
+        self.incremental = not unsupported
+
+    def expand(self, graph: 'Graph') -> str:
+        """
+        Compute the OWL-RL closure of a pooled manager's graph in place
+
+        Returns:
+            'incremental' or 'full', depending on the path taken
+        """
+        store = graph.store
+        if self.closed is None or not isinstance(store, OverlayStore):
+            owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(graph)
+            self.full_runs += 1
+            return 'full'
+
+        abox = store.overlay_triples()
+        if not self.incremental or store.tombstones or not self._abox_supported(abox):
+            owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(graph)
+            self.full_runs += 1
+            return 'full'
+
+        store.rebase(self.closed)
+        self._close_abox(graph, abox)
+        self.incremental_runs += 1
+        return 'incremental'
+
+    def _abox_supported(self, abox: Iterable[Tuple]) -> bool:
+        for s, p, o in abox:
+            if p == RDF.type:
+                if _is_schema_term(o) or o in OWL_RL_Datatypes:
+                    return False
+            elif _is_schema_term(p) and not (p.startswith(str(RDFS)) and p.fragment in _ANNOTATION_PREDICATES):
+                return False
+            if isinstance(o, Literal) and o.datatype in OWL_RL_Datatypes:
+                try:
+                    AltXSDToPYTHON.get(o.datatype, str)(str(o))
+                except ValueError:
+                    # owlrl reports ill-typed literals as error triples
+                    return False
+        return True
+
+    def _close_abox(self, graph: 'Graph', abox: List[Tuple]) -> None:
+        """Semi-naive fixpoint of the instance rules over the new triples"""
+        agenda = list(abox)
+        seen = set(agenda)
+        terms = set()
+        used_datatypes = set(self.used_datatypes)
+
+        def derive(triple):
+            if triple not in seen:
+                seen.add(triple)
+                agenda.append(triple)
+
+        while agenda:
+            s, p, o = agenda.pop()
+            terms.update((s, p, o))
+            if p == RDF.type:
+                for parent in self.super_classes.get(o, ()):
+                    derive((s, RDF.type, parent))
+            for parent in self.super_properties.get(p, ()):
+                derive((s, parent, o))
+            for cls in self.domains.get(p, ()):
+                derive((s, RDF.type, cls))
+            for cls in self.ranges.get(p, ()):
+                derive((o, RDF.type, cls))
+            for inverse in self.inverses.get(p, ()):
+                derive((o, inverse, s))
+            if p in self.symmetric:
+                derive((o, p, s))
+            if p in self.transitive:
+                for nxt in list(graph.objects(o, p)):
+                    derive((s, p, nxt))
+                for prev in list(graph.subjects(p, s)):
+                    derive((prev, p, o))
+            if isinstance(o, Literal) and o.datatype in OWL_RL_Datatypes:
+                derive((o, RDF.type, o.datatype))
+                used_datatypes.add(o.datatype)
+                for parent in OWL_Datatype_Subsumptions.get(o.datatype, ()):
+                    derive((o, RDF.type, parent))
+                    used_datatypes.add(parent)
+            graph.add((s, p, o))
+
+        for left, predicate, right in OWLRL_Datatypes_Disjointness:
+            if left in used_datatypes and right in used_datatypes:
+                graph.add((left, predicate, right))
+                terms.update((left, predicate, right))
+        for term in terms:
+            graph.add((term, OWL.sameAs, term))
+
+
+class OntologyPool:
+    """
+    Per-domain pool of TBoxes and precomputed OWL-RL closures
+
+    Example:
+        >>> pool = OntologyPool(cache_dir="cache/ontology")
+        >>> pool.warm()  # at startup
+        >>> manager = pool.acquire(Domain.PHYSICS)  # per request
+        >>> manager.from_property_graph(graph)
+        >>> result = manager.validate()
+    """
+
+    def __init__(self,
+                 cache_dir: Optional[str] = None,
+                 enable_reasoning: bool = True,
+                 verbose: bool = False):
+        """
+        Args:
+            cache_dir: Directory for persisted closures (None = keep in memory only)
+            enable_reasoning: Precompute closures and reason on acquired managers
+            verbose: Verbose logging on acquired managers
+        """
+        if not RDFLIB_AVAILABLE:
+            raise ImportError("RDFLib not installed. Install with: pip install rdflib owlrl")
+        self.cache_dir = cache_dir
+        self.enable_reasoning = enable_reasoning and OWLRL_AVAILABLE
+        self.verbose = verbose
+        self._tboxes: Dict[Domain, DomainTBox] = {}
+        self._lock = threading.Lock()
+
+    def warm(self, domains: Optional[Iterable[Domain]] = None) -> Dict[str, float]:
+        """Build the TBoxes (and closures) up front; returns seconds spent per domain"""
+        timings = {}
+        for domain in domains or list(Domain):
+            start = time.perf_counter()
+            self.get_tbox(domain)
+            timings[domain.value] = time.perf_counter() - start
+        return timings
+
+    def get_tbox(self, domain: Domain) -> DomainTBox:
+        """Return the shared TBox of a domain, building it on first use"""
+        tbox = self._tboxes.get(domain)
+        if tbox is not None:
+            return tbox
+        with self._lock:
+            tbox = self._tboxes.get(domain)
+            if tbox is None:
+                tbox = self._build(domain)
+                self._tboxes[domain] = tbox
+        return tbox
+
+    def acquire(self, domain: Domain = Domain.GENERAL) -> OntologyManager:
+        """Return a fresh manager whose graph overlays the domain's shared TBox"""
+        return OntologyManager(domain=domain, enable_reasoning=self.enable_reasoning,
+                               verbose=self.verbose, tbox=self.get_tbox(domain))
+
+    def stats(self) -> Dict[str, Dict]:
+        """Per-domain closure source, size and reasoning path counters"""
+        return {
+            domain.value: {
+                'tbox_triples': len(tbox.raw),
+                'closure_triples': len(tbox.closed) if tbox.closed is not None else None,
+                'source': tbox.source,
+                'closure_seconds': tbox.closure_seconds,
+                'incremental': tbox.incremental,
+                'unsupported': tbox.unsupported,
+                'incremental_runs': tbox.incremental_runs,
+                'full_runs': tbox.full_runs,
+            }
+            for domain, tbox in self._tboxes.items()
+        }
+
+    def _build(self, domain: Domain) -> DomainTBox:
+        raw = OntologyManager(domain=domain, enable_reasoning=False).graph
+        tbox = DomainTBox(domain=domain, raw=raw, fingerprint=self._fingerprint(raw))
+        if not self.enable_reasoning:
+            return tbox
+
+        start = time.perf_counter()
+        path = self._cache_path(domain, tbox.fingerprint)
+        closed = self._load_closure(path) if path else None
+        if closed is not None:
+            tbox.source = 'disk'
+        else:
+            closed = Graph()
+            for triple in raw:
+                closed.add(triple)
+            owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(closed)
+            if path:
+                self._save_closure(closed, path)
+        tbox.closed = closed
+        tbox.closure_seconds = time.perf_counter() - start
+        tbox.index_closure()
+        logger.info("Ontology pool: %s closure %d triples (%s, %.3fs, incremental=%s)",
+                    domain.value, len(closed), tbox.source, tbox.closure_seconds, tbox.incremental)
+        return tbox
+
+    @staticmethod
+    def _fingerprint(raw: 'Graph') -> str:
+        digest = hashlib.sha256()
+        digest.update(f"owlrl={owlrl.__version__ if owlrl else None};rdflib={rdflib.__version__}\n".encode())
+        for line in sorted(raw.serialize(format='nt').splitlines()):
+            digest.update(line.encode('utf-8'))
+        return digest.hexdigest()[:16]
+
+    def _cache_path(self, domain: Domain, fingerprint: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        return os.path.join(self.cache_dir, f"{domain.value}_closure_{fingerprint}.json")
+
+    @staticmethod
+    def _load_closure(path: str) -> Optional['Graph']:
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as handle:
+                rows = json.load(handle)
+            closed = Graph()
+            for row in rows:
+                closed.add(tuple(from_n3(term) for term in row))
+            return closed
+        except Exception as exc:
+            logger.warning("Ignoring unreadable ontology closure %s: %s", path, exc)
+            return None
+
+    @staticmethod
+    def _save_closure(closed: 'Graph', path: str) -> None:
+        # N-Triples cannot hold the literal subjects OWL-RL produces, so
+        # terms are stored in their N3 form instead
+        rows = [[term.n3() for term in triple] for triple in closed]
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            tmp_path = f"{path}.tmp-{os.getpid()}"
+            with open(tmp_path, 'w', encoding='utf-8') as handle:
+                json.dump(rows, handle)
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            logger.warning("Could not persist ontology closure to %s: %s", path, exc)
@@ -11,6 +11,7 @@ Provides structured logging with:
 
 import logging
 import json
+import threading
 import time
 from typing import Dict, Any, List, Optional
 from datetime import datetime
@@ -71,7 +72,16 @@ class PipelineLogger:
         }
 
         self.start_time = time.time()
-        self.current_phase = None
+        # Phase state is per thread so concurrently executing pipeline stages don't clobber each other
+        self._local = threading.local()
+
+    @property
+    def current_phase(self) -> Optional[Dict[str, Any]]:
+        return getattr(self._local, 'phase', None)
+
+    @current_phase.setter
+    def current_phase(self, phase: Optional[Dict[str, Any]]):
+        self._local.phase = phase
 
     def log_request(self, problem_text: str, config: Dict[str, Any]):
         """Log incoming request"""
@@ -339,9 +349,17 @@ class ConsoleProgressLogger:
 
     def __init__(self):
         self.phases = []
-        self.current_phase = None
+        self._local = threading.local()
         self.start_time = time.time()
 
+    @property
+    def current_phase(self) -> Optional[Dict[str, Any]]:
+        return getattr(self._local, 'phase', None)
+
+    @current_phase.setter
+    def current_phase(self, phase: Optional[Dict[str, Any]]):
+        self._local.phase = phase
+
     def start_phase(self, phase_name: str, phase_number: int):
         """Start new phase with visual indicator"""
         phase = {
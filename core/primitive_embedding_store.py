@@ -0,0 +1,167 @@
+"""
+Primitive Embedding Store - Precomputed Library Embeddings
+==========================================================
+
+Persists the memory backend's primitive embeddings so processes start
+without loading the sentence-transformer model:
+
+- primitive_embeddings.npy: row-normalized float32 matrix, one row per
+  primitive, opened with mmap so workers share the page cache
+- primitive_embeddings.json: manifest with the model name, matrix shape,
+  a content hash of the embedded texts and the primitive metadata
+
+A store is only used when the model name and content hash match the
+primitives being loaded; anything else is treated as stale and rebuilt.
+
+Build it ahead of deployment with:
+    python -m core.primitive_embedding_store data/primitive_library
+
+Author: Universal STEM Diagram Generator
+Date: November 18, 2025
+"""
+
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    np = None
+
+
+logger = logging.getLogger(__name__)
+
+MATRIX_FILENAME = "primitive_embeddings.npy"
+MANIFEST_FILENAME = "primitive_embeddings.json"
+FORMAT_VERSION = 1
+
+
+def primitive_embedding_text(primitive: Any) -> str:
+    """Text a primitive is embedded from (name + tags)"""
+    return f"{primitive.name} {' '.join(primitive.tags)}"
+
+
+def content_hash(primitives: Sequence[Any], model_name: str) -> str:
+    """Hash of the model and the ordered (id, text) pairs a matrix was built from"""
+    digest = hashlib.sha256(f"v{FORMAT_VERSION}|{model_name}".encode('utf-8'))
+    for primitive in primitives:
+        digest.update(b"\0")
+        digest.update(primitive.id.encode('utf-8'))
+        digest.update(b"\0")
+        digest.update(primitive_embedding_text(primitive).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def save_embedding_store(directory: str,
+                         primitives: Sequence[Any],
+                         embeddings: Sequence[Sequence[float]],
+                         model_name: str) -> Dict[str, Any]:
+    """
+    Write the normalized embedding matrix and its manifest
+
+    Args:
+        directory: Target directory (usually next to primitives.db)
+        primitives: Primitives in row order
+        embeddings: One embedding per primitive
+        model_name: Sentence-transformer model the embeddings came from
+
+    Returns:
+        The manifest that was written
+    """
+    if not NUMPY_AVAILABLE:
+        raise ImportError("numpy is required to build the primitive embedding store")
+    if len(primitives) != len(embeddings):
+        raise ValueError(f"{len(primitives)} primitives but {len(embeddings)} embeddings")
+
+    matrix = np.asarray(embeddings, dtype=np.float32).reshape(len(primitives), -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+
+    manifest = {
+        'version': FORMAT_VERSION,
+        'model': model_name,
+        'rows': int(matrix.shape[0]),
+        'dim': int(matrix.shape[1]),
+        'content_hash': content_hash(primitives, model_name),
+        'primitives': [
+            {k: v for k, v in primitive.to_dict().items() if k not in ('svg_content', 'similarity_score')}
+            for primitive in primitives
+        ],
+    }
+
+    os.makedirs(directory, exist_ok=True)
+    matrix_path = os.path.join(directory, MATRIX_FILENAME)
+    manifest_path = os.path.join(directory, MANIFEST_FILENAME)
+    tmp_suffix = f".tmp-{os.getpid()}"
+    # np.save appends .npy to names without it, so keep the suffix in front
+    tmp_matrix = matrix_path[:-4] + tmp_suffix + ".npy"
+    np.save(tmp_matrix, matrix)
+    with open(manifest_path + tmp_suffix, 'w', encoding='utf-8') as handle:
+        json.dump(manifest, handle, indent=2)
+    # Matrix first: a manifest never points at a matrix it does not describe
+    os.replace(tmp_matrix, matrix_path)
+    os.replace(manifest_path + tmp_suffix, manifest_path)
+    return manifest
+
+
+def load_embedding_store(directory: str,
+                         primitives: Sequence[Any],
+                         model_name: str) -> Optional['np.ndarray']:
+    """
+    Memory-map a stored matrix if it matches the given primitives and model
+
+    Returns:
+        Read-only (rows x dim) float32 memmap, or None if missing or stale
+    """
+    if not NUMPY_AVAILABLE or not directory:
+        return None
+    matrix_path = os.path.join(directory, MATRIX_FILENAME)
+    manifest_path = os.path.join(directory, MANIFEST_FILENAME)
+    if not (os.path.exists(matrix_path) and os.path.exists(manifest_path)):
+        return None
+
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as handle:
+            manifest = json.load(handle)
+        if manifest.get('version') != FORMAT_VERSION or manifest.get('model') != model_name:
+            logger.info("Primitive embedding store %s was built for another model/version", directory)
+            return None
+        if manifest.get('content_hash') != content_hash(primitives, model_name):
+            logger.info("Primitive embedding store %s is stale (primitives changed)", directory)
+            return None
+        matrix = np.load(matrix_path, mmap_mode='r')
+    except (OSError, ValueError) as exc:
+        logger.warning("Ignoring unreadable primitive embedding store %s: %s", directory, exc)
+        return None
+
+    if matrix.dtype != np.float32 or matrix.shape != (manifest['rows'], manifest['dim']):
+        logger.warning("Primitive embedding store %s does not match its manifest", directory)
+        return None
+    return matrix
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Build the store for the memory backend's primitives"""
+    import argparse
+    from core.primitive_library import PrimitiveLibrary
+
+    parser = argparse.ArgumentParser(description="Precompute primitive library embeddings")
+    parser.add_argument('directory', nargs='?', default=os.path.join('data', 'primitive_library'))
+    args = parser.parse_args(argv)
+
+    library = PrimitiveLibrary(backend="memory", embedding_store_dir=None)
+    manifest = library.build_embedding_store(args.directory)
+    if manifest is None:
+        print("❌ No embedder available (pip install sentence-transformers)")
+        return 1
+    print(f"✓ Stored {manifest['rows']} x {manifest['dim']} embeddings ({manifest['model']}) in {args.directory}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
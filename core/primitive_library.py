@@ -12,12 +12,27 @@ Date: November 12, 2025
 """
 
 from typing import List, Optional, Dict, Any, Tuple
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
+from collections import OrderedDict
 from enum import Enum
 import logging
 import json
 from pathlib import Path
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    np = None
+
+from core.primitive_embedding_store import (
+    load_embedding_store, save_embedding_store, primitive_embedding_text
+)
+
+if NUMPY_AVAILABLE:
+    from core.ann_index import IVFIndex
+
 
 class PrimitiveCategory(Enum):
     """Diagram primitive categories"""
@@ -75,34 +90,62 @@ class PrimitiveLibrary:
     - milvus: Milvus vector database (best for production)
     - qdrant: Qdrant vector database (alternative)
     - memory: In-memory fallback (for testing/development)
+    - ann: Memory store + in-process IVF index persisted to disk (large
+      ingested libraries without a vector DB)
     - stub: Stub implementation (returns empty)
     """
 
+    EMBEDDING_MODEL = 'all-MiniLM-L6-v2'  # Fast, lightweight model
+
     def __init__(self,
                  backend: str = "memory",
                  host: str = "localhost",
                  port: int = 19530,
-                 collection_name: str = "primitives"):
+                 collection_name: str = "primitives",
+                 embedding_store_dir: Optional[str] = None,
+                 index_dir: Optional[str] = None,
+                 ann_nprobe: int = 8):
         """
         Initialize primitive library
 
         Args:
-            backend: Backend type ('milvus', 'qdrant', 'memory', 'stub')
+            backend: Backend type ('milvus', 'qdrant', 'memory', 'ann', 'stub')
             host: Vector DB host (for milvus/qdrant)
             port: Vector DB port
             collection_name: Collection/index name
+            embedding_store_dir: Directory of precomputed memory-backend embeddings
+                (see core.primitive_embedding_store); None disables the store
+            index_dir: Where the 'ann' backend persists its index and primitives
+                (None = in-process only)
+            ann_nprobe: IVF cells scanned per query by the 'ann' backend
         """
         self.backend = backend
         self.host = host
         self.port = port
         self.collection_name = collection_name
+        self.embedding_store_dir = embedding_store_dir
+        self.embedding_store_status: Optional[str] = None  # 'loaded', 'built' or 'unavailable'
+        self.index_dir = index_dir
+        self.ann_nprobe = ann_nprobe
+        self.ann_index = None
         self.logger = logging.getLogger(__name__)
 
         # Backend-specific clients
         self.milvus_collection = None
         self.qdrant_client = None
         self.memory_store: List[Tuple[DiagramPrimitive, List[float]]] = []
-        self.embedder = None
+        self._embedder = None
+        self._embedder_pending = False  # Model load deferred until an embedding is needed
+
+        # Memory backend search index: row-normalized float32 embeddings of
+        # memory_store plus per-row category codes, rebuilt when rows are added
+        self._vector_matrix = None
+        self._vector_categories = None
+        self._category_codes: Dict[PrimitiveCategory, int] = {}
+
+        # Memo of text -> embedding; query strings repeat heavily across problems
+        self._embedding_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._embedding_cache_size = 1024
 
         # Initialize backend
         if backend == "milvus":
@@ -111,6 +154,8 @@ class PrimitiveLibrary:
             self._init_qdrant()
         elif backend == "memory":
             self._init_memory()
+        elif backend == "ann":
+            self._init_ann()
         elif backend == "stub":
             self.logger.info("Primitive library initialized in STUB mode")
         else:
@@ -176,6 +221,23 @@ class PrimitiveLibrary:
             self.backend = "memory"
             self._init_memory()
 
+    @property
+    def embedder(self):
+        """Text embedder, loaded on first use when embeddings came from the store"""
+        if self._embedder_pending:
+            self._embedder_pending = False
+            try:
+                self._embedder = self._get_embedder()
+            except Exception as e:
+                self.logger.warning(f"Failed to initialize embedder: {e}")
+                self._embedder = None
+        return self._embedder
+
+    @embedder.setter
+    def embedder(self, value):
+        self._embedder = value
+        self._embedder_pending = False
+
     def _init_memory(self):
         """Initialize in-memory backend with built-in primitives"""
         self.logger.info("Initializing in-memory primitive store with built-in components")
@@ -183,6 +245,17 @@ class PrimitiveLibrary:
         # Load built-in primitives
         built_in = self._get_built_in_primitives()
 
+        # Precomputed embeddings: mmap the stored matrix and skip loading the model
+        stored = load_embedding_store(self.embedding_store_dir, built_in, self.EMBEDDING_MODEL)
+        if stored is not None:
+            self.memory_store = [(primitive, stored[row]) for row, primitive in enumerate(built_in)]
+            self._vector_matrix = stored
+            self._embedder_pending = True
+            self.embedding_store_status = 'loaded'
+            self.logger.info(f"Loaded {len(self.memory_store)} built-in primitives "
+                             f"with stored embeddings from {self.embedding_store_dir}")
+            return
+
         # Initialize embedder for similarity search
         try:
             self.embedder = self._get_embedder()
@@ -190,24 +263,115 @@ class PrimitiveLibrary:
             self.logger.warning(f"Failed to initialize embedder: {e}")
             self.embedder = None
 
-        # Store primitives with embeddings
-        for primitive in built_in:
+        # Store primitives with embeddings (name + tags, encoded in one batch)
+        embeddings = self.embed_texts(
+            [primitive_embedding_text(primitive) for primitive in built_in]
+        ) if self.embedder else []
+        for index, primitive in enumerate(built_in):
             if self.embedder:
-                # Generate embedding from name + tags
-                text = f"{primitive.name} {' '.join(primitive.tags)}"
-                embedding = self._embed_text(text)
-                self.memory_store.append((primitive, embedding))
+                self.memory_store.append((primitive, embeddings[index]))
             else:
                 # Store without embeddings (will use keyword matching)
                 self.memory_store.append((primitive, []))
 
         self.logger.info(f"Loaded {len(self.memory_store)} built-in primitives")
 
+        # Persist for the next process start
+        if self.embedding_store_dir:
+            if embeddings and NUMPY_AVAILABLE:
+                try:
+                    save_embedding_store(self.embedding_store_dir, built_in, embeddings, self.EMBEDDING_MODEL)
+                    self.embedding_store_status = 'built'
+                except OSError as e:
+                    self.logger.warning(f"Could not write primitive embedding store: {e}")
+            else:
+                self.embedding_store_status = 'unavailable'
+
+    def _init_ann(self):
+        """Initialize the local ANN backend: memory store searched through an IVF index"""
+        if not NUMPY_AVAILABLE:
+            self.logger.warning("numpy not installed. Falling back to memory backend")
+            self.backend = "memory"
+            self._init_memory()
+            return
+        if self._load_ann():
+            return
+
+        self._init_memory()
+        if self.memory_store and len(self.memory_store[0][1]):
+            self.ann_index = IVFIndex(nprobe=self.ann_nprobe)
+            self.ann_index.add([embedding for _, embedding in self.memory_store])
+            self.save()
+        else:
+            self.logger.warning("No embedder available - 'ann' backend will use keyword matching")
+
+    def _ann_paths(self) -> Tuple[str, str]:
+        directory = Path(self.index_dir)
+        return str(directory / "ann_index.npz"), str(directory / "ann_primitives.jsonl")
+
+    def _load_ann(self) -> bool:
+        """Restore primitives + index saved by save(); False if there is nothing usable"""
+        if not self.index_dir:
+            return False
+        index_path, primitives_path = self._ann_paths()
+        if not (Path(index_path).exists() and Path(primitives_path).exists()):
+            return False
+        try:
+            index = IVFIndex.load(index_path)
+            with open(primitives_path, 'r', encoding='utf-8') as handle:
+                primitives = [DiagramPrimitive.from_dict(json.loads(line)) for line in handle if line.strip()]
+        except (OSError, ValueError, KeyError) as e:
+            self.logger.warning(f"Ignoring unreadable ANN index in {self.index_dir}: {e}")
+            return False
+        if len(primitives) != len(index):
+            self.logger.warning(f"ANN index in {self.index_dir} has {len(index)} vectors "
+                                f"for {len(primitives)} primitives - rebuilding")
+            return False
+
+        index.nprobe = self.ann_nprobe
+        self.ann_index = index
+        self.memory_store = [(primitive, index.vectors[row]) for row, primitive in enumerate(primitives)]
+        self._embedder_pending = True
+        self.logger.info(f"Loaded {len(primitives)} primitives with ANN index from {self.index_dir}")
+        return True
+
+    def save(self) -> bool:
+        """
+        Persist the 'ann' backend's primitives and index to index_dir
+
+        Returns:
+            True if something was written
+        """
+        if self.backend != "ann" or self.ann_index is None or not self.index_dir:
+            return False
+        index_path, primitives_path = self._ann_paths()
+        Path(self.index_dir).mkdir(parents=True, exist_ok=True)
+        tmp_path = f"{primitives_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as handle:
+            for primitive, _ in self.memory_store:
+                handle.write(json.dumps(primitive.to_dict(), default=str) + "\n")
+        self.ann_index.save(index_path)
+        Path(tmp_path).replace(primitives_path)
+        return True
+
+    def build_embedding_store(self, directory: str) -> Optional[Dict[str, Any]]:
+        """
+        Embed every memory-backend primitive and persist the matrix + manifest
+
+        Returns:
+            The written manifest, or None when no embedder is available
+        """
+        if not self.embedder or not self.memory_store:
+            return None
+        primitives = [primitive for primitive, _ in self.memory_store]
+        embeddings = self.embed_texts([primitive_embedding_text(primitive) for primitive in primitives])
+        return save_embedding_store(directory, primitives, embeddings, self.EMBEDDING_MODEL)
+
     def _get_embedder(self):
         """Get text embedder (sentence-transformers)"""
         try:
             from sentence_transformers import SentenceTransformer
-            model = SentenceTransformer('all-MiniLM-L6-v2')  # Fast, lightweight model
+            model = SentenceTransformer(self.EMBEDDING_MODEL)
             return model
         except ImportError:
             self.logger.warning("sentence-transformers not installed")
@@ -216,11 +380,48 @@ class PrimitiveLibrary:
     def _embed_text(self, text: str) -> List[float]:
         """Generate embedding for text"""
         if self.embedder:
-            embedding = self.embedder.encode(text)
-            return embedding.tolist()
+            return self.embed_texts([text])[0]
         else:
             return []
 
+    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed several texts with a single encoder call
+
+        Texts already embedded are served from the memo; the rest are encoded
+        together so the model batches them. Call this up front with every query
+        a problem will issue, then query() hits the memo.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            One embedding per text (empty lists when no embedder is available)
+        """
+        if not self.embedder:
+            return [[] for _ in texts]
+
+        missing = list(dict.fromkeys(text for text in texts if text not in self._embedding_cache))
+        if missing:
+            encoded = self.embedder.encode(missing)
+            for text, embedding in zip(missing, encoded):
+                self._embedding_cache[text] = embedding.tolist() if hasattr(embedding, 'tolist') else list(embedding)
+                self._embedding_cache.move_to_end(text)
+
+        embeddings = []
+        for text in texts:
+            embedding = self._embedding_cache.get(text)
+            if embedding is None:  # Evicted while filling an oversized batch
+                encoded = self.embedder.encode(text)
+                embedding = encoded.tolist() if hasattr(encoded, 'tolist') else list(encoded)
+            else:
+                self._embedding_cache.move_to_end(text)
+            embeddings.append(embedding)
+
+        while len(self._embedding_cache) > self._embedding_cache_size:
+            self._embedding_cache.popitem(last=False)
+        return embeddings
+
     def _get_built_in_primitives(self) -> List[DiagramPrimitive]:
         """Get built-in primitive library"""
         primitives = []
@@ -419,11 +620,41 @@ class PrimitiveLibrary:
             return self._query_milvus(text, top_k, category, min_score)
         elif self.backend == "qdrant":
             return self._query_qdrant(text, top_k, category, min_score)
-        elif self.backend == "memory":
+        elif self.backend in ("memory", "ann"):
             return self._query_memory(text, top_k, category, min_score)
         else:
             return []
 
+    def query_batch(self,
+                    texts: List[str],
+                    top_k: int = 5,
+                    category: Optional[PrimitiveCategory] = None,
+                    min_score: float = 0.0) -> List[List[DiagramPrimitive]]:
+        """
+        Query the library for several texts at once
+
+        On the memory backend every text is embedded in one encoder call and
+        scored with one matrix product; other backends fall back to query().
+
+        Args:
+            texts: Query texts
+            top_k: Number of results per text
+            category: Optional category filter
+            min_score: Minimum similarity score threshold
+
+        Returns:
+            One result list per text, in input order
+        """
+        if not texts:
+            return []
+        if self.backend in ("memory", "ann") and self.embedder and NUMPY_AVAILABLE:
+            if not self.memory_store:
+                return [[] for _ in texts]
+            return self._search_vectors(self.embed_texts(texts), top_k, category, min_score)
+        if self.embedder:
+            self.embed_texts(texts)
+        return [self.query(text, top_k, category, min_score) for text in texts]
+
     def _query_memory(self,
                      text: str,
                      top_k: int,
@@ -436,7 +667,11 @@ class PrimitiveLibrary:
         results = []
         text_lower = text.lower()
 
-        if self.embedder:
+        if self.embedder and NUMPY_AVAILABLE:
+            # Semantic search: one matrix-vector product over the index
+            return self._search_vectors([self._embed_text(text)], top_k, category, min_score)[0]
+
+        elif self.embedder:
             # Semantic search with embeddings
             query_embedding = self._embed_text(text)
 
@@ -489,6 +724,80 @@ class PrimitiveLibrary:
         results.sort(key=lambda x: x.similarity_score, reverse=True)
         return results[:top_k]
 
+    def _vector_index(self) -> 'np.ndarray':
+        """Normalized embedding matrix of memory_store"""
+        rows = len(self.memory_store)
+        if self._vector_matrix is None or self._vector_matrix.shape[0] != rows:
+            dim = next((len(embedding) for _, embedding in self.memory_store if len(embedding)), 0)
+            matrix = np.zeros((rows, dim), dtype=np.float32)
+            for row, (_, embedding) in enumerate(self.memory_store):
+                if dim and len(embedding) == dim:
+                    matrix[row] = embedding
+            # Rows without embeddings stay zero and score 0.0, as before
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            np.divide(matrix, norms, out=matrix, where=norms > 0)
+            self._vector_matrix = matrix
+        return self._vector_matrix
+
+    def _category_index(self) -> 'np.ndarray':
+        """Category code of each memory_store row"""
+        rows = len(self.memory_store)
+        if self._vector_categories is None or len(self._vector_categories) != rows:
+            categories = np.empty(rows, dtype=np.int16)
+            for row, (primitive, _) in enumerate(self.memory_store):
+                categories[row] = self._category_codes.setdefault(primitive.category, len(self._category_codes))
+            self._vector_categories = categories
+        return self._vector_categories
+
+    def _search_vectors(self,
+                        query_embeddings: List[List[float]],
+                        top_k: int,
+                        category: Optional[PrimitiveCategory],
+                        min_score: float) -> List[List[DiagramPrimitive]]:
+        """Top-k cosine search of several query embeddings against the memory index"""
+        if self.ann_index is not None and self.ann_index.is_trained:
+            allowed = None
+            if category:
+                allowed = self._category_index() == self._category_codes.get(category, -1)
+            return [
+                [replace(self.memory_store[row][0], similarity_score=float(score))
+                 for row, score in zip(ids, scores) if score >= min_score]
+                for ids, scores in self.ann_index.search(query_embeddings, top_k, allowed=allowed)
+            ]
+
+        matrix, categories = self._vector_index(), self._category_index()
+        queries = np.asarray(query_embeddings, dtype=np.float32).reshape(len(query_embeddings), -1)
+        if top_k <= 0 or queries.shape[1] != matrix.shape[1]:
+            return [[] for _ in query_embeddings]
+
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        np.divide(queries, norms, out=queries, where=norms > 0)
+
+        rows = np.arange(matrix.shape[0])
+        if category:
+            code = self._category_codes.get(category)
+            rows = np.flatnonzero(categories == code) if code is not None else rows[:0]
+            if not len(rows):
+                return [[] for _ in query_embeddings]
+            scores = queries @ matrix[rows].T
+        else:
+            scores = queries @ matrix.T
+
+        k = min(top_k, len(rows))
+        results = []
+        for row_scores in scores:
+            if k < len(rows):
+                best = np.argpartition(-row_scores, k - 1)[:k]
+            else:
+                best = np.arange(len(rows))
+            # Highest score first, insertion order among ties
+            best = best[np.lexsort((best, -row_scores[best]))]
+            results.append([
+                replace(self.memory_store[rows[i]][0], similarity_score=float(row_scores[i]))
+                for i in best if row_scores[i] >= min_score
+            ])
+        return results
+
     def _cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
         """Calculate cosine similarity between two vectors"""
         if not vec1 or not vec2:
@@ -609,13 +918,16 @@ class PrimitiveLibrary:
 
     def add(self, primitive: DiagramPrimitive):
         """Add primitive to library"""
-        if self.backend == "memory":
+        if self.backend in ("memory", "ann"):
             if self.embedder:
-                text = f"{primitive.name} {' '.join(primitive.tags)}"
-                embedding = self._embed_text(text)
+                embedding = self._embed_text(primitive_embedding_text(primitive))
                 self.memory_store.append((primitive, embedding))
             else:
+                embedding = []
                 self.memory_store.append((primitive, []))
+            if self.ann_index is not None:
+                # Keep index ids == memory_store rows (zero vector when unembedded)
+                self.ann_index.add([embedding if len(embedding) else np.zeros(self.ann_index.dim, np.float32)])
             self.logger.info(f"Added primitive to memory store: {primitive.name}")
         else:
             self.logger.warning(f"add() not implemented for backend: {self.backend}")
@@ -665,6 +977,9 @@ class PrimitiveLibrary:
                 'bbox': result.bbox,
             })
 
+        if ingested:
+            self.save()
+
         return {
             'ingested': ingested,
             'source_image': str(image_path),
@@ -683,7 +998,7 @@ class PrimitiveLibrary:
 
     def get_stats(self) -> Dict[str, Any]:
         """Get library statistics"""
-        if self.backend == "memory":
+        if self.backend in ("memory", "ann"):
             category_counts = {}
             for primitive, _ in self.memory_store:
                 cat = primitive.category.value
@@ -693,7 +1008,10 @@ class PrimitiveLibrary:
                 'backend': self.backend,
                 'total_primitives': len(self.memory_store),
                 'categories': category_counts,
-                'has_embedder': self.embedder is not None
+                'has_embedder': self._embedder is not None or self._embedder_pending,
+                'embedding_store': self.embedding_store_status,
+                'ann_index': {'rows': len(self.ann_index), 'trained': self.ann_index.is_trained,
+                              'cells': len(self.ann_index._lists)} if self.ann_index is not None else None
             }
         else:
             return {
@@ -13,7 +13,7 @@ Architecture:
 """
 
 import networkx as nx
-from typing import Dict, List, Any, Optional, Tuple, Set
+from typing import Dict, Iterator, List, Any, Optional, Tuple, Set
 from dataclasses import dataclass, field
 from enum import Enum
 import json
@@ -175,13 +175,24 @@ class PropertyGraph:
     - Property propagation
     - Graph traversal
     - Conversion to/from CanonicalProblemSpec
+
+    For large long-lived graphs see ColumnarPropertyGraph
+    (create_property_graph('columnar')), which implements the same API.
     """
 
     def __init__(self):
         """Initialize empty property graph"""
         self.graph = nx.MultiDiGraph()  # Directed graph with multiple edges
         self._node_index: Dict[str, GraphNode] = {}  # Fast node lookup
-        self._edge_index: Dict[str, List[GraphEdge]] = {}  # Fast edge lookup by source
+        self._node_type_index: Dict[NodeType, Dict[str, GraphNode]] = {}  # type -> id -> node
+        # property key -> value -> node IDs; built lazily per key, dropped on node changes
+        self._property_index: Dict[str, Dict[Any, List[str]]] = {}
+        # Edge adjacency indexes; all hold the same GraphEdge instances, in insertion order
+        self._edge_index: Dict[str, List[GraphEdge]] = {}  # by source
+        self._in_edge_index: Dict[str, List[GraphEdge]] = {}  # by target
+        self._out_type_index: Dict[str, Dict[EdgeType, List[GraphEdge]]] = {}  # source -> type -> edges
+        self._in_type_index: Dict[str, Dict[EdgeType, List[GraphEdge]]] = {}  # target -> type -> edges
+        self._edge_type_index: Dict[EdgeType, List[GraphEdge]] = {}  # type -> edges
 
     # ========== Node Operations ==========
 
@@ -199,7 +210,12 @@ class PropertyGraph:
             properties=node.properties,
             metadata=node.metadata
         )
+        previous = self._node_index.get(node.id)
+        if previous is not None and previous.type != node.type:
+            self._node_type_index.get(previous.type, {}).pop(node.id, None)
         self._node_index[node.id] = node
+        self._node_type_index.setdefault(node.type, {})[node.id] = node
+        self._property_index.clear()
 
     def get_node(self, node_id: str) -> Optional[GraphNode]:
         """
@@ -222,10 +238,31 @@ class PropertyGraph:
         """
         if node_id in self.graph:
             self.graph.remove_node(node_id)
-            del self._node_index[node_id]
-            # Clean up edge index
-            if node_id in self._edge_index:
-                del self._edge_index[node_id]
+            node = self._node_index.pop(node_id)
+            typed = self._node_type_index.get(node.type)
+            if typed is not None:
+                typed.pop(node_id, None)
+                if not typed:
+                    del self._node_type_index[node.type]
+            self._property_index.clear()
+            # Drop every edge touching the node from the adjacency indexes
+            outgoing = self._edge_index.pop(node_id, [])
+            incoming = self._in_edge_index.pop(node_id, [])
+            self._out_type_index.pop(node_id, None)
+            self._in_type_index.pop(node_id, None)
+            for edge in outgoing:
+                if edge.target != node_id:
+                    self._unindex_edge(self._in_edge_index, self._in_type_index, edge.target, edge)
+            for edge in incoming:
+                if edge.source != node_id:
+                    self._unindex_edge(self._edge_index, self._out_type_index, edge.source, edge)
+            doomed = {id(edge) for edge in outgoing} | {id(edge) for edge in incoming}
+            for edge_type in {edge.type for edge in outgoing} | {edge.type for edge in incoming}:
+                remaining = [edge for edge in self._edge_type_index.get(edge_type, []) if id(edge) not in doomed]
+                if remaining:
+                    self._edge_type_index[edge_type] = remaining
+                else:
+                    self._edge_type_index.pop(edge_type, None)
 
     def has_node(self, node_id: str) -> bool:
         """Check if node exists"""
@@ -244,7 +281,41 @@ class PropertyGraph:
         if node_type is None:
             return list(self._node_index.values())
         else:
-            return [n for n in self._node_index.values() if n.type == node_type]
+            return list(self._node_type_index.get(node_type, {}).values())
+
+    def iter_nodes(self) -> Iterator[GraphNode]:
+        """Iterate over all nodes without building a list"""
+        yield from self._node_index.values()
+
+    def count_nodes(self, node_type: Optional[NodeType] = None) -> int:
+        """Number of nodes, optionally of one type"""
+        if node_type is None:
+            return len(self._node_index)
+        return len(self._node_type_index.get(node_type, {}))
+
+    def find_nodes_by_property(self, key: str, value: Any) -> List[GraphNode]:
+        """
+        Nodes whose property `key` equals `value` (hashable values only)
+
+        The per-key index is built on first use and dropped by add_node,
+        remove_node and merge_node_properties; edits made directly to a
+        node's properties dict are not tracked.
+        """
+        try:
+            hash(value)
+        except TypeError:
+            return [node for node in self._node_index.values() if node.properties.get(key) == value]
+        index = self._property_index.get(key)
+        if index is None:
+            index = {}
+            for node in self._node_index.values():
+                prop = node.properties.get(key) if node.properties else None
+                try:
+                    index.setdefault(prop, []).append(node.id)
+                except TypeError:
+                    continue  # unhashable values are never equal to a hashable query
+            self._property_index[key] = index
+        return [self._node_index[node_id] for node_id in index.get(value, [])]
 
     def merge_node_properties(self, node_id: str, properties: Dict[str, Any]) -> None:
         """Merge additional properties into a node"""
@@ -256,6 +327,7 @@ class PropertyGraph:
         node.properties = self._merge_dict_values(node.properties, properties)
         if node_id in self.graph.nodes:
             self.graph.nodes[node_id]['properties'] = node.properties
+        self._property_index.clear()
 
     def merge_node_metadata(self, node_id: str, metadata: Dict[str, Any]) -> None:
         """Merge metadata payload into a node"""
@@ -332,16 +404,22 @@ class PropertyGraph:
             confidence=edge.confidence
         )
 
-        # Update edge index
-        if edge.source not in self._edge_index:
-            self._edge_index[edge.source] = []
-        self._edge_index[edge.source].append(edge)
+        # Update adjacency indexes
+        self._edge_index.setdefault(edge.source, []).append(edge)
+        self._in_edge_index.setdefault(edge.target, []).append(edge)
+        self._out_type_index.setdefault(edge.source, {}).setdefault(edge.type, []).append(edge)
+        self._in_type_index.setdefault(edge.target, {}).setdefault(edge.type, []).append(edge)
+        self._edge_type_index.setdefault(edge.type, []).append(edge)
 
     def get_edges(self, source: Optional[str] = None, target: Optional[str] = None,
                   edge_type: Optional[EdgeType] = None) -> List[GraphEdge]:
         """
         Get edges, optionally filtered by source, target, and/or type
 
+        Lookups go through the adjacency indexes, so a filtered call costs
+        O(degree) rather than O(edges). The stored GraphEdge instances are
+        returned (not copies).
+
         Args:
             source: Optional source node ID
             target: Optional target node ID
@@ -350,28 +428,63 @@ class PropertyGraph:
         Returns:
             List of GraphEdge objects
         """
-        edges = []
+        if source and target:
+            # Scan whichever side has fewer candidates
+            outgoing = self._edges_at(self._edge_index, self._out_type_index, source, edge_type)
+            incoming = self._edges_at(self._in_edge_index, self._in_type_index, target, edge_type)
+            if len(outgoing) <= len(incoming):
+                return [edge for edge in outgoing if edge.target == target]
+            return [edge for edge in incoming if edge.source == source]
+        if source:
+            return list(self._edges_at(self._edge_index, self._out_type_index, source, edge_type))
+        if target:
+            return list(self._edges_at(self._in_edge_index, self._in_type_index, target, edge_type))
+        if edge_type:
+            return list(self._edge_type_index.get(edge_type, []))
+
+        edges: List[GraphEdge] = []
+        for node_id in self._node_index:
+            edges.extend(self._edge_index.get(node_id, []))
+        return edges
 
-        # Get all edges from graph
-        for src, tgt, data in self.graph.edges(data=True):
-            if source and src != source:
-                continue
-            if target and tgt != target:
-                continue
-            if edge_type and data.get('type') != edge_type:
-                continue
+    def iter_edges(self) -> Iterator[GraphEdge]:
+        """Iterate over all edges (same order as get_edges()) without building a list"""
+        for node_id in self._node_index:
+            yield from self._edge_index.get(node_id, [])
 
-            edges.append(GraphEdge(
-                source=src,
-                target=tgt,
-                type=data.get('type', EdgeType.UNKNOWN),
-                label=data.get('label', ''),
-                properties=data.get('properties', {}),
-                metadata=data.get('metadata', {}),
-                confidence=data.get('confidence', 1.0)
-            ))
+    def edge_count(self, edge_type: Optional[EdgeType] = None) -> int:
+        """Number of edges, optionally of one type"""
+        if edge_type:
+            return len(self._edge_type_index.get(edge_type, []))
+        return sum(len(edges) for edges in self._edge_index.values())
 
-        return edges
+    @staticmethod
+    def _edges_at(by_node: Dict[str, List[GraphEdge]],
+                  by_node_type: Dict[str, Dict[EdgeType, List[GraphEdge]]],
+                  node_id: str, edge_type: Optional[EdgeType]) -> List[GraphEdge]:
+        if edge_type:
+            return by_node_type.get(node_id, {}).get(edge_type, [])
+        return by_node.get(node_id, [])
+
+    @staticmethod
+    def _unindex_edge(by_node: Dict[str, List[GraphEdge]],
+                      by_node_type: Dict[str, Dict[EdgeType, List[GraphEdge]]],
+                      node_id: str, edge: GraphEdge) -> None:
+        """Remove one edge instance from a node's entries in a directional index"""
+        remaining = [other for other in by_node.get(node_id, []) if other is not edge]
+        if remaining:
+            by_node[node_id] = remaining
+        else:
+            by_node.pop(node_id, None)
+        typed = by_node_type.get(node_id)
+        if typed is not None:
+            kept = [other for other in typed.get(edge.type, []) if other is not edge]
+            if kept:
+                typed[edge.type] = kept
+            else:
+                typed.pop(edge.type, None)
+                if not typed:
+                    by_node_type.pop(node_id, None)
 
     def get_outgoing_edges(self, node_id: str, edge_type: Optional[EdgeType] = None) -> List[GraphEdge]:
         """Get all edges going out from a node"""
@@ -401,7 +514,7 @@ class PropertyGraph:
 
     # ========== Graph Queries ==========
 
-    def query_pattern(self, pattern: Dict) -> List[Dict]:
+    def query_pattern(self, pattern: Dict, limit: Optional[int] = None) -> List[Dict]:
         """
         Query graph by pattern matching
 
@@ -409,56 +522,22 @@ class PropertyGraph:
         {
             'nodes': [
                 {'id': 'n1', 'type': NodeType.OBJECT, 'properties': {...}},
-                {'id': 'n2', 'type': NodeType.FORCE}
+                {'id': 'n2', 'type': NodeType.FORCE, 'filters': [QueryFilter(...)]}
             ],
             'edges': [
                 {'source': 'n1', 'target': 'n2', 'type': EdgeType.ACTS_ON}
             ]
         }
 
+        Pattern nodes bind to distinct graph nodes, and every pattern edge
+        must exist between the bound nodes (see core.graph_pattern).
+
         Returns list of matches (each match is a dict mapping pattern IDs to actual IDs)
         """
-        matches = []
-
-        # Get candidate nodes for each pattern node
-        candidates: Dict[str, List[str]] = {}
-        for node_pattern in pattern.get('nodes', []):
-            pattern_id = node_pattern['id']
-            node_type = node_pattern.get('type')
-            props = node_pattern.get('properties', {})
-
-            # Find matching nodes
-            matching_nodes = []
-            for node in self.get_all_nodes(node_type):
-                # Check if properties match
-                if all(node.properties.get(k) == v for k, v in props.items()):
-                    matching_nodes.append(node.id)
-
-            candidates[pattern_id] = matching_nodes
-
-        # Generate all combinations and check edge constraints
-        def check_match(assignment: Dict[str, str]) -> bool:
-            """Check if node assignment satisfies edge constraints"""
-            for edge_pattern in pattern.get('edges', []):
-                src = assignment[edge_pattern['source']]
-                tgt = assignment[edge_pattern['target']]
-                edge_type = edge_pattern.get('type')
-
-                # Check if edge exists
-                edges = self.get_edges(source=src, target=tgt, edge_type=edge_type)
-                if not edges:
-                    return False
-
-            return True
-
-        # Simple implementation - for complex patterns, use graph isomorphism
-        # For now, just return nodes matching the first pattern
-        if pattern.get('nodes'):
-            first_pattern = pattern['nodes'][0]
-            for node_id in candidates.get(first_pattern['id'], []):
-                matches.append({first_pattern['id']: node_id})
+        from core.graph_pattern import PatternMatcher
 
-        return matches
+        nodes, edges = PatternMatcher.parse(pattern)
+        return [match.nodes for match in PatternMatcher(self).match(nodes, edges, limit=limit)]
 
     def find_paths(self, start: str, end: str, max_length: int = 5) -> List[List[str]]:
         """
@@ -498,17 +577,21 @@ class PropertyGraph:
         Returns:
             New PropertyGraph containing only the specified nodes and edges between them
         """
-        subgraph = PropertyGraph()
+        subgraph = self.__class__()
 
         # Add nodes
         for node_id in node_ids:
-            if node_id in self._node_index:
-                subgraph.add_node(self._node_index[node_id])
-
-        # Add edges
-        for edge in self.get_edges():
-            if edge.source in node_ids and edge.target in node_ids:
-                subgraph.add_edge(edge)
+            node = self.get_node(node_id)
+            if node is not None:
+                subgraph.add_node(node)
+
+        # Add edges (outgoing edges of included nodes whose target is also included)
+        included = [node.id for node in subgraph.get_all_nodes()]
+        included_set = set(included)
+        for node_id in included:
+            for edge in self.get_edges(source=node_id):
+                if edge.target in included_set:
+                    subgraph.add_edge(edge)
 
         return subgraph
 
@@ -572,8 +655,8 @@ class PropertyGraph:
             'objects': objects,
             'relationships': relationships,
             'graph_metadata': {
-                'node_count': len(self._node_index),
-                'edge_count': len(list(self.graph.edges())),
+                'node_count': self.count_nodes(),
+                'edge_count': self.edge_count(),
                 'connected_components': len(self.get_connected_components())
             }
         }
@@ -613,7 +696,7 @@ class PropertyGraph:
                 node_type = NodeType.OBJECT
 
             node = GraphNode(
-                id=obj.get('id', f"node_{len(graph._node_index)}"),
+                id=obj.get('id', f"node_{graph.count_nodes()}"),
                 type=node_type,
                 label=obj.get('label', obj.get('name', obj.get('type', 'unknown'))),
                 properties={k: v for k, v in obj.items() if k not in ['id', 'type', 'label']}
@@ -659,11 +742,11 @@ class PropertyGraph:
     def to_dict(self) -> Dict:
         """Export graph to dictionary"""
         return {
-            'nodes': [node.to_dict() for node in self._node_index.values()],
+            'nodes': [node.to_dict() for node in self.get_all_nodes()],
             'edges': [edge.to_dict() for edge in self.get_edges()],
             'metadata': {
-                'node_count': len(self._node_index),
-                'edge_count': len(list(self.graph.edges()))
+                'node_count': self.count_nodes(),
+                'edge_count': self.edge_count()
             }
         }
 
@@ -696,29 +779,40 @@ class PropertyGraph:
             data = json.load(f)
         return cls.from_dict(data)
 
+    def to_binary(self, filepath: str) -> Dict[str, int]:
+        """Stream graph to the compact binary format (see core.property_graph_io)"""
+        from core.property_graph_io import write_property_graph
+        return write_property_graph(self, filepath)
+
+    @classmethod
+    def from_binary(cls, filepath: str) -> 'PropertyGraph':
+        """Load graph from a binary dump"""
+        from core.property_graph_io import read_property_graph
+        return read_property_graph(filepath, cls())
+
     # ========== Utility Methods ==========
 
     def __len__(self) -> int:
         """Return number of nodes"""
-        return len(self._node_index)
+        return self.count_nodes()
 
     def __repr__(self) -> str:
         """String representation"""
-        return f"PropertyGraph(nodes={len(self._node_index)}, edges={len(list(self.graph.edges()))})"
+        return f"{self.__class__.__name__}(nodes={self.count_nodes()}, edges={self.edge_count()})"
 
     def summary(self) -> str:
         """Get a summary of the graph"""
         summary = [
             f"PropertyGraph Summary:",
-            f"  Nodes: {len(self._node_index)}",
-            f"  Edges: {len(list(self.graph.edges()))}",
+            f"  Nodes: {self.count_nodes()}",
+            f"  Edges: {self.edge_count()}",
             f"  Connected Components: {len(self.get_connected_components())}",
             f"\nNode Types:"
         ]
 
         # Count node types
         type_counts: Dict[NodeType, int] = {}
-        for node in self._node_index.values():
+        for node in self.get_all_nodes():
             type_counts[node.type] = type_counts.get(node.type, 0) + 1
 
         for node_type, count in sorted(type_counts.items(), key=lambda x: x[1], reverse=True):
@@ -746,3 +840,20 @@ class PropertyGraph:
             else:
                 result[key] = value
         return result
+
+
+def create_property_graph(backend: str = "networkx") -> PropertyGraph:
+    """
+    Build an empty property graph
+
+    Args:
+        backend: 'networkx' (PropertyGraph) or 'columnar'
+            (ColumnarPropertyGraph: interned IDs, typed columns, CSR adjacency)
+    """
+    backend = (backend or "networkx").lower()
+    if backend == "networkx":
+        return PropertyGraph()
+    if backend == "columnar":
+        from core.columnar_property_graph import ColumnarPropertyGraph
+        return ColumnarPropertyGraph()
+    raise ValueError(f"Unknown property graph backend: {backend}")
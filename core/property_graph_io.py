@@ -0,0 +1,548 @@
+"""
+Property Graph Binary I/O - Streaming Dumps and Lazy Loading
+============================================================
+
+Compact binary format for PropertyGraph snapshots, plus a background writer
+that keeps persistence off the request path.
+
+File layout (little-endian):
+
+    header   b"PGB1" + uint16 version
+    records  kind (1 byte: b"N" node / b"E" edge) + uint32 length + payload
+    footer   string table, node record offsets, edge record offsets
+    trailer  uint64 footer offset + b"PGB1"
+
+Payloads reference repeated strings (IDs, labels, types, property keys and
+short values) by index into the string table, which is written once in the
+footer. Values are tagged: None/bool, zigzag varint ints, float64, table or
+inline strings, lists and dicts; anything else is stored as JSON text.
+
+- PropertyGraphWriter streams records as nodes/edges are produced; only the
+  string table and 8 bytes per record are held until close()
+- PropertyGraphReader reads the footer and decodes node/edge slices on demand
+- BackgroundGraphWriter snapshots a graph on the caller's thread and writes
+  it (binary or JSON) on a single background thread, atomically via rename
+
+Author: Universal STEM Diagram Generator
+Date: November 18, 2025
+"""
+
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from array import array
+from pathlib import Path
+import json
+import logging
+import os
+import struct
+import sys
+import threading
+import time
+
+from core.property_graph import PropertyGraph, GraphNode, GraphEdge, NodeType, EdgeType
+
+
+MAGIC = b"PGB1"
+FORMAT_VERSION = 1
+
+_NODE_RECORD = ord("N")
+_EDGE_RECORD = ord("E")
+_RECORD_HEADER = struct.Struct("<BI")
+_TRAILER = struct.Struct("<Q4s")
+_FLOAT = struct.Struct("<d")
+
+# Value tags
+_NONE, _FALSE, _TRUE, _INT, _FLOAT_TAG, _STR, _TEXT, _LIST, _DICT, _JSON = range(10)
+
+# Strings longer than this are written inline instead of into the table
+MAX_TABLE_STRING = 64
+
+_NODE_TYPES = {t.value: t for t in NodeType}
+_EDGE_TYPES = {t.value: t for t in EdgeType}
+
+
+# ========== Primitive Encoding ==========
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(buf, pos: int) -> Tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+class _StringTable:
+    """Writer-side string interning: string -> table index"""
+
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+
+    def ref(self, value: str) -> int:
+        ref = self.index.get(value)
+        if ref is None:
+            ref = self.index[value] = len(self.index)
+        return ref
+
+
+def _encode_value(out: bytearray, value: Any, strings: _StringTable) -> None:
+    if value is None:
+        out.append(_NONE)
+    elif value is True:
+        out.append(_TRUE)
+    elif value is False:
+        out.append(_FALSE)
+    elif type(value) is str:
+        if len(value) <= MAX_TABLE_STRING:
+            out.append(_STR)
+            _write_varint(out, strings.ref(value))
+        else:
+            data = value.encode("utf-8")
+            out.append(_TEXT)
+            _write_varint(out, len(data))
+            out += data
+    elif isinstance(value, int) and not isinstance(value, bool):
+        out.append(_INT)
+        _write_varint(out, (value << 1) if value >= 0 else ((-value << 1) - 1))  # zigzag
+    elif isinstance(value, float):
+        out.append(_FLOAT_TAG)
+        out += _FLOAT.pack(value)
+    elif isinstance(value, (list, tuple)):
+        out.append(_LIST)
+        _write_varint(out, len(value))
+        for item in value:
+            _encode_value(out, item, strings)
+    elif isinstance(value, dict):
+        out.append(_DICT)
+        _write_varint(out, len(value))
+        for key, item in value.items():
+            _encode_value(out, key, strings)
+            _encode_value(out, item, strings)
+    else:
+        data = json.dumps(value, default=str).encode("utf-8")
+        out.append(_JSON)
+        _write_varint(out, len(data))
+        out += data
+
+
+def _decode_value(buf, pos: int, strings: List[str]) -> Tuple[Any, int]:
+    tag = buf[pos]
+    pos += 1
+    if tag == _STR:
+        ref, pos = _read_varint(buf, pos)
+        return strings[ref], pos
+    if tag == _INT:
+        raw, pos = _read_varint(buf, pos)
+        return (raw >> 1) if not raw & 1 else -((raw + 1) >> 1), pos
+    if tag == _NONE:
+        return None, pos
+    if tag == _TRUE:
+        return True, pos
+    if tag == _FALSE:
+        return False, pos
+    if tag == _FLOAT_TAG:
+        return _FLOAT.unpack_from(buf, pos)[0], pos + 8
+    if tag == _DICT:
+        count, pos = _read_varint(buf, pos)
+        result = {}
+        for _ in range(count):
+            key, pos = _decode_value(buf, pos, strings)
+            result[key], pos = _decode_value(buf, pos, strings)
+        return result, pos
+    if tag == _LIST:
+        count, pos = _read_varint(buf, pos)
+        items = []
+        for _ in range(count):
+            item, pos = _decode_value(buf, pos, strings)
+            items.append(item)
+        return items, pos
+    if tag in (_TEXT, _JSON):
+        length, pos = _read_varint(buf, pos)
+        text = bytes(buf[pos:pos + length]).decode("utf-8")
+        return (json.loads(text) if tag == _JSON else text), pos + length
+    raise ValueError(f"Unknown value tag {tag} at offset {pos - 1}")
+
+
+def _type_value(member: Any) -> Any:
+    return member.value if isinstance(member, (NodeType, EdgeType)) else member
+
+
+def _offsets_bytes(offsets: array) -> bytes:
+    if sys.byteorder == "big":
+        offsets = array("Q", offsets)
+        offsets.byteswap()
+    return offsets.tobytes()
+
+
+# ========== Writer ==========
+
+class PropertyGraphWriter:
+    """
+    Streaming binary writer
+
+    Usage:
+        with PropertyGraphWriter("graph.pgb") as writer:
+            for node in nodes:
+                writer.write_node(node)
+            for edge in edges:
+                writer.write_edge(edge)
+    """
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        self._file: BinaryIO = open(self.path, "wb")
+        self._file.write(MAGIC + struct.pack("<H", FORMAT_VERSION))
+        self._offset = len(MAGIC) + 2
+        self._strings = _StringTable()
+        self._node_offsets = array("Q")
+        self._edge_offsets = array("Q")
+        self._closed = False
+
+    def write_node(self, node: GraphNode) -> None:
+        """Append one node record"""
+        payload = bytearray()
+        strings = self._strings
+        _encode_value(payload, node.id, strings)
+        _encode_value(payload, _type_value(node.type), strings)
+        _encode_value(payload, node.label, strings)
+        _encode_value(payload, node.properties or {}, strings)
+        _encode_value(payload, node.metadata or {}, strings)
+        self._node_offsets.append(self._offset)
+        self._write_record(_NODE_RECORD, payload)
+
+    def write_edge(self, edge: GraphEdge) -> None:
+        """Append one edge record"""
+        payload = bytearray()
+        strings = self._strings
+        _encode_value(payload, edge.source, strings)
+        _encode_value(payload, edge.target, strings)
+        _encode_value(payload, _type_value(edge.type), strings)
+        _encode_value(payload, edge.label, strings)
+        payload += _FLOAT.pack(float(edge.confidence))
+        _encode_value(payload, edge.properties or {}, strings)
+        _encode_value(payload, edge.metadata or {}, strings)
+        self._edge_offsets.append(self._offset)
+        self._write_record(_EDGE_RECORD, payload)
+
+    def _write_record(self, kind: int, payload: bytearray) -> None:
+        self._file.write(_RECORD_HEADER.pack(kind, len(payload)))
+        self._file.write(payload)
+        self._offset += _RECORD_HEADER.size + len(payload)
+
+    def close(self) -> Dict[str, int]:
+        """Write footer and trailer; returns record counts and file size"""
+        if self._closed:
+            return self.stats()
+        footer = bytearray()
+        _write_varint(footer, len(self._strings.index))
+        for value in self._strings.index:  # dict order == table index order
+            data = value.encode("utf-8")
+            _write_varint(footer, len(data))
+            footer += data
+        for offsets in (self._node_offsets, self._edge_offsets):
+            footer += struct.pack("<Q", len(offsets))
+            footer += _offsets_bytes(offsets)
+        self._file.write(footer)
+        self._file.write(_TRAILER.pack(self._offset, MAGIC))
+        self._offset += len(footer) + _TRAILER.size
+        self._file.close()
+        self._closed = True
+        return self.stats()
+
+    def abort(self) -> None:
+        """Close without a footer and delete the partial file"""
+        if not self._closed:
+            self._file.close()
+            self._closed = True
+        Path(self.path).unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'nodes': len(self._node_offsets),
+            'edges': len(self._edge_offsets),
+            'strings': len(self._strings.index),
+            'bytes': self._offset
+        }
+
+    def __enter__(self) -> 'PropertyGraphWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def write_property_graph(graph: Any, path: str) -> Dict[str, int]:
+    """
+    Stream a graph (PropertyGraph, ColumnarPropertyGraph or GraphSnapshot) to a binary file
+
+    Returns:
+        Dict with node/edge/string counts and file size in bytes
+    """
+    with PropertyGraphWriter(path) as writer:
+        for node in graph.iter_nodes():
+            writer.write_node(node)
+        for edge in graph.iter_edges():
+            writer.write_edge(edge)
+    return writer.stats()
+
+
+# ========== Reader ==========
+
+class PropertyGraphReader:
+    """
+    Lazy binary reader: only the footer is loaded up front
+
+    Usage:
+        with PropertyGraphReader("graph.pgb") as reader:
+            first_hundred = reader.read_nodes(0, 100)
+            graph = reader.load()
+    """
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        self._file: BinaryIO = open(self.path, "rb")
+        try:
+            self._load_footer()
+        except Exception:
+            self._file.close()
+            raise
+
+    def _load_footer(self) -> None:
+        header = self._file.read(len(MAGIC) + 2)
+        if header[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self.path} is not a property graph binary file")
+        version = struct.unpack("<H", header[len(MAGIC):])[0]
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported property graph format version {version}")
+
+        self._file.seek(-_TRAILER.size, os.SEEK_END)
+        trailer_offset = self._file.tell()
+        footer_offset, magic = _TRAILER.unpack(self._file.read(_TRAILER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is truncated (missing trailer)")
+        self._file.seek(footer_offset)
+        footer = self._file.read(trailer_offset - footer_offset)
+
+        count, pos = _read_varint(footer, 0)
+        strings: List[str] = []
+        for _ in range(count):
+            length, pos = _read_varint(footer, pos)
+            strings.append(footer[pos:pos + length].decode("utf-8"))
+            pos += length
+        self._strings = strings
+
+        offsets = []
+        for _ in range(2):
+            (length,) = struct.unpack_from("<Q", footer, pos)
+            pos += 8
+            table = array("Q")
+            table.frombytes(footer[pos:pos + 8 * length])
+            if sys.byteorder == "big":
+                table.byteswap()
+            pos += 8 * length
+            offsets.append(table)
+        self._node_offsets, self._edge_offsets = offsets
+        self._records_end = footer_offset
+
+    @property
+    def node_count(self) -> int:
+        return len(self._node_offsets)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self._edge_offsets)
+
+    def read_nodes(self, start: int = 0, stop: Optional[int] = None) -> List[GraphNode]:
+        """Decode nodes[start:stop]"""
+        return [self._decode_node(payload) for payload in self._payloads(self._node_offsets, start, stop)]
+
+    def read_edges(self, start: int = 0, stop: Optional[int] = None) -> List[GraphEdge]:
+        """Decode edges[start:stop]"""
+        return [self._decode_edge(payload) for payload in self._payloads(self._edge_offsets, start, stop)]
+
+    def iter_nodes(self, batch_size: int = 1024) -> Iterator[GraphNode]:
+        for start in range(0, self.node_count, batch_size):
+            yield from self.read_nodes(start, start + batch_size)
+
+    def iter_edges(self, batch_size: int = 1024) -> Iterator[GraphEdge]:
+        for start in range(0, self.edge_count, batch_size):
+            yield from self.read_edges(start, start + batch_size)
+
+    def load(self, graph: Optional[PropertyGraph] = None) -> PropertyGraph:
+        """Load every node and edge into `graph` (a new PropertyGraph by default)"""
+        graph = graph if graph is not None else PropertyGraph()
+        for node in self.iter_nodes():
+            graph.add_node(node)
+        for edge in self.iter_edges():
+            if graph.has_node(edge.source) and graph.has_node(edge.target):
+                graph.add_edge(edge)
+        return graph
+
+    def _payloads(self, offsets: array, start: int, stop: Optional[int]) -> Iterator[memoryview]:
+        selected = offsets[start:stop]
+        if not selected:
+            return
+        # One read covering the slice; the last record's length comes from its header
+        self._file.seek(selected[-1])
+        _, last_length = _RECORD_HEADER.unpack(self._file.read(_RECORD_HEADER.size))
+        begin = selected[0]
+        self._file.seek(begin)
+        block = memoryview(self._file.read(selected[-1] + _RECORD_HEADER.size + last_length - begin))
+        for offset in selected:
+            pos = offset - begin
+            _, length = _RECORD_HEADER.unpack_from(block, pos)
+            pos += _RECORD_HEADER.size
+            yield block[pos:pos + length]
+
+    def _decode_node(self, payload: memoryview) -> GraphNode:
+        strings = self._strings
+        node_id, pos = _decode_value(payload, 0, strings)
+        node_type, pos = _decode_value(payload, pos, strings)
+        label, pos = _decode_value(payload, pos, strings)
+        properties, pos = _decode_value(payload, pos, strings)
+        metadata, pos = _decode_value(payload, pos, strings)
+        return GraphNode(id=node_id, type=_NODE_TYPES.get(node_type, NodeType.UNKNOWN), label=label,
+                         properties=properties, metadata=metadata)
+
+    def _decode_edge(self, payload: memoryview) -> GraphEdge:
+        strings = self._strings
+        source, pos = _decode_value(payload, 0, strings)
+        target, pos = _decode_value(payload, pos, strings)
+        edge_type, pos = _decode_value(payload, pos, strings)
+        label, pos = _decode_value(payload, pos, strings)
+        confidence = _FLOAT.unpack_from(payload, pos)[0]
+        properties, pos = _decode_value(payload, pos + 8, strings)
+        metadata, pos = _decode_value(payload, pos, strings)
+        return GraphEdge(source=source, target=target, type=_EDGE_TYPES.get(edge_type, EdgeType.UNKNOWN),
+                         label=label, properties=properties, metadata=metadata, confidence=confidence)
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> 'PropertyGraphReader':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def read_property_graph(path: str, graph: Optional[PropertyGraph] = None) -> PropertyGraph:
+    """Load a binary dump into `graph` (a new PropertyGraph by default)"""
+    with PropertyGraphReader(path) as reader:
+        return reader.load(graph)
+
+
+# ========== Background Persistence ==========
+
+@dataclass
+class GraphSnapshot:
+    """
+    Point-in-time copy of a graph's nodes and edges for off-thread writing
+
+    Node/edge objects are copied with shallow copies of their property and
+    metadata dicts, so later merges on the live graph don't leak into a
+    queued write.
+    """
+    nodes: List[GraphNode] = field(default_factory=list)
+    edges: List[GraphEdge] = field(default_factory=list)
+
+    @classmethod
+    def of(cls, graph: PropertyGraph) -> 'GraphSnapshot':
+        return cls(
+            nodes=[GraphNode(id=n.id, type=n.type, label=n.label, properties=dict(n.properties or {}),
+                             metadata=dict(n.metadata or {})) for n in graph.iter_nodes()],
+            edges=[GraphEdge(source=e.source, target=e.target, type=e.type, label=e.label,
+                             properties=dict(e.properties or {}), metadata=dict(e.metadata or {}),
+                             confidence=e.confidence) for e in graph.iter_edges()]
+        )
+
+    def iter_nodes(self) -> Iterator[GraphNode]:
+        return iter(self.nodes)
+
+    def iter_edges(self) -> Iterator[GraphEdge]:
+        return iter(self.edges)
+
+    def write_json(self, path: str) -> None:
+        """Same document as PropertyGraph.to_json"""
+        with open(path, "w") as f:
+            json.dump({
+                'nodes': [node.to_dict() for node in self.nodes],
+                'edges': [edge.to_dict() for edge in self.edges],
+                'metadata': {'node_count': len(self.nodes), 'edge_count': len(self.edges)}
+            }, f, indent=2)
+
+
+class BackgroundGraphWriter:
+    """
+    Single background thread that writes graph snapshots
+
+    submit() snapshots the graph on the calling thread and returns a Future
+    resolving to a persistence info dict ({'status', 'path', 'format', ...}).
+    Files are written to a temporary name and renamed into place, so a
+    reader never sees a partial dump. Pending writes are drained at
+    interpreter exit (ThreadPoolExecutor semantics) or by flush()/close().
+    """
+
+    FORMATS = ('binary', 'json')
+
+    def __init__(self):
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: List[Future] = []
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def submit(self, graph: PropertyGraph, path: str, format: str = "binary") -> Future:
+        """Queue a write of the graph's current state"""
+        if format not in self.FORMATS:
+            raise ValueError(f"Unknown property graph dump format: {format}")
+        snapshot = GraphSnapshot.of(graph)
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="graph-writer")
+            future = self._executor.submit(self._write, snapshot, str(path), format)
+            self._pending = [f for f in self._pending if not f.done()] + [future]
+        return future
+
+    def _write(self, snapshot: GraphSnapshot, path: str, format: str) -> Dict[str, Any]:
+        start = time.time()
+        temp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        try:
+            if format == "binary":
+                stats = write_property_graph(snapshot, temp_path)
+            else:
+                snapshot.write_json(temp_path)
+                stats = {'nodes': len(snapshot.nodes), 'edges': len(snapshot.edges),
+                         'bytes': os.path.getsize(temp_path)}
+            os.replace(temp_path, path)
+        except Exception as exc:
+            Path(temp_path).unlink(missing_ok=True)
+            self.logger.warning(f"Property graph dump to {path} failed: {exc}")
+            return {'status': 'error', 'path': path, 'format': format, 'error': str(exc)}
+        return {'status': 'success', 'path': path, 'format': format,
+                'duration': time.time() - start, **stats}
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait for queued writes; returns False on timeout"""
+        with self._lock:
+            pending = list(self._pending)
+        _, not_done = wait(pending, timeout=timeout)
+        return not not_done
+
+    def close(self, wait_for_pending: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait_for_pending)
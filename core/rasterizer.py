@@ -0,0 +1,271 @@
+"""
+PNG Rasterization Service
+=========================
+
+One place that turns SVG into PNG for the whole process. The renderer's
+PNG output, the VLM validator and the editor export endpoint all go
+through get_rasterizer(), so:
+
+- SVG is passed as bytes in memory (no temp files, no file-to-file calls)
+- work runs in a pool of warm worker processes (cairosvg imported and a
+  first surface rendered at start-up), keeping cairo off the request thread
+- results are cached in an LRU keyed on SVG digest + output size, and
+  concurrent requests for the same SVG share one in-flight job, so the
+  same SVG is never rasterized twice
+- a request without a size is keyed (and rendered) at the document's
+  intrinsic width/height, so callers that pass the size and callers that
+  don't share one entry
+
+workers=0 rasterizes in the calling thread (same cache, no pool).
+
+Author: Universal STEM Diagram Generator
+Date: November 18, 2025
+"""
+
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Optional, Tuple, Union
+
+try:
+    import cairosvg
+    CAIROSVG_AVAILABLE = True
+except (ImportError, OSError):  # OSError: cairocffi present but libcairo missing
+    CAIROSVG_AVAILABLE = False
+    cairosvg = None
+
+
+logger = logging.getLogger(__name__)
+
+RenderFunction = Callable[[bytes, Optional[int], Optional[int], float], bytes]
+
+_SVG_ROOT = re.compile(rb'<svg\b[^>]*>', re.DOTALL)
+_LENGTH = re.compile(rb'^\s*([0-9]*\.?[0-9]+)\s*(?:px)?\s*$')
+
+_WARMUP_SVG = b'<svg xmlns="http://www.w3.org/2000/svg" width="8" height="8"><text x="0" y="8">A</text></svg>'
+
+
+def cairosvg_render(svg: bytes, width: Optional[int], height: Optional[int], scale: float) -> bytes:
+    """Rasterize SVG bytes with cairosvg (runs inside the worker processes)"""
+    return cairosvg.svg2png(bytestring=svg, output_width=width, output_height=height, scale=scale)
+
+
+def intrinsic_size(svg: bytes) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Pixel width/height declared on the root <svg> (viewBox as fallback)
+
+    Returns (None, None) when the size is relative (%, em, mm, ...) or not whole
+    pixels, since passing it explicitly would then change the output.
+    """
+    root = _SVG_ROOT.search(svg)
+    if root is None:
+        return None, None
+    tag = root.group(0)
+
+    def attribute(name: bytes) -> Optional[bytes]:
+        match = re.search(rb'\s' + name + rb'\s*=\s*["\']([^"\']*)["\']', tag)
+        return match.group(1) if match else None
+
+    width, height = attribute(b'width'), attribute(b'height')
+    if width is None and height is None:
+        view_box = (attribute(b'viewBox') or b'').replace(b',', b' ').split()
+        if len(view_box) == 4:
+            width, height = view_box[2], view_box[3]
+    sizes = []
+    for value in (width, height):
+        match = _LENGTH.match(value) if value is not None else None
+        if match is None or not float(match.group(1)).is_integer():
+            return None, None
+        sizes.append(int(float(match.group(1))))
+    return sizes[0], sizes[1]
+
+
+def _warm_worker(render: RenderFunction) -> None:
+    """Pool initializer: load the backend and fonts before the first real job"""
+    try:
+        render(_WARMUP_SVG, 8, 8, 1.0)
+    except Exception:  # A broken backend surfaces on the first real job instead
+        pass
+
+
+class RasterizationService:
+    """
+    Pool of warm rasterizer processes with an LRU of PNG results
+
+    Example:
+        >>> png = get_rasterizer().rasterize(svg, width=1200, height=800)
+        >>> if png is None:
+        ...     pass  # cairosvg unavailable or rendering failed
+    """
+
+    def __init__(self,
+                 workers: Optional[int] = None,
+                 cache_size: int = 256,
+                 max_cache_bytes: int = 64 * 1024 * 1024,
+                 timeout: float = 60.0,
+                 render: Optional[RenderFunction] = None):
+        """
+        Args:
+            workers: Worker processes (None = half the CPUs, at most 4; 0 = in-process)
+            cache_size: Maximum cached PNGs
+            max_cache_bytes: Maximum total size of cached PNGs
+            timeout: Seconds rasterize() waits for a result
+            render: Rasterizer function (default cairosvg); must be picklable
+                when workers > 0
+        """
+        if workers is None:
+            workers = max(1, min(4, (os.cpu_count() or 2) // 2))
+        self.workers = workers
+        self.cache_size = cache_size
+        self.max_cache_bytes = max_cache_bytes
+        self.timeout = timeout
+        self.render = render or cairosvg_render
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self._cache_bytes = 0
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared = 0  # Requests that joined an in-flight job
+        self.misses = 0
+
+    @property
+    def available(self) -> bool:
+        return self.render is not cairosvg_render or CAIROSVG_AVAILABLE
+
+    @staticmethod
+    def cache_key(svg: bytes, width: Optional[int], height: Optional[int], scale: float) -> str:
+        return f"{hashlib.sha256(svg).hexdigest()}:{width}x{height}@{scale}"
+
+    # ========== Public API ==========
+
+    def rasterize(self,
+                  svg: Union[str, bytes],
+                  width: Optional[int] = None,
+                  height: Optional[int] = None,
+                  scale: float = 1.0) -> Optional[bytes]:
+        """
+        PNG bytes for an SVG document
+
+        Returns:
+            PNG bytes, or None if no rasterizer is available or rendering failed
+        """
+        if not self.available:
+            return None
+        try:
+            return self.submit(svg, width, height, scale).result(timeout=self.timeout)
+        except BrokenProcessPool:
+            logger.warning("Rasterizer worker died; restarting pool on next request")
+            self._reset_executor()
+        except Exception as exc:
+            logger.warning("SVG rasterization failed: %s", exc)
+        return None
+
+    def submit(self,
+               svg: Union[str, bytes],
+               width: Optional[int] = None,
+               height: Optional[int] = None,
+               scale: float = 1.0) -> Future:
+        """Asynchronous rasterize(); the future resolves to PNG bytes"""
+        data = svg.encode('utf-8') if isinstance(svg, str) else bytes(svg)
+        if width is None and height is None:
+            width, height = intrinsic_size(data)
+        key = self.cache_key(data, width, height, scale)
+        with self._lock:
+            png = self._cache.get(key)
+            if png is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                done: Future = Future()
+                done.set_result(png)
+                return done
+            pending = self._inflight.get(key)
+            if pending is not None:
+                self.shared += 1
+                return pending
+            self.misses += 1
+            if self.workers:
+                future = self._get_executor().submit(self.render, data, width, height, scale)
+            else:
+                future = Future()
+            self._inflight[key] = future
+        future.add_done_callback(lambda finished: self._store(key, finished))
+
+        if not self.workers:
+            try:
+                future.set_result(self.render(data, width, height, scale))
+            except Exception as exc:
+                future.set_exception(exc)
+        return future
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'entries': len(self._cache), 'bytes': self._cache_bytes, 'hits': self.hits,
+                    'shared': self.shared, 'misses': self.misses, 'workers': self.workers}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self._cache_bytes = 0
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    # ========== Internals ==========
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker,
+                                                 initargs=(self.render,))
+        return self._executor
+
+    def _reset_executor(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _store(self, key: str, future: Future) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+            if future.cancelled() or future.exception() is not None:
+                return
+            png = future.result()
+            if not png or len(png) > self.max_cache_bytes:
+                return
+            self._cache[key] = png
+            self._cache_bytes += len(png)
+            while len(self._cache) > self.cache_size or self._cache_bytes > self.max_cache_bytes:
+                _, evicted = self._cache.popitem(last=False)
+                self._cache_bytes -= len(evicted)
+
+
+_rasterizer: Optional[RasterizationService] = None
+_rasterizer_lock = threading.Lock()
+
+
+def get_rasterizer() -> RasterizationService:
+    """The process-wide rasterization service (created on first use)"""
+    global _rasterizer
+    with _rasterizer_lock:
+        if _rasterizer is None:
+            _rasterizer = RasterizationService()
+        return _rasterizer
+
+
+def configure_rasterizer(**kwargs) -> RasterizationService:
+    """Replace the process-wide service (see RasterizationService for options)"""
+    global _rasterizer
+    with _rasterizer_lock:
+        previous, _rasterizer = _rasterizer, RasterizationService(**kwargs)
+    if previous is not None:
+        previous.shutdown()
+    return _rasterizer
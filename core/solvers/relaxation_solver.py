@@ -0,0 +1,437 @@
+"""
+Vectorized Constraint Relaxation
+================================
+
+NumPy backend for UniversalLayoutEngine._solve_constraints.
+
+The scene is packed into arrays (x, y, width, height, has-position) and
+scene.constraints are compiled once into index arrays grouped by constraint
+family. Each iteration applies all constraints of a family as one vectorized
+projection. When several constraints of the same family target one object,
+their targets are averaged (Jacobi style). Families are applied in a fixed
+order, so later families see earlier moves (Gauss-Seidel across families).
+Iteration stops when the largest coordinate change (L-infinity norm of the
+displacement) falls below the tolerance.
+
+Per-constraint targets mirror UniversalLayoutEngine._apply_constraint:
+- ALIGNED_H / ALIGNED_V / COINCIDENT / COLLINEAR / PARALLEL: group means
+- ABOVE / BELOW / LEFT_OF / RIGHT_OF: obj1 placed relative to obj2
+- STACKED_V / STACKED_H: whole chains placed in closed form (prefix sums)
+- ADJACENT, PERPENDICULAR, SYMMETRIC, CONNECTED, NO_OVERLAP
+- DISTANCE and BETWEEN are skipped (initial placement already applied them)
+
+Author: Universal STEM Diagram Generator
+Date: November 18, 2025
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+import logging
+
+from core.scene.schema_v1 import Scene, ConstraintType
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    np = None
+
+
+# Group-mean constraints: type -> (axes averaged, minimum number of resolved objects)
+_GROUP_TYPES = {
+    ConstraintType.ALIGNED_H: ('y', 1),
+    ConstraintType.ALIGNED_V: ('x', 1),
+    ConstraintType.COINCIDENT: ('xy', 1),
+    ConstraintType.COLLINEAR: ('y', 2),
+    ConstraintType.PARALLEL: ('x', 2),
+}
+
+# obj1 relative to obj2: target = obj2 + coefficients * (w1, w2, h1, h2, gap)
+_RELATIVE_TYPES = {
+    #                         x: w1,  w2, gap    y: h1,  h2, gap
+    ConstraintType.ABOVE:    ((0.0, 0.0, 0.0), (-1.0, 0.0, -1.0)),
+    ConstraintType.BELOW:    ((0.0, 0.0, 0.0), (0.0, 1.0, 1.0)),
+    ConstraintType.LEFT_OF:  ((-1.0, 0.0, -1.0), (0.0, 0.0, 0.0)),
+    ConstraintType.RIGHT_OF: ((0.0, 1.0, 1.0), (0.0, 0.0, 0.0)),
+}
+
+_SKIPPED_TYPES = (ConstraintType.DISTANCE, ConstraintType.BETWEEN)
+
+_BIG = np.iinfo(np.int64).max if NUMPY_AVAILABLE else 0
+
+
+@dataclass
+class RelaxationResult:
+    """Outcome of a vectorized relaxation run"""
+    iterations: int
+    converged: bool
+    max_displacement: float
+    compiled: Dict[str, int] = field(default_factory=dict)  # constraints per family
+    skipped: int = 0
+
+
+class _Packed:
+    """Scene objects as coordinate arrays"""
+
+    def __init__(self, scene: Scene, default_size: float = 40.0):
+        self.objects = list(scene.objects)
+        n = len(self.objects)
+        self.index: Dict[str, int] = {}
+        self.x = np.zeros(n)
+        self.y = np.zeros(n)
+        self.w = np.full(n, default_size)
+        self.h = np.full(n, default_size)
+        self.box_w = np.full(n, 20.0)  # NO_OVERLAP box size (position width/height)
+        self.box_h = np.full(n, 20.0)
+        self.has = np.zeros(n, dtype=bool)
+        self.anchored = np.zeros(n, dtype=bool)  # placed by a relative/stacking constraint
+
+        for i, obj in enumerate(self.objects):
+            if obj.id not in self.index:
+                self.index[obj.id] = i
+            self.w[i] = _as_float((obj.properties or {}).get('width'), default_size)
+            self.h[i] = _as_float((obj.properties or {}).get('height'), default_size)
+            position = obj.position
+            if not position:
+                continue
+            self.has[i] = True
+            if isinstance(position, dict):
+                self.x[i] = _as_float(position.get('x'), 0.0)
+                self.y[i] = _as_float(position.get('y'), 0.0)
+                self.box_w[i] = _as_float(position.get('width'), 0.0) or 20.0
+                self.box_h[i] = _as_float(position.get('height'), 0.0) or 20.0
+            else:
+                self.x[i] = _as_float(getattr(position, 'x', None), 0.0)
+                self.y[i] = _as_float(getattr(position, 'y', None), 0.0)
+
+        self.x0 = self.x.copy()
+        self.y0 = self.y.copy()
+        self.has0 = self.has.copy()
+
+    def resolve(self, object_ids: List[Any]) -> List[int]:
+        return [self.index[oid] for oid in object_ids if oid in self.index]
+
+    def write_back(self) -> int:
+        """Copy changed coordinates onto the scene objects; returns objects updated"""
+        changed = np.nonzero(self.has & ((self.x != self.x0) | (self.y != self.y0) | ~self.has0))[0]
+        for i in changed:
+            obj = self.objects[i]
+            x, y = float(self.x[i]), float(self.y[i])
+            if not obj.position:
+                obj.position = {'x': x, 'y': y, 'anchor': 'top-left'}
+            elif isinstance(obj.position, dict):
+                obj.position['x'] = x
+                obj.position['y'] = y
+                if self.anchored[i]:
+                    obj.position['anchor'] = 'top-left'
+            else:
+                obj.position.x = x
+                obj.position.y = y
+        return len(changed)
+
+
+def _as_float(value: Any, fallback: float) -> float:
+    if value in (None, "", []):
+        return fallback
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return fallback
+
+
+def _ints(values: List[int]) -> "np.ndarray":
+    return np.asarray(values, dtype=np.int64)
+
+
+class VectorizedRelaxationSolver:
+    """
+    Vectorized iterative constraint relaxation
+
+    Usage:
+        solver = VectorizedRelaxationSolver(canvas_center=(600, 400))
+        result = solver.solve(scene)
+    """
+
+    def __init__(self, canvas_center: Tuple[float, float] = (600.0, 400.0),
+                 max_iterations: int = 50, tolerance: float = 1e-3):
+        if not NUMPY_AVAILABLE:
+            raise ImportError("numpy is required for VectorizedRelaxationSolver")
+        self.canvas_center = canvas_center
+        self.max_iterations = max_iterations
+        self.tolerance = tolerance
+        self.logger = logging.getLogger(__name__)
+
+    def solve(self, scene: Scene) -> RelaxationResult:
+        """Relax scene.constraints in place; returns iteration statistics"""
+        packed = _Packed(scene)
+        program, compiled, skipped = self._compile(scene, packed)
+
+        iterations = 0
+        displacement = 0.0
+        converged = not program
+        for iteration in range(self.max_iterations if program else 0):
+            iterations = iteration + 1
+            prev_x, prev_y, prev_has = packed.x.copy(), packed.y.copy(), packed.has.copy()
+            for step in program:
+                step(packed)
+            moved = packed.has & prev_has
+            displacement = float(max(
+                np.max(np.abs(packed.x - prev_x)[moved], initial=0.0),
+                np.max(np.abs(packed.y - prev_y)[moved], initial=0.0)
+            ))
+            if displacement <= self.tolerance and not np.any(packed.has & ~prev_has):
+                converged = True
+                break
+
+        packed.write_back()
+        return RelaxationResult(
+            iterations=iterations,
+            converged=converged,
+            max_displacement=displacement,
+            compiled=compiled,
+            skipped=skipped
+        )
+
+    # Compilation
+
+    def _compile(self, scene: Scene, packed: _Packed):
+        groups: Dict[str, Tuple[List[int], List[int]]] = {'x': ([], []), 'y': ([], []), 'xy': ([], [])}
+        relative: List[Tuple[int, int, float, Tuple, Tuple]] = []
+        stacked: Dict[str, List[Tuple[List[int], float]]] = {'v': [], 'h': []}
+        perpendicular: List[Tuple[int, int]] = []
+        symmetric: List[Tuple[int, int, int]] = []
+        connected: List[Tuple[int, int]] = []
+        adjacent: List[Tuple[int, int]] = []
+        no_overlap: List[Tuple[int, int]] = []
+        compiled: Dict[str, int] = {}
+        skipped = 0
+
+        distance_sets = [set(c.objects or []) for c in scene.constraints if c.type == ConstraintType.DISTANCE]
+
+        def count(family: str) -> None:
+            compiled[family] = compiled.get(family, 0) + 1
+
+        for constraint in scene.constraints:
+            ids = list(constraint.objects or [])
+            members = packed.resolve(ids)
+            ctype = constraint.type
+
+            if ctype in _GROUP_TYPES:
+                axes, minimum = _GROUP_TYPES[ctype]
+                if ctype == ConstraintType.ALIGNED_H and any(len(d & set(ids)) >= 2 for d in distance_sets):
+                    skipped += 1  # DISTANCE takes precedence, as in the per-constraint path
+                    continue
+                if ctype == ConstraintType.PARALLEL and len(ids) < 2:
+                    continue
+                if len(members) < minimum:
+                    continue
+                objs, gids = groups[axes]
+                group_id = (gids[-1] + 1) if gids else 0
+                objs.extend(members)
+                gids.extend([group_id] * len(members))
+                count(ctype.value)
+            elif ctype in _RELATIVE_TYPES:
+                if len(ids) != 2 or len(members) != 2:
+                    continue
+                relative.append((members[0], members[1], _as_float(constraint.value, 0.0) or 0.0,
+                                 *_RELATIVE_TYPES[ctype]))
+                count(ctype.value)
+            elif ctype in (ConstraintType.STACKED_V, ConstraintType.STACKED_H):
+                if len(ids) < 2 or len(members) < 2:
+                    continue
+                key = 'v' if ctype == ConstraintType.STACKED_V else 'h'
+                stacked[key].append((members, _as_float(constraint.value, 0.0) or 0.0))
+                count(ctype.value)
+            elif ctype == ConstraintType.PERPENDICULAR:
+                if len(ids) == 2 and len(members) == 2:
+                    perpendicular.append((members[0], members[1]))
+                    count(ctype.value)
+            elif ctype == ConstraintType.SYMMETRIC:
+                center = packed.index.get(str(constraint.value)) if constraint.value else None
+                if len(ids) == 2 and len(members) == 2 and center is not None:
+                    symmetric.append((members[0], members[1], center))
+                    count(ctype.value)
+            elif ctype == ConstraintType.CONNECTED:
+                if len(ids) == 2 and len(members) == 2:
+                    connected.append((members[0], members[1]))
+                    count(ctype.value)
+            elif ctype == ConstraintType.ADJACENT:
+                if len(ids) == 2 and len(members) == 2:
+                    adjacent.append((members[0], members[1]))
+                    count(ctype.value)
+            elif ctype == ConstraintType.NO_OVERLAP:
+                no_overlap.extend((a, b) for i, a in enumerate(members) for b in members[i + 1:])
+                count(ctype.value)
+            elif ctype in _SKIPPED_TYPES:
+                skipped += 1
+
+        program = []
+        for axes, (objs, gids) in groups.items():
+            if objs:
+                program.append(self._group_step(axes, _ints(objs), _ints(gids)))
+        if perpendicular:
+            program.append(self._perpendicular_step(_ints([p[0] for p in perpendicular]),
+                                                    _ints([p[1] for p in perpendicular])))
+        if symmetric:
+            program.append(self._symmetric_step(*(_ints([s[k] for s in symmetric]) for k in range(3))))
+        if no_overlap:
+            program.append(self._no_overlap_step(_ints([p[0] for p in no_overlap]),
+                                                 _ints([p[1] for p in no_overlap])))
+        if connected:
+            program.append(self._connected_step(_ints([p[0] for p in connected]),
+                                                _ints([p[1] for p in connected])))
+        if adjacent:
+            program.append(self._adjacent_step(_ints([p[0] for p in adjacent]),
+                                               _ints([p[1] for p in adjacent])))
+        if relative:
+            program.append(self._relative_step(
+                _ints([r[0] for r in relative]), _ints([r[1] for r in relative]),
+                np.asarray([r[2] for r in relative]),
+                np.asarray([r[3] for r in relative]), np.asarray([r[4] for r in relative])
+            ))
+        for key, chains in stacked.items():
+            if chains:
+                program.append(self._stacked_step(key == 'v', chains))
+        return program, compiled, skipped
+
+    # Projection steps (each closes over its compiled index arrays)
+
+    @staticmethod
+    def _assign(packed: _Packed, targets: "np.ndarray", x: Optional["np.ndarray"] = None,
+                y: Optional["np.ndarray"] = None, anchored: bool = False) -> None:
+        """Move each target object to the mean of the positions proposed for it"""
+        if targets.size == 0:
+            return
+        n = len(packed.objects)
+        counts = np.bincount(targets, minlength=n)
+        hit = counts > 0
+        if x is not None:
+            packed.x[hit] = np.bincount(targets, weights=x, minlength=n)[hit] / counts[hit]
+        if y is not None:
+            packed.y[hit] = np.bincount(targets, weights=y, minlength=n)[hit] / counts[hit]
+        packed.has[hit] = True
+        if anchored:
+            packed.anchored[hit] = True
+
+    def _group_step(self, axes: str, objs: "np.ndarray", gids: "np.ndarray"):
+        n_groups = int(gids.max()) + 1
+
+        def step(packed: _Packed) -> None:
+            weight = packed.has[objs].astype(float)
+            totals = np.bincount(gids, weights=weight, minlength=n_groups)
+            live = packed.has[objs] & (totals[gids] > 0)
+            means = {}
+            for axis in axes:
+                coord = getattr(packed, axis)
+                sums = np.bincount(gids, weights=coord[objs] * weight, minlength=n_groups)
+                means[axis] = (sums / np.where(totals > 0, totals, 1))[gids][live]
+            self._assign(packed, objs[live], x=means.get('x'), y=means.get('y'))
+
+        return step
+
+    def _perpendicular_step(self, a: "np.ndarray", b: "np.ndarray"):
+        def step(packed: _Packed) -> None:
+            live = packed.has[a] & packed.has[b] & (packed.x[a] != 0) & (packed.x[b] != 0)
+            self._assign(packed, b[live], x=packed.x[a][live], y=packed.y[a][live])
+
+        return step
+
+    def _symmetric_step(self, a: "np.ndarray", b: "np.ndarray", center: "np.ndarray"):
+        def step(packed: _Packed) -> None:
+            live = packed.has[a] & packed.has[b] & packed.has[center]
+            cx = packed.x[center]
+            cx = np.where(cx == 0, self.canvas_center[0], cx)
+            half = (packed.x[b] - packed.x[a]) / 2
+            targets = np.concatenate([a[live], b[live]])
+            xs = np.concatenate([(cx - half)[live], (cx + half)[live]])
+            self._assign(packed, targets, x=xs)
+
+        return step
+
+    def _no_overlap_step(self, a: "np.ndarray", b: "np.ndarray"):
+        def step(packed: _Packed) -> None:
+            x, y, bw, bh = packed.x, packed.y, packed.box_w, packed.box_h
+            live = packed.has[a] & packed.has[b] & ~(
+                (x[a] + bw[a] < x[b]) | (x[b] + bw[b] < x[a]) |
+                (y[a] + bh[a] < y[b]) | (y[b] + bh[b] < y[a])
+            )
+            if not np.any(live):
+                return
+            pa, pb = a[live], b[live]
+            dx, dy = x[pb] - x[pa], y[pb] - y[pa]
+            horizontal = np.abs(dx) > np.abs(dy)
+            push_x = np.where(horizontal, np.where(dx > 0, 20.0, -20.0), 0.0)
+            push_y = np.where(horizontal, 0.0, np.where(dy > 0, 20.0, -20.0))
+            # Pushes accumulate, as in the sequential pairwise pass
+            np.add.at(packed.x, pb, push_x)
+            np.add.at(packed.y, pb, push_y)
+
+        return step
+
+    def _connected_step(self, a: "np.ndarray", b: "np.ndarray"):
+        def step(packed: _Packed) -> None:
+            x, y = packed.x, packed.y
+            dist = np.hypot(x[b] - x[a], y[b] - y[a])
+            live = packed.has[a] & packed.has[b] & (dist > 50)
+            pa, pb = a[live], b[live]
+            self._assign(packed, pb, x=x[pb] + (x[pa] - x[pb]) * 0.1, y=y[pb] + (y[pa] - y[pb]) * 0.1)
+
+        return step
+
+    def _adjacent_step(self, a: "np.ndarray", b: "np.ndarray"):
+        def step(packed: _Packed) -> None:
+            x, y, w, h = packed.x, packed.y, packed.w, packed.h
+            both = packed.has[a] & packed.has[b]
+            horizontal = (np.abs(y[a] - y[b]) < 20) | (np.abs(x[a] - x[b]) > 50)
+            target_x = np.where(horizontal, x[a] + w[a], x[a])
+            target_y = np.where(horizontal, y[b], y[a] + h[a])
+            error = np.maximum(np.abs(target_x - x[b]), np.abs(target_y - y[b]))
+            live = both & (error > 1.0)  # dead band avoids oscillation
+            self._assign(packed, b[live], x=target_x[live], y=target_y[live])
+
+        return step
+
+    def _relative_step(self, a: "np.ndarray", b: "np.ndarray", gap: "np.ndarray",
+                       cx: "np.ndarray", cy: "np.ndarray"):
+        def step(packed: _Packed) -> None:
+            live = packed.has[b]
+            x, y, w, h = packed.x, packed.y, packed.w, packed.h
+            target_x = x[b] + cx[:, 0] * w[a] + cx[:, 1] * w[b] + cx[:, 2] * gap
+            target_y = y[b] + cy[:, 0] * h[a] + cy[:, 1] * h[b] + cy[:, 2] * gap
+            self._assign(packed, a[live], x=target_x[live], y=target_y[live], anchored=True)
+
+        return step
+
+    def _stacked_step(self, vertical: bool, chains: List[Tuple[List[int], float]]):
+        members = _ints([m for chain, _ in chains for m in chain])
+        lengths = _ints([len(chain) for chain, _ in chains])
+        starts = np.concatenate([[0], np.cumsum(lengths)[:-1]]).astype(np.int64)
+        chain_of = np.repeat(np.arange(len(chains)), lengths)
+        rank = np.arange(members.size) - starts[chain_of]
+        gaps = np.asarray([gap for _, gap in chains])[chain_of]
+
+        def step(packed: _Packed) -> None:
+            # The first positioned member anchors its chain; every later member is placed
+            # at anchor + sum of the sizes (plus gaps) of the members between them
+            key = np.where(packed.has[members], rank, _BIG)
+            first = np.minimum.reduceat(key, starts)
+            live_chain = first != _BIG
+            anchor = members[starts + np.where(live_chain, first, 0)]
+            size = (packed.h if vertical else packed.w)[members] + gaps
+            prefix = np.cumsum(size) - size
+            prefix = prefix - prefix[starts][chain_of]
+            anchor_prefix = prefix[starts + np.where(live_chain, first, 0)]
+            after = live_chain[chain_of] & (rank > first[chain_of])
+
+            base_x = packed.x[anchor][chain_of]
+            base_y = packed.y[anchor][chain_of]
+            offset = prefix - anchor_prefix[chain_of]
+            target_x = base_x if vertical else base_x + offset
+            target_y = base_y + offset if vertical else base_y
+            if vertical:
+                error = np.maximum(np.abs(target_x - packed.x[members]), np.abs(target_y - packed.y[members]))
+                after &= (error > 1.0) | ~packed.has[members]
+            self._assign(packed, members[after], x=target_x[after], y=target_y[after], anchored=True)
+
+        return step
@@ -17,15 +17,35 @@ Example:
     solution = solver.solve_layout(plan)
     if solution.satisfiable:
         positions = solution.positions
+
+Component-parallel mode (parallel_components=True) splits the object set into
+connected components, solves each in a process pool and packs the component
+bounding boxes onto the canvas with GeometryEngine's skyline packer.
 """
 
-from typing import Dict, List, Any, Optional, Tuple, TYPE_CHECKING
-from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Set, Tuple, TYPE_CHECKING
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field, replace
 from enum import Enum
+import atexit
 import logging
+import multiprocessing
+import os
+import threading
 import time
 
 from core.diagram_plan import DiagramPlan, LayoutConstraint, ConstraintPriority
+from core.diagram_planner import DiagramPlanner
+from core.layout_cache import LayoutFingerprint, LayoutSolutionCache, fingerprint_layout
+
+# Component packing needs the geometry engine (Shapely-backed)
+try:
+    from core.symbolic.geometry_engine import GeometryEngine, Rectangle, SHAPELY_AVAILABLE as GEOMETRY_ENGINE_AVAILABLE
+except ImportError:
+    GeometryEngine = Rectangle = None
+    GEOMETRY_ENGINE_AVAILABLE = False
 
 # Z3 is optional - graceful degradation if not installed
 try:
@@ -73,6 +93,23 @@ class LayoutSolution:
         return f"LayoutSolution(satisfiable={self.satisfiable}, objects={len(self.positions)}, time={self.solve_time:.3f}s)"
 
 
+@dataclass
+class _IncrementalSession:
+    """
+    Base model kept alive across solve_layout calls for one object set
+
+    The solver holds bounds and non-overlap clauses at its base level; plan
+    constraints are added inside push()/pop() so they can change per call.
+    """
+    solver: Any
+    vars: Dict[str, Dict[str, Any]]
+    pairs: Set[Tuple[str, str]] = field(default_factory=set)  # pairs with a non-overlap clause
+    base_constraints: int = 0
+    last_positions: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+    solves: int = 0
+    lock: Any = field(default_factory=threading.Lock)
+
+
 class Z3LayoutSolver:
     """
     Z3-based layout solver for diagram generation
@@ -81,13 +118,44 @@ class Z3LayoutSolver:
     object placements that satisfy all constraints.
     """
 
-    def __init__(self, timeout: int = 30000, verbose: bool = False):
+    # Default objective weights for optimize mode
+    DEFAULT_OBJECTIVE_WEIGHTS = {
+        'wire_length': 1.0,    # Manhattan distance between connected object centers
+        'deviation': 0.5,      # Manhattan distance from hint (heuristic) positions
+        'bounding_box': 0.25,  # Half-perimeter of the layout bounding box (linear area proxy)
+    }
+
+    def __init__(self, timeout: int = 30000, verbose: bool = False, incremental: bool = False,
+                 prune_margin: float = 50.0, max_sessions: int = 8, max_refinement_rounds: int = 5,
+                 optimize: bool = False, objective_weights: Optional[Dict[str, float]] = None,
+                 parallel_components: bool = False, component_workers: Optional[int] = None,
+                 component_spacing: float = 20.0, parallel_min_objects: int = 48,
+                 cache: Optional[LayoutSolutionCache] = None):
         """
         Initialize Z3 layout solver
 
         Args:
             timeout: Solver timeout in milliseconds (default: 30000 = 30 seconds)
             verbose: Enable verbose logging
+            incremental: Keep the base model (bounds + non-overlap) alive between calls for
+                the same object set, scope plan constraints with push()/pop(), and seed
+                each check with the previous model's positions
+            prune_margin: Incremental mode - slack (px) around hint positions when deciding
+                which object pairs could plausibly overlap
+            max_sessions: Incremental mode - base models kept (LRU)
+            max_refinement_rounds: Incremental mode - lazy non-overlap repair rounds before
+                falling back to clauses for every pair
+            optimize: Minimize weighted layout objectives with Z3 Optimize instead of only
+                checking satisfiability; returns the best model found within the time budget
+            objective_weights: Optimize mode - overrides for DEFAULT_OBJECTIVE_WEIGHTS
+            parallel_components: Solve each connected component of the object graph on its
+                own and pack the component bounding boxes onto the canvas (skyline)
+            component_workers: Component mode - process pool size (default: CPU count)
+            parallel_min_objects: Component mode - below this many objects components are
+                solved one after another in-process (pool start-up would dominate)
+            component_spacing: Component mode - gap (px) between packed components
+            cache: Optional LayoutSolutionCache; plans that match a cached one up to object
+                renaming replay its positions instead of calling Z3
 
         Raises:
             ImportError: If Z3 is not installed
@@ -99,17 +167,41 @@ class Z3LayoutSolver:
 
         self.timeout = timeout
         self.verbose = verbose
+        self.incremental = incremental
+        self.prune_margin = prune_margin
+        self.max_sessions = max(1, max_sessions)
+        self.max_refinement_rounds = max(1, max_refinement_rounds)
         self.logger = logging.getLogger(__name__)
+        self._sessions: "OrderedDict[Tuple, _IncrementalSession]" = OrderedDict()
+        self._sessions_lock = threading.Lock()
+        self.optimize = optimize
+        self.objective_weights = dict(self.DEFAULT_OBJECTIVE_WEIGHTS)
+        self.objective_weights.update(objective_weights or {})
+        self.parallel_components = parallel_components
+        self.component_workers = component_workers
+        self.component_spacing = component_spacing
+        self.parallel_min_objects = parallel_min_objects
+        self._component_pool: Optional[ProcessPoolExecutor] = None
+        self._component_pool_lock = threading.Lock()
+        self._component_solver: Optional["Z3LayoutSolver"] = None
+        self.cache = cache
 
     # ========== Main Solve Method ==========
 
-    def solve_layout(self, plan: DiagramPlan, object_dimensions: Optional[Dict[str, Tuple[float, float]]] = None) -> LayoutSolution:
+    def solve_layout(self, plan: DiagramPlan, object_dimensions: Optional[Dict[str, Tuple[float, float]]] = None,
+                     hints: Optional[Dict[str, Tuple[float, float]]] = None,
+                     time_budget: Optional[float] = None) -> LayoutSolution:
         """
         Solve layout constraints to find optimal positions
 
         Args:
             plan: DiagramPlan with constraints
             object_dimensions: Optional dict mapping object ID to (width, height)
+            hints: Optional current (x, y) per object; in incremental mode these seed the
+                first solve and decide which non-overlap clauses are generated up front;
+                in optimize mode they are the heuristic positions for the deviation term
+            time_budget: Optional wall-clock limit in seconds for this call, in every mode
+                (capped at timeout; default: timeout)
 
         Returns:
             LayoutSolution with positions if satisfiable
@@ -130,9 +222,62 @@ class Z3LayoutSolver:
         if object_dimensions is None:
             object_dimensions = {obj_id: (50.0, 50.0) for obj_id in object_ids}
 
+        fingerprint = self._cache_fingerprint(plan, object_ids, object_dimensions, hints)
+        if fingerprint is not None:
+            cached = self.cache.get(fingerprint)
+            if cached is not None and len(cached.positions) == len(object_ids):
+                if self.verbose:
+                    self.logger.info(f"Layout cache hit ({fingerprint.key[:12]})")
+                return LayoutSolution(
+                    positions=cached.positions,
+                    satisfiable=True,
+                    solve_time=time.time() - start_time,
+                    metadata={**cached.metadata, 'cache_hit': True}
+                )
+
+        solution = self._solve_uncached(plan, object_ids, object_dimensions, hints, time_budget, start_time)
+        # Budget-limited optimize results are not final; a later call may do better
+        if fingerprint is not None and solution.satisfiable and not solution.metadata.get('budget_exhausted'):
+            self.cache.put(fingerprint, solution.positions, solution.metadata)
+        return solution
+
+    def _solve_uncached(self, plan: DiagramPlan, object_ids: List[str],
+                        object_dimensions: Dict[str, Tuple[float, float]],
+                        hints: Optional[Dict[str, Tuple[float, float]]],
+                        time_budget: Optional[float], start_time: float) -> LayoutSolution:
+        """Component split when enabled, else one whole-plan solve"""
+        component_fallback = None
+        if self.parallel_components:
+            components = self._connected_components(plan, object_ids)
+            if len(components) > 1:
+                solution, component_fallback = self._solve_components(
+                    plan, components, object_dimensions, hints or {}, time_budget, start_time
+                )
+                if solution is not None:
+                    return solution
+
+        solution = self._solve_whole(plan, object_ids, object_dimensions, hints, time_budget, start_time)
+        if component_fallback:
+            solution.metadata['component_fallback'] = component_fallback
+        return solution
+
+    def _solve_whole(self, plan: DiagramPlan, object_ids: List[str],
+                     object_dimensions: Dict[str, Tuple[float, float]],
+                     hints: Optional[Dict[str, Tuple[float, float]]],
+                     time_budget: Optional[float], start_time: float) -> LayoutSolution:
+        """Solve every object in one Z3 problem (satisfy, incremental or optimize)"""
+        # One wall-clock budget for every mode, counted from solve_layout's start
+        budget_ms = self.timeout if time_budget is None else max(1, min(self.timeout, int(time_budget * 1000)))
+        if self.optimize:
+            return self._solve_optimize(plan, sorted(object_ids), object_dimensions, hints or {},
+                                        start_time, budget_ms)
+
+        if self.incremental:
+            return self._solve_incremental(plan, object_ids, object_dimensions, hints or {}, start_time, budget_ms)
+
         # Create solver
         solver = Solver()
-        solver.set("timeout", self.timeout)
+        solver.set("timeout", max(1, budget_ms - int((time.time() - start_time) * 1000)))
 
         # Create variables
         vars = self._create_variables(object_ids, object_dimensions)
@@ -275,17 +420,21 @@ class Z3LayoutSolver:
                 #   obj2.bottom <= obj1.top   # obj2 above obj1
                 # )
 
-                solver.add(Or(
-                    v1['x'] + v1['width'] <= v2['x'],  # obj1 left of obj2
-                    v2['x'] + v2['width'] <= v1['x'],  # obj2 left of obj1
-                    v1['y'] + v1['height'] <= v2['y'],  # obj1 above obj2
-                    v2['y'] + v2['height'] <= v1['y']   # obj2 above obj1
-                ))
+                solver.add(self._non_overlap_clause(v1, v2))
 
                 count += 1
 
         return count
 
+    def _non_overlap_clause(self, v1: Dict[str, Any], v2: Dict[str, Any]):
+        """Disjunction that keeps two rectangles apart"""
+        return Or(
+            v1['x'] + v1['width'] <= v2['x'],  # obj1 left of obj2
+            v2['x'] + v2['width'] <= v1['x'],  # obj2 left of obj1
+            v1['y'] + v1['height'] <= v2['y'],  # obj1 above obj2
+            v2['y'] + v2['height'] <= v1['y']   # obj2 above obj1
+        )
+
     def _add_plan_constraints(self, solver: Solver, vars: Dict, plan: DiagramPlan, dimensions: Dict) -> int:
         """Add constraints from diagram plan"""
         count = 0
@@ -455,6 +604,693 @@ class Z3LayoutSolver:
 
         return count
 
+    # ========== Objective Optimization ==========
+
+    def _solve_optimize(self, plan: DiagramPlan, object_ids: List[str],
+                        dimensions: Dict[str, Tuple[float, float]],
+                        hints: Dict[str, Tuple[float, float]],
+                        start_time: float, budget_ms: int) -> LayoutSolution:
+        """
+        Anytime objective minimization
+
+        1. A plain Solver finds a feasible incumbent (at most half the budget).
+        2. Optimize minimizes the weighted objective in the remaining budget.
+           If it times out, its best model so far, or else the incumbent, is
+           returned together with the proven lower bound and the optimality gap.
+        """
+        deadline = start_time + budget_ms / 1000.0
+
+        def remaining_ms(fraction: float = 1.0) -> int:
+            return max(1, int((deadline - time.time()) * 1000 * fraction))
+
+        vars = self._create_variables(object_ids, dimensions)
+        pairs = self._plausible_pairs(object_ids, dimensions, hints) if hints else self._all_pairs(object_ids)
+
+        # Phase 1: feasible incumbent (lazy non-overlap repair as in incremental mode)
+        feasibility = Solver()
+        constraint_count = self._add_bounds_constraints(feasibility, vars, plan)
+        constraint_count += self._add_plan_constraints(feasibility, vars, plan, dimensions)
+        for obj1_id, obj2_id in sorted(pairs):
+            feasibility.add(self._non_overlap_clause(vars[obj1_id], vars[obj2_id]))
+        self._seed_phase(feasibility, vars, hints)
+
+        incumbent: Dict[str, Tuple[float, float]] = {}
+        feasible_result = unknown
+        for round_index in range(self.max_refinement_rounds + 1):
+            feasibility.set("timeout", remaining_ms(0.5))
+            feasible_result = feasibility.check()
+            if feasible_result != sat:
+                break
+            incumbent = self._extract_positions(feasibility.model(), vars)
+            violated = self._overlapping_pairs(incumbent, dimensions) - pairs
+            if not violated:
+                break
+            if round_index + 1 >= self.max_refinement_rounds:
+                violated = self._all_pairs(object_ids) - pairs
+            for obj1_id, obj2_id in sorted(violated):
+                feasibility.add(self._non_overlap_clause(vars[obj1_id], vars[obj2_id]))
+            pairs |= violated
+            incumbent = {}
+
+        base_metadata = {
+            'mode': 'optimize',
+            'object_count': len(object_ids),
+            'constraint_count': constraint_count + len(object_ids) * (len(object_ids) - 1) // 2,
+            'time_budget': budget_ms / 1000.0
+        }
+        if feasible_result == unsat:
+            return LayoutSolution(satisfiable=False, solve_time=time.time() - start_time,
+                                  metadata={**base_metadata, 'reason': 'unsatisfiable'})
+
+        # Phase 2: optimize within the remaining budget. The objective pulls objects
+        # together, so every pair gets its non-overlap clause here.
+        opt = Optimize()
+        opt.set("timeout", remaining_ms())
+        self._add_bounds_constraints(opt, vars, plan)
+        self._add_plan_constraints(opt, vars, plan, dimensions)
+        self._add_overlap_constraints(opt, vars, dimensions)
+        terms = self._objective_terms(opt, vars, plan, hints)
+        objective = Sum([RealVal(weight) * expr for weight, expr, _ in terms.values()]) if terms else RealVal(0)
+        handle = opt.minimize(objective)
+
+        opt_result = opt.check() if time.time() < deadline else unknown
+        model = None
+        if opt_result in (sat, unknown):
+            try:
+                model = opt.model()
+            except Z3Exception:
+                model = None
+        positions = self._extract_positions(model, vars) if model is not None else {}
+        if len(positions) < len(object_ids):
+            positions, model = {}, None  # partial model; keep the incumbent
+
+        optimal = opt_result == sat and model is not None
+        if not positions:
+            positions = incumbent
+        solve_time = time.time() - start_time
+        if not positions:
+            return LayoutSolution(satisfiable=False, solve_time=solve_time,
+                                  metadata={**base_metadata, 'reason': 'timeout'})
+
+        # Evaluate exactly in Python: abs/bounding-box slacks may be loose in a best-so-far model
+        term_values = {name: evaluate(positions) for name, (_, _, evaluate) in terms.items()}
+        objective_value = sum(terms[name][0] * value for name, value in term_values.items())
+        if optimal:
+            lower_bound = objective_value
+        else:
+            # Every term is non-negative, so 0 is always a valid (if weak) bound
+            lower_bound = max(0.0, self._bound_value(handle.lower()) or 0.0)
+        gap = max(0.0, objective_value - lower_bound) / max(abs(objective_value), 1e-9)
+
+        if self.verbose:
+            self.logger.info(
+                f"Optimize layout in {solve_time:.3f}s: objective={objective_value:.2f}, "
+                f"gap={gap:.1%}"
+            )
+
+        return LayoutSolution(
+            positions=positions,
+            satisfiable=True,
+            solve_time=solve_time,
+            z3_model=model,
+            metadata={
+                **base_metadata,
+                'solve_time': solve_time,
+                'objective': objective_value,
+                'objective_terms': term_values,
+                'objective_weights': {name: weight for name, (weight, _, _) in terms.items()},
+                'lower_bound': lower_bound,
+                'optimality_gap': gap,
+                'optimal': optimal,
+                'budget_exhausted': not optimal,
+                'source': 'optimize' if model is not None else 'incumbent'
+            }
+        )
+
+    def _objective_terms(self, opt, vars: Dict, plan: DiagramPlan,
+                         hints: Dict[str, Tuple[float, float]]) -> Dict[str, Tuple[float, Any, Any]]:
+        """
+        Linear objective terms: name -> (weight, Z3 expression, evaluate(positions))
+
+        Absolute values and the bounding box use auxiliary variables bounded
+        from below, which are tight at the optimum.
+        """
+        terms: Dict[str, Tuple[float, Any, Any]] = {}
+        weights = self.objective_weights
+        size = {obj_id: (obj_vars['width'], obj_vars['height']) for obj_id, obj_vars in vars.items()}
+
+        def absolute(expr, name: str):
+            slack = Real(name)
+            opt.add(slack >= expr, slack >= -expr)
+            return slack
+
+        def center(obj_id: str, axis: int, positions=None):
+            origin = positions[obj_id][axis] if positions is not None else vars[obj_id]['x' if axis == 0 else 'y']
+            return origin + size[obj_id][axis] / 2
+
+        connections = self._connection_pairs(plan, vars)
+        if weights.get('wire_length') and connections:
+            parts = []
+            for i, (a, b) in enumerate(connections):
+                parts.append(absolute(center(a, 0) - center(b, 0), f'__wire_{i}_x'))
+                parts.append(absolute(center(a, 1) - center(b, 1), f'__wire_{i}_y'))
+
+            def wire_length(positions):
+                return sum(
+                    abs(center(a, 0, positions) - center(b, 0, positions)) +
+                    abs(center(a, 1, positions) - center(b, 1, positions))
+                    for a, b in connections if a in positions and b in positions
+                )
+            terms['wire_length'] = (weights['wire_length'], Sum(parts), wire_length)
+
+        hinted = [obj_id for obj_id in vars if obj_id in hints and None not in hints[obj_id]]
+        if weights.get('deviation') and hinted:
+            parts = []
+            for obj_id in hinted:
+                hx, hy = hints[obj_id]
+                parts.append(absolute(vars[obj_id]['x'] - float(hx), f'__dev_{obj_id}_x'))
+                parts.append(absolute(vars[obj_id]['y'] - float(hy), f'__dev_{obj_id}_y'))
+
+            def deviation(positions):
+                return sum(
+                    abs(positions[obj_id][0] - float(hints[obj_id][0])) +
+                    abs(positions[obj_id][1] - float(hints[obj_id][1]))
+                    for obj_id in hinted if obj_id in positions
+                )
+            terms['deviation'] = (weights['deviation'], Sum(parts), deviation)
+
+        if weights.get('bounding_box') and vars:
+            min_x, min_y = Real('__bbox_min_x'), Real('__bbox_min_y')
+            max_x, max_y = Real('__bbox_max_x'), Real('__bbox_max_y')
+            for obj_vars in vars.values():
+                opt.add(min_x <= obj_vars['x'], min_y <= obj_vars['y'],
+                        max_x >= obj_vars['x'] + obj_vars['width'], max_y >= obj_vars['y'] + obj_vars['height'])
+
+            def bounding_box(positions):
+                if not positions:
+                    return 0.0
+                xs = [(x, x + size[obj_id][0]) for obj_id, (x, _) in positions.items()]
+                ys = [(y, y + size[obj_id][1]) for obj_id, (_, y) in positions.items()]
+                return (max(hi for _, hi in xs) - min(lo for lo, _ in xs)) + \
+                       (max(hi for _, hi in ys) - min(lo for lo, _ in ys))
+            terms['bounding_box'] = (weights['bounding_box'], (max_x - min_x) + (max_y - min_y), bounding_box)
+
+        return terms
+
+    def _connection_pairs(self, plan: DiagramPlan, vars: Dict) -> List[Tuple[str, str]]:
+        """Object pairs joined by a relationship or a distance constraint"""
+        pairs: List[Tuple[str, str]] = []
+        seen = set()
+
+        def add(a: str, b: str) -> None:
+            key = tuple(sorted((a, b)))
+            if a != b and a in vars and b in vars and key not in seen:
+                seen.add(key)
+                pairs.append(key)
+
+        spec = getattr(plan, 'original_spec', None)
+        for rel in (getattr(spec, 'relationships', None) or []):
+            if isinstance(rel, dict):
+                add(rel.get('subject', ''), rel.get('target', ''))
+        for constraint in plan.get_all_constraints():
+            if constraint.type in ('distance', 'connected') and len(constraint.objects) >= 2:
+                add(constraint.objects[0], constraint.objects[1])
+        return pairs
+
+    def _bound_value(self, value) -> Optional[float]:
+        """Convert a Z3 numeral/bound to float (None for infinite or symbolic bounds)"""
+        try:
+            if hasattr(value, 'as_decimal'):
+                return float(value.as_decimal(10).rstrip('?'))
+            return float(str(value))
+        except (ValueError, TypeError, Z3Exception):
+            return None
+
+    # ========== Solution Cache ==========
+
+    def _cache_fingerprint(self, plan: DiagramPlan, object_ids: List[str],
+                           dimensions: Dict[str, Tuple[float, float]],
+                           hints: Optional[Dict[str, Tuple[float, float]]]) -> Optional[LayoutFingerprint]:
+        """Rename-invariant key for this plan under the current solver settings"""
+        if self.cache is None:
+            return None
+
+        spec = getattr(plan, 'original_spec', None)
+        types: Dict[str, Any] = {}
+        ordered: List[str] = []
+        for obj in (getattr(spec, 'objects', None) or []):
+            obj_id = obj.get('id', '') if isinstance(obj, dict) else getattr(obj, 'id', '')
+            if obj_id and obj_id not in types:
+                types[obj_id] = obj.get('type', '') if isinstance(obj, dict) else getattr(obj, 'type', '')
+                ordered.append(obj_id)
+        known = set(object_ids)
+        ordered = [obj_id for obj_id in ordered if obj_id in known]
+        ordered += sorted(known - set(ordered))
+
+        constraints = [
+            (constraint.type, list(constraint.objects),
+             {'parameters': constraint.parameters, 'priority': constraint.priority})
+            for constraint in plan.get_all_constraints()
+        ]
+        for rel in (getattr(spec, 'relationships', None) or []):
+            if isinstance(rel, dict) and rel.get('subject') and rel.get('target'):
+                constraints.append(('relationship', [rel['subject'], rel['target']], {'type': rel.get('type', '')}))
+
+        mode = 'optimize' if self.optimize else 'satisfy'
+        signature = f"z3;mode={mode};components={self.parallel_components}:{self.component_spacing}"
+        if self.optimize:
+            signature += f";weights={sorted(self.objective_weights.items())}"
+        # Hints only change the answer through the optimize-mode deviation term
+        positions = None
+        if self.optimize and self.objective_weights.get('deviation') and hints:
+            positions = {obj_id: hint for obj_id, hint in hints.items() if hint and None not in hint}
+
+        return fingerprint_layout(
+            objects=[(obj_id, types.get(obj_id, ''), *dimensions.get(obj_id, (50.0, 50.0))) for obj_id in ordered],
+            constraints=constraints,
+            canvas=(plan.canvas_width, plan.canvas_height, list(plan.margins)),
+            signature=signature,
+            positions=positions
+        )
+
+    # ========== Component-Parallel Solving ==========
+
+    # Constraint types that tie objects to absolute canvas coordinates; a component
+    # carrying one of these cannot be translated by the packer
+    CANVAS_ANCHORED_CONSTRAINTS = ('symmetry', 'centered')
+
+    # Constraint types that span every object without coupling their positions
+    UNCOUPLED_CONSTRAINTS = ('no_overlap', 'bounds')
+
+    def _connected_components(self, plan: DiagramPlan, object_ids: List[str]) -> List[List[str]]:
+        """
+        Connected groups of objects, sorted for determinism
+
+        Spec relationships are grouped by DiagramPlanner's connectivity pass;
+        plan constraints over several objects (distance, alignment, ...) then
+        merge the groups they span.
+        """
+        known = set(object_ids)
+        parent = {obj_id: obj_id for obj_id in object_ids}
+
+        def find(obj_id: str) -> str:
+            while parent[obj_id] != obj_id:
+                parent[obj_id] = parent[parent[obj_id]]
+                obj_id = parent[obj_id]
+            return obj_id
+
+        def union(members: List[str]) -> None:
+            members = [obj_id for obj_id in members if obj_id in known]
+            for other in members[1:]:
+                root_a, root_b = find(members[0]), find(other)
+                if root_a != root_b:
+                    parent[max(root_a, root_b)] = min(root_a, root_b)
+
+        spec = getattr(plan, 'original_spec', None)
+        if spec is not None and all(isinstance(item, dict) for item in
+                                    list(getattr(spec, 'objects', None) or []) +
+                                    list(getattr(spec, 'relationships', None) or [])):
+            for group in DiagramPlanner()._decompose_by_connectivity(spec):
+                union(group)
+        for constraint in plan.get_all_constraints():
+            if constraint.type not in self.UNCOUPLED_CONSTRAINTS:
+                union(list(constraint.objects))
+
+        groups: Dict[str, List[str]] = {}
+        for obj_id in sorted(object_ids):
+            groups.setdefault(find(obj_id), []).append(obj_id)
+        return sorted(groups.values(), key=lambda group: group[0])
+
+    def _solve_components(self, plan: DiagramPlan, components: List[List[str]],
+                          dimensions: Dict[str, Tuple[float, float]],
+                          hints: Dict[str, Tuple[float, float]],
+                          time_budget: Optional[float],
+                          start_time: float) -> Tuple[Optional[LayoutSolution], Optional[str]]:
+        """
+        Solve components independently, then pack their bounding boxes
+
+        Each component is solved on the full canvas (so it is known to fit),
+        translated so its bounding box starts at the origin, and placed by
+        GeometryEngine.pack_rectangles(algorithm='skyline'). Non-overlap between
+        components follows from the packing. Returns (None, reason) when the
+        plan cannot be split and the caller should solve it whole.
+
+        The call's budget is one deadline shared by all components: pool workers
+        get the time left until it, serial solves split the time left across the
+        components still to run.
+        """
+        budget_ms = self.timeout if time_budget is None else max(1, min(self.timeout, int(time_budget * 1000)))
+        deadline = start_time + budget_ms / 1000.0
+        if not GEOMETRY_ENGINE_AVAILABLE:
+            return None, 'geometry_engine_unavailable'
+
+        all_constraints = plan.get_all_constraints()
+        if any(c.type in self.CANVAS_ANCHORED_CONSTRAINTS for c in all_constraints):
+            return None, 'canvas_anchored_constraints'
+        # Same pruning rule as _add_plan_constraints, decided on the whole plan
+        if len(all_constraints) > 20:
+            all_constraints = [c for c in all_constraints if c.priority != ConstraintPriority.LOW]
+
+        spec = getattr(plan, 'original_spec', None)
+        relationships = [rel for rel in (getattr(spec, 'relationships', None) or []) if isinstance(rel, dict)]
+        payloads = []
+        for members in components:
+            member_set = set(members)
+            payloads.append({
+                'object_ids': members,
+                'dimensions': {obj_id: tuple(dimensions.get(obj_id, (50.0, 50.0))) for obj_id in members},
+                'hints': {obj_id: hints[obj_id] for obj_id in members if obj_id in hints},
+                'relationships': [rel for rel in relationships
+                                  if rel.get('subject') in member_set and rel.get('target') in member_set],
+                'constraints': [c.to_dict() for c in all_constraints
+                                if c.type not in self.UNCOUPLED_CONSTRAINTS and c.objects
+                                and set(c.objects) <= member_set],
+                'canvas': (plan.canvas_width, plan.canvas_height, list(plan.margins)),
+                'deadline': deadline
+            })
+
+        total_objects = sum(len(members) for members in components)
+        workers = self.component_workers or os.cpu_count() or 1
+        parallel = workers > 1 and total_objects >= self.parallel_min_objects
+        results = self._run_component_payloads(payloads, parallel)
+        parallel = parallel and self._component_pool is not None
+
+        base_metadata = {
+            'mode': 'components',
+            'object_count': total_objects,
+            'component_count': len(components),
+            'component_sizes': [len(members) for members in components],
+            'component_solve_times': [result.solve_time for result in results],
+            'parallel': parallel,
+            'constraint_count': sum(result.metadata.get('constraint_count', 0) for result in results),
+            # Budget-limited components are not final answers; solve_layout must not cache them
+            'budget_exhausted': any(result.metadata.get('budget_exhausted') for result in results)
+        }
+        failed = next((result for result in results if not result.satisfiable), None)
+        if failed is not None:
+            return LayoutSolution(
+                satisfiable=False,
+                solve_time=time.time() - start_time,
+                metadata={**base_metadata, 'reason': failed.metadata.get('reason', 'unsatisfiable')}
+            ), None
+
+        # Pack component bounding boxes into the canvas area inside the margins
+        top, right, bottom, left = plan.margins
+        spacing = self.component_spacing
+        boxes = []
+        for index, result in enumerate(results):
+            members = components[index]
+            min_x = min(result.positions[obj_id][0] for obj_id in members)
+            min_y = min(result.positions[obj_id][1] for obj_id in members)
+            max_x = max(result.positions[obj_id][0] + dimensions.get(obj_id, (50.0, 50.0))[0] for obj_id in members)
+            max_y = max(result.positions[obj_id][1] + dimensions.get(obj_id, (50.0, 50.0))[1] for obj_id in members)
+            boxes.append((min_x, min_y, Rectangle(0, 0, max_x - min_x, max_y - min_y, str(index))))
+
+        # The packer keeps `spacing` clear of its canvas edges; widen it so the margins stay exact
+        canvas = Rectangle(left - spacing, top - spacing,
+                           plan.canvas_width - left - right + 2 * spacing,
+                           plan.canvas_height - top - bottom + 2 * spacing)
+        packing = GeometryEngine().pack_rectangles([rect for _, _, rect in boxes], canvas,
+                                                   algorithm='skyline', margin=spacing)
+        if not packing.success or len(packing.rectangles) < len(boxes):
+            return None, 'packing_failed'
+
+        positions: Dict[str, Tuple[float, float]] = {}
+        for packed in packing.rectangles:
+            index = int(packed.id)
+            min_x, min_y, _ = boxes[index]
+            for obj_id, (x, y) in results[index].positions.items():
+                positions[obj_id] = (x - min_x + packed.x, y - min_y + packed.y)
+
+        solve_time = time.time() - start_time
+        metadata = {**base_metadata, 'solve_time': solve_time,
+                    'packing_efficiency': packing.packing_efficiency}
+        if all('objective' in result.metadata for result in results):
+            objective = sum(result.metadata['objective'] for result in results)
+            lower_bound = sum(result.metadata['lower_bound'] for result in results)
+            metadata.update({
+                'objective': objective,
+                'lower_bound': lower_bound,
+                'optimality_gap': max(0.0, objective - lower_bound) / max(abs(objective), 1e-9),
+                'optimal': all(result.metadata.get('optimal') for result in results)
+            })
+
+        if self.verbose:
+            self.logger.info(
+                f"Component layout in {solve_time:.3f}s: {len(components)} components "
+                f"({'process pool' if parallel else 'serial'})"
+            )
+
+        return LayoutSolution(positions=positions, satisfiable=True, solve_time=solve_time,
+                              metadata=metadata), None
+
+    def _run_component_payloads(self, payloads: List[Dict[str, Any]], parallel: bool) -> List[LayoutSolution]:
+        """Solve component payloads in the process pool, or in-process when parallel is False"""
+        settings = self._component_settings()
+        if parallel:
+            try:
+                pool = self._get_component_pool()
+                futures = [pool.submit(_solve_component_worker, settings, payload) for payload in payloads]
+                return [future.result() for future in futures]
+            except (BrokenProcessPool, OSError) as exc:
+                self.logger.warning(f"Component pool failed ({exc}); solving components in-process")
+                self.close()
+
+        if self._component_solver is None:
+            self._component_solver = Z3LayoutSolver(**settings)
+        results = []
+        for index, payload in enumerate(payloads):
+            results.append(self._component_solver.solve_layout(
+                _component_plan(payload), payload['dimensions'], hints=payload['hints'],
+                time_budget=_remaining_budget(payload['deadline'], len(payloads) - index)
+            ))
+        return results
+
+    def _component_settings(self) -> Dict[str, Any]:
+        """Constructor arguments for per-component solvers (never recursive)"""
+        return {
+            'timeout': self.timeout,
+            'incremental': self.incremental,
+            'prune_margin': self.prune_margin,
+            'max_sessions': self.max_sessions,
+            'max_refinement_rounds': self.max_refinement_rounds,
+            'optimize': self.optimize,
+            'objective_weights': dict(self.objective_weights)
+        }
+
+    def _get_component_pool(self) -> ProcessPoolExecutor:
+        with self._component_pool_lock:
+            if self._component_pool is None:
+                workers = self.component_workers or os.cpu_count() or 1
+                self._component_pool = ProcessPoolExecutor(
+                    max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+                )
+                # Long-lived owners (the pipeline, API servers) never call close() themselves
+                atexit.register(self.close)
+            return self._component_pool
+
+    def close(self) -> None:
+        """Shut down the component process pool (if one was started)"""
+        with self._component_pool_lock:
+            pool, self._component_pool = self._component_pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+            atexit.unregister(self.close)
+
+    # ========== Incremental Solving ==========
+
+    def _solve_incremental(self, plan: DiagramPlan, object_ids: List[str],
+                           dimensions: Dict[str, Tuple[float, float]],
+                           hints: Dict[str, Tuple[float, float]], start_time: float,
+                           budget_ms: Optional[int] = None) -> LayoutSolution:
+        """
+        Solve against a cached base model
+
+        Non-overlap clauses start with the pairs a sweep line finds near each
+        other (around the warm-start positions). Any other pair that overlaps
+        in the model gets its clause added to the base and the check repeats,
+        so the answer honours non-overlap for every pair.
+        """
+        object_ids = sorted(object_ids)
+        key = self._session_key(object_ids, dimensions, plan)
+        with self._sessions_lock:
+            session = self._sessions.get(key)
+            reused = session is not None
+            if session is None:
+                session = self._build_session(object_ids, dimensions, plan, hints)
+                self._sessions[key] = session
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            else:
+                self._sessions.move_to_end(key)
+
+        with session.lock:
+            solver = session.solver
+            warm = dict(hints)
+            warm.update(session.last_positions)
+            all_pairs = len(object_ids) * (len(object_ids) - 1) // 2
+            rounds = 0
+            plan_count = 0
+            model = None
+            positions: Dict[str, Tuple[float, float]] = {}
+
+            while True:
+                rounds += 1
+                remaining_ms = (budget_ms or self.timeout) - int((time.time() - start_time) * 1000)
+                solver.set("timeout", max(1, remaining_ms))
+                solver.push()
+                try:
+                    plan_count = self._add_plan_constraints(solver, session.vars, plan, dimensions)
+                    self._seed_phase(solver, session.vars, warm)
+                    check_result = solver.check()
+                    if check_result == sat:
+                        model = solver.model()
+                        positions = self._extract_positions(model, session.vars)
+                finally:
+                    solver.pop()
+
+                if check_result != sat:
+                    break
+                violated = self._overlapping_pairs(positions, dimensions) - session.pairs
+                if not violated:
+                    break
+                if rounds >= self.max_refinement_rounds:
+                    violated = self._all_pairs(object_ids) - session.pairs
+                session.base_constraints += self._add_pair_clauses(session, violated)
+                warm.update(positions)
+
+            solve_time = time.time() - start_time
+            metadata = {
+                'constraint_count': session.base_constraints + plan_count,
+                'object_count': len(object_ids),
+                'incremental': True,
+                'session_reused': reused,
+                'warm_start': bool(warm),
+                'overlap_pairs': len(session.pairs),
+                'overlap_pairs_total': all_pairs,
+                'refinement_rounds': rounds
+            }
+
+            if check_result == sat:
+                session.last_positions = positions
+                session.solves += 1
+                if self.verbose:
+                    self.logger.info(
+                        f"Incremental solution in {solve_time:.3f}s "
+                        f"({len(session.pairs)}/{all_pairs} non-overlap pairs, {rounds} rounds)"
+                    )
+                return LayoutSolution(
+                    positions=positions,
+                    satisfiable=True,
+                    solve_time=solve_time,
+                    z3_model=model,
+                    metadata=metadata
+                )
+
+            metadata['reason'] = 'unsatisfiable' if check_result == unsat else 'timeout'
+            return LayoutSolution(satisfiable=False, solve_time=solve_time, metadata=metadata)
+
+    def reset_incremental(self) -> None:
+        """Drop every cached base model"""
+        with self._sessions_lock:
+            self._sessions.clear()
+
+    def _session_key(self, object_ids: List[str], dimensions: Dict[str, Tuple[float, float]],
+                     plan: DiagramPlan) -> Tuple:
+        return (
+            tuple(object_ids),
+            tuple(tuple(dimensions.get(obj_id, (50.0, 50.0))) for obj_id in object_ids),
+            plan.canvas_width,
+            plan.canvas_height,
+            tuple(plan.margins)
+        )
+
+    def _build_session(self, object_ids: List[str], dimensions: Dict[str, Tuple[float, float]],
+                       plan: DiagramPlan, hints: Dict[str, Tuple[float, float]]) -> _IncrementalSession:
+        solver = Solver()
+        solver.set("timeout", self.timeout)
+        vars = self._create_variables(object_ids, dimensions)
+        session = _IncrementalSession(solver=solver, vars=vars)
+        session.base_constraints = self._add_bounds_constraints(solver, vars, plan)
+        session.base_constraints += self._add_pair_clauses(
+            session, self._plausible_pairs(object_ids, dimensions, hints)
+        )
+        return session
+
+    def _add_pair_clauses(self, session: _IncrementalSession, pairs: Set[Tuple[str, str]]) -> int:
+        for obj1_id, obj2_id in sorted(pairs):
+            session.solver.add(self._non_overlap_clause(session.vars[obj1_id], session.vars[obj2_id]))
+        session.pairs.update(pairs)
+        return len(pairs)
+
+    def _seed_phase(self, solver: Solver, vars: Dict, positions: Dict[str, Tuple[float, float]]) -> None:
+        """Use known positions as initial values (phase hints) for the next check"""
+        if not positions or not hasattr(solver, 'set_initial_value'):
+            return
+        for obj_id, (x, y) in positions.items():
+            obj_vars = vars.get(obj_id)
+            if obj_vars is None:
+                continue
+            try:
+                solver.set_initial_value(obj_vars['x'], RealVal(float(x)))
+                solver.set_initial_value(obj_vars['y'], RealVal(float(y)))
+            except Exception as exc:  # older z3 builds reject real-valued hints
+                self.logger.debug(f"Z3 phase hint skipped: {exc}")
+                return
+
+    def _all_pairs(self, object_ids: List[str]) -> Set[Tuple[str, str]]:
+        return {(a, b) for i, a in enumerate(object_ids) for b in object_ids[i + 1:]}
+
+    def _plausible_pairs(self, object_ids: List[str], dimensions: Dict[str, Tuple[float, float]],
+                         hints: Dict[str, Tuple[float, float]]) -> Set[Tuple[str, str]]:
+        """
+        Sweep-line pass over hint boxes inflated by prune_margin
+
+        Objects without a hint could be anywhere, so they pair with everything.
+        """
+        inf = float('inf')
+        margin = self.prune_margin
+        boxes = []
+        for obj_id in object_ids:
+            width, height = dimensions.get(obj_id, (50.0, 50.0))
+            hint = hints.get(obj_id)
+            if hint is None or None in hint:
+                boxes.append((-inf, -inf, inf, inf, obj_id))
+            else:
+                x, y = float(hint[0]), float(hint[1])
+                boxes.append((x - margin, y - margin, x + width + margin, y + height + margin, obj_id))
+        return self._sweep_pairs(boxes, strict=False)
+
+    def _overlapping_pairs(self, positions: Dict[str, Tuple[float, float]],
+                           dimensions: Dict[str, Tuple[float, float]]) -> Set[Tuple[str, str]]:
+        """Pairs whose solved rectangles overlap (touching edges are allowed)"""
+        boxes = []
+        for obj_id, (x, y) in positions.items():
+            width, height = dimensions.get(obj_id, (50.0, 50.0))
+            boxes.append((x, y, x + width, y + height, obj_id))
+        return self._sweep_pairs(boxes, strict=True)
+
+    def _sweep_pairs(self, boxes: List[Tuple[float, float, float, float, str]], strict: bool) -> Set[Tuple[str, str]]:
+        eps = 1e-6 if strict else 0.0
+        pairs: Set[Tuple[str, str]] = set()
+        active: List[Tuple[float, float, float, float, str]] = []
+        for box in sorted(boxes, key=lambda b: b[0]):
+            x1, y1, x2, y2, obj_id = box
+            # Boxes are visited by left edge, so anything still active overlaps in x
+            if strict:
+                active = [other for other in active if other[2] - eps > x1]
+            else:
+                active = [other for other in active if other[2] >= x1]
+            for ox1, oy1, ox2, oy2, other_id in active:
+                if strict:
+                    hit = oy1 < y2 - eps and y1 < oy2 - eps
+                else:
+                    hit = oy1 <= y2 and y1 <= oy2
+                if hit:
+                    pairs.add((other_id, obj_id) if other_id < obj_id else (obj_id, other_id))
+            active.append(box)
+        return pairs
+
     # ========== Solution Extraction ==========
 
     def _extract_positions(self, model, vars: Dict) -> Dict[str, Tuple[float, float]]:
@@ -522,6 +1358,53 @@ class Z3LayoutSolver:
         return f"Z3LayoutSolver(timeout={self.timeout}ms, available={self.is_available()})"
 
 
+# ========== Component Workers ==========
+
+# Per-process solvers, so incremental sessions survive between component jobs
+_WORKER_SOLVERS: Dict[str, Z3LayoutSolver] = {}
+
+
+def _component_plan(payload: Dict[str, Any]) -> DiagramPlan:
+    """Rebuild a DiagramPlan for one component from its picklable payload"""
+    from core.universal_ai_analyzer import CanonicalProblemSpec, PhysicsDomain
+
+    canvas_width, canvas_height, margins = payload['canvas']
+    spec = CanonicalProblemSpec(
+        domain=PhysicsDomain.UNKNOWN,
+        problem_type='component',
+        problem_text='',
+        objects=[{'id': obj_id} for obj_id in payload['object_ids']],
+        relationships=list(payload['relationships'])
+    )
+    plan = DiagramPlan(
+        original_spec=spec,
+        complexity_score=0.0,
+        strategy='component',
+        canvas_width=canvas_width,
+        canvas_height=canvas_height,
+        margins=list(margins)
+    )
+    for constraint in payload['constraints']:
+        plan.add_global_constraint(LayoutConstraint.from_dict(constraint))
+    return plan
+
+
+def _remaining_budget(deadline: float, share: int = 1) -> float:
+    """Seconds left until deadline, split evenly across `share` solves"""
+    return max(0.001, (deadline - time.time()) / max(1, share))
+
+
+def _solve_component_worker(settings: Dict[str, Any], payload: Dict[str, Any]) -> LayoutSolution:
+    """ProcessPoolExecutor task: solve one connected component"""
+    key = repr(sorted(settings.items()))
+    solver = _WORKER_SOLVERS.get(key)
+    if solver is None:
+        solver = _WORKER_SOLVERS[key] = Z3LayoutSolver(**settings)
+    solution = solver.solve_layout(_component_plan(payload), payload['dimensions'],
+                                   hints=payload['hints'], time_budget=_remaining_budget(payload['deadline']))
+    return replace(solution, z3_model=None)  # Z3 models don't pickle
+
+
 # ========== Standalone Functions ==========
 
 def check_z3_availability() -> bool:
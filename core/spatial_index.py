@@ -0,0 +1,257 @@
+"""
+Scene Spatial Index
+===================
+
+Uniform-grid spatial hash over scene objects, shared by the layout engine,
+label placer and spatial validator.
+
+Each index keeps:
+- by_id: object id -> SceneObject (replaces linear scans of scene.objects)
+- a grid of cell -> objects, built from a caller-supplied bounds function
+  (each caller keeps its own notion of an object's extent)
+
+Bounds are snapshotted on insert. After moving an object call update(obj),
+which re-bins just that object; refresh() re-checks every object after a
+bulk move. query() and candidate_pairs() apply the same closed-interval box
+test as the callers' _bounds_overlap helpers and return results in insertion
+order, so swapping a linear scan for the index does not change which overlaps
+are reported or in what order.
+
+Author: Universal STEM Diagram Generator
+Date: November 18, 2025
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+import math
+
+
+Bounds = Tuple[float, float, float, float]  # (x1, y1, x2, y2)
+
+# Objects covering more cells than this are kept in a side list and checked on every query
+_MAX_CELLS_PER_OBJECT = 1024
+
+
+def boxes_overlap(a: Bounds, b: Bounds) -> bool:
+    """Closed-interval box intersection (touching edges count as overlap)"""
+    return not (a[2] < b[0] or a[0] > b[2] or a[3] < b[1] or a[1] > b[3])
+
+
+class _Entry:
+    __slots__ = ('obj', 'order', 'bounds', 'cells')
+
+    def __init__(self, obj: Any, order: int):
+        self.obj = obj
+        self.order = order
+        self.bounds: Optional[Bounds] = None
+        self.cells: Optional[Tuple[Tuple[int, int], ...]] = None  # None = oversized
+
+
+class SceneSpatialIndex:
+    """
+    Id lookup plus uniform-grid spatial hash over scene objects
+
+    Usage:
+        index = SceneSpatialIndex.build(scene.objects, bounds_fn)
+        obj = index.get("battery_1")
+        nearby = index.query((x1, y1, x2, y2))
+    """
+
+    def __init__(self, bounds_fn: Callable[[Any], Optional[Bounds]], cell_size: float = 64.0):
+        """
+        Args:
+            bounds_fn: Returns (x1, y1, x2, y2) for an object, or None if it has no extent
+            cell_size: Grid cell edge length in pixels
+        """
+        self.bounds_fn = bounds_fn
+        self.cell_size = float(cell_size) if cell_size and cell_size > 0 else 64.0
+        self.by_id: Dict[str, Any] = {}
+        self._entries: Dict[int, _Entry] = {}  # keyed by id(obj): duplicate ids stay distinct
+        self._cells: Dict[Tuple[int, int], Set[int]] = {}
+        self._oversized: Set[int] = set()
+        self._next_order = 0
+
+    @classmethod
+    def build(cls, objects: Iterable[Any], bounds_fn: Callable[[Any], Optional[Bounds]],
+              cell_size: float = 64.0) -> "SceneSpatialIndex":
+        index = cls(bounds_fn, cell_size)
+        for obj in objects:
+            index.insert(obj)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, obj: Any) -> bool:
+        return id(obj) in self._entries
+
+    def get(self, obj_id: str) -> Optional[Any]:
+        """First inserted object with this id (same result as a linear scan)"""
+        if not obj_id:
+            return None
+        return self.by_id.get(obj_id)
+
+    def is_stale(self, objects: List[Any]) -> bool:
+        """
+        True if the index no longer covers exactly the given objects
+
+        Checks membership only, not positions: callers that move indexed
+        objects must update(obj) or refresh() themselves.
+        """
+        return len(objects) != len(self._entries) or any(id(obj) not in self._entries for obj in objects)
+
+    def bounds(self, obj: Any) -> Optional[Bounds]:
+        """Snapshotted bounds of an indexed object"""
+        entry = self._entries.get(id(obj))
+        return entry.bounds if entry else None
+
+    def insert(self, obj: Any) -> None:
+        key = id(obj)
+        if key in self._entries:
+            self.update(obj)
+            return
+        entry = _Entry(obj, self._next_order)
+        self._next_order += 1
+        self._entries[key] = entry
+        obj_id = getattr(obj, 'id', None)
+        if obj_id and obj_id not in self.by_id:
+            self.by_id[obj_id] = obj
+        self._place(key, entry, self._compute_bounds(obj))
+
+    def update(self, obj: Any) -> bool:
+        """Re-read an object's bounds; returns True if it moved"""
+        key = id(obj)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.insert(obj)
+            return True
+        bounds = self._compute_bounds(obj)
+        if bounds == entry.bounds:
+            return False
+        self._unplace(key, entry)
+        self._place(key, entry, bounds)
+        return True
+
+    def remove(self, obj: Any) -> None:
+        key = id(obj)
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._unplace(key, entry)
+        obj_id = getattr(obj, 'id', None)
+        if obj_id and self.by_id.get(obj_id) is obj:
+            del self.by_id[obj_id]
+            for other in sorted(self._entries.values(), key=lambda e: e.order):
+                if getattr(other.obj, 'id', None) == obj_id:
+                    self.by_id[obj_id] = other.obj
+                    break
+
+    def refresh(self) -> int:
+        """Re-read every object's bounds; returns the number that moved"""
+        return sum(1 for entry in list(self._entries.values()) if self.update(entry.obj))
+
+    def query(self, bounds: Bounds, exclude: Any = None) -> List[Any]:
+        """Indexed objects whose bounds overlap the box, in insertion order"""
+        box = self._normalize(bounds)
+        if box is None:
+            return []
+        keys = set(self._oversized)
+        cells = self._cells_for(box)
+        if cells is None:
+            keys.update(key for key, entry in self._entries.items() if entry.bounds is not None)
+        else:
+            for cell in cells:
+                bucket = self._cells.get(cell)
+                if bucket:
+                    keys.update(bucket)
+        hits = [
+            self._entries[key] for key in keys
+            if self._entries[key].obj is not exclude and boxes_overlap(bounds, self._entries[key].bounds)
+        ]
+        hits.sort(key=lambda entry: entry.order)
+        return [entry.obj for entry in hits]
+
+    def candidate_pairs(self) -> List[Tuple[Any, Any]]:
+        """All pairs of indexed objects whose bounds overlap, ordered (earlier, later)"""
+        seen: Set[Tuple[int, int]] = set()
+        pairs: List[Tuple[_Entry, _Entry]] = []
+
+        def consider(a: _Entry, b: _Entry) -> None:
+            if a.order > b.order:
+                a, b = b, a
+            marker = (a.order, b.order)
+            if marker in seen:
+                return
+            seen.add(marker)
+            if boxes_overlap(a.bounds, b.bounds):
+                pairs.append((a, b))
+
+        for bucket in self._cells.values():
+            members = [self._entries[key] for key in bucket]
+            for i, a in enumerate(members):
+                for b in members[i + 1:]:
+                    consider(a, b)
+        for key in self._oversized:
+            big = self._entries[key]
+            for entry in self._entries.values():
+                if entry is not big and entry.bounds is not None:
+                    consider(big, entry)
+
+        pairs.sort(key=lambda pair: (pair[0].order, pair[1].order))
+        return [(a.obj, b.obj) for a, b in pairs]
+
+    # Internal helpers
+
+    def _compute_bounds(self, obj: Any) -> Optional[Bounds]:
+        try:
+            bounds = self.bounds_fn(obj)
+        except (AttributeError, KeyError, TypeError, ValueError):
+            return None
+        if bounds is None:
+            return None
+        try:
+            bounds = tuple(float(v) for v in bounds)
+        except (TypeError, ValueError):
+            return None
+        if len(bounds) != 4 or not all(math.isfinite(v) for v in bounds):
+            return None
+        return bounds
+
+    def _normalize(self, bounds: Optional[Bounds]) -> Optional[Bounds]:
+        if bounds is None:
+            return None
+        x1, y1, x2, y2 = bounds
+        return (min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
+
+    def _cells_for(self, box: Bounds) -> Optional[List[Tuple[int, int]]]:
+        size = self.cell_size
+        cx1, cy1 = math.floor(box[0] / size), math.floor(box[1] / size)
+        cx2, cy2 = math.floor(box[2] / size), math.floor(box[3] / size)
+        if (cx2 - cx1 + 1) * (cy2 - cy1 + 1) > _MAX_CELLS_PER_OBJECT:
+            return None
+        return [(cx, cy) for cx in range(cx1, cx2 + 1) for cy in range(cy1, cy2 + 1)]
+
+    def _place(self, key: int, entry: _Entry, bounds: Optional[Bounds]) -> None:
+        entry.bounds = bounds
+        entry.cells = ()
+        if bounds is None:
+            return
+        cells = self._cells_for(self._normalize(bounds))
+        if cells is None:
+            entry.cells = None
+            self._oversized.add(key)
+            return
+        entry.cells = tuple(cells)
+        for cell in cells:
+            self._cells.setdefault(cell, set()).add(key)
+
+    def _unplace(self, key: int, entry: _Entry) -> None:
+        if entry.cells is None:
+            self._oversized.discard(key)
+        else:
+            for cell in entry.cells:
+                bucket = self._cells.get(cell)
+                if bucket is not None:
+                    bucket.discard(key)
+                    if not bucket:
+                        del self._cells[cell]
+        entry.cells = ()
@@ -17,6 +17,7 @@ Date: November 11, 2025
 from typing import List, Optional, Tuple, Set
 from dataclasses import dataclass, field
 from core.scene.schema_v1 import Scene, SceneObject, PrimitiveType, RenderLayer, Position, ConstraintType
+from core.spatial_index import SceneSpatialIndex
 
 
 @dataclass
@@ -157,20 +158,21 @@ class SpatialValidator:
                      if obj.type in [PrimitiveType.RECTANGLE, PrimitiveType.CAPACITOR_PLATE]
                      and obj.position is not None]
 
-        for i, rect1 in enumerate(rectangles):
-            for rect2 in rectangles[i+1:]:
-                overlap_area = self._calculate_overlap_area(rect1, rect2)
-                if overlap_area > 0:
-                    # Check if overlap is intentional (e.g., containment constraint)
-                    is_intentional = self._is_intentional_overlap(
-                        rect1, rect2, scene.constraints
-                    )
-                    overlaps.append(Overlap(
-                        obj1_id=rect1.id,
-                        obj2_id=rect2.id,
-                        is_intentional=is_intentional,
-                        overlap_area=overlap_area
-                    ))
+        # Grid pruning: only pairs sharing a cell reach the area computation
+        index = SceneSpatialIndex.build(rectangles, self._get_bounds)
+        for rect1, rect2 in index.candidate_pairs():
+            overlap_area = self._calculate_overlap_area(rect1, rect2)
+            if overlap_area > 0:
+                # Check if overlap is intentional (e.g., containment constraint)
+                is_intentional = self._is_intentional_overlap(
+                    rect1, rect2, scene.constraints
+                )
+                overlaps.append(Overlap(
+                    obj1_id=rect1.id,
+                    obj2_id=rect2.id,
+                    is_intentional=is_intentional,
+                    overlap_area=overlap_area
+                ))
 
         return overlaps
 
@@ -277,39 +279,32 @@ class SpatialValidator:
         shapes = [obj for obj in scene.objects
                  if obj.type != PrimitiveType.TEXT and obj.position is not None]
 
+        shape_index = SceneSpatialIndex.build(shapes, self._get_bounds)
+        label_index = SceneSpatialIndex.build(labels, self._get_bounds)
+
         for label in labels:
-            label_bounds = self._get_bounds(label)
+            label_bounds = label_index.bounds(label)
             if label_bounds is None:
                 continue
 
             # Check overlap with shapes
-            for shape in shapes:
-                shape_bounds = self._get_bounds(shape)
-                if shape_bounds is None:
-                    continue
-
-                if self._bounds_overlap(label_bounds, shape_bounds):
-                    issues.append(LabelIssue(
-                        label_id=label.id,
-                        issue_type="overlaps_shape",
-                        overlapping_with=shape.id
-                    ))
+            for shape in shape_index.query(label_bounds):
+                issues.append(LabelIssue(
+                    label_id=label.id,
+                    issue_type="overlaps_shape",
+                    overlapping_with=shape.id
+                ))
 
             # Check overlap with other labels
-            for other_label in labels:
+            for other_label in label_index.query(label_bounds):
                 if other_label.id == label.id:
                     continue
 
-                other_bounds = self._get_bounds(other_label)
-                if other_bounds is None:
-                    continue
-
-                if self._bounds_overlap(label_bounds, other_bounds):
-                    issues.append(LabelIssue(
-                        label_id=label.id,
-                        issue_type="overlaps_label",
-                        overlapping_with=other_label.id
-                    ))
+                issues.append(LabelIssue(
+                    label_id=label.id,
+                    issue_type="overlaps_label",
+                    overlapping_with=other_label.id
+                ))
 
         return issues
 
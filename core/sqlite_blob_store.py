@@ -0,0 +1,158 @@
+"""
+SQLite Blob Store
+=================
+
+Shared on-disk tier for the pipeline's content-addressed caches (NLP
+results, layout solutions). Each cache owns its key scheme and payload
+encoding; this module only stores opaque blobs:
+
+- one table per cache (key, payload, size, created_at, accessed_at)
+- WAL mode so concurrent Uvicorn/Gunicorn workers read while one writes
+- payloads are zlib-compressed by the store
+- least recently accessed rows are evicted once the stored size exceeds
+  max_bytes
+
+build_cache() holds the shared 'sqlite' / 'memory' / 'none' backend
+selection, including the fallback to memory when SQLite is unavailable.
+
+Author: Universal STEM Diagram Generator
+Date: November 18, 2025
+"""
+
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+from pathlib import Path
+import logging
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+
+T = TypeVar('T')
+
+_TABLE_NAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+class SQLiteBlobStore:
+    """Key -> compressed blob table with size-bounded LRU eviction"""
+
+    def __init__(self, path: str, table: str, max_bytes: int):
+        """
+        Args:
+            path: SQLite file (parent directories are created)
+            table: Table name for this cache
+            max_bytes: Stored payload budget before eviction
+        """
+        if not _TABLE_NAME.match(table):
+            raise ValueError(f"Invalid table name: {table!r}")
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.table = table
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    key TEXT PRIMARY KEY,
+                    payload BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_accessed ON {table}(accessed_at)")
+            self._conn.commit()
+
+    def load(self, key: str) -> Optional[bytes]:
+        """Decompressed payload for key (None on a miss or unreadable row)"""
+        with self._lock:
+            row = self._conn.execute(f"SELECT payload FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        try:
+            return zlib.decompress(row[0])
+        except zlib.error as exc:
+            logging.getLogger(__name__).warning(f"Discarding unreadable {self.table} entry {key[:12]}: {exc}")
+            return None
+
+    def save(self, key: str, payload: bytes) -> List[str]:
+        """
+        Store payload under key
+
+        Returns:
+            Keys evicted to stay within max_bytes
+        """
+        compressed = zlib.compress(payload)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, payload, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, compressed, len(compressed), now, now)
+            )
+            evicted = self._evict_locked()
+            self._conn.commit()
+        return evicted
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count, size = self._conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}"
+            ).fetchone()
+        return {
+            'path': str(self.path),
+            'disk_entries': count,
+            'disk_bytes': size,
+            'max_bytes': self.max_bytes
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _evict_locked(self) -> List[str]:
+        total = self._conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table}").fetchone()[0]
+        if total <= self.max_bytes:
+            return []
+        rows = self._conn.execute(f"SELECT key, size FROM {self.table} ORDER BY accessed_at ASC").fetchall()
+        doomed = []
+        for row_key, size in rows:
+            if total <= self.max_bytes:
+                break
+            doomed.append(row_key)
+            total -= size
+        self._conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", [(row_key,) for row_key in doomed])
+        return doomed
+
+
+def build_cache(backend: str, name: str, memory: Callable[[], T], sqlite: Callable[[], T]) -> Optional[T]:
+    """
+    Select a cache backend
+
+    Args:
+        backend: 'sqlite', 'memory', or 'none'
+        name: Cache name for messages ('NLP', 'layout', ...)
+        memory: Builds the in-memory cache
+        sqlite: Builds the SQLite-backed cache (falls back to memory on sqlite3.Error)
+    """
+    backend = (backend or "none").lower()
+    if backend == "none":
+        return None
+    if backend == "sqlite":
+        try:
+            return sqlite()
+        except sqlite3.Error as exc:
+            logging.getLogger(__name__).warning(
+                f"SQLite {name} cache unavailable ({exc}); falling back to in-memory cache"
+            )
+    elif backend != "memory":
+        raise ValueError(f"Unknown {name} cache backend: {backend}")
+    return memory()
@@ -0,0 +1,338 @@
+"""
+Stage Graph Executor
+====================
+
+Explicit dataflow graph for the diagram pipeline.
+
+Each Stage declares the named values it consumes (inputs) and produces
+(outputs), plus the PipelineConfig fields it reads. The executor runs a
+stage as soon as all of its inputs exist, so independent stages (e.g.
+ontology validation and layout) overlap on a thread pool.
+
+Every stage is memoized on a content key:
+
+    key = H(stage name, stage version, fingerprints of inputs, config slice)
+
+Root inputs (problem text, precomputed NLP) are fingerprinted by value;
+every stage output's fingerprint is derived from the key of the stage that
+produced it. Re-running a problem after a config change therefore misses the
+cache only for stages whose config slice changed and the stages downstream
+of them; everything upstream is served from the cache.
+
+Cached outputs are shared, not copied. Stages that modify an input in place
+must list it in ``mutates`` so they receive a private deep copy.
+
+Stages with side effects or non-deterministic results (LLM calls) set
+``cacheable=False``: they run on every execution, and their outputs get a
+fresh fingerprint each time, so every stage downstream of them misses the
+cache as well. ``cacheable`` may also be a predicate on the run's config, for
+stages that are only non-deterministic when an LLM path is enabled.
+
+A StageRun can carry an ``on_stage`` callback (called with a StageRecord when
+a stage starts and when it finishes, for progress reporting) and a
+``cancel_event``; once the event is set no further stage starts and the run
+raises StageCancelled. Stages already running are not interrupted.
+
+Author: Universal STEM Diagram Generator
+Date: November 18, 2025
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+import copy
+import hashlib
+import json
+import logging
+import threading
+import time
+import uuid
+
+
+@dataclass
+class Stage:
+    """One node of the pipeline graph"""
+    name: str
+    fn: Callable[..., Dict[str, Any]]  # fn(context, **inputs) -> {output name: value}
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+    config_keys: Tuple[str, ...] = ()  # PipelineConfig fields that affect the result
+    mutates: Tuple[str, ...] = ()  # Inputs modified in place (passed as deep copies)
+    cacheable: Union[bool, Callable[[Any], bool]] = True  # Or a predicate on the config
+    version: str = "1"  # Bump when the stage's behaviour changes
+
+    def is_cacheable(self, config: Any = None) -> bool:
+        return bool(self.cacheable(config)) if callable(self.cacheable) else bool(self.cacheable)
+
+
+@dataclass
+class StageRecord:
+    """Execution record for one stage in one run"""
+    name: str
+    status: str  # 'running' | 'ran' | 'cached' | 'failed'
+    key: str
+    duration: float = 0.0
+    started_at: float = 0.0
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'status': self.status,
+            'key': self.key[:16],
+            'duration': self.duration,
+            'error': self.error
+        }
+
+
+class StageGraph:
+    """Validated DAG of stages (declaration order is the tie-break order)"""
+
+    def __init__(self, stages: Iterable[Stage], root_inputs: Iterable[str] = ()):
+        self.stages: List[Stage] = list(stages)
+        self.root_inputs: Tuple[str, ...] = tuple(root_inputs)
+        self.by_name: Dict[str, Stage] = {}
+        self.producer: Dict[str, str] = {}
+
+        for stage in self.stages:
+            if stage.name in self.by_name:
+                raise ValueError(f"Duplicate stage name: {stage.name}")
+            self.by_name[stage.name] = stage
+            for output in stage.outputs:
+                if output in self.producer or output in self.root_inputs:
+                    raise ValueError(f"Value '{output}' is produced more than once")
+                self.producer[output] = stage.name
+
+        for stage in self.stages:
+            for name in stage.inputs:
+                if name not in self.producer and name not in self.root_inputs:
+                    raise ValueError(f"Stage '{stage.name}' needs '{name}', which nothing produces")
+
+        self.order: List[str] = self._topological_order()
+
+    def dependencies(self, stage_name: str) -> Set[str]:
+        """Stages whose outputs the given stage reads directly"""
+        return {self.producer[name] for name in self.by_name[stage_name].inputs if name in self.producer}
+
+    def downstream(self, stage_name: str) -> List[str]:
+        """All stages (transitively) affected by a change to the given stage"""
+        affected = {stage_name}
+        for name in self.order:
+            if self.dependencies(name) & affected:
+                affected.add(name)
+        affected.discard(stage_name)
+        return [name for name in self.order if name in affected]
+
+    def _topological_order(self) -> List[str]:
+        order: List[str] = []
+        placed: Set[str] = set()
+        remaining = [stage.name for stage in self.stages]
+        while remaining:
+            ready = [name for name in remaining if self.dependencies(name) <= placed]
+            if not ready:
+                raise ValueError(f"Stage graph has a cycle among: {', '.join(remaining)}")
+            for name in ready:
+                order.append(name)
+                placed.add(name)
+            remaining = [name for name in remaining if name not in placed]
+        return order
+
+
+class StageCache:
+    """Thread-safe LRU of stage outputs keyed by stage key"""
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max(0, max_entries)
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            outputs = self._entries.get(key)
+            if outputs is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return outputs
+
+    def put(self, key: str, outputs: Dict[str, Any]) -> None:
+        if not self.max_entries:
+            return
+        with self._lock:
+            self._entries[key] = outputs
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / lookups) if lookups else 0.0
+            }
+
+
+def fingerprint_value(value: Any) -> str:
+    """Stable digest of a root input (JSON where possible, repr otherwise)"""
+    try:
+        encoded = json.dumps(value, sort_keys=True, default=repr)
+    except (TypeError, ValueError):
+        encoded = repr(value)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class StageCancelled(Exception):
+    """Raised by the executor when a run's cancel_event is set between stages"""
+
+
+class StageRun:
+    """Values and records of one execution (inspectable after a failure)"""
+
+    def __init__(self, graph: StageGraph, roots: Dict[str, Any],
+                 on_stage: Optional[Callable[[StageRecord], None]] = None,
+                 cancel_event: Optional[threading.Event] = None):
+        missing = [name for name in graph.root_inputs if name not in roots]
+        if missing:
+            raise ValueError(f"Missing root inputs: {', '.join(missing)}")
+        self.graph = graph
+        self.values: Dict[str, Any] = dict(roots)
+        self.fingerprints: Dict[str, str] = {name: fingerprint_value(value) for name, value in roots.items()}
+        self.records: Dict[str, StageRecord] = {}
+        self.on_stage = on_stage
+        self.cancel_event = cancel_event
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event is not None and self.cancel_event.is_set()
+
+    def notify(self, record: StageRecord) -> None:
+        """Report a stage event to on_stage (callback errors never fail the run)"""
+        if self.on_stage is None:
+            return
+        try:
+            self.on_stage(record)
+        except Exception as exc:
+            logging.getLogger(__name__).warning(f"on_stage callback failed for {record.name}: {exc}")
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self.values.get(name, default)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Records in graph order"""
+        return [self.records[name].to_dict() for name in self.graph.order if name in self.records]
+
+
+class StageExecutor:
+    """
+    Runs a StageGraph with memoization and bounded concurrency.
+
+    The first stage exception cancels stages that have not started, waits for
+    running ones, and is re-raised unchanged.
+    """
+
+    def __init__(self, cache: Optional[StageCache] = None, max_workers: int = 4):
+        self.cache = cache
+        self.max_workers = max(1, max_workers)
+        self.logger = logging.getLogger(__name__)
+
+    def stage_key(self, stage: Stage, run: StageRun, config: Any = None) -> str:
+        digest = hashlib.sha256()
+        digest.update(f"{stage.name}@{stage.version}\n".encode('utf-8'))
+        for name in stage.inputs:
+            digest.update(f"in:{name}={run.fingerprints[name]}\n".encode('utf-8'))
+        for name in stage.config_keys:
+            digest.update(f"cfg:{name}={getattr(config, name, None)!r}\n".encode('utf-8'))
+        return digest.hexdigest()
+
+    def execute(self, run: StageRun, context: Any = None, config: Any = None) -> StageRun:
+        graph = run.graph
+        if self.max_workers == 1:
+            for name in graph.order:
+                self._complete(run, graph.by_name[name], config, *self._run_stage(run, graph.by_name[name], context, config))
+            return run
+
+        done: Set[str] = set()
+        running: Dict[Any, Stage] = {}
+        failure: Optional[BaseException] = None
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pipeline-stage") as pool:
+            while True:
+                if failure is None:
+                    active = {stage.name for stage in running.values()}
+                    for name in graph.order:
+                        if name in done or name in active:
+                            continue
+                        if graph.dependencies(name) <= done:
+                            stage = graph.by_name[name]
+                            running[pool.submit(self._run_stage, run, stage, context, config)] = stage
+                if not running:
+                    break
+                finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    stage = running.pop(future)
+                    try:
+                        self._complete(run, stage, config, *future.result())
+                        done.add(stage.name)
+                    except BaseException as exc:  # re-raised below once running stages settle
+                        if failure is None:
+                            failure = exc
+        if failure is not None:
+            raise failure
+        return run
+
+    def _run_stage(self, run: StageRun, stage: Stage, context: Any, config: Any) -> Tuple[str, Dict[str, Any], bool, float, float]:
+        if run.cancelled:
+            raise StageCancelled(f"Run cancelled before stage '{stage.name}'")
+        key = self.stage_key(stage, run, config)
+        started = time.time()
+        cacheable = stage.is_cacheable(config)
+        if cacheable and self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return key, cached, True, started, 0.0
+
+        run.notify(StageRecord(name=stage.name, status='running', key=key, started_at=started))
+        kwargs = {name: run.values[name] for name in stage.inputs}
+        for name in stage.mutates:
+            kwargs[name] = copy.deepcopy(kwargs[name])
+        try:
+            outputs = stage.fn(context, **kwargs) or {}
+        except BaseException as exc:
+            run.records[stage.name] = StageRecord(
+                name=stage.name, status='failed', key=key, started_at=started,
+                duration=time.time() - started, error=f"{type(exc).__name__}: {exc}"
+            )
+            run.notify(run.records[stage.name])
+            raise
+        missing = [name for name in stage.outputs if name not in outputs]
+        if missing:
+            raise ValueError(f"Stage '{stage.name}' did not produce: {', '.join(missing)}")
+        outputs = {name: outputs[name] for name in stage.outputs}
+        if cacheable and self.cache is not None:
+            self.cache.put(key, outputs)
+        return key, outputs, False, started, time.time() - started
+
+    def _complete(self, run: StageRun, stage: Stage, config: Any, key: str, outputs: Dict[str, Any],
+                  cached: bool, started: float, duration: float) -> None:
+        # Non-cacheable outputs may differ between runs with the same key
+        origin = key if stage.is_cacheable(config) else f"{key}:{uuid.uuid4().hex}"
+        for name, value in outputs.items():
+            run.values[name] = value
+            run.fingerprints[name] = hashlib.sha256(f"{origin}:{name}".encode('utf-8')).hexdigest()
+        run.records[stage.name] = StageRecord(
+            name=stage.name, status='cached' if cached else 'ran', key=key,
+            started_at=started, duration=duration
+        )
+        run.notify(run.records[stage.name])
+        if cached:
+            self.logger.debug(f"Stage {stage.name} served from cache ({key[:12]})")
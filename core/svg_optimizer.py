@@ -5,16 +5,78 @@ SVG Optimizer
 Post-processing optimization for generated SVG diagrams.
 Reduces file size and improves rendering performance.
 
-Uses svgo (Node.js) or scour (Python) when available.
+The builtin backend is a pure-Python pass that runs in-process (no
+subprocess per diagram); svgo (Node.js) and scour (Python) can be
+selected explicitly and fall back to builtin when not installed. Results are cached by content hash, so re-optimizing
+an SVG that was already seen costs one dictionary lookup.
 
 Author: Universal STEM Diagram Generator
 Date: November 12, 2025
 """
 
-from typing import Optional, Dict, Any
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Set
+import hashlib
+import json
 import re
+import shutil
 import subprocess
 import logging
+import threading
+
+from core.svg_stream import DEFAULT_ATTRIBUTES, VERBATIM_ATTRIBUTES, format_number
+
+
+_DECIMAL = re.compile(r'-?\d*\.\d+(?:[eE][-+]?\d+)?')
+_TOKEN = re.compile(r'(<!\[CDATA\[.*?\]\]>|<[^>]*>)', re.DOTALL)
+_TAG = re.compile(r'<(/?)([\w:.-]+)(.*?)(/?)>$', re.DOTALL)
+_ATTRIBUTE = re.compile(r'([\w:.-]+)\s*=\s*("[^"]*"|\'[^\']*\')')
+_REFERENCE = re.compile(r'#([\w.:-]+)')
+_LONG_HEX = re.compile(r'^#([0-9a-fA-F])\1([0-9a-fA-F])\2([0-9a-fA-F])\3$')
+_COLOR_ATTRIBUTES = frozenset({'fill', 'stroke', 'stop-color', 'color', 'flood-color', 'lighting-color'})
+_DROPPED_ELEMENTS = frozenset({'metadata'})
+_DEFAULT_VALUES = {name: '1' for name in DEFAULT_ATTRIBUTES}
+
+
+class _ResultCache:
+    """Thread-safe LRU of optimized SVG keyed by content hash"""
+
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return value
+
+    def put(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+# Shared by every SVGOptimizer in the process (optimize_svg() builds a new one per call)
+OPTIMIZED_SVG_CACHE = _ResultCache()
 
 
 class SVGOptimizer:
@@ -22,39 +84,39 @@ class SVGOptimizer:
     SVG optimization using external tools or built-in methods
 
     Supported backends:
-    - svgo: Node.js-based optimizer (best quality)
-    - scour: Python-based optimizer
-    - builtin: Simple regex-based cleanup (fallback)
+    - svgo: Node.js-based optimizer (one process per uncached SVG)
+    - scour: Python-based optimizer (re-parses the document)
+    - builtin: In-process pure-Python optimizer (default)
     """
 
-    def __init__(self, backend: str = "auto"):
+    def __init__(self, backend: str = "auto", cache: Optional[_ResultCache] = OPTIMIZED_SVG_CACHE):
         """
         Initialize SVG optimizer
 
         Args:
             backend: Optimization backend ('svgo', 'scour', 'builtin', 'auto')
+            cache: Result cache keyed by content hash (None disables caching)
         """
         self.logger = logging.getLogger(__name__)
         self.backend = backend
+        self.cache = cache
 
         if backend == "auto":
-            # Auto-detect available backend
-            if self._check_svgo():
-                self.backend = "svgo"
-            elif self._check_scour():
-                self.backend = "scour"
-            else:
-                self.backend = "builtin"
+            # The builtin pass runs in-process, so production use adds no
+            # subprocess per request; svgo/scour must be asked for explicitly
+            self.backend = "builtin"
+        elif backend == "svgo" and not self._check_svgo():
+            self.logger.warning("svgo not found on PATH; using builtin SVG optimizer")
+            self.backend = "builtin"
+        elif backend == "scour" and not self._check_scour():
+            self.logger.warning("scour not installed; using builtin SVG optimizer")
+            self.backend = "builtin"
 
         self.logger.info(f"SVG optimizer initialized with backend: {self.backend}")
 
     def _check_svgo(self) -> bool:
-        """Check if svgo is available"""
-        try:
-            subprocess.run(['svgo', '--version'], capture_output=True, timeout=2)
-            return True
-        except (FileNotFoundError, subprocess.TimeoutExpired):
-            return False
+        """Check if svgo is available (PATH lookup, no process spawned)"""
+        return shutil.which('svgo') is not None
 
     def _check_scour(self) -> bool:
         """Check if scour is available"""
@@ -82,45 +144,49 @@ class SVGOptimizer:
         """
         options = options or {}
 
+        key = None
+        if self.cache is not None:
+            key = self._cache_key(svg_content, options)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
         try:
             if self.backend == "svgo":
-                return self._optimize_svgo(svg_content, options)
+                optimized = self._optimize_svgo(svg_content, options)
             elif self.backend == "scour":
-                return self._optimize_scour(svg_content, options)
+                optimized = self._optimize_scour(svg_content, options)
             else:
-                return self._optimize_builtin(svg_content, options)
+                optimized = self._optimize_builtin(svg_content, options)
 
         except Exception as e:
             self.logger.error(f"SVG optimization failed: {e}")
             return svg_content  # Return original on error
 
-    def _optimize_svgo(self, svg: str, options: Dict) -> str:
-        """Optimize using svgo"""
-        try:
-            # Write to temp file
-            import tempfile
-            import os
+        if key is not None:
+            self.cache.put(key, optimized)
+        return optimized
 
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.svg', delete=False) as f:
-                f.write(svg)
-                temp_path = f.name
+    def _cache_key(self, svg: str, options: Dict[str, Any]) -> str:
+        digest = hashlib.sha256(svg.encode('utf-8'))
+        digest.update(f"|{self.backend}|{json.dumps(options, sort_keys=True, default=str)}".encode('utf-8'))
+        return digest.hexdigest()
 
-            # Run svgo
+    def _optimize_svgo(self, svg: str, options: Dict) -> str:
+        """Optimize using svgo (SVG piped through stdin/stdout, no temp file)"""
+        try:
             result = subprocess.run(
-                ['svgo', temp_path, '-o', temp_path, '--multipass'],
+                ['svgo', '-i', '-', '-o', '-', '--multipass'],
+                input=svg,
                 capture_output=True,
                 timeout=10,
                 text=True
             )
 
-            if result.returncode == 0:
-                with open(temp_path, 'r') as f:
-                    optimized = f.read()
-                os.unlink(temp_path)
-                return optimized
+            if result.returncode == 0 and result.stdout:
+                return result.stdout
             else:
                 self.logger.warning(f"svgo failed: {result.stderr}")
-                os.unlink(temp_path)
                 return svg
 
         except Exception as e:
@@ -154,40 +220,94 @@ class SVGOptimizer:
 
     def _optimize_builtin(self, svg: str, options: Dict) -> str:
         """
-        Built-in optimization using regex cleanup
-
-        Performs simple optimizations:
-        - Remove comments
-        - Remove unnecessary whitespace
-        - Remove empty groups
-        - Round coordinates to 2 decimal places
+        Built-in optimization in a single pass over the markup
+
+        Performs:
+        - Remove comments, XML declaration, doctype and <metadata>
+        - Remove whitespace-only text between tags
+        - Round numbers (attributes, path data, points, transforms) to
+          `precision` decimal places (default 2)
+        - Drop attributes at their default value (opacity="1", ...)
+        - Shorten hex colors (#ffffff -> #fff)
+        - Remove <defs> children whose id is never referenced
+        - Remove empty groups/defs and unwrap attribute-less groups
         """
-        optimized = svg
-
-        # Remove XML comments
-        optimized = re.sub(r'<!--.*?-->', '', optimized, flags=re.DOTALL)
-
-        # Remove unnecessary whitespace between tags
-        optimized = re.sub(r'>\s+<', '><', optimized)
-
-        # Remove empty groups
-        optimized = re.sub(r'<g[^>]*>\s*</g>', '', optimized)
-
-        # Round coordinates to 2 decimal places (reduces file size)
-        def round_number(match):
-            try:
-                num = float(match.group(1))
-                return f'"{round(num, 2)}'
-            except:
-                return match.group(0)
-
-        optimized = re.sub(r'"([\d.]+)', round_number, optimized)
-
-        # Remove trailing zeros after decimal point
-        optimized = re.sub(r'(\d+\.\d*?)0+(["\s,])', r'\1\2', optimized)
-        optimized = re.sub(r'(\d+)\.0(["\s,])', r'\1\2', optimized)
-
-        return optimized
+        precision = int(options.get('precision', 2))
+        svg = re.sub(r'<!--.*?-->|<\?xml.*?\?>|<!DOCTYPE[^>]*>', '', svg, flags=re.DOTALL)
+        referenced = self._referenced_ids(svg)
+
+        def round_match(match):
+            return format_number(float(match.group(0)), precision)
+
+        out: List[Optional[str]] = []
+        stack: List[tuple] = []  # (tag, index of start tag in out, unwrap)
+        skip_depth = 0
+        for token in _TOKEN.split(svg):
+            if not token:
+                continue
+            if token[0] != '<' or token.startswith('<![CDATA['):
+                if not skip_depth and (token.strip() or (stack and stack[-1][0] in ('text', 'tspan'))):
+                    out.append(token)
+                continue
+            match = _TAG.match(token)
+            if match is None:
+                if not skip_depth:
+                    out.append(token)
+                continue
+            closing, tag, body, self_closing = match.groups()
+
+            if skip_depth:
+                if closing:
+                    skip_depth -= 1
+                elif not self_closing:
+                    skip_depth += 1
+                continue
+
+            if closing:
+                if not stack:
+                    out.append(token)
+                    continue
+                open_tag, index, unwrap = stack.pop()
+                if open_tag in ('g', 'defs') and index == len(out) - 1:
+                    out.pop()  # Empty group/defs
+                elif unwrap:
+                    out[index] = None
+                else:
+                    out.append(token)
+                continue
+
+            attributes = {}
+            for name, quoted in _ATTRIBUTE.findall(body):
+                value = quoted[1:-1]
+                if name in _DEFAULT_VALUES and value.strip() == _DEFAULT_VALUES[name]:
+                    continue
+                if name not in VERBATIM_ATTRIBUTES and '.' in value:
+                    value = _DECIMAL.sub(round_match, value)
+                if name in _COLOR_ATTRIBUTES:
+                    value = _LONG_HEX.sub(r'#\1\2\3', value)
+                attributes[name] = value
+
+            parent = stack[-1][0] if stack else None
+            unused_def = parent == 'defs' and 'id' in attributes and attributes['id'] not in referenced
+            if tag in _DROPPED_ELEMENTS or unused_def:
+                if not self_closing:
+                    skip_depth = 1
+                continue
+            if self_closing and tag in ('g', 'defs'):
+                continue
+
+            serialized = ''.join(f" {name}='{value}'" if '"' in value else f' {name}="{value}"'
+                                 for name, value in attributes.items())
+            out.append(f'<{tag}{serialized}{"/" if self_closing else ""}>')
+            if not self_closing:
+                stack.append((tag, len(out) - 1, tag == 'g' and not attributes))
+
+        return ''.join(token for token in out if token is not None)
+
+    @staticmethod
+    def _referenced_ids(svg: str) -> Set[str]:
+        """Ids that may be referenced (url(#id), href="#id", CSS selectors)"""
+        return {match.group(1) for match in _REFERENCE.finditer(svg)}
 
     def get_optimization_stats(self, original: str, optimized: str) -> Dict[str, Any]:
         """
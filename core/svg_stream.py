@@ -0,0 +1,299 @@
+"""
+Streaming SVG Writer
+====================
+
+Single SVG emitter shared by the renderers. Elements are written straight
+to a buffer or any file-like object (file, socket wrapper, HTTP response
+body) instead of being collected as string fragments or an ElementTree
+and serialized - and re-parsed by scour - afterwards.
+
+Optimizations happen while emitting, so no post-pass has to re-parse
+the document:
+- numbers are formatted once at a fixed precision (numeric values and the
+  decimals inside path data, points and transforms)
+- attributes at their default value (opacity="1", ...) are dropped
+- <defs> entries are deduplicated by id
+- runs of sibling leaf elements sharing the same inheritable presentation
+  attributes are merged under one <g> that carries them
+- text and attribute values are XML-escaped
+
+Example:
+    >>> writer = SVGStreamWriter(out=response_body)
+    >>> writer.open_svg(1200, 800)
+    >>> writer.element('circle', cx=10.0, cy=20.25, r=5, fill='red')
+    >>> writer.close()
+
+Author: Universal STEM Diagram Generator
+Date: November 18, 2025
+"""
+
+import numbers
+import re
+from typing import Any, Callable, Dict, List, Optional, Set, TextIO, Tuple
+
+
+SVG_NAMESPACE = "http://www.w3.org/2000/svg"
+
+# Presentation attributes a child inherits from its <g>; only these are merged
+INHERITED_ATTRIBUTES = frozenset({
+    'fill', 'fill-opacity', 'fill-rule', 'stroke', 'stroke-width', 'stroke-opacity',
+    'stroke-dasharray', 'stroke-linecap', 'stroke-linejoin',
+    'font-family', 'font-size', 'font-style', 'font-weight', 'text-anchor',
+})
+DEFAULT_ATTRIBUTES = {'opacity': 1.0, 'fill-opacity': 1.0, 'stroke-opacity': 1.0}
+# Values that are names, never rounded
+VERBATIM_ATTRIBUTES = frozenset({'id', 'class', 'href', 'xlink:href', 'version', 'xmlns'})
+
+_DEFAULT_TEXT = {name: '1' for name in DEFAULT_ATTRIBUTES}
+
+MAX_MERGE_RUN = 256  # Bounds how much a style run buffers before it is written
+
+_DECIMAL = re.compile(r'-?\d*\.\d+(?:[eE][-+]?\d+)?')
+_ATTRIBUTE_ESCAPES = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'})
+_TEXT_ESCAPES = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;'})
+
+
+def _keyword_name(name: str) -> str:
+    converted = _KEYWORD_NAMES.get(name)
+    if converted is None:
+        converted = _KEYWORD_NAMES[name] = name.rstrip('_').replace('_', '-')
+    return converted
+
+
+_KEYWORD_NAMES: Dict[str, str] = {}
+
+
+def format_number(value: Any, precision: int = 2) -> str:
+    """Fixed-precision number without trailing zeros ('-0' becomes '0')"""
+    if isinstance(value, numbers.Integral):
+        return str(int(value))
+    text = f"{float(value):.{precision}f}"
+    if '.' in text:
+        text = text.rstrip('0').rstrip('.')
+    return '0' if text == '-0' else text
+
+
+class SVGStreamWriter:
+    """
+    Incremental SVG emitter
+
+    Output is buffered in small chunks and written to `out` whenever
+    chunk_size characters are pending (or on flush/close). Without `out`
+    the document is kept in memory and returned by getvalue().
+    """
+
+    def __init__(self,
+                 out: Optional[TextIO] = None,
+                 precision: int = 2,
+                 optimize: bool = True,
+                 indent: Optional[str] = None,
+                 chunk_size: int = 65536):
+        """
+        Args:
+            out: File-like object with write(str); None keeps the output in memory
+            precision: Decimal places for emitted numbers
+            optimize: Drop default attributes and merge shared styles into groups
+            indent: Pretty-print with this indent string (None = compact)
+            chunk_size: Pending characters before they are written to `out`
+        """
+        self.out = out
+        self.precision = precision
+        self.optimize = optimize
+        self.indent = indent
+        self.chunk_size = chunk_size
+        self._parts: List[str] = []
+        self._pending = 0
+        self._stack: List[str] = []
+        self._defined: Set[str] = set()
+        self._run: List[Tuple[str, Dict[str, str], Optional[str]]] = []
+        self._run_key: Optional[Tuple[Tuple[str, str], ...]] = None
+        self._started = False
+        self._float_format = f"%.{precision}f"
+
+    # ========== Document structure ==========
+
+    def declaration(self) -> None:
+        self._write('<?xml version="1.0" ?>')
+        self._started = True
+
+    def open_svg(self, width: Any, height: Any, attrs: Optional[Dict[str, Any]] = None, **extra) -> None:
+        """Start the root <svg> element"""
+        attributes = {'width': width, 'height': height, 'xmlns': SVG_NAMESPACE}
+        attributes.update(attrs or {})
+        self.start('svg', attributes, **extra)
+
+    def start(self, tag: str, attrs: Optional[Dict[str, Any]] = None, **extra) -> None:
+        """Open an element that will get children"""
+        self._flush_run()
+        self._newline(len(self._stack))
+        self._write(f'<{tag}{self._serialize(self._attributes(attrs, extra))}>')
+        self._stack.append(tag)
+
+    def end(self) -> None:
+        """Close the innermost open element"""
+        self._flush_run()
+        tag = self._stack.pop()
+        self._newline(len(self._stack))
+        self._write(f'</{tag}>')
+
+    def element(self, tag: str, attrs: Optional[Dict[str, Any]] = None, text: Optional[str] = None, **extra) -> None:
+        """Write a leaf element (optionally with text content)"""
+        attributes = self._attributes(attrs, extra)
+        if not self.optimize:
+            self._write_element(tag, attributes, text, len(self._stack))
+            return
+        key = tuple(sorted(item for item in attributes.items() if item[0] in INHERITED_ATTRIBUTES))
+        if self._run and (key != self._run_key or len(self._run) >= MAX_MERGE_RUN):
+            self._flush_run()
+        self._run_key = key
+        self._run.append((tag, attributes, text))
+
+    def text(self, content: Any) -> None:
+        """Character data inside the innermost open element"""
+        self._flush_run()
+        self._write(str(content).translate(_TEXT_ESCAPES))
+
+    def raw(self, fragment: str) -> None:
+        """Pre-serialized markup, written verbatim"""
+        if fragment:
+            self._flush_run()
+            self._newline(len(self._stack))
+            self._write(fragment)
+
+    def comment(self, content: str) -> None:
+        if not self.optimize:
+            self._flush_run()
+            self._newline(len(self._stack))
+            self._write(f'<!-- {content} -->')
+
+    def define(self, def_id: str, emit: Callable[['SVGStreamWriter'], None]) -> bool:
+        """
+        Emit a <defs> entry unless one with this id was already written
+
+        emit(writer) writes the definition; it is wrapped in <defs> unless
+        a <defs> element is already open.
+
+        Returns:
+            True if the definition was written
+        """
+        if def_id in self._defined:
+            return False
+        self._defined.add(def_id)
+        wrap = not self._stack or self._stack[-1] != 'defs'
+        if wrap:
+            self.start('defs')
+        emit(self)
+        if wrap:
+            self.end()
+        return True
+
+    def close(self) -> None:
+        """Close every open element and flush to `out`"""
+        while self._stack:
+            self.end()
+        self._flush_run()
+        self.flush()
+
+    # ========== Output ==========
+
+    def drain(self) -> str:
+        """Take the text written since the last drain/flush"""
+        chunk = ''.join(self._parts)
+        self._parts.clear()
+        self._pending = 0
+        return chunk
+
+    def flush(self) -> None:
+        if self.out is not None and self._parts:
+            self.out.write(self.drain())
+
+    def getvalue(self) -> str:
+        """The whole document (in-memory writers only)"""
+        if self.out is not None:
+            raise ValueError("getvalue() is only available when writing to memory")
+        self._flush_run()
+        return ''.join(self._parts)
+
+    @property
+    def pending(self) -> int:
+        """Characters buffered and not yet drained"""
+        return self._pending
+
+    # ========== Internals ==========
+
+    def _write(self, text: str) -> None:
+        self._parts.append(text)
+        self._pending += len(text)
+        if self.out is not None and self._pending >= self.chunk_size:
+            self.flush()
+
+    def _newline(self, depth: int) -> None:
+        if self.indent is not None:
+            if self._started:
+                self._write('\n' + self.indent * depth)
+            self._started = True
+
+    def _attributes(self, attrs: Optional[Dict[str, Any]], extra: Dict[str, Any]) -> Dict[str, str]:
+        """Format values once; keyword names map stroke_width -> stroke-width, class_ -> class"""
+        result: Dict[str, str] = {}
+        items = list(attrs.items()) if attrs else []
+        for name, value in extra.items():
+            items.append((_keyword_name(name), value))
+        optimize = self.optimize
+        for name, value in items:
+            kind = type(value)
+            if kind is str:
+                text = value
+                if '.' in text and name not in VERBATIM_ATTRIBUTES:
+                    text = _DECIMAL.sub(self._round_match, text)
+            elif kind is float:
+                text = self._float_format % value
+                if '.' in text:
+                    text = text.rstrip('0').rstrip('.')
+                if text == '-0':
+                    text = '0'
+            elif kind is int:
+                text = str(value)
+            elif value is None:
+                continue
+            elif isinstance(value, numbers.Real) and not isinstance(value, bool):
+                text = format_number(value, self.precision)
+            else:
+                text = str(value)
+            if optimize and name in _DEFAULT_TEXT and _DEFAULT_TEXT[name] == text:
+                continue
+            result[name] = text
+        return result
+
+    def _round_match(self, match: 're.Match') -> str:
+        return format_number(float(match.group(0)), self.precision)
+
+    @staticmethod
+    def _serialize(attributes: Dict[str, str]) -> str:
+        return ''.join(f' {name}="{value.translate(_ATTRIBUTE_ESCAPES)}"' for name, value in attributes.items())
+
+    def _write_element(self, tag: str, attributes: Dict[str, str], text: Optional[str], depth: int) -> None:
+        self._newline(depth)
+        if text is None or text == '':
+            self._write(f'<{tag}{self._serialize(attributes)}/>')
+        else:
+            self._write(f'<{tag}{self._serialize(attributes)}>{str(text).translate(_TEXT_ESCAPES)}</{tag}>')
+
+    def _flush_run(self) -> None:
+        if not self._run:
+            return
+        run, key = self._run, self._run_key
+        self._run, self._run_key = [], None
+        depth = len(self._stack)
+        if len(run) > 1 and key:
+            shared = dict(key)
+            self._newline(depth)
+            self._write(f'<g{self._serialize(shared)}>')
+            for tag, attributes, text in run:
+                own = {name: value for name, value in attributes.items() if name not in shared}
+                self._write_element(tag, own, text, depth + 1)
+            self._newline(depth)
+            self._write('</g>')
+        else:
+            for tag, attributes, text in run:
+                self._write_element(tag, attributes, text, depth)
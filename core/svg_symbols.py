@@ -0,0 +1,82 @@
+"""
+Glyph Symbol Reuse
+==================
+
+Shared pieces for the renderers' symbol mode: every distinct glyph shape
+(type + size + style) is defined once as a <symbol> in <defs> and each
+instance is a <use transform="translate(x y)">, instead of re-emitting
+the full geometry per component.
+
+- symbol_id(): stable id derived from the glyph key, so the same shape
+  gets the same id in every document
+- GlyphFragmentCache: thread-safe LRU of built glyph fragments, shared by
+  all renderer instances so fragments are reused within and across
+  requests (GLYPH_FRAGMENTS is the process-wide instance)
+
+Symbols are emitted with overflow="visible" because glyph geometry is
+drawn around its anchor and may extend to negative coordinates.
+
+Author: Universal STEM Diagram Generator
+Date: November 18, 2025
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+LABEL_PLACEHOLDER = "\x00label\x00"  # Marks label text in templates built at the origin
+
+
+def symbol_id(kind: str, key: Hashable) -> str:
+    """Deterministic <symbol> id for a glyph key"""
+    digest = hashlib.sha1(repr((kind, key)).encode('utf-8')).hexdigest()[:12]
+    return f"sym-{kind.lower()}-{digest}"
+
+
+def hashable_key(*parts: Any) -> Optional[tuple]:
+    """Tuple key for a glyph, or None when a part cannot be hashed (no reuse then)"""
+    key = tuple(tuple(part) if isinstance(part, list) else part for part in parts)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+class GlyphFragmentCache:
+    """LRU of glyph fragments keyed by (type, size, style)"""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+        value = build()
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = value
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+GLYPH_FRAGMENTS = GlyphFragmentCache()
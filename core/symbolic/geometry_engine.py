@@ -51,6 +51,7 @@ class Rectangle:
     y: float
     width: float
     height: float
+    id: Optional[str] = None  # Caller tag, carried through packing
 
     @property
     def left(self) -> float:
@@ -401,7 +402,7 @@ class GeometryEngine:
 
             if position:
                 # Create packed rectangle at found position
-                packed_rect = Rectangle(position[0], position[1], rect.width, rect.height)
+                packed_rect = Rectangle(position[0], position[1], rect.width, rect.height, rect.id)
                 packed.append(packed_rect)
             else:
                 # Could not pack this rectangle
@@ -423,41 +424,76 @@ class GeometryEngine:
                      rectangles: List[Rectangle],
                      canvas: Rectangle,
                      margin: float) -> PackingResult:
-        """Pack rectangles using skyline algorithm"""
-        # Simplified skyline: maintain y-levels
-        sorted_rects = sorted(rectangles, key=lambda r: r.height, reverse=True)
+        """
+        Pack rectangles using the skyline bottom-left heuristic
 
-        packed = []
-        current_x = canvas.left + margin
-        current_y = canvas.top + margin
-        row_height = 0
+        The skyline is a list of [x, y, width] segments giving the lowest free
+        y over each x span. Rectangles are placed tallest first at the spot
+        with the smallest resulting bottom edge (ties: leftmost). Packed
+        rectangles are returned in input order; ones that don't fit are dropped.
+        """
+        left = canvas.left + margin
+        right = canvas.right - margin
+        bottom = canvas.bottom - margin
+        skyline: List[List[float]] = [[left, canvas.top + margin, right - left]]
+
+        order = sorted(range(len(rectangles)),
+                       key=lambda i: (rectangles[i].height, rectangles[i].width), reverse=True)
+        placed: Dict[int, Rectangle] = {}
+
+        for index in order:
+            rect = rectangles[index]
+            best = None  # (bottom edge, x, segment index, y)
+            for i in range(len(skyline)):
+                x = skyline[i][0]
+                if x + rect.width > right + 1e-9:
+                    break
+                # Highest skyline level under [x, x + width)
+                y = skyline[i][1]
+                j = i
+                span_end = x + rect.width
+                while j < len(skyline) and skyline[j][0] < span_end - 1e-9:
+                    y = max(y, skyline[j][1])
+                    j += 1
+                if y + rect.height > bottom + 1e-9:
+                    continue
+                candidate = (y + rect.height, x, i, y)
+                if best is None or candidate[:2] < best[:2]:
+                    best = candidate
 
-        for rect in sorted_rects:
-            # Try to place in current row
-            if current_x + rect.width + margin <= canvas.right:
-                # Fits in current row
-                packed_rect = Rectangle(current_x, current_y, rect.width, rect.height)
-                packed.append(packed_rect)
+            if best is None:
+                if self.verbose:
+                    self.logger.warning(f"Skyline packing: no room for {rect.width}x{rect.height}")
+                continue
 
-                current_x += rect.width + margin
-                row_height = max(row_height, rect.height)
-            else:
-                # Start new row
-                current_y += row_height + margin
-                current_x = canvas.left + margin
-                row_height = rect.height
-
-                if current_y + rect.height + margin <= canvas.bottom:
-                    packed_rect = Rectangle(current_x, current_y, rect.width, rect.height)
-                    packed.append(packed_rect)
-                    current_x += rect.width + margin
-                else:
-                    # Out of vertical space
-                    if self.verbose:
-                        self.logger.warning(f"Out of vertical space for {rect.width}x{rect.height}")
+            _, x, i, y = best
+            placed[index] = Rectangle(x, y, rect.width, rect.height, rect.id)
+            self._raise_skyline(skyline, i, x, min(rect.width + margin, right - x), y + rect.height + margin)
 
+        packed = [placed[i] for i in sorted(placed)]
         return self._calculate_packing_stats(packed, canvas)
 
+    def _raise_skyline(self, skyline: List[List[float]], start: int, x: float, width: float, level: float) -> None:
+        """Cover [x, x + width) of the skyline with a segment at the given level"""
+        end = x + width
+        segments = skyline[:start]
+        segments.append([x, level, width])
+        for seg_x, seg_y, seg_w in skyline[start:]:
+            seg_end = seg_x + seg_w
+            if seg_end <= end + 1e-9:
+                continue  # fully covered
+            if seg_x < end:
+                seg_x, seg_w = end, seg_end - end  # trim the covered prefix
+            segments.append([seg_x, seg_y, seg_w])
+
+        # Merge neighbours at the same level
+        skyline.clear()
+        for segment in segments:
+            if skyline and abs(skyline[-1][1] - segment[1]) < 1e-9:
+                skyline[-1][2] += segment[2]
+            else:
+                skyline.append(segment)
+
     def _calculate_packing_stats(self, packed: List[Rectangle], canvas: Rectangle) -> PackingResult:
         """Calculate packing statistics"""
         if not packed:
@@ -8,6 +8,8 @@ import math
 from typing import Dict, List, Tuple, Optional, Any
 from core.scene.schema_v1 import Scene, SceneObject, Constraint, ConstraintType, PrimitiveType
 from core.universal_ai_analyzer import CanonicalProblemSpec, PhysicsDomain
+from core.spatial_index import SceneSpatialIndex
+from core.layout_cache import LayoutFingerprint, LayoutSolutionCache, fingerprint_layout
 
 try:
     from core.solvers.z3_layout_solver import Z3LayoutSolver
@@ -31,6 +33,15 @@ except Exception:
     SimplexSolver = None
     Variable = None
 
+try:
+    from core.solvers.relaxation_solver import VectorizedRelaxationSolver, NUMPY_AVAILABLE as VECTORIZED_RELAXATION_AVAILABLE
+except Exception:
+    VECTORIZED_RELAXATION_AVAILABLE = False
+    VectorizedRelaxationSolver = None
+
+# 'auto' backend switches to the vectorized solver at this many constraints
+VECTORIZED_RELAXATION_MIN_CONSTRAINTS = 32
+
 try:
     from core.label_placer import IntelligentLabelPlacer
     LABEL_PLACER_AVAILABLE = True
@@ -55,13 +66,18 @@ class UniversalLayoutEngine:
     4. Places labels intelligently
     """
 
-    def __init__(self, width: int = 1200, height: int = 800):
+    def __init__(self, width: int = 1200, height: int = 800, relaxation_backend: str = "auto",
+                 layout_cache: Optional[LayoutSolutionCache] = None):
         """
         Initialize Universal Layout Engine
 
         Args:
             width: Canvas width in pixels
             height: Canvas height in pixels
+            relaxation_backend: Constraint relaxation in Step 3 - 'python' (per-constraint),
+                'numpy' (vectorized), or 'auto' (numpy for large constraint sets)
+            layout_cache: Optional LayoutSolutionCache for Step 2; scenes that match a
+                solved one up to object renaming reuse its positions
         """
         self.width = width
         self.height = height
@@ -72,11 +88,20 @@ class UniversalLayoutEngine:
         print(f"   Canvas: {width}x{height}")
         print(f"   Center: {self.center}")
 
-        self.z3_solver = Z3LayoutSolver() if Z3_LAYOUT_AVAILABLE else None
+        self.z3_solver = Z3LayoutSolver(incremental=True) if Z3_LAYOUT_AVAILABLE else None
         self.sympy_solver = SymPyLayoutSolver() if SYMPY_LAYOUT_AVAILABLE else None
         self.cassowary_solver_cls = SimplexSolver if CASSOWARY_AVAILABLE else None
         self.label_placer = IntelligentLabelPlacer(canvas_width=width, canvas_height=height) if LABEL_PLACER_AVAILABLE else None
         self._solver_warning_cache: Dict[str, str] = {}
+        self._scene_index_cache: Optional[Tuple[Scene, SceneSpatialIndex]] = None
+        self.layout_cache = layout_cache
+        self.relaxation_backend = (relaxation_backend or "auto").lower()
+        self.relaxation_solver = (
+            VectorizedRelaxationSolver(canvas_center=self.center)
+            if VECTORIZED_RELAXATION_AVAILABLE and self.relaxation_backend != "python" else None
+        )
+        if self.relaxation_backend == "numpy" and self.relaxation_solver is None:
+            self._warn_solver_unavailable('Vectorized relaxation', 'install numpy; using per-constraint relaxation')
 
     def _get_position_coords(self, obj: SceneObject) -> Tuple[float, float]:
         """Get (x, y) coordinates from position regardless of format (dict or Position object)"""
@@ -157,6 +182,9 @@ class UniversalLayoutEngine:
         print(f"📐 UNIVERSAL LAYOUT ENGINE - Phase 4")
         print(f"{'='*80}\n")
 
+        # Objects may have been replaced since any earlier lookup
+        self._scene_index_cache = None
+
         # Step 1: Domain-aware initial placement (only for objects without positions)
         print("Step 1/6: Domain-Aware Initial Placement")
         self._initial_placement(scene, spec)
@@ -197,6 +225,7 @@ class UniversalLayoutEngine:
         print(f"✅ UNIVERSAL LAYOUT ENGINE COMPLETE")
         print(f"{'='*80}\n")
 
+        self._scene_index_cache = None
         return scene
 
     def _initial_placement(self, scene: Scene, spec: CanonicalProblemSpec):
@@ -468,6 +497,12 @@ class UniversalLayoutEngine:
     def _solve_constraints(self, scene: Scene) -> int:
         """Step 2: Iterative constraint satisfaction"""
 
+        if self._use_vectorized_relaxation(scene):
+            result = self.relaxation_solver.solve(scene)
+            print(f"   ⚡ Vectorized relaxation: {sum(result.compiled.values())} constraints, "
+                  f"max displacement {result.max_displacement:.3g}")
+            return result.iterations
+
         max_iterations = 50
         tolerance = 1e-3
 
@@ -484,12 +519,72 @@ class UniversalLayoutEngine:
 
         return max_iterations
 
+    def _use_vectorized_relaxation(self, scene: Scene) -> bool:
+        if self.relaxation_solver is None or not scene.constraints:
+            return False
+        if self.relaxation_backend == "numpy":
+            return True
+        return self.relaxation_backend == "auto" and len(scene.constraints) >= VECTORIZED_RELAXATION_MIN_CONSTRAINTS
+
     def _apply_advanced_constraint_solvers(self, scene: Scene, spec: CanonicalProblemSpec) -> List[str]:
         """Apply Z3, SymPy, Cassowary passes if available"""
-        applied: List[str] = []
         plan = getattr(spec, 'diagram_plan', None)
         plan_constraints = getattr(plan, 'global_constraints', None) or []
         sympy_constraints = self._collect_sympy_constraints(scene, plan)
+
+        fingerprint = self._solver_fingerprint(scene, plan_constraints, sympy_constraints)
+        if fingerprint is not None:
+            cached = self.layout_cache.get(fingerprint)
+            if cached is not None:
+                self._apply_positions_dict(scene, cached.positions)
+                print(f"   ♻️  Layout cache hit ({fingerprint.key[:12]})")
+                return list(cached.metadata.get('applied', []))
+
+        applied = self._run_advanced_constraint_solvers(scene, plan, plan_constraints, sympy_constraints)
+        if fingerprint is not None and applied:
+            positions = {obj.id: self._get_position_coords(obj) for obj in scene.objects if obj.position}
+            self.layout_cache.put(fingerprint, positions, {'applied': applied})
+        return applied
+
+    def _solver_fingerprint(self, scene: Scene, plan_constraints: List[Any],
+                            sympy_constraints: List[Dict[str, Any]]) -> Optional[LayoutFingerprint]:
+        """Rename-invariant key for Step 2 (inputs include the Step 1 positions)"""
+        if self.layout_cache is None:
+            return None
+        try:
+            dimensions = self._estimate_object_dimensions(scene)
+            constraints = [
+                (constraint.type, list(constraint.objects or []), {'value': constraint.value})
+                for constraint in scene.constraints
+            ]
+            for constraint in plan_constraints:
+                if isinstance(constraint, dict):
+                    constraints.append(('plan:' + str(constraint.get('type', '')), list(constraint.get('objects', [])),
+                                        constraint.get('parameters', {})))
+                else:
+                    constraints.append(('plan:' + str(constraint.type), list(constraint.objects),
+                                        {'parameters': constraint.parameters, 'priority': constraint.priority}))
+            for entry in sympy_constraints:
+                members = [entry[key] for key in ('object', 'object1', 'object2') if entry.get(key)]
+                params = {key: value for key, value in entry.items() if key not in ('object', 'object1', 'object2')}
+                constraints.append(('sympy:' + str(params.pop('type', '')), members, params))
+            solvers = [name for name, available in (('z3', self.z3_solver), ('sympy', self.sympy_solver),
+                                                    ('cassowary', self.cassowary_solver_cls)) if available]
+            return fingerprint_layout(
+                objects=[(obj.id, obj.type, *dimensions[obj.id]) for obj in scene.objects],
+                constraints=constraints,
+                canvas=(self.width, self.height, self.margin),
+                signature="layout_engine.step2;" + ",".join(solvers),
+                positions={obj.id: self._get_position_coords(obj) for obj in scene.objects if obj.position}
+            )
+        except (AttributeError, KeyError, TypeError, ValueError) as exc:
+            print(f"   ⚠️  Layout cache skipped: {exc}")
+            return None
+
+    def _run_advanced_constraint_solvers(self, scene: Scene, plan: Any, plan_constraints: List[Any],
+                                         sympy_constraints: List[Dict[str, Any]]) -> List[str]:
+        """Z3 (diagram plan), SymPy (geometric) and Cassowary (alignment/relative) passes"""
+        applied: List[str] = []
         cassowary_required = any(
             constraint.type in (
                 ConstraintType.ALIGNED_H,
@@ -509,7 +604,8 @@ class UniversalLayoutEngine:
             if self.z3_solver:
                 try:
                     object_dims = self._estimate_object_dimensions(scene)
-                    solution = self.z3_solver.solve_layout(plan, object_dims)
+                    hints = {obj.id: self._get_position_coords(obj) for obj in scene.objects if obj.position}
+                    solution = self.z3_solver.solve_layout(plan, object_dims, hints=hints)
                     if solution and getattr(solution, 'satisfiable', False):
                         self._apply_positions_dict(scene, solution.positions)
                         applied.append('z3')
@@ -720,11 +816,22 @@ class UniversalLayoutEngine:
                 self._set_position_coords(obj2, x=center_x + avg_dist)
 
         elif constraint.type == ConstraintType.NO_OVERLAP:
-            # Resolve overlaps by pushing apart
-            for i, oid1 in enumerate(constraint.objects):
-                for oid2 in constraint.objects[i+1:]:
-                    obj1 = self._get_obj(scene, oid1)
-                    obj2 = self._get_obj(scene, oid2)
+            # Resolve overlaps by pushing apart; the spatial index limits each
+            # object's partners to those whose boxes currently intersect it
+            members = [self._get_obj(scene, oid) for oid in constraint.objects]
+            rank: Dict[int, List[int]] = {}
+            for j, member in enumerate(members):
+                if member is not None:
+                    rank.setdefault(id(member), []).append(j)
+            index = self._scene_index(scene)
+            index.refresh()
+            for i, obj1 in enumerate(members):
+                bounds = index.bounds(obj1) if obj1 is not None else None
+                if bounds is None:
+                    continue
+                partners = sorted(j for other in index.query(bounds) for j in rank.get(id(other), ()) if j > i)
+                for j in partners:
+                    obj2 = members[j]
 
                     if self._check_overlap(obj1, obj2):
                         # Push apart along shortest axis
@@ -740,6 +847,7 @@ class UniversalLayoutEngine:
                                 obj2.position.x = (obj2.position.x if obj2.position.x is not None else 0) + dx
                                 obj2.position.y = (obj2.position.y if obj2.position.y is not None else 0) + dy
                             max_displacement = max(max_displacement, abs(dx), abs(dy))
+                            index.update(obj2)
                         except (KeyError, AttributeError) as e:
                             # Skip if position format is incompatible
                             pass
@@ -842,6 +950,9 @@ class UniversalLayoutEngine:
             except Exception as exc:
                 print(f"   ⚠️  IntelligentLabelPlacer failed: {exc}")
 
+        index = self._scene_index(scene)
+        index.refresh()
+
         # For each object with a label, find best position (N, NE, E, SE, S, SW, W, NW)
         for obj in scene.objects:
             label = obj.properties.get('label')
@@ -868,7 +979,7 @@ class UniversalLayoutEngine:
                     label_y = obj_y + dy
 
                     # Check overlap with other objects
-                    overlap = self._count_label_overlaps(label_x, label_y, scene.objects, obj)
+                    overlap = self._count_label_overlaps(label_x, label_y, scene.objects, obj, index=index)
 
                     if overlap < min_overlap:
                         min_overlap = overlap
@@ -1485,15 +1596,37 @@ class UniversalLayoutEngine:
 
     # Helper methods
 
+    def _scene_index(self, scene: Scene) -> SceneSpatialIndex:
+        """Spatial index for the scene being laid out (rebuilt when objects are added or removed)"""
+        cached = self._scene_index_cache
+        if cached is not None and cached[0] is scene and not cached[1].is_stale(scene.objects):
+            return cached[1]
+        index = SceneSpatialIndex.build(scene.objects, self._layout_bounds)
+        self._scene_index_cache = (scene, index)
+        return index
+
+    def _layout_bounds(self, obj: SceneObject) -> Optional[Tuple[float, float, float, float]]:
+        """Box used by the overlap checks: top-left position plus width/height (default 20)"""
+        position = obj.position
+        if not position:
+            return None
+        # Handle both dict and Position object formats
+        if isinstance(position, dict):
+            read = position.get
+        else:
+            read = lambda name: getattr(position, name, None)
+        x = read('x') or 0
+        y = read('y') or 0
+        w = read('width') or 20
+        h = read('height') or 20
+        return (x, y, x + w, y + h)
+
     def _get_obj(self, scene: Scene, obj_id: str) -> Optional[SceneObject]:
         """Get object by ID"""
         # FIX: Add guard for missing objects
         if not obj_id:
             return None
-        for obj in scene.objects:
-            if obj.id == obj_id:
-                return obj
-        return None
+        return self._scene_index(scene).get(obj_id)
 
     def _get_objects(self, scene: Scene, object_ids: List[str]) -> List[SceneObject]:
         """Get multiple objects by a list of IDs, filtering out Nones."""
@@ -1548,11 +1681,15 @@ class UniversalLayoutEngine:
         return math.sqrt((x2 - x1)**2 + (y2 - y1)**2)
 
     def _count_label_overlaps(self, label_x: float, label_y: float,
-                             objects: List[SceneObject], exclude: SceneObject) -> int:
-        """Count overlaps for label at given position"""
+                             objects: List[SceneObject], exclude: SceneObject,
+                             index: Optional[SceneSpatialIndex] = None) -> int:
+        """Count overlaps for label at given position (index narrows the candidates)"""
         overlap_count = 0
         label_size = 30  # Approximate label size
 
+        if index is not None:
+            objects = index.query((label_x, label_y, label_x + label_size, label_y + 15))
+
         for obj in objects:
             if obj == exclude or not obj.position:
                 continue
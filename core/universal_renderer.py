@@ -4,11 +4,14 @@ Merges GenericSVGRenderer + JEEEnhancedRenderer + MultiDomainRenderer
 Uses UniversalGlyphLibrary + domain embellishments
 """
 
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
 from pathlib import Path
 import json
 
+from core.rasterizer import get_rasterizer
 from core.scene.schema_v1 import Scene, SceneObject, PrimitiveType
+from core.svg_stream import SVGStreamWriter
+from core.svg_symbols import GLYPH_FRAGMENTS, hashable_key, symbol_id
 from core.universal_ai_analyzer import CanonicalProblemSpec, PhysicsDomain
 
 
@@ -26,7 +29,8 @@ class UniversalRenderer:
     - Domain embellishments (loaded as data from domains/)
     """
 
-    def __init__(self, width: int = 1200, height: int = 800, domains_path: str = "domains"):
+    def __init__(self, width: int = 1200, height: int = 800, domains_path: str = "domains",
+                 precision: int = 2, optimize: bool = True, use_symbols: bool = False):
         """
         Initialize Universal Renderer
 
@@ -34,9 +38,16 @@ class UniversalRenderer:
             width: Canvas width
             height: Canvas height
             domains_path: Path to domains directory
+            precision: Decimal places for emitted coordinates
+            optimize: Drop default attributes and merge shared styles while emitting
+            use_symbols: Define each distinct glyph shape once as a <symbol> and
+                instantiate it with <use> (much smaller SVGs for repeated components)
         """
         self.width = width
         self.height = height
+        self.precision = precision
+        self.optimize = optimize
+        self.use_symbols = use_symbols
         self.domains_path = Path(domains_path)
 
         # Load universal glyph library
@@ -70,6 +81,28 @@ class UniversalRenderer:
             return self._svg_to_png(svg)
         raise ValueError(f"Unsupported format: {fmt}")
 
+    def write_svg(self, scene: Scene, out: TextIO, spec: CanonicalProblemSpec = None) -> None:
+        """Stream the SVG for a scene into a file-like object (file, response body)"""
+        writer = SVGStreamWriter(out=out, precision=self.precision, optimize=self.optimize)
+        for _ in self._emit_svg(writer, scene, spec):
+            pass
+        writer.close()
+
+    def iter_svg(self, scene: Scene, spec: CanonicalProblemSpec = None, chunk_size: int = 16384) -> Iterator[str]:
+        """
+        Yield the SVG in chunks of roughly chunk_size characters while it is rendered
+
+        Suitable as the body of a streaming HTTP response.
+        """
+        writer = SVGStreamWriter(precision=self.precision, optimize=self.optimize)
+        for _ in self._emit_svg(writer, scene, spec):
+            if writer.pending >= chunk_size:
+                yield writer.drain()
+        writer.close()
+        tail = writer.drain()
+        if tail:
+            yield tail
+
     def _render_svg(self, scene: Scene, spec: CanonicalProblemSpec = None) -> str:
         """
         Render scene to SVG
@@ -79,7 +112,10 @@ class UniversalRenderer:
         2. Render objects using glyphs
         3. Add domain embellishments (field lines, annotations)
         4. Add labels and legend
-        5. Generate final SVG
+        5. Close the document
+
+        Everything is emitted through one SVGStreamWriter, which rounds,
+        deduplicates defs and merges shared styles as it writes.
 
         Args:
             scene: Positioned scene with all objects
@@ -92,37 +128,64 @@ class UniversalRenderer:
         print(f"🎨 UNIVERSAL RENDERER - Phase 5")
         print(f"{'='*80}\n")
 
+        writer = SVGStreamWriter(precision=self.precision, optimize=self.optimize)
+        for _ in self._emit_svg(writer, scene, spec, verbose=True):
+            pass
+        writer.close()
+        svg = writer.getvalue()
+        print(f"   ✅ Generated {len(svg)} bytes of SVG")
+
+        print(f"\n{'='*80}")
+        print(f"✅ UNIVERSAL RENDERER COMPLETE")
+        print(f"{'='*80}\n")
+
+        return svg
+
+    def _emit_svg(self, writer: SVGStreamWriter, scene: Scene, spec: CanonicalProblemSpec = None,
+                  verbose: bool = False) -> Iterator[None]:
+        """Write the document; yields after each top-level element so callers can drain output"""
+
         # Step 1: Apply domain theme
-        print("Step 1/5: Theme Application")
+        if verbose:
+            print("Step 1/5: Theme Application")
         theme = self._apply_theme(scene, spec)
-        print(f"   ✅ Applied: {theme.get('name', 'default')} theme")
+        if verbose:
+            print(f"   ✅ Applied: {theme.get('name', 'default')} theme")
+
+        canvas = theme.get('canvas', {})
+        writer.open_svg(self.width, self.height)
+        self._emit_defs(writer)
+        writer.element('rect', width="100%", height="100%", fill=canvas.get('background', '#ffffff'))
+        yield
 
         # Step 2: Render objects
-        print("\nStep 2/5: Object Rendering")
-        object_svg = self._render_objects(scene, theme)
-        print(f"   ✅ Rendered {len(scene.objects)} objects")
+        if verbose:
+            print("\nStep 2/5: Object Rendering")
+        yield from self._emit_objects(writer, scene, theme)
+        if verbose:
+            print(f"   ✅ Rendered {len(scene.objects)} objects")
 
         # Step 3: Add embellishments
-        print("\nStep 3/5: Domain Embellishments")
-        embellishments_svg = self._add_embellishments(scene, spec, theme)
-        print(f"   ✅ Added domain-specific elements")
+        if verbose:
+            print("\nStep 3/5: Domain Embellishments")
+        self._emit_embellishments(writer, scene, spec, theme)
+        yield
+        if verbose:
+            print(f"   ✅ Added domain-specific elements")
 
         # Step 4: Add labels and legend
-        print("\nStep 4/5: Labels and Legend")
-        labels_svg = self._render_labels(scene, theme)
-        legend_svg = self._render_legend(scene, theme)
-        print(f"   ✅ Added labels and legend")
-
-        # Step 5: Assemble final SVG
-        print("\nStep 5/5: SVG Assembly")
-        svg = self._assemble_svg(scene, theme, object_svg, embellishments_svg, labels_svg, legend_svg)
-        print(f"   ✅ Generated {len(svg)} bytes of SVG")
-
-        print(f"\n{'='*80}")
-        print(f"✅ UNIVERSAL RENDERER COMPLETE")
-        print(f"{'='*80}\n")
-
-        return self._optimize_svg(svg)
+        if verbose:
+            print("\nStep 4/5: Labels and Legend")
+        self._emit_labels(writer, scene, theme)
+        self._emit_legend(writer, scene, theme)
+        yield
+        if verbose:
+            print(f"   ✅ Added labels and legend")
+
+        # Step 5: Close the document
+        if verbose:
+            print("\nStep 5/5: SVG Assembly")
+        writer.end()
 
     def _load_glyph_library(self) -> Dict:
         """Load universal glyph library"""
@@ -233,64 +296,76 @@ class UniversalRenderer:
 
         return theme
 
-    def _render_objects(self, scene: Scene, theme: Dict) -> List[str]:
+    def _emit_objects(self, writer: SVGStreamWriter, scene: Scene, theme: Dict) -> Iterator[None]:
         """Step 2: Render all objects using glyphs"""
 
-        svg_parts = []
-
         for obj in scene.objects:
             if not obj.position:
                 continue  # Skip unpositioned objects
 
             # Get glyph for object type
             glyph = self.glyphs.get(obj.type)
-
-            if glyph:
-                # Render using glyph
-                svg = glyph.render(
-                    position=obj.position,
-                    properties=obj.properties,
-                    style=obj.style or theme.get('components', {})
-                )
-                svg_parts.append(svg)
+            style = obj.style or theme.get('components', {})
+
+            key = glyph.symbol_key(obj.position, obj.properties, style) \
+                if self.use_symbols and hasattr(glyph, 'symbol_key') else None
+
+            if key is not None:
+                self._emit_symbol_use(writer, glyph, key, obj.position, obj.properties, style)
+            elif hasattr(glyph, 'emit'):
+                glyph.emit(writer, obj.position, obj.properties, style)
+            elif glyph:
+                # Glyphs that only produce markup strings
+                writer.raw(glyph.render(position=obj.position, properties=obj.properties, style=style))
             else:
                 # Fallback: generic shape
-                x = obj.position.get('x', 0)
-                y = obj.position.get('y', 0)
-                svg_parts.append(f'<circle cx="{x}" cy="{y}" r="10" fill="gray" opacity="0.5"/>')
-
-        return svg_parts
-
-    def _add_embellishments(self, scene: Scene, spec: CanonicalProblemSpec, theme: Dict) -> List[str]:
+                writer.element('circle', cx=obj.position.get('x', 0), cy=obj.position.get('y', 0), r=10,
+                               fill="gray", opacity=0.5)
+            yield
+
+    def _emit_symbol_use(self, writer: SVGStreamWriter, glyph: 'Glyph', key: tuple,
+                         position: Dict, properties: Dict, style: Dict) -> None:
+        """Instantiate a glyph through its (memoized) <symbol>, defining it on first use"""
+        kind = type(glyph).__name__
+
+        def build() -> Tuple[str, str]:
+            sid = symbol_id(kind, key)
+            fragment = SVGStreamWriter(precision=self.precision, optimize=self.optimize)
+            fragment.start('symbol', id=sid, overflow="visible")
+            glyph.emit(fragment, {**position, 'x': 0, 'y': 0}, properties, style)
+            fragment.close()
+            return sid, fragment.getvalue()
+
+        sid, markup = GLYPH_FRAGMENTS.get_or_build((kind, key, self.precision, self.optimize), build)
+        writer.define(sid, lambda w: w.raw(markup))
+        writer.element('use', href=f"#{sid}",
+                       transform=f"translate({position.get('x', 0)} {position.get('y', 0)})")
+
+    def _emit_embellishments(self, writer: SVGStreamWriter, scene: Scene, spec: CanonicalProblemSpec,
+                             theme: Dict) -> None:
         """Step 3: Add domain-specific embellishments"""
 
-        svg_parts = []
-
         if not spec:
-            return svg_parts
+            return
 
         embellishment_config = self.embellishments.get(spec.domain, {})
 
         # Electrostatics: field lines
         if spec.domain == PhysicsDomain.ELECTROSTATICS and embellishment_config.get('field_lines'):
             charges = [obj for obj in scene.objects if obj.type == PrimitiveType.CHARGE]
-            svg_parts.extend(self._render_field_lines(charges))
+            self._emit_field_lines(writer, charges)
 
         # Circuits: current flow
         if spec.domain == PhysicsDomain.CURRENT_ELECTRICITY and embellishment_config.get('current_flow'):
-            svg_parts.extend(self._render_current_flow(scene))
+            self._emit_current_flow(writer, scene)
 
         # Mechanics: force vectors (already in scene, just ensure visibility)
         if spec.domain == PhysicsDomain.MECHANICS and embellishment_config.get('force_vectors'):
             pass  # Forces already rendered as arrows
 
-        return svg_parts
-
-    def _render_field_lines(self, charges: List[SceneObject]) -> List[str]:
+    def _emit_field_lines(self, writer: SVGStreamWriter, charges: List[SceneObject]) -> None:
         """Render electric field lines between charges"""
 
-        svg_parts = []
-
         for i, charge1 in enumerate(charges):
             for charge2 in charges[i+1:]:
                 if not charge1.position or not charge2.position:
@@ -302,28 +377,18 @@ class UniversalRenderer:
                 y2 = charge2.position.get('y', 0)
 
                 # Draw field line (curved)
-                svg_parts.append(
-                    f'<path d="M {x1} {y1} Q {(x1+x2)/2} {(y1+y2)/2-30} {x2} {y2}" '
-                    f'stroke="#0066cc" stroke-width="1" fill="none" stroke-dasharray="5,5" opacity="0.6"/>'
-                )
+                writer.element('path', d=f"M {x1} {y1} Q {(x1+x2)/2} {(y1+y2)/2-30} {x2} {y2}",
+                               stroke="#0066cc", stroke_width=1, fill="none", stroke_dasharray="5,5", opacity=0.6)
 
-        return svg_parts
-
-    def _render_current_flow(self, scene: Scene) -> List[str]:
+    def _emit_current_flow(self, writer: SVGStreamWriter, scene: Scene) -> None:
         """Render current flow arrows in circuit"""
 
-        svg_parts = []
-
         # Find wires and add current direction arrows
         # TODO: Implement based on circuit topology
 
-        return svg_parts
-
-    def _render_labels(self, scene: Scene, theme: Dict) -> List[str]:
+    def _emit_labels(self, writer: SVGStreamWriter, scene: Scene, theme: Dict) -> None:
         """Step 4: Render labels for all objects"""
 
-        svg_parts = []
-
         label_style = theme.get('labels', {})
         font_size = label_style.get('font_size', 14)
         font_weight = label_style.get('font_weight', 'normal')
@@ -337,25 +402,22 @@ class UniversalRenderer:
                 x = label_pos.get('x', obj.position.get('x', 0))
                 y = label_pos.get('y', obj.position.get('y', 0) - 15)
 
-                svg_parts.append(
-                    f'<text x="{x}" y="{y}" font-size="{font_size}" font-weight="{font_weight}" '
-                    f'fill="{fill}" text-anchor="middle">{label}</text>'
-                )
-
-        return svg_parts
+                writer.element('text', x=x, y=y, font_size=font_size, font_weight=font_weight, fill=fill,
+                               text_anchor="middle", text=label)
 
-    def _render_legend(self, scene: Scene, theme: Dict) -> str:
+    def _emit_legend(self, writer: SVGStreamWriter, scene: Scene, theme: Dict) -> None:
         """Step 4b: Render legend (exam mode only)"""
 
         style_profile = scene.metadata.get('style_profile', 'exam')
         if style_profile != 'exam':
-            return ""
+            return
 
         legend_x = self.width - 250
         legend_y = 50
 
-        svg = f'<rect x="{legend_x}" y="{legend_y}" width="230" height="150" fill="white" stroke="black" stroke-width="1" opacity="0.9"/>'
-        svg += f'<text x="{legend_x + 10}" y="{legend_y + 25}" font-size="14" font-weight="bold">Legend</text>'
+        writer.element('rect', x=legend_x, y=legend_y, width=230, height=150, fill="white", stroke="black",
+                       stroke_width=1, opacity=0.9)
+        writer.element('text', x=legend_x + 10, y=legend_y + 25, font_size=14, font_weight="bold", text="Legend")
 
         # Add object descriptions
         y_offset = legend_y + 50
@@ -363,34 +425,9 @@ class UniversalRenderer:
             obj_type = obj.type.value.replace("_", " ").title()
             obj_label = obj.properties.get("label", obj.id)
 
-            svg += f'<text x="{legend_x + 10}" y="{y_offset}" font-size="12">{obj_label}: {obj_type}</text>'
+            writer.element('text', x=legend_x + 10, y=y_offset, font_size=12, text=f"{obj_label}: {obj_type}")
             y_offset += 20
 
-        return svg
-
-    def _assemble_svg(self, scene: Scene, theme: Dict, object_svg: List[str],
-                     embellishments_svg: List[str], labels_svg: List[str], legend_svg: str) -> str:
-        """Step 5: Assemble final SVG document"""
-
-        canvas = theme.get('canvas', {})
-        bg_color = canvas.get('background', '#ffffff')
-
-        svg_parts = [
-            f'<svg width="{self.width}" height="{self.height}" xmlns="http://www.w3.org/2000/svg">',
-            self._add_defs(),
-            f'<rect width="100%" height="100%" fill="{bg_color}"/>',
-        ]
-
-        # Add all rendered parts
-        svg_parts.extend(object_svg)
-        svg_parts.extend(embellishments_svg)
-        svg_parts.extend(labels_svg)
-        svg_parts.append(legend_svg)
-
-        svg_parts.append('</svg>')
-
-        return '\n'.join(svg_parts)
-
     def _render_tikz(self, scene: Scene, spec: CanonicalProblemSpec = None) -> str:
         lines = ["\\begin{tikzpicture}[scale=0.02]"]
         for obj in scene.objects:
@@ -418,51 +455,57 @@ class UniversalRenderer:
         return "\n".join(lines)
 
     def _svg_to_png(self, svg: str) -> str:
-        try:
-            import base64
-            import cairosvg  # type: ignore
-            png_bytes = cairosvg.svg2png(bytestring=svg.encode('utf-8'),
-                                         output_width=self.width,
-                                         output_height=self.height)
-            return base64.b64encode(png_bytes).decode('utf-8')
-        except Exception as exc:
-            print(f"⚠️  PNG conversion unavailable ({exc}); returning SVG instead")
+        import base64
+        png_bytes = get_rasterizer().rasterize(svg, self.width, self.height)
+        if png_bytes is None:
+            print("⚠️  PNG conversion unavailable; returning SVG instead")
             return svg
+        return base64.b64encode(png_bytes).decode('utf-8')
 
-    def _optimize_svg(self, svg: str) -> str:
-        try:
-            from scour import scour  # type: ignore
-            options = scour.sanitizeOptions()
-            options.remove_metadata = True
-            options.strip_comments = True
-            optimized, _ = scour.scourString(svg, options=options)
-            return optimized
-        except Exception:
-            return svg
-
-    def _add_defs(self) -> str:
+    def _emit_defs(self, writer: SVGStreamWriter) -> None:
         """Add SVG definitions (markers, gradients)"""
-        return '''
-        <defs>
-            <!-- Arrowhead marker -->
-            <marker id="arrowhead" markerWidth="10" markerHeight="10" refX="9" refY="3" orient="auto">
-                <polygon points="0 0, 10 3, 0 6" fill="black"/>
-            </marker>
-            <!-- Field line marker -->
-            <marker id="field-arrow" markerWidth="8" markerHeight="8" refX="7" refY="3" orient="auto">
-                <polygon points="0 0, 8 3, 0 6" fill="#0066cc"/>
-            </marker>
-        </defs>
-        '''
+        writer.start('defs')
+        # Arrowhead marker
+        writer.define('arrowhead', lambda w: self._emit_marker(w, 'arrowhead', 10, 9, "0 0, 10 3, 0 6", "black"))
+        # Field line marker
+        writer.define('field-arrow', lambda w: self._emit_marker(w, 'field-arrow', 8, 7, "0 0, 8 3, 0 6", "#0066cc"))
+        writer.end()
+
+    @staticmethod
+    def _emit_marker(writer: SVGStreamWriter, marker_id: str, size: int, ref_x: int, points: str, fill: str) -> None:
+        writer.start('marker', {'id': marker_id, 'markerWidth': size, 'markerHeight': size,
+                                'refX': ref_x, 'refY': 3, 'orient': "auto"})
+        writer.element('polygon', points=points, fill=fill)
+        writer.end()
 
 
 # ============================================================================
 # Built-in Glyphs (minimal implementations)
 # ============================================================================
 
-class CircleGlyph:
-    """Render circle primitive"""
+class Glyph:
+    """Built-in glyph: emit() writes through the stream writer, render() returns the markup"""
+    def emit(self, writer: SVGStreamWriter, position: Dict, properties: Dict, style: Dict) -> None:
+        raise NotImplementedError
+
+    def symbol_key(self, position: Dict, properties: Dict, style: Dict) -> Optional[tuple]:
+        """Everything except the anchor (x, y) that shapes this glyph; None = not reusable"""
+        return None
+
     def render(self, position: Dict, properties: Dict, style: Dict) -> str:
+        writer = SVGStreamWriter(optimize=False)
+        self.emit(writer, position, properties, style)
+        return writer.getvalue()
+
+
+class CircleGlyph(Glyph):
+    """Render circle primitive"""
+    def symbol_key(self, position: Dict, properties: Dict, style: Dict) -> Optional[tuple]:
+        return hashable_key(properties.get('radius', position.get('width', 20) / 2),
+                            properties.get('fill', style.get('fill', 'none')),
+                            style.get('stroke', '#000000'), style.get('stroke_width', 2))
+
+    def emit(self, writer: SVGStreamWriter, position: Dict, properties: Dict, style: Dict) -> None:
 
         x = position.get('x', 0)
         y = position.get('y', 0)
@@ -471,12 +514,17 @@ class CircleGlyph:
         stroke = style.get('stroke', '#000000')
         stroke_width = style.get('stroke_width', 2)
 
-        return f'<circle cx="{x}" cy="{y}" r="{r}" fill="{fill}" stroke="{stroke}" stroke-width="{stroke_width}"/>'
+        writer.element('circle', cx=x, cy=y, r=r, fill=fill, stroke=stroke, stroke_width=stroke_width)
 
 
-class RectangleGlyph:
+class RectangleGlyph(Glyph):
     """Render rectangle primitive"""
-    def render(self, position: Dict, properties: Dict, style: Dict) -> str:
+    def symbol_key(self, position: Dict, properties: Dict, style: Dict) -> Optional[tuple]:
+        return hashable_key(properties.get('width', 40), properties.get('height', 40),
+                            properties.get('fill', style.get('fill', 'none')), properties.get('fill_opacity', 1.0),
+                            style.get('stroke', '#000000'), style.get('stroke_width', 2))
+
+    def emit(self, writer: SVGStreamWriter, position: Dict, properties: Dict, style: Dict) -> None:
 
         x = position.get('x', 0)
         y = position.get('y', 0)
@@ -489,12 +537,13 @@ class RectangleGlyph:
         stroke = style.get('stroke', '#000000')
         stroke_width = style.get('stroke_width', 2)
 
-        return f'<rect x="{x}" y="{y}" width="{w}" height="{h}" fill="{fill}" fill-opacity="{fill_opacity}" stroke="{stroke}" stroke-width="{stroke_width}"/>'
+        writer.element('rect', x=x, y=y, width=w, height=h, fill=fill, fill_opacity=fill_opacity,
+                       stroke=stroke, stroke_width=stroke_width)
 
 
-class LineGlyph:
+class LineGlyph(Glyph):
     """Render line primitive"""
-    def render(self, position: Dict, properties: Dict, style: Dict) -> str:
+    def emit(self, writer: SVGStreamWriter, position: Dict, properties: Dict, style: Dict) -> None:
 
         x1 = position.get('x', 0)
         y1 = position.get('y', 0)
@@ -503,12 +552,16 @@ class LineGlyph:
         stroke = style.get('stroke', '#000000')
         stroke_width = style.get('stroke_width', 2)
 
-        return f'<line x1="{x1}" y1="{y1}" x2="{x2}" y2="{y2}" stroke="{stroke}" stroke-width="{stroke_width}"/>'
+        writer.element('line', x1=x1, y1=y1, x2=x2, y2=y2, stroke=stroke, stroke_width=stroke_width)
 
 
-class ArrowGlyph:
+class ArrowGlyph(Glyph):
     """Render arrow (force/vector)"""
-    def render(self, position: Dict, properties: Dict, style: Dict) -> str:
+    def symbol_key(self, position: Dict, properties: Dict, style: Dict) -> Optional[tuple]:
+        return hashable_key(properties.get('direction', 'right'), properties.get('length', 60),
+                            properties.get('color', '#cc0000'))
+
+    def emit(self, writer: SVGStreamWriter, position: Dict, properties: Dict, style: Dict) -> None:
 
         x = position.get('x', 0)
         y = position.get('y', 0)
@@ -528,12 +581,15 @@ class ArrowGlyph:
         else:
             x2, y2 = x + length, y
 
-        return f'<line x1="{x}" y1="{y}" x2="{x2}" y2="{y2}" stroke="{color}" stroke-width="2" marker-end="url(#arrowhead)"/>'
+        writer.element('line', x1=x, y1=y, x2=x2, y2=y2, stroke=color, stroke_width=2, marker_end="url(#arrowhead)")
 
 
-class ChargeGlyph:
+class ChargeGlyph(Glyph):
     """Render point charge"""
-    def render(self, position: Dict, properties: Dict, style: Dict) -> str:
+    def symbol_key(self, position: Dict, properties: Dict, style: Dict) -> Optional[tuple]:
+        return hashable_key(properties.get('sign', '+'))
+
+    def emit(self, writer: SVGStreamWriter, position: Dict, properties: Dict, style: Dict) -> None:
 
         x = position.get('x', 0)
         y = position.get('y', 0)
@@ -542,40 +598,46 @@ class ChargeGlyph:
 
         color = '#ff0000' if sign == '+' else '#0000ff'
 
-        svg = f'<circle cx="{x}" cy="{y}" r="{r}" fill="{color}" stroke="black" stroke-width="2"/>'
-        svg += f'<text x="{x}" y="{y+5}" font-size="16" font-weight="bold" fill="white" text-anchor="middle">{sign}</text>'
+        writer.element('circle', cx=x, cy=y, r=r, fill=color, stroke="black", stroke_width=2)
+        writer.element('text', x=x, y=y+5, font_size=16, font_weight="bold", fill="white", text_anchor="middle",
+                       text=sign)
 
-        return svg
 
-
-class PlateGlyph:
+class PlateGlyph(Glyph):
     """Render capacitor plate"""
-    def render(self, position: Dict, properties: Dict, style: Dict) -> str:
+    def symbol_key(self, position: Dict, properties: Dict, style: Dict) -> Optional[tuple]:
+        return hashable_key(position.get('width', 300), position.get('height', 10))
+
+    def emit(self, writer: SVGStreamWriter, position: Dict, properties: Dict, style: Dict) -> None:
 
         x = position.get('x', 0)
         y = position.get('y', 0)
         w = position.get('width', 300)
         h = position.get('height', 10)
 
-        return f'<rect x="{x}" y="{y}" width="{w}" height="{h}" fill="#666666" stroke="black" stroke-width="2"/>'
+        writer.element('rect', x=x, y=y, width=w, height=h, fill="#666666", stroke="black", stroke_width=2)
 
 
-class BatteryGlyph:
+class BatteryGlyph(Glyph):
     """Render battery symbol"""
-    def render(self, position: Dict, properties: Dict, style: Dict) -> str:
+    def symbol_key(self, position: Dict, properties: Dict, style: Dict) -> Optional[tuple]:
+        return ()
+
+    def emit(self, writer: SVGStreamWriter, position: Dict, properties: Dict, style: Dict) -> None:
 
         x = position.get('x', 0)
         y = position.get('y', 0)
 
-        svg = f'<line x1="{x-10}" y1="{y-15}" x2="{x-10}" y2="{y+15}" stroke="black" stroke-width="3"/>'  # Long plate
-        svg += f'<line x1="{x+10}" y1="{y-8}" x2="{x+10}" y2="{y+8}" stroke="black" stroke-width="3"/>'  # Short plate
-
-        return svg
+        writer.element('line', x1=x-10, y1=y-15, x2=x-10, y2=y+15, stroke="black", stroke_width=3)  # Long plate
+        writer.element('line', x1=x+10, y1=y-8, x2=x+10, y2=y+8, stroke="black", stroke_width=3)  # Short plate
 
 
-class ResistorGlyph:
+class ResistorGlyph(Glyph):
     """Render resistor symbol"""
-    def render(self, position: Dict, properties: Dict, style: Dict) -> str:
+    def symbol_key(self, position: Dict, properties: Dict, style: Dict) -> Optional[tuple]:
+        return ()
+
+    def emit(self, writer: SVGStreamWriter, position: Dict, properties: Dict, style: Dict) -> None:
 
         x = position.get('x', 0)
         y = position.get('y', 0)
@@ -583,32 +645,36 @@ class ResistorGlyph:
         # Zigzag pattern
         path = f'M {x-30} {y} l 10 -10 l 10 20 l 10 -20 l 10 20 l 10 -20 l 10 10'
 
-        return f'<path d="{path}" stroke="black" stroke-width="2" fill="none"/>'
+        writer.element('path', d=path, stroke="black", stroke_width=2, fill="none")
 
 
-class CapacitorGlyph:
+class CapacitorGlyph(Glyph):
     """Render capacitor symbol"""
-    def render(self, position: Dict, properties: Dict, style: Dict) -> str:
+    def symbol_key(self, position: Dict, properties: Dict, style: Dict) -> Optional[tuple]:
+        return ()
+
+    def emit(self, writer: SVGStreamWriter, position: Dict, properties: Dict, style: Dict) -> None:
 
         x = position.get('x', 0)
         y = position.get('y', 0)
 
-        svg = f'<line x1="{x-5}" y1="{y-15}" x2="{x-5}" y2="{y+15}" stroke="black" stroke-width="2"/>'
-        svg += f'<line x1="{x+5}" y1="{y-15}" x2="{x+5}" y2="{y+15}" stroke="black" stroke-width="2"/>'
-
-        return svg
+        writer.element('line', x1=x-5, y1=y-15, x2=x-5, y2=y+15, stroke="black", stroke_width=2)
+        writer.element('line', x1=x+5, y1=y-15, x2=x+5, y2=y+15, stroke="black", stroke_width=2)
 
 
-class MassGlyph:
+class MassGlyph(Glyph):
     """Render mass/block"""
-    def render(self, position: Dict, properties: Dict, style: Dict) -> str:
+    def symbol_key(self, position: Dict, properties: Dict, style: Dict) -> Optional[tuple]:
+        return hashable_key(position.get('width', 60), position.get('height', 60))
+
+    def emit(self, writer: SVGStreamWriter, position: Dict, properties: Dict, style: Dict) -> None:
 
         x = position.get('x', 0)
         y = position.get('y', 0)
         w = position.get('width', 60)
         h = position.get('height', 60)
 
-        return f'<rect x="{x}" y="{y}" width="{w}" height="{h}" fill="#cccccc" stroke="black" stroke-width="2"/>'
+        writer.element('rect', x=x, y=y, width=w, height=h, fill="#cccccc", stroke="black", stroke_width=2)
 
 class FieldLineGlyph:
     """Renders an electric or magnetic field line."""
@@ -630,45 +696,47 @@ class FieldLineGlyph:
         return (f'<path d="M {x1} {y1} Q {cx} {cy} {x2} {y2}" '
                 f'stroke="#0066cc" stroke-width="1.5" fill="none" stroke-dasharray="4,4" opacity="0.7" marker-end="url(#field-arrow)"/>')
 
-class LensGlyph:
+class LensGlyph(Glyph):
     """Render a thin lens symbol"""
-    def render(self, position: Dict, properties: Dict, style: Dict) -> str:
+    def symbol_key(self, position: Dict, properties: Dict, style: Dict) -> Optional[tuple]:
+        return hashable_key(properties.get('type') == 'converging')
+
+    def emit(self, writer: SVGStreamWriter, position: Dict, properties: Dict, style: Dict) -> None:
 
         x = position.get('x', 0)
         y = position.get('y', 0)
         height = 200
-        
-        svg = f'<line x1="{x}" y1="{y - height/2}" x2="{x}" y2="{y + height/2}" stroke="#42a5f5" stroke-width="4"/>'
+
+        writer.element('line', x1=x, y1=y - height/2, x2=x, y2=y + height/2, stroke="#42a5f5", stroke_width=4)
         # Arrowheads for converging lens
         if properties.get('type') == 'converging':
-            svg += f'<path d="M {x-10},{y - height/2} L {x},{y - height/2 - 15} L {x+10},{y - height/2}" fill="none" stroke="#42a5f5" stroke-width="4"/>'
-            svg += f'<path d="M {x-10},{y + height/2} L {x},{y + height/2 + 15} L {x+10},{y + height/2}" fill="none" stroke="#42a5f5" stroke-width="4"/>'
-        return svg
+            writer.element('path', d=f"M {x-10},{y - height/2} L {x},{y - height/2 - 15} L {x+10},{y - height/2}",
+                           fill="none", stroke="#42a5f5", stroke_width=4)
+            writer.element('path', d=f"M {x-10},{y + height/2} L {x},{y + height/2 + 15} L {x+10},{y + height/2}",
+                           fill="none", stroke="#42a5f5", stroke_width=4)
 
-class FocalPointGlyph:
+class FocalPointGlyph(Glyph):
     """Render a focal point marker"""
-    def render(self, position: Dict, properties: Dict, style: Dict) -> str:
+    def emit(self, writer: SVGStreamWriter, position: Dict, properties: Dict, style: Dict) -> None:
 
         x = position.get('x', 0)
         y = position.get('y', 0)
         label = properties.get('label', 'F')
-        
-        svg = f'<circle cx="{x}" cy="{y}" r="5" fill="#d32f2f"/>'
-        svg += f'<text x="{x}" y="{y + 25}" text-anchor="middle" font-size="14" fill="#d32f2f">{label}</text>'
-        return svg
 
-class PointGlyph:
+        writer.element('circle', cx=x, cy=y, r=5, fill="#d32f2f")
+        writer.element('text', x=x, y=y + 25, text_anchor="middle", font_size=14, fill="#d32f2f", text=label)
+
+class PointGlyph(Glyph):
     """Render a simple point marker"""
-    def render(self, position: Dict, properties: Dict, style: Dict) -> str:
+    def emit(self, writer: SVGStreamWriter, position: Dict, properties: Dict, style: Dict) -> None:
 
         x = position.get('x', 0)
         y = position.get('y', 0)
         label = properties.get('label', '')
-        
-        svg = f'<circle cx="{x}" cy="{y}" r="4" fill="black"/>'
+
+        writer.element('circle', cx=x, cy=y, r=4, fill="black")
         if label:
-            svg += f'<text x="{x+5}" y="{y-5}" font-size="12">{label}</text>'
-        return svg
+            writer.element('text', x=x+5, y=y-5, font_size=12, text=label)
 
 class PolylineGlyph:
     """Render a polyline, used for rays"""
@@ -702,9 +770,12 @@ class PolylineGlyph:
                 resolved_points.append((point_obj.position['x'], point_obj.position['y']))
         return resolved_points
 
-class SpringGlyph:
+class SpringGlyph(Glyph):
     """Render a spring"""
-    def render(self, position: Dict, properties: Dict, style: Dict) -> str:
+    def symbol_key(self, position: Dict, properties: Dict, style: Dict) -> Optional[tuple]:
+        return hashable_key(properties.get('coils', 10), properties.get('radius', 10))
+
+    def emit(self, writer: SVGStreamWriter, position: Dict, properties: Dict, style: Dict) -> None:
 
         x1 = position.get('x', 0)
         y1 = position.get('y', 0)
@@ -714,31 +785,28 @@ class SpringGlyph:
         radius = properties.get('radius', 10)
 
         # Path for a horizontal spring
-        path = f'M {x1} {y1}'
-        for i in range(coils):
-            path += f' l 5 {radius}'
-            path += f' l 5 -{2*radius}'
-            path += f' l 5 {radius}'
+        path = f'M {x1} {y1}' + f' l 5 {radius} l 5 -{2*radius} l 5 {radius}' * coils
 
-        return f'<path d="{path}" stroke="black" stroke-width="2" fill="none"/>'
+        writer.element('path', d=path, stroke="black", stroke_width=2, fill="none")
 
 
-class PulleyGlyph:
+class PulleyGlyph(Glyph):
     """Render a pulley"""
-    def render(self, position: Dict, properties: Dict, style: Dict) -> str:
+    def symbol_key(self, position: Dict, properties: Dict, style: Dict) -> Optional[tuple]:
+        return hashable_key(properties.get('radius', 30))
+
+    def emit(self, writer: SVGStreamWriter, position: Dict, properties: Dict, style: Dict) -> None:
 
         x = position.get('x', 0)
         y = position.get('y', 0)
         r = properties.get('radius', 30)
 
-        svg = f'<circle cx="{x}" cy="{y}" r="{r}" fill="none" stroke="black" stroke-width="3"/>'
-        svg += f'<circle cx="{x}" cy="{y}" r="{r-10}" fill="none" stroke="black" stroke-width="1"/>'
-
-        return svg
+        writer.element('circle', cx=x, cy=y, r=r, fill="none", stroke="black", stroke_width=3)
+        writer.element('circle', cx=x, cy=y, r=r-10, fill="none", stroke="black", stroke_width=1)
 
-class TextGlyph:
+class TextGlyph(Glyph):
     """Render text labels and annotations"""
-    def render(self, position: Dict, properties: Dict, style: Dict) -> str:
+    def emit(self, writer: SVGStreamWriter, position: Dict, properties: Dict, style: Dict) -> None:
         x = position.get('x', 0)
         y = position.get('y', 0)
         text = properties.get('text', '')
@@ -750,7 +818,5 @@ class TextGlyph:
         fill = style.get('fill', '#000000')
         text_anchor = style.get('text_anchor', 'start')
 
-        svg = f'<text x="{x}" y="{y}" font-size="{font_size}" font-weight="{font_weight}" '
-        svg += f'font-family="{font_family}" fill="{fill}" text-anchor="{text_anchor}">{text}</text>'
-
-        return svg
+        writer.element('text', x=x, y=y, font_size=font_size, font_weight=font_weight, font_family=font_family,
+                       fill=fill, text_anchor=text_anchor, text=text)
@@ -22,8 +22,9 @@ from core.universal_scene_format import (
     UniversalScene, SceneObject, Relationship, Annotation,
     ObjectType, RelationType, Position, Style
 )
+from core.svg_stream import SVGStreamWriter
+from core.svg_symbols import GLYPH_FRAGMENTS, LABEL_PLACEHOLDER, symbol_id
 import xml.etree.ElementTree as ET
-from xml.dom import minidom
 
 
 class SVGElement:
@@ -53,14 +54,30 @@ class SVGElement:
             elem.append(child.to_element())
         return elem
 
+    def write(self, writer: SVGStreamWriter) -> None:
+        """Emit this element and its subtree through a stream writer"""
+        if not self.children:
+            writer.element(self.tag, self.attributes, self.text)
+            return
+        writer.start(self.tag, self.attributes)
+        if self.text:
+            writer.text(self.text)
+        for child in self.children:
+            def_id = child.attributes.get('id') if self.tag == 'defs' else None
+            if def_id:
+                writer.define(def_id, child.write)
+            else:
+                child.write(writer)
+        writer.end()
+
     def to_string(self, indent: bool = True) -> str:
         """Convert to SVG string"""
-        elem = self.to_element()
+        writer = SVGStreamWriter(indent="  " if indent else None)
         if indent:
-            rough_string = ET.tostring(elem, encoding='unicode')
-            reparsed = minidom.parseString(rough_string)
-            return reparsed.toprettyxml(indent="  ")
-        return ET.tostring(elem, encoding='unicode')
+            writer.declaration()
+        self.write(writer)
+        writer.close()
+        return writer.getvalue()
 
 
 class ComponentLibrary:
@@ -379,9 +396,24 @@ class UniversalSVGRenderer:
     This renderer takes a UniversalScene and produces a professional SVG diagram
     """
 
-    def __init__(self):
+    # Components drawn around their anchor that symbol mode instantiates with <use>
+    SYMBOL_COMPONENTS = {
+        ObjectType.RESISTOR: ('resistor', ComponentLibrary.create_resistor),
+        ObjectType.CAPACITOR: ('capacitor', ComponentLibrary.create_capacitor),
+        ObjectType.BATTERY: ('battery', ComponentLibrary.create_battery),
+    }
+
+    def __init__(self, use_symbols: bool = False):
+        """
+        Args:
+            use_symbols: Define each distinct component shape once as a <symbol>
+                and instantiate it with <use> instead of repeating its geometry
+        """
         self.component_library = ComponentLibrary()
         self.primitive_components = {}  # Cache for primitive SVG content
+        self.use_symbols = use_symbols
+        self._defs: Optional[SVGElement] = None
+        self._document_symbols: set = set()
 
     def render(self, scene: UniversalScene, primitive_components: Optional[Dict] = None) -> str:
         """
@@ -394,6 +426,16 @@ class UniversalSVGRenderer:
         Returns:
             SVG string
         """
+        return self._build_document(scene, primitive_components).to_string()
+
+    def write_svg(self, scene: UniversalScene, out, primitive_components: Optional[Dict] = None) -> None:
+        """Stream the SVG for a scene into a file-like object (file, response body)"""
+        writer = SVGStreamWriter(out=out)
+        self._build_document(scene, primitive_components).write(writer)
+        writer.close()
+
+    def _build_document(self, scene: UniversalScene, primitive_components: Optional[Dict] = None) -> SVGElement:
+        """Build the element tree for a scene"""
         # Store primitives for use in _render_object
         if primitive_components:
             self.primitive_components = primitive_components
@@ -409,6 +451,8 @@ class UniversalSVGRenderer:
         # Add definitions (markers, gradients, etc.)
         defs = self._create_definitions(scene)
         svg.add_child(defs)
+        self._defs = defs
+        self._document_symbols = set()
 
         # Add background
         background = SVGElement("rect",
@@ -451,7 +495,7 @@ class UniversalSVGRenderer:
                 annotations_group.add_child(ann_elem)
         svg.add_child(annotations_group)
 
-        return svg.to_string()
+        return svg
 
     def _create_definitions(self, scene: UniversalScene) -> SVGElement:
         """Create SVG definitions (markers, patterns, etc.)"""
@@ -565,7 +609,10 @@ class UniversalSVGRenderer:
         style = obj.style
 
         # Route to appropriate component based on object type
-        if obj.object_type == ObjectType.RESISTOR:
+        if self.use_symbols and obj.object_type in self.SYMBOL_COMPONENTS:
+            kind, factory = self.SYMBOL_COMPONENTS[obj.object_type]
+            return self._component_instance(kind, factory, x, y, w, h, style, obj.label)
+        elif obj.object_type == ObjectType.RESISTOR:
             return self.component_library.create_resistor(x, y, w, h, style, obj.label)
         elif obj.object_type == ObjectType.CAPACITOR:
             return self.component_library.create_capacitor(x, y, w, h, style, obj.label)
@@ -589,6 +636,40 @@ class UniversalSVGRenderer:
             # Default: render as a generic shape
             return self._render_generic(obj)
 
+    def _component_instance(self, kind: str, factory, x: float, y: float, width: float, height: float,
+                            style: Style, label: Optional[str]) -> SVGElement:
+        """<use> of a memoized component <symbol> plus the instance's own label"""
+        key = ('component', kind, width, height, repr(sorted(style.to_dict().items())))
+
+        def build() -> Tuple[SVGElement, Optional[SVGElement]]:
+            # Built at the origin with a placeholder label so the label can be re-anchored
+            template = factory(0.0, 0.0, width, height, style, LABEL_PLACEHOLDER)
+            symbol = SVGElement("symbol", id=symbol_id(kind, key[2:]), overflow="visible")
+            label_template = None
+            for child in template.children:
+                if child.tag == "text" and child.text == LABEL_PLACEHOLDER:
+                    label_template = child
+                else:
+                    symbol.add_child(child)
+            return symbol, label_template
+
+        symbol, label_template = GLYPH_FRAGMENTS.get_or_build(key, build)
+        sid = symbol.attributes['id']
+        if sid not in self._document_symbols:
+            self._document_symbols.add(sid)
+            self._defs.add_child(symbol)
+
+        group = SVGElement("g", id=f"{kind}_{x}_{y}")
+        group.add_child(SVGElement("use", href=f"#{sid}", transform=f"translate({x} {y})"))
+        if label and label_template is not None:
+            attributes = dict(label_template.attributes)
+            attributes['x'] = str(x + float(attributes['x']))
+            attributes['y'] = str(y + float(attributes['y']))
+            text = SVGElement("text", **attributes)
+            text.set_text(label)
+            group.add_child(text)
+        return group
+
     def _render_circle(self, obj: SceneObject) -> SVGElement:
         """Render a circle"""
         circle = SVGElement("circle",
@@ -693,9 +774,8 @@ class UniversalSVGRenderer:
 
     def save_svg(self, scene: UniversalScene, filepath: str) -> None:
         """Render scene and save to file"""
-        svg_content = self.render(scene)
         with open(filepath, 'w') as f:
-            f.write(svg_content)
+            self.write_svg(scene, f)
         print(f"✅ SVG saved to: {filepath}")
 
 
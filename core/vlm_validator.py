@@ -18,13 +18,16 @@ Dependencies (to install):
 - pip install salesforce-lavis  # For BLIP-2
 """
 
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Optional, Tuple, Any, Union
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
 import base64
-import os
-import tempfile
+import io
+
+from core.rasterizer import get_rasterizer
+
+ImageSource = Union[str, bytes]  # Image path or in-memory PNG
 
 
 class VLMProvider(Enum):
@@ -176,24 +179,14 @@ class VLMValidator:
         Returns:
             VisualValidationResult with validation details
         """
-        svg_temp_path = None
-        try:
-            if diagram_input.strip().startswith("<svg"):
-                svg_temp_path = self._write_temp_svg(diagram_input)
-                image_path = svg_temp_path
-            else:
-                image_path = diagram_input
-
-            print(f"\n🔍 Visual validation of: {Path(image_path).name}")
+        inline_svg = diagram_input.lstrip().startswith(("<svg", "<?xml"))
+        print(f"\n🔍 Visual validation of: {'inline SVG' if inline_svg else Path(diagram_input).name}")
 
-            # Convert SVG to PNG if needed
-            image_path = self._ensure_png(image_path)
+        # Rasterize SVG in memory (shared, cached service) if needed
+        image = self._ensure_png(diagram_input, inline_svg)
 
-            # Generate description from image
-            vlm_description = self._describe_image(image_path)
-        finally:
-            if svg_temp_path and os.path.exists(svg_temp_path):
-                os.remove(svg_temp_path)
+        # Generate description from image
+        vlm_description = self._describe_image(image)
 
         if not vlm_description:
             return VisualValidationResult(
@@ -222,59 +215,54 @@ class VLMValidator:
             suggestions=suggestions
         )
 
-    def _ensure_png(self, image_path: str) -> str:
-        """Convert SVG to PNG if needed"""
-        path = Path(image_path)
-
-        if path.suffix.lower() == '.svg':
-            # Convert SVG to PNG
-            png_path = path.with_suffix('.png')
-
-            try:
-                from cairosvg import svg2png
-                svg2png(url=str(path), write_to=str(png_path))
-                print(f"   ✅ Converted SVG to PNG: {png_path.name}")
-                return str(png_path)
-            except ImportError:
-                print("⚠️  cairosvg not installed. Install: pip install cairosvg")
-                print("   Attempting to use SVG directly (may not work)")
-                return image_path
-            except Exception as e:
-                print(f"⚠️  SVG conversion failed: {e}")
-                return image_path
-
-        return image_path
-
-    def _write_temp_svg(self, svg_content: str) -> str:
-        """Persist inline SVG content to a temporary file"""
-        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".svg")
-        tmp.write(svg_content.encode("utf-8"))
-        tmp.flush()
-        tmp.close()
-        return tmp.name
-
-    def _describe_image(self, image_path: str) -> Optional[str]:
-        """Generate description of image using VLM"""
+    def _ensure_png(self, diagram_input: str, inline_svg: bool = False) -> ImageSource:
+        """
+        PNG bytes for SVG input (inline markup or a .svg path), else the path unchanged
+
+        SVG is rasterized in memory by the shared rasterization service, so
+        an SVG already rasterized by the renderer or editor is a cache hit.
+        """
+        if not inline_svg and Path(diagram_input).suffix.lower() != '.svg':
+            return diagram_input
+
+        svg_bytes = diagram_input.encode('utf-8') if inline_svg else Path(diagram_input).read_bytes()
+        rasterizer = get_rasterizer()
+        if not rasterizer.available:
+            print("⚠️  cairosvg not installed. Install: pip install cairosvg")
+            print("   Attempting to use SVG directly (may not work)")
+            return svg_bytes if inline_svg else diagram_input
+
+        png_bytes = rasterizer.rasterize(svg_bytes)
+        if png_bytes is None:
+            print("⚠️  SVG conversion failed")
+            return svg_bytes if inline_svg else diagram_input
+        print(f"   ✅ Converted SVG to PNG ({len(png_bytes)} bytes)")
+        return png_bytes
+
+    def _describe_image(self, image: ImageSource) -> Optional[str]:
+        """Generate description of image (path or PNG bytes) using VLM"""
 
         if self.model is None:
             # Stub mode
-            return self._stub_describe_image(image_path)
+            return self._stub_describe_image(image)
 
         if self.config.provider == VLMProvider.BLIP2:
-            return self._describe_with_blip2(image_path)
+            return self._describe_with_blip2(image)
         elif self.config.provider == VLMProvider.GPT4_VISION:
-            return self._describe_with_gpt4v(image_path)
+            return self._describe_with_gpt4v(image)
         else:
             return None
 
-    def _describe_with_blip2(self, image_path: str) -> Optional[str]:
+    def _describe_with_blip2(self, image_source: ImageSource) -> Optional[str]:
         """Describe image using BLIP-2"""
         try:
             from PIL import Image
             import torch
 
             # Load image
-            image = Image.open(image_path).convert('RGB')
+            if isinstance(image_source, bytes):
+                image_source = io.BytesIO(image_source)
+            image = Image.open(image_source).convert('RGB')
 
             # Prepare inputs
             prompt = "Describe this diagram in detail, including all components, connections, and labels:"
@@ -293,12 +281,14 @@ class VLMValidator:
             print(f"❌ BLIP-2 description failed: {e}")
             return None
 
-    def _describe_with_gpt4v(self, image_path: str) -> Optional[str]:
+    def _describe_with_gpt4v(self, image_source: ImageSource) -> Optional[str]:
         """Describe image using GPT-4 Vision"""
         try:
             # Read and encode image
-            with open(image_path, 'rb') as f:
-                image_data = base64.b64encode(f.read()).decode('utf-8')
+            if not isinstance(image_source, bytes):
+                with open(image_source, 'rb') as f:
+                    image_source = f.read()
+            image_data = base64.b64encode(image_source).decode('utf-8')
 
             # Call GPT-4 Vision
             response = self.model.chat.completions.create(
@@ -323,7 +313,7 @@ class VLMValidator:
             print(f"❌ GPT-4V description failed: {e}")
             return None
 
-    def _stub_describe_image(self, image_path: str) -> str:
+    def _stub_describe_image(self, image: ImageSource) -> str:
         """Stub description for testing"""
         return "A circuit diagram showing capacitors and a battery connected in series. The diagram includes labels and connection lines."
 
@@ -4,22 +4,41 @@ This replaces the legacy Flask wrapper with a production-ready FastAPI
 entrypoint that can be served by Uvicorn/Gunicorn workers. The core pipeline
 logic remains untouched – we simply expose `/api/generate` and `/api/health`
 endpoints with structured logging and typed request/response models.
+
+Generation is synchronous and slow, so it never runs on the event loop:
+every request goes through a bounded JobQueue (core.job_queue).
+
+- POST /api/jobs               -> 202 + job id (429 when the queue is full)
+- GET /api/jobs/{id}           -> state, per-stage progress, final result
+- GET /api/jobs/{id}/events    -> the same progress as Server-Sent Events
+- DELETE /api/jobs/{id}        -> cancel (queued: at once; running: at the
+                                  next stage boundary)
+
+`/api/generate` keeps its blocking request/response contract but waits on
+the same queue, so it shares the backpressure limit.
+
+Jobs run one at a time per server process: every job shares the single
+pipeline instance, which keeps per-request state (e.g. self.property_graph)
+and is not thread-safe. Scale out with more Uvicorn/Gunicorn worker
+processes, each of which loads its own pipeline.
 """
 
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
 import os
 import sys
 import time
-import uuid
-from functools import lru_cache
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
+from core.job_queue import Job, JobQueue, JobState, QueueFullError
 from unified_diagram_pipeline import PipelineConfig, UnifiedDiagramPipeline
 
 # ---------------------------------------------------------------------------
@@ -29,6 +48,13 @@ from unified_diagram_pipeline import PipelineConfig, UnifiedDiagramPipeline
 # Suppress HuggingFace tokenizers parallelism warning
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
+# Generation job pool: one job at a time (the shared pipeline is not
+# thread-safe); DIAGRAM_JOB_QUEUE_SIZE jobs may wait before 429
+JOB_WORKERS = 1
+JOB_QUEUE_SIZE = int(os.environ.get("DIAGRAM_JOB_QUEUE_SIZE", "8"))
+JOB_RETRY_AFTER_SECONDS = 30
+SSE_POLL_SECONDS = 0.25
+
 # ---------------------------------------------------------------------------
 # Logging
 # ---------------------------------------------------------------------------
@@ -73,6 +99,25 @@ class HealthResponse(BaseModel):
     pipeline: str
     features: Dict[str, Any]
     uptime_seconds: float
+    jobs: Dict[str, int] = {}
+
+
+class JobSubmitted(BaseModel):
+    job_id: str
+    state: str
+    status_url: str
+    events_url: str
+
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    state: str
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    progress: List[Dict[str, Any]] = []
+    result: Optional[GenerateResponse] = None
+    error: Optional[str] = None
 
 
 # ---------------------------------------------------------------------------
@@ -160,6 +205,91 @@ def get_pipeline() -> UnifiedDiagramPipeline:
     return _pipeline
 
 
+# ---------------------------------------------------------------------------
+# Generation Jobs
+# ---------------------------------------------------------------------------
+
+JOBS = JobQueue(max_workers=JOB_WORKERS, max_pending=JOB_QUEUE_SIZE)
+
+
+def build_response(req_id: str, result: Any) -> GenerateResponse:
+    metadata = DiagramMetadata(
+        complexity_score=getattr(result, "complexity_score", 0.0) or 0.0,
+        selected_strategy=getattr(result, "selected_strategy", "unknown") or "unknown",
+        property_graph_nodes=len(result.property_graph.get_all_nodes()) if result.property_graph else 0,
+        property_graph_edges=len(result.property_graph.get_edges()) if result.property_graph else 0,
+        ontology_validation=getattr(result, "ontology_validation", None),
+        nlp_tools_used=list(result.nlp_results.keys()) if result.nlp_results else [],
+    )
+
+    LOGGER.info(
+        "[%s] completed complexity=%.3f strategy=%s nodes=%d edges=%d",
+        req_id,
+        metadata.complexity_score,
+        metadata.selected_strategy,
+        metadata.property_graph_nodes,
+        metadata.property_graph_edges,
+    )
+
+    return GenerateResponse(request_id=req_id, svg=result.svg, metadata=metadata)
+
+
+def run_generation_job(job: Job, problem_text: str) -> GenerateResponse:
+    """Worker-thread body: run the pipeline, reporting each stage on the job"""
+    pipeline = get_pipeline()
+
+    def on_stage(record) -> None:
+        job.emit("stage", stage=record.name, status=record.status,
+                 duration=round(record.duration, 3), error=record.error)
+
+    result = pipeline.generate(problem_text, on_stage=on_stage, cancel_event=job.cancel_event)
+    return build_response(job.id, result)
+
+
+def submit_generation(problem_text: str) -> Job:
+    """Queue a generation job (429 when the queue is full)"""
+    get_pipeline()  # Fail fast before queueing if startup failed
+    try:
+        return JOBS.submit(lambda job: run_generation_job(job, problem_text))
+    except QueueFullError as exc:
+        raise HTTPException(status_code=429, detail=str(exc),
+                            headers={"Retry-After": str(JOB_RETRY_AFTER_SECONDS)}) from exc
+
+
+def job_status(job: Job) -> JobStatusResponse:
+    return JobStatusResponse(
+        job_id=job.id,
+        state=job.state.value,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        progress=list(job.events),
+        result=job.result if job.state == JobState.SUCCEEDED else None,
+        error=job.error,
+    )
+
+
+def get_job_or_404(job_id: str) -> Job:
+    job = JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job
+
+
+async def job_event_stream(job: Job) -> AsyncIterator[str]:
+    """Server-Sent Events for a job's progress, ending with its final status"""
+    cursor = 0
+    while True:
+        events = job.events[cursor:]
+        cursor += len(events)
+        for event in events:
+            yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+        if job.done and cursor >= len(job.events):
+            yield f"event: done\ndata: {job_status(job).model_dump_json()}\n\n"
+            return
+        await asyncio.sleep(SSE_POLL_SECONDS)
+
+
 # ---------------------------------------------------------------------------
 # FastAPI Application
 # ---------------------------------------------------------------------------
@@ -185,38 +315,67 @@ async def startup_event():
     LOGGER.info("Server startup complete: Pipeline ready for requests")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Cancel outstanding generation jobs and release the pipeline's worker pools"""
+    await asyncio.to_thread(JOBS.shutdown)
+    if _pipeline is not None:
+        _pipeline.close()
+
+
 @app.post("/api/generate", response_model=GenerateResponse)
 async def generate_diagram(request: Request, payload: GenerateRequest) -> GenerateResponse:
-    pipeline = get_pipeline()
-    req_id = str(uuid.uuid4())
-
-    LOGGER.info("[%s] /api/generate received (%d chars)", req_id, len(payload.problem_text))
+    job = submit_generation(payload.problem_text)
+    LOGGER.info("[%s] /api/generate received (%d chars)", job.id, len(payload.problem_text))
 
+    # Wait without blocking the event loop; if this request is cancelled, so is the job
     try:
-        result = pipeline.generate(payload.problem_text)
-    except Exception as exc:
-        LOGGER.exception("[%s] Pipeline execution failed", req_id)
-        raise HTTPException(status_code=500, detail=str(exc)) from exc
-
-    metadata = DiagramMetadata(
-        complexity_score=getattr(result, "complexity_score", 0.0) or 0.0,
-        selected_strategy=getattr(result, "selected_strategy", "unknown") or "unknown",
-        property_graph_nodes=len(result.property_graph.get_all_nodes()) if result.property_graph else 0,
-        property_graph_edges=len(result.property_graph.get_edges()) if result.property_graph else 0,
-        ontology_validation=getattr(result, "ontology_validation", None),
-        nlp_tools_used=list(result.nlp_results.keys()) if result.nlp_results else [],
+        await asyncio.wrap_future(job.future)
+    except asyncio.CancelledError:
+        if job.state != JobState.CANCELLED:  # Not a DELETE of a queued job
+            JOBS.cancel(job.id)
+            raise
+
+    if job.state == JobState.CANCELLED:
+        raise HTTPException(status_code=409, detail="Job cancelled")
+    if job.state != JobState.SUCCEEDED:
+        LOGGER.error("[%s] Pipeline execution failed: %s", job.id, job.error)
+        raise HTTPException(status_code=500, detail=job.error or job.state.value)
+    return job.result
+
+
+@app.post("/api/jobs", response_model=JobSubmitted, status_code=202)
+async def create_job(payload: GenerateRequest) -> JobSubmitted:
+    job = submit_generation(payload.problem_text)
+    LOGGER.info("[%s] /api/jobs queued (%d chars)", job.id, len(payload.problem_text))
+    return JobSubmitted(
+        job_id=job.id,
+        state=job.state.value,
+        status_url=f"/api/jobs/{job.id}",
+        events_url=f"/api/jobs/{job.id}/events",
     )
 
-    LOGGER.info(
-        "[%s] completed complexity=%.3f strategy=%s nodes=%d edges=%d",
-        req_id,
-        metadata.complexity_score,
-        metadata.selected_strategy,
-        metadata.property_graph_nodes,
-        metadata.property_graph_edges,
-    )
 
-    return GenerateResponse(request_id=req_id, svg=result.svg, metadata=metadata)
+@app.get("/api/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str) -> JobStatusResponse:
+    return job_status(get_job_or_404(job_id))
+
+
+@app.get("/api/jobs/{job_id}/events")
+async def stream_job_events(job_id: str) -> StreamingResponse:
+    job = get_job_or_404(job_id)
+    return StreamingResponse(job_event_stream(job), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
+
+
+@app.delete("/api/jobs/{job_id}", response_model=JobStatusResponse)
+async def cancel_job(job_id: str) -> JobStatusResponse:
+    job = get_job_or_404(job_id)
+    if job.done:
+        raise HTTPException(status_code=409, detail=f"Job already {job.state.value}")
+    JOBS.cancel(job_id)
+    LOGGER.info("[%s] cancellation requested (state=%s)", job_id, job.state.value)
+    return job_status(job)
 
 
 @app.get("/api/health", response_model=HealthResponse)
@@ -237,6 +396,7 @@ async def health_check() -> HealthResponse:
         pipeline="unified_diagram_pipeline.py",
         features=feature_flags,
         uptime_seconds=uptime,
+        jobs=JOBS.stats(),
     )
 
 
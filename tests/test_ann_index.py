@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from core.ann_index import IVFIndex
+
+
+def _clustered(rows, dim=32, clusters=50, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    return centers[rng.integers(0, clusters, rows)] + 0.5 * rng.standard_normal((rows, dim)).astype(np.float32)
+
+
+def test_recall_against_exact_search_with_incremental_inserts():
+    data = _clustered(5200)
+    index = IVFIndex(nprobe=8, train_threshold=500)
+    index.add(data[:400])
+    assert not index.is_trained
+    for chunk in np.array_split(data[400:5000], 6):
+        index.add(chunk)
+    assert index.is_trained and index.trainings == 2 and len(index) == 5000
+
+    queries = data[5000:]
+    approx = index.search(queries, 10)
+    exact = index.search_exact(queries, 10)
+    recall = np.mean([len(np.intersect1d(a, e)) / 10 for (a, _), (e, _) in zip(approx, exact)])
+    assert recall >= 0.9
+    # Every inserted id is in exactly one cell
+    assert sorted(np.concatenate(index._lists).tolist()) == list(range(5000))
+
+
+def test_allowed_mask_and_persistence(tmp_path):
+    data = _clustered(3000)
+    index = IVFIndex(nprobe=2, train_threshold=1000)
+    index.add(data)
+    allowed = np.zeros(len(index), dtype=bool)
+    allowed[::97] = True
+
+    ids, scores = index.search(data[:1], 5, allowed=allowed)[0]
+    assert len(ids) == 5 and allowed[ids].all()
+    assert list(scores) == sorted(scores, reverse=True)
+
+    path = tmp_path / "index.npz"
+    index.save(str(path))
+    loaded = IVFIndex.load(str(path))
+    assert len(loaded) == len(index) and loaded.nprobe == 2
+    for (a, sa), (b, sb) in zip(index.search(data[:20], 5), loaded.search(data[:20], 5)):
+        assert a.tolist() == b.tolist()
+        assert sa == pytest.approx(sb)
+    assert loaded.add(data[:1]).tolist() == [3000]
+    with pytest.raises(ValueError):
+        loaded.add(np.ones((1, 8)))
@@ -0,0 +1,139 @@
+import os
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from core.nlp_result_cache import create_nlp_cache
+from core.primitive_library import PrimitiveLibrary
+from unified_diagram_pipeline import PipelineConfig, UnifiedDiagramPipeline
+
+
+class _BatchingExtractor:
+    def __init__(self):
+        self.single_calls = 0
+        self.batch_calls = 0
+
+    def _result(self, text):
+        triple = SimpleNamespace(subject=text.split()[0], relation="has", object="value")
+        return SimpleNamespace(triples=[triple], entities=[], relations=[])
+
+    def extract(self, text):
+        self.single_calls += 1
+        return self._result(text)
+
+    def extract_batch(self, texts):
+        self.batch_calls += 1
+        return [self._result(text) for text in texts]
+
+
+class _Analyzer:
+    def __init__(self):
+        self.calls = 0
+
+    def analyze(self, text):
+        self.calls += 1
+        return {'entities': [{'text': text.split()[0]}], 'dependencies': []}
+
+
+def _bare_pipeline(nlp_tools, **config_overrides):
+    # Skip __init__: it loads every model in the stack
+    pipeline = UnifiedDiagramPipeline.__new__(UnifiedDiagramPipeline)
+    pipeline.config = PipelineConfig(**config_overrides)
+    pipeline.nlp_tools = nlp_tools
+    pipeline._nlp_executor = None
+    pipeline._nlp_tool_versions = None
+    pipeline.nlp_cache = create_nlp_cache("memory")
+    return pipeline
+
+
+def test_batch_nlp_uses_batched_entry_points_and_cache():
+    openie, stanza = _BatchingExtractor(), _Analyzer()
+    pipeline = _bare_pipeline({'openie': openie, 'stanza': stanza})
+    texts = ["Battery circuit.", "Capacitor plates.", "Lens optics."]
+
+    results = pipeline._run_nlp_tools_batch(texts)
+
+    assert (openie.batch_calls, openie.single_calls, stanza.calls) == (1, 0, 3)
+    assert [r['openie']['triples'][0][0] for r in results] == ["Battery", "Capacitor", "Lens"]
+    assert results[0]['openie']['batched'] is True
+    assert results[2]['stanza']['entities'][0]['text'] == "Lens"
+
+    again = pipeline._run_nlp_tools_batch(texts[:2] + ["Pulley system."])
+    assert openie.batch_calls == 2 and stanza.calls == 4
+    assert again[0]['openie']['cached'] is True
+    assert again[2]['openie']['cached'] is False
+
+
+def test_generate_batch_in_process_forwards_nlp_and_captures_errors():
+    pipeline = _bare_pipeline({'stanza': _Analyzer()})
+    seen = {}
+
+    def fake_generate(problem_text, precomputed_nlp=None):
+        if problem_text == "bad":
+            raise RuntimeError("layout failed")
+        seen[problem_text] = precomputed_nlp
+        return SimpleNamespace(metadata={})
+
+    pipeline.generate = fake_generate
+
+    items = sorted(pipeline.generate_batch(["Spring mass.", "bad"], max_workers=1), key=lambda i: i.index)
+
+    assert items[0].success and items[0].result.metadata['batch_index'] == 0
+    assert seen["Spring mass."]['stanza']['entities'][0]['text'] == "Spring"
+    assert not items[1].success and items[1].error == "RuntimeError: layout failed"
+
+
+class _WorkerPipeline(UnifiedDiagramPipeline):
+    """Picklable pipeline double: rebuilt from its class in each worker process"""
+
+    def __init__(self, config):
+        self.config = config
+        self.nlp_tools = {}
+        self._nlp_executor = None
+        self._nlp_tool_versions = None
+        self.nlp_cache = create_nlp_cache("memory")
+
+    def generate(self, problem_text, precomputed_nlp=None):
+        if problem_text == "bad":
+            raise RuntimeError("layout failed")
+        return SimpleNamespace(metadata={'pid': os.getpid(), 'nlp': precomputed_nlp,
+                                         'nlp_enabled': self.config.enable_nlp_enrichment})
+
+
+def test_generate_batch_fans_out_to_worker_processes():
+    pipeline = _WorkerPipeline(PipelineConfig())
+    pipeline.nlp_tools = {'stanza': _Analyzer()}  # Phase 0 stays in this process
+    texts = ["Spring mass.", "bad", "Lens optics."]
+
+    items = sorted(pipeline.generate_batch(texts, max_workers=2), key=lambda i: i.index)
+
+    assert [item.problem_text for item in items] == texts
+    assert [item.success for item in items] == [True, False, True]
+    assert items[1].error == "RuntimeError: layout failed"
+    first, last = items[0].result.metadata, items[2].result.metadata
+    assert first['batch_index'] == 0 and last['batch_index'] == 2
+    assert os.getpid() not in (first['pid'], last['pid'])
+    assert first['nlp']['stanza']['entities'][0]['text'] == "Spring" and first['nlp_enabled'] is False
+
+
+class _CountingEncoder:
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts):
+        self.calls.append(texts)
+        if isinstance(texts, str):
+            return [float(len(texts)), 1.0]
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+def test_primitive_library_embeds_queries_in_one_call():
+    encoder = _CountingEncoder()
+    with patch("core.primitive_library.PrimitiveLibrary._get_embedder", return_value=encoder):
+        library = PrimitiveLibrary(backend="memory")
+    assert len(encoder.calls) == 1  # built-in primitives encoded as one batch
+
+    library.embed_texts(["physics battery object", "physics resistor object", "physics battery object"])
+    library.query("physics resistor object", top_k=1)
+
+    assert encoder.calls[1] == ["physics battery object", "physics resistor object"]
+    assert len(encoder.calls) == 2
@@ -0,0 +1,83 @@
+import pytest
+
+from core.columnar_property_graph import ColumnarPropertyGraph
+from core.property_graph import EdgeType, GraphEdge, GraphNode, NodeType, create_property_graph
+
+
+def _populate(pg, nodes=150):
+    for i in range(nodes):
+        node_type = NodeType.COMPONENT if i % 3 else NodeType.QUANTITY
+        properties = {"value": i, "unit": "V" if i % 2 else "A"}
+        if i % 5 == 0:
+            properties["scale"] = 1.0 if i % 10 else 1  # mixed int/float column
+        pg.add_node(GraphNode(id=f"n{i}", type=node_type, label=f"node {i}", properties=properties,
+                              metadata={"source": "test"} if i % 7 == 0 else {}))
+    for i in range(nodes - 1):
+        pg.add_edge(GraphEdge(source=f"n{i}", target=f"n{i + 1}", type=EdgeType.CONNECTED_TO, label="wire"))
+        if i % 4 == 0:
+            pg.add_edge(GraphEdge(source=f"n{i}", target=f"n{(i * 7) % nodes}", type=EdgeType.HAS_VALUE,
+                                  label="value", properties={"weight": i}, confidence=0.5))
+    return pg
+
+
+def _snapshot(pg):
+    nodes = sorted((n.id, n.type, n.label, tuple(n.properties.items()), tuple(n.metadata.items()))
+                   for n in pg.get_all_nodes())
+    edges = sorted((e.source, e.target, e.type.value, e.label, tuple(e.properties.items()), e.confidence)
+                   for e in pg.get_edges())
+    return nodes, edges
+
+
+def test_columnar_backend_matches_networkx_backend():
+    reference = _populate(create_property_graph("networkx"))
+    columnar = _populate(create_property_graph("columnar"))
+    assert isinstance(columnar, ColumnarPropertyGraph)
+
+    for pg in (reference, columnar):
+        pg.merge_node_properties("n3", {"unit": "mV", "tolerance": 0.05})
+        pg.merge_node_metadata("n3", {"ontologies": ["x"]})
+        pg.remove_node("n40")
+
+    assert _snapshot(columnar) == _snapshot(reference)
+    assert columnar.get_node("n10").properties == {"value": 10, "unit": "A", "scale": 1}
+    assert type(columnar.get_node("n5").properties["scale"]) is float
+    assert columnar.count_nodes(NodeType.QUANTITY) == reference.count_nodes(NodeType.QUANTITY)
+    assert columnar.edge_count(EdgeType.HAS_VALUE) == reference.edge_count(EdgeType.HAS_VALUE)
+    for node_id in ("n0", "n8", "n39", "n41", "n100"):
+        for direction in ("in", "out", "both"):
+            assert sorted(columnar.get_neighbors(node_id, direction)) == sorted(reference.get_neighbors(node_id, direction))
+        assert columnar.get_node_degree(node_id) == reference.get_node_degree(node_id)
+        assert len(columnar.get_edges(source=node_id, edge_type=EdgeType.HAS_VALUE)) == \
+            len(reference.get_edges(source=node_id, edge_type=EdgeType.HAS_VALUE))
+    assert [n.id for n in columnar.find_nodes_by_property("unit", "mV")] == ["n3"]
+    assert sorted(map(sorted, columnar.get_connected_components())) == \
+        sorted(map(sorted, reference.get_connected_components()))
+
+    # networkx is only built for path algorithms, and rebuilt after changes
+    assert columnar.find_shortest_path("n0", "n3") == reference.find_shortest_path("n0", "n3")
+    assert columnar.find_paths("n41", "n39") == []
+    columnar.add_edge(GraphEdge(source="n41", target="n39", type=EdgeType.RELATED_TO, label="bridge"))
+    assert columnar.find_paths("n41", "n39", max_length=1) == [["n41", "n39"]]
+
+    pattern = {'nodes': [{'id': 'q', 'type': NodeType.QUANTITY}, {'id': 'c', 'type': NodeType.COMPONENT}],
+               'edges': [{'source': 'q', 'target': 'c', 'type': EdgeType.HAS_VALUE}]}
+    assert sorted(map(sorted, (m.items() for m in columnar.query_pattern(pattern)))) == \
+        sorted(map(sorted, (m.items() for m in reference.query_pattern(pattern))))
+
+
+def test_columnar_round_trips_through_json_and_subgraph(tmp_path):
+    pg = _populate(ColumnarPropertyGraph(), nodes=20)
+    path = tmp_path / "graph.json"
+    pg.to_json(str(path))
+
+    loaded = ColumnarPropertyGraph.from_json(str(path))
+    assert _snapshot(loaded) == _snapshot(pg)
+
+    sub = pg.get_subgraph(["n1", "n2", "n3", "missing"])
+    assert isinstance(sub, ColumnarPropertyGraph)
+    assert [(e.source, e.target) for e in sub.get_edges()] == [("n1", "n2"), ("n2", "n3")]
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        create_property_graph("rocksdb")
@@ -0,0 +1,83 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("httpx")
+from fastapi.testclient import TestClient
+
+import fastapi_server
+from core.job_queue import JobQueue
+from core.stage_graph import StageRecord
+
+
+class SlowPipeline:
+    """Pipeline double: two stages, the second waits for `release`"""
+
+    property_graph = nlp_tools = diagram_planner = llm_planner = auditor = None
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def generate(self, problem_text, on_stage=None, cancel_event=None):
+        on_stage(StageRecord(name='nlp', status='ran', key='k', duration=0.01))
+        self.release.wait(5)
+        if cancel_event.is_set():
+            raise RuntimeError("cancelled")
+        on_stage(StageRecord(name='render', status='ran', key='k', duration=0.02))
+        return SimpleNamespace(svg='<svg/>', complexity_score=0.5, selected_strategy='direct',
+                               property_graph=None, nlp_results={'spacy': {}}, ontology_validation=None)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    pipeline = SlowPipeline()
+    queue = JobQueue(max_workers=1, max_pending=1)
+    monkeypatch.setattr(fastapi_server, "_pipeline", pipeline)
+    monkeypatch.setattr(fastapi_server, "JOBS", queue)
+    monkeypatch.setattr(fastapi_server, "SSE_POLL_SECONDS", 0.01)
+    yield TestClient(fastapi_server.app), pipeline
+    pipeline.release.set()
+    queue.shutdown()
+
+
+def _poll(client, job_id, state):
+    for _ in range(500):
+        body = client.get(f"/api/jobs/{job_id}").json()
+        if body['state'] == state:
+            return body
+        time.sleep(0.01)
+    raise AssertionError(f"job never reached {state}: {body}")
+
+
+def test_job_lifecycle_backpressure_and_events(client):
+    client, pipeline = client
+    first = client.post("/api/jobs", json={"problem_text": "two resistors in series"})
+    assert first.status_code == 202
+    job_id = first.json()['job_id']
+    second = client.post("/api/jobs", json={"problem_text": "a block on an incline"}).json()['job_id']
+
+    full = client.post("/api/jobs", json={"problem_text": "one too many"})
+    assert full.status_code == 429 and full.headers['retry-after']
+
+    _poll(client, job_id, 'running')
+    assert client.get("/api/health").status_code == 200  # Event loop is not blocked
+    assert client.delete(f"/api/jobs/{second}").json()['state'] == 'cancelled'
+
+    pipeline.release.set()
+    body = _poll(client, job_id, 'succeeded')
+    assert body['result']['svg'] == '<svg/>' and body['result']['metadata']['nlp_tools_used'] == ['spacy']
+    assert [e['stage'] for e in body['progress'] if e['type'] == 'stage'] == ['nlp', 'render']
+
+    stream = client.get(f"/api/jobs/{job_id}/events").text
+    assert 'event: stage' in stream and stream.rstrip().split('\n')[-2] == 'event: done'
+    assert client.delete(f"/api/jobs/{job_id}").status_code == 409
+    assert client.get("/api/jobs/unknown").status_code == 404
+
+
+def test_generate_endpoint_waits_on_the_queue(client):
+    client, pipeline = client
+    pipeline.release.set()
+    response = client.post("/api/generate", json={"problem_text": "two resistors in series"})
+    assert response.status_code == 200 and response.json()['svg'] == '<svg/>'
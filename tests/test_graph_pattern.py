@@ -0,0 +1,63 @@
+from core.graph_pattern import PatternEdge, PatternNode
+from core.graph_query import GraphQueryEngine, QueryFilter, QueryOperator
+from core.property_graph import EdgeType, GraphEdge, GraphNode, NodeType, PropertyGraph
+
+
+def _forces_graph():
+    pg = PropertyGraph()
+    for body in ("block", "table", "floor"):
+        pg.add_node(GraphNode(id=body, type=NodeType.BODY, label=body, properties={"mass": 2 if body == "block" else 50}))
+    for force, body, magnitude in (("gravity", "block", 19.6), ("normal", "block", 19.6), ("push", "table", 5.0)):
+        pg.add_node(GraphNode(id=force, type=NodeType.FORCE, label=force, properties={"magnitude": magnitude}))
+        pg.add_edge(GraphEdge(source=force, target=body, type=EdgeType.ACTS_ON, label="acts_on"))
+    pg.add_edge(GraphEdge(source="block", target="table", type=EdgeType.ABOVE, label="above"))
+    pg.add_edge(GraphEdge(source="table", target="floor", type=EdgeType.ABOVE, label="above"))
+    pg.add_edge(GraphEdge(source="table", target="table", type=EdgeType.RELATED_TO, label="related"))
+    return pg
+
+
+def test_query_pattern_matches_multi_hop_patterns_injectively():
+    pg = _forces_graph()
+    pattern = {
+        'nodes': [
+            {'id': 'f', 'type': NodeType.FORCE},
+            {'id': 'top', 'type': NodeType.BODY, 'properties': {'mass': 2}},
+            {'id': 'under', 'type': NodeType.BODY},
+        ],
+        'edges': [
+            {'source': 'f', 'target': 'top', 'type': EdgeType.ACTS_ON},
+            {'source': 'top', 'target': 'under', 'type': EdgeType.ABOVE},
+        ],
+    }
+
+    matches = pg.query_pattern(pattern)
+    assert sorted(m['f'] for m in matches) == ["gravity", "normal"]
+    assert all(m['top'] == "block" and m['under'] == "table" for m in matches)
+    assert len(pg.query_pattern(pattern, limit=1)) == 1
+
+    # Two variables never bind the same node, so the table's self-loop cannot match a-b
+    loop = {'nodes': [{'id': 'a'}, {'id': 'b'}], 'edges': [{'source': 'a', 'target': 'b', 'type': EdgeType.RELATED_TO}]}
+    assert pg.query_pattern(loop) == []
+
+    heavy = {'nodes': [{'id': 'b', 'type': NodeType.BODY,
+                        'filters': [QueryFilter('mass', QueryOperator.GT, 10)]}]}
+    assert sorted(m['b'] for m in pg.query_pattern(heavy)) == ["floor", "table"]
+
+
+def test_match_pattern_keeps_edge_results_and_self_loops():
+    pg = _forces_graph()
+    engine = GraphQueryEngine(pg)
+
+    acting = engine.match_pattern(source_type=NodeType.FORCE, edge_type=EdgeType.ACTS_ON, target_type=NodeType.BODY,
+                                  source_filters=[QueryFilter('magnitude', QueryOperator.LT, 10)])
+    assert [(m['source'].id, m['edge'].type, m['target'].id) for m in acting] == [("push", EdgeType.ACTS_ON, "table")]
+
+    loops = engine.match_pattern(edge_type=EdgeType.RELATED_TO)
+    assert [(m['source'].id, m['target'].id) for m in loops] == [("table", "table")]
+    assert len(engine.match_pattern(edge_type=EdgeType.ACTS_ON, limit=2)) == 2
+
+    stacked = engine.match_subgraph(
+        [PatternNode('a', NodeType.BODY), PatternNode('b', NodeType.BODY), PatternNode('c', NodeType.BODY)],
+        [PatternEdge('a', 'b', EdgeType.ABOVE), PatternEdge('b', 'c', EdgeType.ABOVE)],
+    )
+    assert [m.nodes for m in stacked] == [{'a': "block", 'b': "table", 'c': "floor"}]
@@ -0,0 +1,92 @@
+import threading
+
+import pytest
+
+from core.graph_persistence import GraphPersistenceWorker, InMemoryGraphStore, create_graph_store
+from core.property_graph import EdgeType, GraphEdge, GraphNode, NodeType, PropertyGraph
+
+
+def _graph(nodes=10):
+    pg = PropertyGraph()
+    for i in range(nodes):
+        pg.add_node(GraphNode(id=f"n{i}", type=NodeType.OBJECT, label=f"node {i}", properties={"i": i}))
+    for i in range(nodes - 1):
+        pg.add_edge(GraphEdge(source=f"n{i}", target=f"n{i + 1}", type=EdgeType.CONNECTED_TO, label="wire"))
+    return pg
+
+
+class FlakyStore(InMemoryGraphStore):
+    def __init__(self, failures, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = failures
+
+    def write_graph(self, request_id, snapshot):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("database unavailable")
+        return super().write_graph(request_id, snapshot)
+
+
+class GatedStore(InMemoryGraphStore):
+    def __init__(self):
+        super().__init__()
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def write_graph(self, request_id, snapshot):
+        self.started.set()
+        self.release.wait(10)
+        return super().write_graph(request_id, snapshot)
+
+
+def test_worker_batches_writes_and_retries_with_backoff():
+    store = FlakyStore(failures=2, batch_size=4)
+    worker = GraphPersistenceWorker(store, max_retries=3, backoff_base=0.01)
+    pg = _graph()
+    try:
+        assert worker.submit(pg, "req-1")
+        pg.remove_node("n9")  # later edits don't reach the queued snapshot
+        assert worker.flush(timeout=10)
+        metrics = worker.metrics()
+    finally:
+        worker.close()
+
+    assert store.batch_sizes == [4, 4, 2, 4, 4, 1]
+    assert len(store.graphs["req-1"]["nodes"]) == 10 and len(store.graphs["req-1"]["edges"]) == 9
+    assert worker.last_results["req-1"]["attempts"] == 3
+    assert (metrics['enqueued'], metrics['written'], metrics['retries'], metrics['failed']) == (1, 1, 2, 0)
+    assert metrics['queue_depth'] == 0 and metrics['last_lag_seconds'] > 0
+
+
+def test_worker_reports_failures_and_drops_when_queue_is_full():
+    failing = GraphPersistenceWorker(FlakyStore(failures=10), max_retries=1, backoff_base=0.01)
+    try:
+        failing.submit(_graph(2), "req-bad")
+        assert failing.flush(timeout=10)
+        assert failing.last_results["req-bad"]["status"] == "error"
+        assert failing.metrics()['failed'] == 1 and failing.metrics()['last_error'] == "database unavailable"
+    finally:
+        failing.close()
+
+    store = GatedStore()
+    worker = GraphPersistenceWorker(store, max_queue=1)
+    try:
+        assert worker.submit(_graph(2), "a")
+        assert store.started.wait(10)  # "a" is in flight
+        assert worker.submit(_graph(2), "b")  # "b" fills the queue
+        assert not worker.submit(_graph(2), "c")
+        metrics = worker.metrics()
+        assert (metrics['queue_depth'], metrics['in_flight'], metrics['dropped']) == (1, 1, 1)
+        assert metrics['oldest_pending_seconds'] >= 0
+        store.release.set()
+        assert worker.flush(timeout=10)
+    finally:
+        store.release.set()
+        worker.close()
+    assert sorted(store.graphs) == ["a", "b"]
+
+
+def test_create_graph_store_reports_missing_backends():
+    assert isinstance(create_graph_store("memory", uri="memory://"), InMemoryGraphStore)
+    with pytest.raises(ValueError, match="cassandra"):
+        create_graph_store("cassandra", uri="x")
@@ -0,0 +1,81 @@
+import threading
+import time
+
+import pytest
+
+from core.job_queue import JobQueue, JobState, QueueFullError
+from core.stage_graph import Stage, StageCancelled, StageExecutor, StageGraph, StageRun
+
+
+def _wait(job, timeout=5):
+    deadline = time.time() + timeout
+    while not job.done and time.time() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+def test_jobs_run_in_background_and_report_results():
+    queue = JobQueue(max_workers=1, max_pending=2)
+    try:
+        ok = queue.submit(lambda job: job.emit('stage', stage='only') or 42)
+        bad = queue.submit(lambda job: 1 / 0)
+        assert _wait(ok).state == JobState.SUCCEEDED and ok.result == 42
+        assert [e.get('state') or e.get('stage') for e in ok.events] == ['queued', 'running', 'only', 'succeeded']
+        assert _wait(bad).state == JobState.FAILED and 'ZeroDivisionError' in bad.error
+        assert queue.get(ok.id) is ok and queue.get('missing') is None
+    finally:
+        queue.shutdown()
+
+
+def test_backpressure_and_cancellation():
+    release = threading.Event()
+    queue = JobQueue(max_workers=1, max_pending=1)
+    try:
+        running = queue.submit(lambda job: release.wait(5))
+        queued = queue.submit(lambda job: 'never')
+        with pytest.raises(QueueFullError):
+            queue.submit(lambda job: None)
+
+        assert queue.cancel(queued.id).state == JobState.CANCELLED  # Queued: dropped at once
+        queue.submit(lambda job: None)  # Its slot is free again
+        assert queue.stats()['capacity'] == 2
+        release.set()
+        assert _wait(running).state == JobState.SUCCEEDED
+    finally:
+        queue.shutdown()
+
+
+def test_running_job_stops_at_next_stage_boundary():
+    started = threading.Event()
+
+    def first(ctx, text):
+        started.set()
+        time.sleep(0.2)
+        return {'a': text}
+
+    graph = StageGraph([
+        Stage('first', first, inputs=('text',), outputs=('a',)),
+        Stage('second', lambda ctx, a: {'b': a}, inputs=('a',), outputs=('b',)),
+    ], root_inputs=('text',))
+
+    def generate(job):
+        run = StageRun(graph, {'text': 'x'}, cancel_event=job.cancel_event,
+                       on_stage=lambda record: job.emit('stage', stage=record.name, status=record.status))
+        StageExecutor(max_workers=1).execute(run)
+        return run.get('b')
+
+    queue = JobQueue(max_workers=1)
+    try:
+        job = queue.submit(generate)
+        assert started.wait(5)
+        queue.cancel(job.id)
+        assert _wait(job).state == JobState.CANCELLED
+        stages = [(e['stage'], e['status']) for e in job.events if e['type'] == 'stage']
+        assert stages == [('first', 'running'), ('first', 'ran')]
+    finally:
+        queue.shutdown()
+
+    with pytest.raises(StageCancelled):
+        cancelled = threading.Event()
+        cancelled.set()
+        StageExecutor(max_workers=1).execute(StageRun(graph, {'text': 'x'}, cancel_event=cancelled))
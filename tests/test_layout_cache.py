@@ -0,0 +1,66 @@
+import pytest
+
+from core.layout_cache import LayoutSolutionCache, SQLiteLayoutSolutionCache, create_layout_cache, fingerprint_layout
+
+
+def _series_capacitors(names):
+    a, b, c = names
+    objects = [(a, 'battery', 40, 80), (b, 'capacitor', 30, 60), (c, 'capacitor', 30, 60)]
+    constraints = [('left_of', [a, b], {}), ('left_of', [b, c], {}), ('alignment_h', [b, c], {'gap': 20.0})]
+    return objects, constraints
+
+
+def test_fingerprint_ignores_ids_and_remaps_positions(tmp_path):
+    first = fingerprint_layout(*_series_capacitors(["V1", "C1", "C2"]), canvas=(800, 600), signature="z3")
+    renamed = fingerprint_layout(*_series_capacitors(["batt", "cap_a", "cap_b"]), canvas=(800, 600), signature="z3")
+
+    assert first.key == renamed.key
+    objects, constraints = _series_capacitors(["V1", "C1", "C2"])
+    assert fingerprint_layout(objects, constraints, canvas=(1200, 800), signature="z3").key != first.key
+    assert fingerprint_layout(objects, constraints[:2], canvas=(800, 600), signature="z3").key != first.key
+    assert fingerprint_layout(objects, constraints, canvas=(800, 600), signature="sympy").key != first.key
+
+    cache = create_layout_cache("sqlite", path=str(tmp_path / "layouts.sqlite3"))
+    cache.put(first, {"V1": (50.0, 100.0), "C1": (200.0, 110.0), "C2": (300.0, 110.0)}, {'applied': ['z3']})
+
+    hit = SQLiteLayoutSolutionCache(path=str(tmp_path / "layouts.sqlite3")).get(renamed)
+    assert hit.positions == {"batt": (50.0, 100.0), "cap_a": (200.0, 110.0), "cap_b": (300.0, 110.0)}
+    assert hit.metadata == {'applied': ['z3']}
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = LayoutSolutionCache(max_entries=1)
+    keys = [fingerprint_layout([("a", 'block', 10 * n, 10)], [], canvas=(800, 600)) for n in (1, 2)]
+    cache.put(keys[0], {"a": (1.0, 2.0)})
+    cache.put(keys[1], {"a": (3.0, 4.0)})
+
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[1]).positions == {"a": (3.0, 4.0)}
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions']) == (1, 1, 1)
+
+
+def test_z3_solver_replays_cached_layout_for_renamed_plan():
+    pytest.importorskip("z3")
+    from core.diagram_plan import DiagramPlan, create_alignment_constraint, create_no_overlap_constraint
+    from core.solvers.z3_layout_solver import Z3LayoutSolver
+    from core.universal_ai_analyzer import CanonicalProblemSpec, PhysicsDomain
+
+    def plan(ids):
+        spec = CanonicalProblemSpec(domain=PhysicsDomain.UNKNOWN, problem_type='test', problem_text='layout',
+                                    objects=[{'id': obj_id, 'type': 'plate'} for obj_id in ids])
+        plan = DiagramPlan(original_spec=spec, complexity_score=0.3, strategy='heuristic',
+                           canvas_width=800, canvas_height=600)
+        plan.add_global_constraint(create_no_overlap_constraint(ids))
+        plan.add_global_constraint(create_alignment_constraint(ids[:2], 'v'))
+        return plan
+
+    solver = Z3LayoutSolver(cache=LayoutSolutionCache())
+    first = solver.solve_layout(plan(["p1", "p2", "d1"]), {"p1": (200.0, 10.0), "p2": (200.0, 10.0), "d1": (180.0, 60.0)})
+    second = solver.solve_layout(plan(["top", "bottom", "slab"]),
+                                 {"top": (200.0, 10.0), "bottom": (200.0, 10.0), "slab": (180.0, 60.0)})
+
+    assert first.satisfiable and not first.metadata.get('cache_hit')
+    assert second.metadata['cache_hit']
+    assert second.positions == {"top": first.positions["p1"], "bottom": first.positions["p2"],
+                                "slab": first.positions["d1"]}
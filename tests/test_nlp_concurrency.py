@@ -0,0 +1,84 @@
+import time
+from types import SimpleNamespace
+
+from unified_diagram_pipeline import PipelineConfig, UnifiedDiagramPipeline
+
+
+class _SleepyExtractor:
+    def __init__(self, delay):
+        self.delay = delay
+
+    def extract(self, text):
+        time.sleep(self.delay)
+        triple = SimpleNamespace(subject="battery", relation="connected to", object="resistor")
+        return SimpleNamespace(triples=[triple], entities=[], relations=[])
+
+
+class _BrokenAnalyzer:
+    def analyze(self, text):
+        raise RuntimeError("model missing")
+
+
+def _bare_pipeline(nlp_tools, **config_overrides):
+    # Skip __init__: it loads every model in the stack
+    pipeline = UnifiedDiagramPipeline.__new__(UnifiedDiagramPipeline)
+    pipeline.config = PipelineConfig(**config_overrides)
+    pipeline.nlp_tools = nlp_tools
+    pipeline._nlp_executor = None
+    return pipeline
+
+
+def test_nlp_tools_run_concurrently_and_isolate_failures():
+    pipeline = _bare_pipeline({
+        'openie': _SleepyExtractor(0.3),
+        'dygie': _SleepyExtractor(0.3),
+        'stanza': _BrokenAnalyzer(),
+    })
+
+    start = time.time()
+    results, timing = pipeline._run_nlp_tools("A battery is connected to a resistor.")
+    elapsed = time.time() - start
+
+    assert list(results) == ['openie', 'dygie']
+    assert elapsed < 0.55  # sequential would take >= 0.6s
+    assert timing['mode'] == 'concurrent'
+    assert 'stanza' in timing['failed']
+    assert timing['critical_path_tool'] in ('openie', 'dygie')
+    assert results['openie']['runtime_ms'] >= 300
+    assert results['openie']['triples'] == [("battery", "connected to", "resistor")]
+
+
+def test_nlp_tool_timeout_drops_slow_tool():
+    pipeline = _bare_pipeline(
+        {'openie': _SleepyExtractor(0.0), 'dygie': _SleepyExtractor(1.0)},
+        nlp_tool_timeouts={'dygie': 0.1},
+    )
+
+    results, timing = pipeline._run_nlp_tools("text")
+
+    assert list(results) == ['openie']
+    assert timing['timed_out'] == ['dygie']
+    assert timing['critical_path_tool'] == 'dygie'
+
+
+def test_nlp_tools_sequential_mode():
+    pipeline = _bare_pipeline({'openie': _SleepyExtractor(0.0)}, nlp_parallel=False)
+
+    results, timing = pipeline._run_nlp_tools("text")
+
+    assert timing['mode'] == 'sequential'
+    assert results['openie']['cached'] is False
+
+
+def test_timed_out_tool_does_not_starve_later_calls():
+    pipeline = _bare_pipeline(
+        {'openie': _SleepyExtractor(0.0), 'dygie': _SleepyExtractor(1.0)},
+        nlp_max_workers=1, nlp_tool_timeouts={'dygie': 0.05},
+    )
+
+    pipeline._run_nlp_tools("text")  # dygie's thread is still sleeping
+    start = time.time()
+    results, timing = pipeline._run_nlp_tools("text")
+
+    assert 'openie' in results and timing['timed_out'] == ['dygie']
+    assert time.time() - start < 0.5
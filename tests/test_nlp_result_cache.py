@@ -0,0 +1,112 @@
+from dataclasses import dataclass
+
+import pytest
+
+from core.nlp_result_cache import (
+    FrozenDict,
+    NLPResultCache,
+    SQLiteNLPResultCache,
+    create_nlp_cache,
+    freeze,
+    make_nlp_cache_key,
+    normalize_results,
+)
+
+
+@dataclass
+class Entity:
+    """Stands in for a tool's live result objects (e.g. DyGIE++ entities)"""
+    text: str
+    type: str
+
+
+def _sample_results():
+    return {
+        'openie': {
+            'provenance': 'openie',
+            'runtime_ms': 12.5,
+            'cached': False,
+            'triples': [("battery", "connected to", "resistor")],
+            'raw_result': object(),
+        },
+        'stanza': {
+            'provenance': 'stanza',
+            'entities': [{'text': 'battery', 'type': 'OBJECT'}],
+        },
+        'dygie': {
+            'entities': [Entity('resistor', 'OBJECT')],
+            'raw_result': object(),
+        },
+    }
+
+
+def test_cache_key_is_stable_and_version_sensitive():
+    versions = {'openie': 'OpenIEExtractor', 'stanza': 'StanzaEnhancer;model=en'}
+    key = make_nlp_cache_key("A 12 V battery.", versions)
+
+    assert key == make_nlp_cache_key("A 12 V battery.", dict(reversed(list(versions.items()))))
+    assert key != make_nlp_cache_key("A 12 V battery.", {**versions, 'stanza': 'StanzaEnhancer;model=fr'})
+    assert key != make_nlp_cache_key("A 9 V battery.", versions)
+
+
+def test_memory_cache_returns_frozen_shared_results():
+    cache = NLPResultCache(max_entries=1)
+    stored = cache.put("k1", _sample_results())
+
+    cached = cache.get("k1")
+    assert cached is stored
+    assert isinstance(cached['openie'], FrozenDict)
+    assert cached['openie']['triples'] == (("battery", "connected to", "resistor"),)
+    with pytest.raises(TypeError):
+        cached['openie']['cached'] = True
+
+    cache.put("k2", _sample_results())
+    assert cache.get("k1") is None
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions']) == (1, 1, 1)
+
+
+def test_sqlite_cache_is_shared_across_instances(tmp_path):
+    path = tmp_path / "nlp.sqlite3"
+    writer = SQLiteNLPResultCache(path=str(path))
+    writer.put("k1", _sample_results())
+
+    reader = SQLiteNLPResultCache(path=str(path))
+    cached = reader.get("k1")
+
+    assert cached['stanza']['entities'][0]['text'] == 'battery'
+    assert 'raw_result' not in cached['openie']
+    subject, relation, obj = cached['openie']['triples'][0]
+    assert relation == "connected to"
+    assert reader.stats()['hits'] == 1
+    writer.close()
+    reader.close()
+
+
+def test_sqlite_cache_evicts_least_recently_used(tmp_path):
+    cache = SQLiteNLPResultCache(path=str(tmp_path / "nlp.sqlite3"), max_bytes=1, memory_entries=0)
+    cache.put("k1", _sample_results())
+    cache.put("k2", _sample_results())
+
+    assert cache.get("k1") is None
+    assert cache.stats()['evictions'] >= 1
+    cache.close()
+
+
+def test_create_nlp_cache_backends(tmp_path):
+    assert create_nlp_cache("none") is None
+    assert create_nlp_cache("memory").backend == "memory"
+    assert create_nlp_cache("sqlite", path=str(tmp_path / "c.sqlite3")).backend == "sqlite"
+    with pytest.raises(ValueError):
+        create_nlp_cache("redis")
+
+
+def test_memory_hits_disk_hits_and_fresh_results_have_the_same_shape(tmp_path):
+    fresh = freeze(normalize_results(_sample_results()))
+    memory = NLPResultCache().put("k1", _sample_results())
+    SQLiteNLPResultCache(path=str(tmp_path / "nlp.sqlite3")).put("k1", _sample_results())
+    disk = SQLiteNLPResultCache(path=str(tmp_path / "nlp.sqlite3"), memory_entries=0).get("k1")
+
+    assert fresh == memory == disk
+    assert disk['dygie']['entities'] == ({'text': 'resistor', 'type': 'OBJECT'},)
+    assert all('raw_result' not in entry for entry in memory.values())
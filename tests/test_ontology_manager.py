@@ -0,0 +1,35 @@
+import pytest
+
+pytest.importorskip("rdflib")
+
+from core.ontology import Domain, OntologyManager, ValidationLevel
+from core.ontology import ontology_manager
+
+
+def test_queries_are_prepared_once_per_text():
+    manager = OntologyManager(domain=Domain.PHYSICS, enable_reasoning=False)
+    manager.add_instance("F1", "phys:Force", {"phys:hasMagnitude": 10})
+    query = "SELECT ?f ?m WHERE { ?f rdf:type phys:Force . ?f phys:hasMagnitude ?m }"
+
+    first = manager.query(query)
+    prepared = ontology_manager._prepare_query(query, dict(manager.graph.namespaces()))
+    assert manager.query(query) == first == [{'f': str(manager.BASE['F1']), 'm': '10'}]
+    assert ontology_manager._prepare_query(query, dict(manager.graph.namespaces())) is prepared
+    assert manager.query("SELECT ?x WHERE {") == []
+
+
+def test_defined_terms_follow_tbox_changes():
+    manager = OntologyManager(domain=Domain.PHYSICS, enable_reasoning=False)
+    manager.add_instance("s1", "phys:Spring")
+    manager.add_triple("s1", "phys:stiffness", "k")
+    result = manager.validate(ValidationLevel.STRICT)
+    assert any("undefined class" in e and e.endswith("physics#Spring") for e in result.errors)
+    assert any(e.endswith("physics#stiffness") for e in result.errors)
+
+    manager.add_triple("phys:Spring", "rdf:type", "owl:Class")
+    manager.import_rdf(
+        "@prefix owl: <http://www.w3.org/2002/07/owl#> . "
+        "<http://stem-diagrams.org/physics#stiffness> a owl:DatatypeProperty ."
+    )
+    errors = manager.validate(ValidationLevel.STRICT).errors
+    assert not any(e.endswith(("physics#Spring", "physics#stiffness")) for e in errors)
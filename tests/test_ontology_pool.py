@@ -0,0 +1,60 @@
+import pytest
+
+pytest.importorskip("owlrl")
+
+from core.ontology import Domain, OntologyManager, OntologyPool
+from core.property_graph import EdgeType, GraphEdge, GraphNode, NodeType, PropertyGraph
+
+
+def _add_abox(manager):
+    manager.add_instance("F1", "phys:GravitationalForce", {"phys:hasMagnitude": 9.8, "phys:hasDirection": "down"})
+    manager.add_instance("F2", "phys:Force", {"phys:hasMagnitude": 3})
+    manager.add_instance("block", "stem:Object", {"stem:hasColor": "red", "stem:fixed": True})
+    manager.add_instance("A1", "chem:Atom")
+    manager.add_instance("C1", "bio:Cell")
+    manager.add_triple("F1", "phys:actsOn", "block")
+    manager.add_triple("A1", "chem:bondedTo", "A2")
+    manager.add_triple("C1", "bio:contains", "stem:mitochondrion")
+    pg = PropertyGraph()
+    pg.add_node(GraphNode(id="m1", type=NodeType.OBJECT, label="mass", properties={"mass": 2.0}))
+    pg.add_node(GraphNode(id="f", type=NodeType.FORCE, label="weight"))
+    pg.add_edge(GraphEdge(source="f", target="m1", type=EdgeType.ACTS_ON, label="acts on"))
+    manager.from_property_graph(pg)
+
+
+@pytest.mark.parametrize("domain", list(Domain))
+def test_incremental_reasoning_matches_full_closure(domain):
+    pool = OntologyPool()
+    reference = OntologyManager(domain=domain)
+    pooled = pool.acquire(domain)
+    for manager in (reference, pooled):
+        _add_abox(manager)
+
+    expected, result = reference.validate(), pooled.validate()
+
+    assert set(pooled.graph) == set(reference.graph)
+    assert sorted(result.warnings) == sorted(expected.warnings)
+    assert result.metadata['triple_count'] == expected.metadata['triple_count']
+    assert pool.stats()[domain.value]['incremental_runs'] == 1
+    # The shared TBox is never written to
+    assert len(pool.get_tbox(domain).raw) == len(OntologyManager(domain=domain, enable_reasoning=False).graph)
+
+
+def test_schema_changes_fall_back_to_full_closure_and_closures_persist(tmp_path):
+    OntologyPool(cache_dir=str(tmp_path)).warm([Domain.PHYSICS])
+    pool = OntologyPool(cache_dir=str(tmp_path))
+    assert pool.stats() == {}
+    tbox = pool.get_tbox(Domain.PHYSICS)
+    assert tbox.source == 'disk' and tbox.incremental
+
+    reference = OntologyManager(domain=Domain.PHYSICS)
+    pooled = pool.acquire(Domain.PHYSICS)
+    for manager in (reference, pooled):
+        manager.add_triple("phys:Spring", "rdfs:subClassOf", "phys:Force")
+        manager.add_instance("s1", "phys:Spring")
+        manager.graph.remove((manager.PHYS.Friction, None, None))
+        manager.apply_reasoning()
+
+    assert set(pooled.graph) == set(reference.graph)
+    assert pool.stats()['physics']['full_runs'] == 1
+    assert (pooled.PHYS.Friction, None, None) in tbox.raw
@@ -0,0 +1,133 @@
+import hashlib
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from core import primitive_library
+from core.primitive_library import DiagramPrimitive, PrimitiveCategory, PrimitiveLibrary
+
+
+class HashEmbedder:
+    """Deterministic bag-of-words embedder standing in for sentence-transformers"""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts):
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+        self.calls.append(len(batch))
+        vectors = np.zeros((len(batch), 32), dtype=np.float32)
+        for row, text in enumerate(batch):
+            for word in text.lower().split():
+                vectors[row, int(hashlib.md5(word.encode()).hexdigest(), 16) % 32] += 1.0
+        return vectors[0] if single else vectors
+
+
+@pytest.fixture
+def library():
+    with patch.object(PrimitiveLibrary, "_get_embedder", return_value=HashEmbedder()):
+        return PrimitiveLibrary(backend="memory")
+
+
+def _python_ranking(library, text, top_k, category=None):
+    query = library._embed_text(text)
+    scored = [
+        (library._cosine_similarity(query, embedding), primitive.id)
+        for primitive, embedding in library.memory_store
+        if not category or primitive.category == category
+    ]
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return scored[:top_k]
+
+
+def test_matrix_search_matches_python_cosine(library):
+    for text, category in [("battery resistor circuit", None), ("spring mass", PrimitiveCategory.MECHANICS),
+                           ("atom bond", PrimitiveCategory.CHEMISTRY)]:
+        results = library.query(text, top_k=4, category=category)
+        expected = _python_ranking(library, text, 4, category)
+        assert [r.id for r in results] == [pid for _, pid in expected]
+        assert [r.similarity_score for r in results] == pytest.approx([score for score, _ in expected], abs=1e-6)
+        assert all(r.category == category for r in results if category)
+
+    # Scores are attached to copies, never to the stored primitives
+    assert all(primitive.similarity_score == 0.0 for primitive, _ in library.memory_store)
+    assert library.query("battery", top_k=0) == []
+    assert library.query("battery", top_k=3, min_score=1.1) == []
+
+
+def test_query_batch_uses_one_encoder_call_and_sees_added_primitives(library):
+    library.embedder.calls.clear()
+    texts = ["battery cell", "pulley rope", "zz unknown words"]
+    batch = library.query_batch(texts, top_k=2)
+    assert library.embedder.calls == [3]
+    assert [[r.id for r in results] for results in batch] == [[r.id for r in library.query(t, top_k=2)] for t in texts]
+
+    library.add(DiagramPrimitive(id="custom_lens", name="Convex Lens", category=PrimitiveCategory.GEOMETRY,
+                                 svg_content="<g/>", tags=["optics", "lens"]))
+    assert library.query_batch(["convex lens optics"], top_k=1)[0][0].id == "custom_lens"
+    assert library.query_batch([], top_k=1) == []
+
+
+def test_falls_back_to_python_scoring_without_numpy(library, monkeypatch):
+    expected = [r.id for r in library.query("spring mass", top_k=3)]
+    monkeypatch.setattr(primitive_library, "NUMPY_AVAILABLE", False)
+    assert [r.id for r in library.query("spring mass", top_k=3)] == expected
+
+
+def test_embedding_store_skips_model_load_until_a_query_needs_it(tmp_path):
+    embedder = HashEmbedder()
+    loads = []
+
+    def load_embedder(self):
+        loads.append(1)
+        return embedder
+
+    with patch.object(PrimitiveLibrary, "_get_embedder", load_embedder):
+        built = PrimitiveLibrary(backend="memory", embedding_store_dir=str(tmp_path))
+        assert built.embedding_store_status == 'built' and len(loads) == 1
+
+        warm = PrimitiveLibrary(backend="memory", embedding_store_dir=str(tmp_path))
+        assert warm.embedding_store_status == 'loaded' and len(loads) == 1
+        assert isinstance(warm._vector_matrix, np.memmap)
+        assert warm.get_stats()['has_embedder'] and len(loads) == 1
+
+        expected = [(r.id, r.similarity_score) for r in built.query("spring block", top_k=3)]
+        assert [(r.id, r.similarity_score) for r in warm.query("spring block", top_k=3)] == expected
+        assert len(loads) == 2
+
+        # Changing the primitives' text invalidates the stored matrix
+        original = PrimitiveLibrary._get_built_in_primitives
+
+        def renamed(self):
+            primitives = original(self)
+            primitives[0].tags = primitives[0].tags + ["renamed"]
+            return primitives
+
+        with patch.object(PrimitiveLibrary, "_get_built_in_primitives", renamed):
+            stale = PrimitiveLibrary(backend="memory", embedding_store_dir=str(tmp_path))
+        assert stale.embedding_store_status == 'built' and len(loads) == 3
+
+
+def test_ann_backend_matches_memory_and_persists(library, tmp_path):
+    with patch.object(PrimitiveLibrary, "_get_embedder", return_value=HashEmbedder()):
+        ann = PrimitiveLibrary(backend="ann", index_dir=str(tmp_path))
+    ann.ann_index.train()  # Built-in library is below the training threshold
+    for text, category in [("battery resistor circuit", None), ("spring mass", PrimitiveCategory.MECHANICS)]:
+        expected = [(r.id, r.similarity_score) for r in library.query(text, top_k=3, category=category)]
+        results = ann.query(text, top_k=3, category=category)
+        assert [r.id for r in results] == [pid for pid, _ in expected]
+        assert [r.similarity_score for r in results] == pytest.approx([score for _, score in expected], abs=1e-6)
+
+    ann.add(DiagramPrimitive(id="custom_lens", name="Convex Lens", category=PrimitiveCategory.GEOMETRY,
+                             svg_content="<g/>", tags=["optics", "lens"]))
+    assert len(ann.ann_index) == len(ann.memory_store)
+    assert ann.query("convex lens optics", top_k=1)[0].id == "custom_lens"
+    assert ann.save()
+
+    loads = []
+    with patch.object(PrimitiveLibrary, "_get_embedder", lambda self: loads.append(1) or HashEmbedder()):
+        warm = PrimitiveLibrary(backend="ann", index_dir=str(tmp_path))
+        assert not loads and warm.get_stats()['ann_index']['trained']
+        assert warm.query("convex lens optics", top_k=1)[0].id == "custom_lens"
@@ -0,0 +1,70 @@
+import pytest
+
+from core.columnar_property_graph import ColumnarPropertyGraph
+from core.property_graph import EdgeType, GraphEdge, GraphNode, NodeType, PropertyGraph
+from core.property_graph_io import BackgroundGraphWriter, PropertyGraphReader, read_property_graph
+
+
+def _graph(nodes=30):
+    pg = PropertyGraph()
+    for i in range(nodes):
+        pg.add_node(GraphNode(
+            id=f"q{i}", type=NodeType.QUANTITY, label="Capacitance",
+            properties={"value": i * 1.5e-6, "count": -i, "unit": "F", "ok": i % 2 == 0, "missing": None,
+                        "tags": ["c", {"nested": [1, 2]}], 3: "int key", "note": "long " * 40},
+            metadata={"sources": ["text_pattern"]},
+        ))
+    for i in range(nodes - 1):
+        pg.add_edge(GraphEdge(source=f"q{i}", target=f"q{i + 1}", type=EdgeType.RELATED_TO, label="next",
+                              confidence=0.25, properties={"rank": i}))
+    return pg
+
+
+def _dicts(pg):
+    return [n.to_dict() for n in pg.get_all_nodes()], [e.to_dict() for e in pg.get_edges()]
+
+
+def test_binary_round_trip_and_lazy_slices(tmp_path):
+    pg = _graph()
+    path = tmp_path / "graph.pgb"
+    stats = pg.to_binary(str(path))
+    assert (stats['nodes'], stats['edges']) == (30, 29)
+    # Repeated labels, keys and units are stored once
+    assert stats['strings'] < 30 * 3
+
+    assert _dicts(PropertyGraph.from_binary(str(path))) == _dicts(pg)
+    assert _dicts(read_property_graph(str(path), ColumnarPropertyGraph())) == _dicts(pg)
+
+    with PropertyGraphReader(str(path)) as reader:
+        assert (reader.node_count, reader.edge_count) == (30, 29)
+        assert [n.id for n in reader.read_nodes(10, 13)] == ["q10", "q11", "q12"]
+        edge = reader.read_edges(28)[0]
+        assert (edge.source, edge.target, edge.confidence, edge.properties) == ("q28", "q29", 0.25, {"rank": 28})
+        assert reader.read_nodes(40, 50) == []
+
+
+def test_truncated_dump_is_rejected(tmp_path):
+    path = tmp_path / "graph.pgb"
+    _graph(5).to_binary(str(path))
+    path.write_bytes(path.read_bytes()[:-3])
+    with pytest.raises(ValueError):
+        PropertyGraphReader(str(path))
+
+
+def test_background_writer_snapshots_before_later_mutations(tmp_path):
+    pg = _graph(5)
+    writer = BackgroundGraphWriter()
+    try:
+        binary = writer.submit(pg, str(tmp_path / "graph.pgb"))
+        as_json = writer.submit(pg, str(tmp_path / "graph.json"), format="json")
+        pg.get_node("q0").metadata["sources"] = ["changed"]
+        pg.remove_node("q4")
+        assert writer.flush(timeout=30)
+    finally:
+        writer.close()
+
+    assert binary.result()['status'] == as_json.result()['status'] == 'success'
+    loaded = PropertyGraph.from_binary(str(tmp_path / "graph.pgb"))
+    assert loaded.count_nodes() == 5 and loaded.get_node("q0").metadata["sources"] == ["text_pattern"]
+    assert PropertyGraph.from_json(str(tmp_path / "graph.json")).count_nodes() == 5
+    assert not list(tmp_path.glob("*.tmp-*"))
@@ -59,3 +59,25 @@ def test_property_graph_gap_queries_and_metadata_merge():
     pg.merge_node_metadata("d1", {"ontologies": [{"namespace": "physh", "uri": "x"}]})
     metadata = pg.get_node("d1").metadata
     assert len(metadata["ontologies"]) == 1
+
+
+def test_edge_indexes_return_stored_edges_and_survive_node_removal():
+    pg = PropertyGraph()
+    for node_id in ("battery", "resistor", "capacitor"):
+        pg.add_node(GraphNode(id=node_id, type=NodeType.COMPONENT, label=node_id))
+    wire = GraphEdge(source="battery", target="resistor", type=EdgeType.CONNECTED_TO, label="wire")
+    pg.add_edge(wire)
+    pg.add_edge(GraphEdge(source="resistor", target="capacitor", type=EdgeType.CONNECTED_TO, label="wire"))
+    pg.add_edge(GraphEdge(source="battery", target="capacitor", type=EdgeType.DEPENDS_ON, label="charges"))
+
+    assert pg.get_outgoing_edges("battery", EdgeType.CONNECTED_TO)[0] is wire
+    assert [e.source for e in pg.get_incoming_edges("capacitor")] == ["resistor", "battery"]
+    assert pg.get_edges(source="battery", target="capacitor", edge_type=EdgeType.CONNECTED_TO) == []
+    assert pg.edge_count(EdgeType.CONNECTED_TO) == 2
+
+    pg.remove_node("resistor")
+
+    assert pg.get_outgoing_edges("battery", EdgeType.CONNECTED_TO) == []
+    assert [e.label for e in pg.get_edges()] == ["charges"]
+    assert pg.get_edges(edge_type=EdgeType.CONNECTED_TO) == []
+    assert pg.edge_count() == pg.graph.number_of_edges() == 1
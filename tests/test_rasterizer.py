@@ -0,0 +1,108 @@
+import threading
+import time
+
+import pytest
+
+from core.rasterizer import RasterizationService, configure_rasterizer, intrinsic_size
+
+SVG = '<svg xmlns="http://www.w3.org/2000/svg" width="10" height="10"><rect width="10" height="10"/></svg>'
+
+
+def fake_render(svg, width, height, scale):
+    """Picklable stand-in for cairosvg: encodes its inputs as the 'PNG'"""
+    return b"PNG:" + svg[:8] + f":{width}x{height}@{scale}".encode()
+
+
+class CountingRender:
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.delay = delay
+
+    def __call__(self, svg, width, height, scale):
+        self.calls += 1
+        time.sleep(self.delay)
+        return fake_render(svg, width, height, scale)
+
+
+def test_cache_is_keyed_on_digest_and_size():
+    render = CountingRender()
+    service = RasterizationService(workers=0, render=render)
+
+    first = service.rasterize(SVG, 100, 80)
+    assert first == fake_render(SVG.encode(), 100, 80, 1.0)
+    assert service.rasterize(SVG.encode(), 100, 80) == first  # str and bytes share an entry
+    assert render.calls == 1
+
+    service.rasterize(SVG, 200, 160)
+    service.rasterize(SVG.replace('10', '12'), 100, 80)
+    assert render.calls == 3
+    assert service.stats()['hits'] == 1 and service.stats()['entries'] == 3
+
+
+def test_lru_eviction_and_failures():
+    service = RasterizationService(workers=0, cache_size=2, render=CountingRender())
+    for size in (10, 20, 30):
+        service.rasterize(SVG, size, size)
+    assert service.stats()['entries'] == 2
+    service.rasterize(SVG, 10, 10)
+    assert service.stats()['misses'] == 4
+
+    def broken(svg, width, height, scale):
+        raise ValueError("bad svg")
+
+    failing = RasterizationService(workers=0, render=broken)
+    assert failing.rasterize(SVG) is None
+    assert failing.stats()['entries'] == 0
+
+
+def test_concurrent_requests_share_one_job():
+    render = CountingRender(delay=0.2)
+    service = RasterizationService(workers=0, render=render)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(service.rasterize(SVG, 50, 50))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert render.calls == 1
+    assert len(set(results)) == 1 and results[0] is not None
+    assert service.stats()['shared'] + service.stats()['hits'] == 3
+
+
+def test_process_pool_workers():
+    service = RasterizationService(workers=1, render=fake_render)
+    try:
+        futures = [service.submit(SVG, 40, 30) for _ in range(3)]
+        assert {future.result(timeout=30) for future in futures} == {fake_render(SVG.encode(), 40, 30, 1.0)}
+        assert service.stats()['misses'] == 1
+    finally:
+        service.shutdown()
+
+
+def test_cairosvg_produces_png():
+    pytest.importorskip("cairosvg")
+    service = RasterizationService(workers=0)
+    png = service.rasterize(SVG, 20, 20)
+    assert png.startswith(b"\x89PNG")
+
+
+def test_unsized_requests_use_the_intrinsic_size():
+    assert intrinsic_size(SVG.encode()) == (10, 10)
+    assert intrinsic_size(b'<svg viewBox="0 0 300 200">') == (300, 200)
+    assert intrinsic_size(b'<svg width="100%" height="50">') == (None, None)
+
+
+def test_renderer_and_vlm_validator_share_one_rasterization(monkeypatch):
+    from types import SimpleNamespace
+    import core.rasterizer
+    from core.universal_renderer import UniversalRenderer
+    from core.vlm_validator import VLMValidator
+
+    monkeypatch.setattr(core.rasterizer, "_rasterizer", None)  # Restored after the test
+    render = CountingRender()
+    service = configure_rasterizer(workers=0, render=render)
+
+    UniversalRenderer._svg_to_png(SimpleNamespace(width=10, height=10), SVG)  # Renderer passes its size
+    png = VLMValidator._ensure_png(None, SVG, inline_svg=True)  # Validator passes none
+    assert png == fake_render(SVG.encode(), 10, 10, 1.0)
+    assert render.calls == 1 and service.stats()['hits'] == 1
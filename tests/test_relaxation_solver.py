@@ -0,0 +1,53 @@
+from core.scene.schema_v1 import Constraint, ConstraintType, PrimitiveType, Scene, SceneObject
+from core.solvers.relaxation_solver import VectorizedRelaxationSolver
+from core.universal_layout_engine import UniversalLayoutEngine
+
+
+def _scene():
+    scene = Scene()
+    scene.objects = [
+        SceneObject(id=oid, type=PrimitiveType.RECTANGLE, position={'x': x, 'y': y},
+                    properties={'width': 60, 'height': 30})
+        for oid, x, y in [("a", 100, 100), ("b", 300, 120), ("c", 500, 90),
+                          ("d", 200, 400), ("e", 260, 380), ("f", 700, 600)]
+    ]
+    scene.constraints = [
+        Constraint(type=ConstraintType.STACKED_V, objects=["a", "b", "c"], value=10),
+        Constraint(type=ConstraintType.ALIGNED_H, objects=["d", "e"]),
+        Constraint(type=ConstraintType.RIGHT_OF, objects=["f", "e"], value=5),
+        Constraint(type=ConstraintType.ADJACENT, objects=["d", "e"]),
+        Constraint(type=ConstraintType.DISTANCE, objects=["a", "f"], value=100),
+    ]
+    return scene
+
+
+def _positions(scene):
+    return {obj.id: (obj.position['x'], obj.position['y']) for obj in scene.objects}
+
+
+def test_vectorized_relaxation_matches_per_constraint_solver():
+    engine = UniversalLayoutEngine(width=1200, height=800, relaxation_backend="python")
+    reference = _scene()
+    engine._solve_constraints(reference)
+
+    scene = _scene()
+    result = VectorizedRelaxationSolver(canvas_center=(600, 400)).solve(scene)
+
+    assert result.converged and result.skipped == 1
+    assert result.compiled == {'stacked_v': 1, 'aligned_h': 1, 'right_of': 1, 'adjacent': 1}
+    assert _positions(scene) == _positions(reference)
+    assert scene.objects[5].position['anchor'] == 'top-left'
+
+
+def test_auto_backend_switches_on_constraint_count():
+    engine = UniversalLayoutEngine(width=1200, height=800, relaxation_backend="auto")
+    small = _scene()
+    assert not engine._use_vectorized_relaxation(small)
+
+    large = _scene()
+    large.constraints = [
+        Constraint(type=ConstraintType.ALIGNED_V, objects=["a", "b"]) for _ in range(40)
+    ]
+    assert engine._use_vectorized_relaxation(large)
+    assert engine._solve_constraints(large) <= 2
+    assert large.objects[0].position['x'] == large.objects[1].position['x'] == 200
@@ -0,0 +1,103 @@
+import random
+
+from core.label_placer import IntelligentLabelPlacer
+from core.scene.schema_v1 import Constraint, ConstraintType, PrimitiveType, RenderLayer, Scene, SceneObject
+from core.spatial_index import SceneSpatialIndex, boxes_overlap
+from core.spatial_validator import SpatialValidator
+from core.universal_layout_engine import UniversalLayoutEngine
+
+
+def _box(obj):
+    x, y = obj.position['x'], obj.position['y']
+    return (x, y, x + obj.properties['width'], y + obj.properties['height'])
+
+
+def _random_rects(count, seed=7):
+    rng = random.Random(seed)
+    return [
+        SceneObject(
+            id=f"r{i}",
+            type=PrimitiveType.RECTANGLE,
+            position={'x': rng.uniform(0, 1000), 'y': rng.uniform(0, 700), 'anchor': 'top-left'},
+            properties={'width': rng.uniform(5, 150), 'height': rng.uniform(5, 150)},
+            layer=RenderLayer.SHAPES,
+        )
+        for i in range(count)
+    ]
+
+
+def test_index_matches_brute_force_and_tracks_moves():
+    rects = _random_rects(120)
+    index = SceneSpatialIndex.build(rects, _box, cell_size=50)
+
+    expected = [(a.id, b.id) for i, a in enumerate(rects) for b in rects[i + 1:] if boxes_overlap(_box(a), _box(b))]
+    assert [(a.id, b.id) for a, b in index.candidate_pairs()] == expected
+
+    probe = (300, 200, 420, 260)
+    assert index.query(probe) == [r for r in rects if boxes_overlap(probe, _box(r))]
+
+    mover = rects[0]
+    mover.position['x'], mover.position['y'] = 5000, 5000
+    assert mover in index.query(index.bounds(mover))  # stale until update()
+    assert index.update(mover) is True
+    assert index.query((4990, 4990, 5010, 5010)) == [mover]
+    assert index.get("r0") is mover and index.get("missing") is None
+
+
+def test_validator_and_label_placer_results_unchanged():
+    scene = Scene()
+    scene.objects = _random_rects(40, seed=3)
+    scene.objects.append(SceneObject(
+        id="label1", type=PrimitiveType.TEXT, position=None,
+        properties={"text": "C = 4 uF", "font_size": 16, "target_object": "r5"},
+        layer=RenderLayer.LABELS,
+    ))
+
+    validator = SpatialValidator(canvas_width=1200, canvas_height=800)
+    rects = [obj for obj in scene.objects if obj.type == PrimitiveType.RECTANGLE]
+    brute = [(a.id, b.id) for i, a in enumerate(rects) for b in rects[i + 1:]
+             if validator._calculate_overlap_area(a, b) > 0]
+    assert [(o.obj1_id, o.obj2_id) for o in validator._check_overlaps(scene)] == brute
+
+    placer = IntelligentLabelPlacer()
+    placer.place_labels(scene)
+    label = scene.objects[-1]
+    assert label.position is not None
+    shapes = scene.objects[:-1]
+    width, height = placer._estimate_label_size(label)
+    assert placer._score_label_position(label, label.position, width, height, shapes, [], shapes[5]) == \
+        placer._score_label_position(label, label.position, width, height,
+                                     SceneSpatialIndex.build(shapes, placer._get_bounds), [], shapes[5])
+
+
+def test_layout_engine_lookup_and_no_overlap_use_index():
+    engine = UniversalLayoutEngine(width=400, height=300)
+    scene = Scene()
+    scene.objects = [
+        SceneObject(id="a", type=PrimitiveType.RECTANGLE, position={'x': 100, 'y': 100}),
+        SceneObject(id="b", type=PrimitiveType.RECTANGLE, position={'x': 105, 'y': 100}),
+        SceneObject(id="c", type=PrimitiveType.RECTANGLE, position={'x': 300, 'y': 200}),
+    ]
+    assert engine._get_obj(scene, "c") is scene.objects[2]
+
+    moved = engine._apply_constraint(scene, Constraint(type=ConstraintType.NO_OVERLAP, objects=["a", "b", "c"]))
+
+    assert moved == 20
+    assert scene.objects[1].position['x'] == 125
+    assert scene.objects[2].position == {'x': 300, 'y': 200}
+
+    scene.objects.append(SceneObject(id="d", type=PrimitiveType.CIRCLE, position={'x': 0, 'y': 0}))
+    assert engine._get_obj(scene, "d") is scene.objects[3]
+
+
+def test_layout_bounds_accept_position_objects_and_staleness_checks_identity():
+    from types import SimpleNamespace
+
+    engine = UniversalLayoutEngine.__new__(UniversalLayoutEngine)
+    obj = SimpleNamespace(id="p", position=SimpleNamespace(x=10, y=20, width=None, height=30))
+    assert engine._layout_bounds(obj) == (10, 20, 30, 50)
+
+    rects = _random_rects(3)
+    index = SceneSpatialIndex.build(rects, _box)
+    assert not index.is_stale(rects)
+    assert index.is_stale(rects[:2] + _random_rects(1, seed=1))  # Same count, different object
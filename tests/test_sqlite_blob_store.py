@@ -0,0 +1,28 @@
+import pytest
+
+from core.sqlite_blob_store import SQLiteBlobStore, build_cache
+
+
+def test_tables_share_a_file_and_evict_least_recently_used(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    first = SQLiteBlobStore(path, table="first", max_bytes=10_000)
+    second = SQLiteBlobStore(path, table="second", max_bytes=10_000)
+    first.save("k", b"first payload")
+    second.save("k", b"second payload")
+    assert first.load("k") == b"first payload" and second.load("k") == b"second payload"
+    assert first.load("missing") is None
+
+    small = SQLiteBlobStore(path, table="small", max_bytes=1)
+    assert small.save("a", b"x" * 100) == ["a"]
+    assert small.stats()['disk_entries'] == 0
+
+    with pytest.raises(ValueError):
+        SQLiteBlobStore(path, table="bad; DROP TABLE first", max_bytes=1)
+
+
+def test_build_cache_selects_backend():
+    assert build_cache("none", "test", memory=dict, sqlite=list) is None
+    assert build_cache("memory", "test", memory=dict, sqlite=list) == {}
+    assert build_cache("SQLITE", "test", memory=dict, sqlite=list) == []
+    with pytest.raises(ValueError):
+        build_cache("redis", "test", memory=dict, sqlite=list)
@@ -0,0 +1,168 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from core.stage_graph import Stage, StageCache, StageExecutor, StageGraph, StageRun
+
+
+def _graph(calls, barrier=None):
+    def record(name, fn):
+        def wrapped(ctx, **inputs):
+            calls.append(name)
+            return fn(**inputs)
+        return wrapped
+
+    def slow_branch(key):
+        def fn(base):
+            if barrier is not None:
+                barrier.wait(timeout=2)  # both branches must be in flight at once
+            return {key: base + 1}
+        return fn
+
+    return StageGraph([
+        Stage('base', record('base', lambda text: {'base': len(text)}), inputs=('text',), outputs=('base',)),
+        Stage('left', record('left', slow_branch('left')), inputs=('base',), outputs=('left',)),
+        Stage('right', record('right', slow_branch('right')), inputs=('base',), outputs=('right',),
+              config_keys=('scale',)),
+        Stage('join', record('join', lambda left, right: {'total': left + right}),
+              inputs=('left', 'right'), outputs=('total',)),
+    ], root_inputs=('text',))
+
+
+def test_independent_stages_run_concurrently():
+    calls = []
+    graph = _graph(calls, barrier=threading.Barrier(2))
+    run = StageExecutor(max_workers=4).execute(StageRun(graph, {'text': 'abc'}))
+
+    assert run.get('total') == 8
+    assert calls[0] == 'base' and calls[-1] == 'join'
+    assert graph.downstream('right') == ['join']
+
+
+def test_config_change_recomputes_only_downstream_stages():
+    calls = []
+    graph = _graph(calls)
+    executor = StageExecutor(cache=StageCache(), max_workers=1)
+
+    executor.execute(StageRun(graph, {'text': 'abc'}), config=SimpleNamespace(scale=1))
+    calls.clear()
+    run = executor.execute(StageRun(graph, {'text': 'abc'}), config=SimpleNamespace(scale=2))
+
+    assert calls == ['right', 'join']
+    assert [r['status'] for r in run.summary()] == ['cached', 'cached', 'ran', 'ran']
+
+
+def test_mutated_inputs_are_copied():
+    def edit(ctx, items):
+        items.append('edited')
+        return {'edited': items}
+
+    graph = StageGraph([
+        Stage('make', lambda ctx: {'items': ['a']}, outputs=('items',)),
+        Stage('edit', edit, inputs=('items',), outputs=('edited',), mutates=('items',)),
+    ])
+    run = StageExecutor(max_workers=1).execute(StageRun(graph, {}))
+
+    assert run.get('items') == ['a']
+    assert run.get('edited') == ['a', 'edited']
+
+
+def test_stage_failure_propagates_and_stops_dependents():
+    calls = []
+
+    def boom(ctx, base):
+        time.sleep(0.05)
+        raise RuntimeError("strict mode")
+
+    graph = StageGraph([
+        Stage('base', lambda ctx: {'base': 1}, outputs=('base',)),
+        Stage('fail', boom, inputs=('base',), outputs=('failed',)),
+        Stage('after', lambda ctx, failed: calls.append('after') or {}, inputs=('failed',)),
+    ])
+    run = StageRun(graph, {})
+    with pytest.raises(RuntimeError, match="strict mode"):
+        StageExecutor(max_workers=2).execute(run)
+
+    assert calls == []
+    assert run.records['fail'].status == 'failed'
+
+
+def test_graph_validation():
+    with pytest.raises(ValueError):
+        StageGraph([Stage('a', lambda ctx, b: {}, inputs=('b',), outputs=('a',))])
+    with pytest.raises(ValueError):
+        StageGraph([
+            Stage('a', lambda ctx, y: {}, inputs=('y',), outputs=('x',)),
+            Stage('b', lambda ctx, x: {}, inputs=('x',), outputs=('y',)),
+        ])
+
+
+def test_pipeline_stage_graph_declares_independent_branches():
+    from unified_diagram_pipeline import PipelineConfig, UnifiedDiagramPipeline
+
+    pipeline = UnifiedDiagramPipeline.__new__(UnifiedDiagramPipeline)
+    pipeline.config = PipelineConfig()
+    pipeline._stage_graph = None
+    graph = pipeline._get_stage_graph()
+
+    assert graph.order[0] == 'nlp' and graph.order[-1] == 'audit'
+    assert 'ontology_validation' not in graph.downstream('layout')
+    assert 'layout' not in graph.downstream('ontology_validation')
+    assert 'planning' not in graph.downstream('deepseek_enrichment')
+
+
+def test_non_cacheable_stage_reruns_and_invalidates_downstream():
+    calls = []
+    answers = iter([1, 2])
+
+    def llm(ctx, text):
+        calls.append('llm')
+        return {'plan': next(answers)}
+
+    def layout(ctx, plan):
+        calls.append('layout')
+        return {'layout': plan * 10}
+
+    graph = StageGraph([
+        Stage('llm', llm, inputs=('text',), outputs=('plan',), cacheable=False),
+        Stage('layout', layout, inputs=('plan',), outputs=('layout',)),
+    ], root_inputs=('text',))
+    executor = StageExecutor(cache=StageCache(), max_workers=1)
+
+    assert executor.execute(StageRun(graph, {'text': 'a'})).get('layout') == 10
+    assert executor.execute(StageRun(graph, {'text': 'a'})).get('layout') == 20
+    assert calls == ['llm', 'layout', 'llm', 'layout']
+
+
+def test_pipeline_render_only_change_keeps_layout_cached():
+    from dataclasses import replace
+    from unified_diagram_pipeline import PipelineConfig, UnifiedDiagramPipeline
+
+    pipeline = UnifiedDiagramPipeline.__new__(UnifiedDiagramPipeline)
+    pipeline.config = PipelineConfig(enable_stage_cache=True)
+    pipeline._stage_graph = None
+    # LLM paths off: no client, planner, VLM or auditor was constructed
+    pipeline.deepseek_client = pipeline.llm_planner = pipeline.vlm_validator = pipeline.auditor = None
+    pipeline.diagram_planner = object()
+    graph = pipeline._get_stage_graph()
+
+    calls = []
+    for stage in graph.stages:  # Deterministic stand-ins for the real stage bodies
+        stage.fn = (lambda name, outputs: lambda ctx, **inputs: calls.append(name) or dict.fromkeys(outputs, name))(
+            stage.name, stage.outputs)
+
+    executor = StageExecutor(cache=StageCache(), max_workers=1)
+    roots = {'problem_text': 'two resistors in series', 'precomputed_nlp': None}
+    executor.execute(StageRun(graph, roots), config=pipeline.config)
+    calls.clear()
+    run = executor.execute(StageRun(graph, roots), config=replace(pipeline.config, svg_precision=1))
+
+    assert run.records['layout'].status == 'cached'
+    assert calls == ['render', 'refinement', 'audit']
+
+    pipeline.llm_planner = object()  # LLM planning live: scene synthesis and everything after re-run
+    calls.clear()
+    executor.execute(StageRun(graph, roots), config=pipeline.config)
+    assert 'scene_synthesis' in calls and 'layout' in calls and 'planning' not in calls
@@ -0,0 +1,66 @@
+import subprocess
+import xml.etree.ElementTree as ET
+
+from core.svg_optimizer import SVGOptimizer, _ResultCache
+
+SVG = '''<?xml version="1.0" ?>
+<!-- generated -->
+<svg xmlns="http://www.w3.org/2000/svg" width="100" height="80">
+  <metadata><source>editor</source></metadata>
+  <defs>
+    <marker id="arrowhead"><polygon points="0 0, 10 3.33333, 0 6" fill="#000000"/></marker>
+    <linearGradient id="unused"><stop offset="0" stop-color="#ffffff"/></linearGradient>
+  </defs>
+  <g>
+    <line x1="1.23456" y1="2.0000" x2="3.5" y2="4" stroke="#FF0000" opacity="1" marker-end="url(#arrowhead)"/>
+    <g fill="red"></g>
+  </g>
+  <text x="10.1234" y="20">a &amp; b <tspan>c</tspan> d</text>
+</svg>'''
+
+
+def test_builtin_pass_shrinks_and_stays_valid():
+    optimized = SVGOptimizer(backend="builtin", cache=None).optimize(SVG)
+    root = ET.fromstring(optimized)
+    ns = '{http://www.w3.org/2000/svg}'
+
+    assert '<!--' not in optimized and '<?xml' not in optimized and 'metadata' not in optimized
+    assert root.find(f'{ns}defs/{ns}marker').get('id') == 'arrowhead'
+    assert 'unused' not in optimized  # Unreferenced definition removed
+    line = root.find(f'{ns}line')  # Attribute-less <g> unwrapped, empty <g> removed
+    assert line.get('x1') == '1.23' and line.get('y1') == '2' and line.get('stroke') == '#F00'
+    assert line.get('opacity') is None
+    assert root.find(f'{ns}defs/{ns}marker/{ns}polygon').get('points') == '0 0, 10 3.33, 0 6'
+    assert ''.join(root.find(f'{ns}text').itertext()) == 'a & b c d'
+    assert len(optimized) < len(SVG) * 0.6
+
+
+def test_results_are_cached_by_content_hash():
+    cache = _ResultCache(maxsize=2)
+    optimizer = SVGOptimizer(backend="builtin", cache=cache)
+    first = optimizer.optimize(SVG)
+    assert SVGOptimizer(backend="builtin", cache=cache).optimize(SVG) is first
+    assert cache.stats() == {'entries': 1, 'hits': 1, 'misses': 1}
+
+    assert optimizer.optimize(SVG, {'precision': 3}) != first  # Options are part of the key
+    assert cache.stats()['entries'] == 2
+
+
+def test_auto_backend_spawns_no_process(monkeypatch):
+    def no_subprocess(*args, **kwargs):
+        raise AssertionError("optimizer started a subprocess")
+
+    monkeypatch.setattr(subprocess, "run", no_subprocess)
+    optimizer = SVGOptimizer()
+    assert optimizer.backend == "builtin"
+    assert optimizer.optimize(SVG).startswith('<svg')
+
+
+def test_unavailable_explicit_backend_falls_back_to_builtin(monkeypatch):
+    monkeypatch.setattr(SVGOptimizer, "_check_svgo", lambda self: False)
+    monkeypatch.setattr(SVGOptimizer, "_check_scour", lambda self: False)
+    assert SVGOptimizer(backend="svgo").backend == "builtin"
+    assert SVGOptimizer(backend="scour").backend == "builtin"
+
+    monkeypatch.setattr(SVGOptimizer, "_check_svgo", lambda self: True)
+    assert SVGOptimizer(backend="svgo").backend == "svgo"
@@ -0,0 +1,62 @@
+import contextlib
+import io
+import xml.etree.ElementTree as ET
+
+from core.scene.schema_v1 import PrimitiveType, Scene, SceneObject
+from core.svg_stream import SVGStreamWriter, format_number
+from core.universal_renderer import UniversalRenderer
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+
+def test_numbers_defaults_escaping_and_style_merging():
+    assert [format_number(v, 2) for v in (3, 2.0, -0.001, 1.23456, 1e-7)] == ["3", "2", "0", "1.23", "0"]
+
+    writer = SVGStreamWriter()
+    writer.open_svg(100, 50.5)
+    writer.element('line', x1=0.123456, y1=1, x2=2, y2=3, stroke="black", stroke_width=2)
+    writer.element('path', d="M 1.23456 2.0 L 3 4.999", stroke="black", stroke_width=2.0, opacity=1.0)
+    writer.element('text', x=1, y=2, fill="red", text="a < b & c")
+    writer.close()
+
+    assert writer.getvalue() == (
+        '<svg width="100" height="50.5" xmlns="http://www.w3.org/2000/svg">'
+        '<g stroke="black" stroke-width="2"><line x1="0.12" y1="1" x2="2" y2="3"/><path d="M 1.23 2 L 3 5"/></g>'
+        '<text x="1" y="2" fill="red">a &lt; b &amp; c</text></svg>'
+    )
+
+
+def test_defs_are_deduplicated_and_output_streams_in_chunks():
+    out = io.StringIO()
+    writer = SVGStreamWriter(out=out, chunk_size=64)
+    writer.open_svg(10, 10)
+    marker = lambda w: w.element('marker', id="m")
+    assert writer.define("m", marker) and not writer.define("m", marker)
+    for i in range(20):
+        writer.element('circle', cx=i, cy=i, r=1, fill="#%06x" % i)
+    assert len(out.getvalue()) > 0  # Flushed before the document was closed
+    writer.close()
+    root = ET.fromstring(out.getvalue())
+    assert len(root.findall(f"{SVG}defs")) == 1 and len(root.findall(f"{SVG}circle")) == 20
+
+
+def test_universal_renderer_streams_the_same_document_it_returns():
+    with contextlib.redirect_stdout(io.StringIO()):
+        renderer = UniversalRenderer()
+    scene = Scene()
+    for i in range(40):
+        scene.objects.append(SceneObject(id=f"o{i}", type=[PrimitiveType.RECTANGLE, PrimitiveType.CHARGE][i % 2],
+                                         properties={'label': f"q<{i}>", 'width': 10.5},
+                                         position={'x': i * 1.3333, 'y': 7.0}))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        svg = renderer.render(scene)
+    root = ET.fromstring(svg)
+    assert "q<3>" in [t.text for t in root.iter(f"{SVG}text")]
+    assert '1.33' in svg and '1.3333' not in svg
+
+    out = io.StringIO()
+    renderer.write_svg(scene, out)
+    chunks = list(renderer.iter_svg(scene, chunk_size=512))
+    assert out.getvalue() == "".join(chunks) == svg
+    assert len(chunks) > 1
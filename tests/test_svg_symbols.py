@@ -0,0 +1,59 @@
+import contextlib
+import io
+import xml.etree.ElementTree as ET
+
+from core.enhanced_component_library import ComponentStyle, EnhancedComponentLibrary
+from core.scene.schema_v1 import PrimitiveType, Scene, SceneObject
+from core.svg_symbols import GLYPH_FRAGMENTS
+from core.universal_renderer import UniversalRenderer
+from core.universal_scene_format import Dimensions, ObjectType, Position, create_circuit_scene
+from core.universal_scene_format import SceneObject as UniversalObject
+from core.universal_svg_renderer import UniversalSVGRenderer
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+
+def test_repeated_glyphs_become_one_symbol_each():
+    with contextlib.redirect_stdout(io.StringIO()):
+        plain, symbols = UniversalRenderer(), UniversalRenderer(use_symbols=True)
+    scene = Scene()
+    for i in range(60):
+        kind = [PrimitiveType.RESISTOR_SYMBOL, PrimitiveType.SPRING, PrimitiveType.LINE][i % 3]
+        scene.objects.append(SceneObject(id=f"c{i}", type=kind, position={'x': 20.0 * i, 'y': 100.5}))
+
+    GLYPH_FRAGMENTS.clear()
+    reused = "".join(symbols.iter_svg(scene))
+    root = ET.fromstring(reused)
+    assert len(root.findall(f".//{SVG}symbol")) == 2
+    assert len(root.findall(f"{SVG}use")) == 40 and len(root.findall(f"{SVG}line")) == 20
+    assert len(reused) < 0.7 * len("".join(plain.iter_svg(scene)))
+
+    # Fragments are memoized across documents
+    assert "".join(symbols.iter_svg(scene)) == reused
+    assert GLYPH_FRAGMENTS.stats()['misses'] == 2 and GLYPH_FRAGMENTS.stats()['hits'] > 0
+
+
+def test_component_symbols_keep_instance_labels():
+    scene = create_circuit_scene("rc", "RC")
+    for i, label in enumerate(["R1", "R2", None]):
+        scene.add_object(UniversalObject(id=f"R{i}", object_type=ObjectType.RESISTOR, position=Position(100 + 150 * i, 300),
+                                         dimensions=Dimensions(width=120, height=30), label=label))
+
+    def texts(svg):
+        return sorted((t.get('x'), t.get('y'), t.text) for t in ET.fromstring(svg.split("?>", 1)[1]).iter(f"{SVG}text"))
+
+    plain = UniversalSVGRenderer().render(scene)
+    reused = UniversalSVGRenderer(use_symbols=True).render(scene)
+    assert texts(reused) == texts(plain)
+    assert reused.count("<symbol") == 1 and reused.count("<use") == 3
+
+
+def test_enhanced_library_defines_each_symbol_once_per_document():
+    lib = EnhancedComponentLibrary(ComponentStyle(style_type="modern"), use_symbols=True)
+    first, second = (lib.create_enhanced_resistor(100 * i, 50, 80, 30, f"R{i}") for i in range(2))
+    assert "<symbol" in first.to_svg() and "<symbol" not in second.to_svg()
+    assert 'x="100"' in second.to_svg() and "R1" in second.to_svg()
+
+    lib.begin_document()
+    assert "<symbol" in lib.create_enhanced_resistor(0, 0, 80, 30).to_svg()
+    assert "<symbol" not in EnhancedComponentLibrary().create_enhanced_resistor(0, 0, 80, 30).to_svg()
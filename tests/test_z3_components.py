@@ -0,0 +1,94 @@
+import time
+
+import pytest
+
+pytest.importorskip("z3")
+pytest.importorskip("shapely")
+
+from core.diagram_plan import DiagramPlan, LayoutConstraint, create_alignment_constraint, create_no_overlap_constraint
+from core.solvers.z3_layout_solver import Z3LayoutSolver
+from core.symbolic.geometry_engine import GeometryEngine, Rectangle
+from core.universal_ai_analyzer import CanonicalProblemSpec, PhysicsDomain
+
+
+def _chains_plan(chains, length):
+    ids = [f"c{c}_{i}" for c in range(chains) for i in range(length)]
+    spec = CanonicalProblemSpec(
+        domain=PhysicsDomain.UNKNOWN,
+        problem_type='test',
+        problem_text='layout',
+        objects=[{'id': obj_id} for obj_id in ids],
+        relationships=[{'subject': f"c{c}_{i}", 'target': f"c{c}_{i + 1}"}
+                       for c in range(chains) for i in range(length - 1)]
+    )
+    plan = DiagramPlan(original_spec=spec, complexity_score=0.3, strategy='heuristic',
+                       canvas_width=800, canvas_height=600)
+    plan.add_global_constraint(create_no_overlap_constraint(ids))
+    plan.add_global_constraint(create_alignment_constraint(["c0_0", "c1_0"], 'h'))
+    return plan, ids
+
+
+def test_skyline_packing_keeps_ids_and_stays_in_canvas():
+    rects = [Rectangle(0, 0, w, h, f"r{i}") for i, (w, h) in enumerate([(300, 200), (100, 50), (200, 250), (500, 60)])]
+    result = GeometryEngine().pack_rectangles(rects, Rectangle(0, 0, 800, 600), algorithm='skyline', margin=10)
+
+    assert [r.id for r in result.rectangles] == ["r0", "r1", "r2", "r3"]
+    assert all(10 <= r.left and r.right <= 790 and 10 <= r.top and r.bottom <= 590 for r in result.rectangles)
+    assert not any(a.intersects(b) for i, a in enumerate(result.rectangles) for b in result.rectangles[i + 1:])
+
+
+@pytest.mark.parametrize("min_objects", [10 ** 6, 0])
+def test_components_are_solved_separately_and_packed(min_objects):
+    plan, ids = _chains_plan(chains=4, length=3)
+    dims = {obj_id: (50.0, 40.0) for obj_id in ids}
+    solver = Z3LayoutSolver(parallel_components=True, component_workers=2, parallel_min_objects=min_objects)
+    try:
+        solution = solver.solve_layout(plan, dims)
+    finally:
+        solver.close()
+
+    meta = solution.metadata
+    assert solution.satisfiable and meta['mode'] == 'components'
+    # The alignment constraint joins chains 0 and 1; chains 2 and 3 stay separate
+    assert meta['component_sizes'] == [6, 3, 3]
+    assert meta['parallel'] is (min_objects == 0)
+    assert set(solution.positions) == set(ids)
+    assert solution.positions["c0_0"][1] == solution.positions["c1_0"][1]
+    assert solver._overlapping_pairs(solution.positions, dims) == set()
+    assert all(40 <= x and x + 50 <= 760 and 40 <= y and y + 40 <= 560 for x, y in solution.positions.values())
+
+
+def test_canvas_anchored_constraints_fall_back_to_single_solve():
+    plan, ids = _chains_plan(chains=3, length=2)
+    plan.add_global_constraint(LayoutConstraint(type='centered', objects=["c0_0"]))
+
+    solution = Z3LayoutSolver(parallel_components=True).solve_layout(plan, {obj_id: (50.0, 40.0) for obj_id in ids})
+
+    assert solution.satisfiable
+    assert solution.metadata['component_fallback'] == 'canvas_anchored_constraints'
+    assert solution.positions["c0_0"] == (375.0, 280.0)
+
+
+def test_serial_components_share_one_deadline_and_report_exhaustion():
+    from core.solvers.z3_layout_solver import LayoutSolution
+
+    plan, ids = _chains_plan(chains=6, length=1)
+    plan.global_constraints = [c for c in plan.global_constraints if not c.type.startswith('alignment')]
+    budgets = []
+
+    class RecordingSolver:
+        def solve_layout(self, component_plan, dims, hints=None, time_budget=None):
+            budgets.append((time.time(), time_budget))
+            obj_id = component_plan.original_spec.objects[0]['id']
+            return LayoutSolution(positions={obj_id: (40.0, 40.0)}, satisfiable=True, solve_time=0.0,
+                                  metadata={'budget_exhausted': obj_id == 'c3_0'})
+
+    solver = Z3LayoutSolver(parallel_components=True, parallel_min_objects=10 ** 6, cache=None)
+    solver._component_solver = RecordingSolver()
+    start = time.time()
+    solution = solver.solve_layout(plan, {obj_id: (50.0, 40.0) for obj_id in ids}, time_budget=3.0)
+
+    assert solution.metadata['component_count'] == 6
+    assert budgets[0][1] <= 0.5  # 3s split across 6 components
+    assert all(at + budget <= start + 3.01 for at, budget in budgets)  # Never past the call's deadline
+    assert solution.metadata['budget_exhausted'] is True
@@ -0,0 +1,111 @@
+import pytest
+
+pytest.importorskip("z3")
+
+from core.diagram_plan import DiagramPlan, create_alignment_constraint, create_no_overlap_constraint
+from core.solvers.z3_layout_solver import Z3LayoutSolver
+from core.universal_ai_analyzer import CanonicalProblemSpec, PhysicsDomain
+
+
+def _plan(object_ids, *constraints):
+    spec = CanonicalProblemSpec(
+        domain=PhysicsDomain.UNKNOWN,
+        problem_type='test',
+        problem_text='layout',
+        objects=[{'id': obj_id} for obj_id in object_ids]
+    )
+    plan = DiagramPlan(original_spec=spec, complexity_score=0.3, strategy='heuristic',
+                       canvas_width=800, canvas_height=600)
+    plan.add_global_constraint(create_no_overlap_constraint(object_ids))
+    for constraint in constraints:
+        plan.add_global_constraint(constraint)
+    return plan
+
+
+def test_incremental_session_is_reused_with_pruned_overlap_clauses():
+    ids = [f"obj{i}" for i in range(12)]
+    dims = {obj_id: (60.0, 40.0) for obj_id in ids}
+    hints = {obj_id: (60.0 + 55 * i, 80.0 + 35 * (i % 3)) for i, obj_id in enumerate(ids)}
+    solver = Z3LayoutSolver(incremental=True, prune_margin=10.0)
+
+    first = solver.solve_layout(_plan(ids), dims, hints=hints)
+    assert first.satisfiable
+    assert not first.metadata['session_reused']
+    assert first.metadata['overlap_pairs'] < first.metadata['overlap_pairs_total']
+    # Pairs pruned up front are repaired lazily: the answer never overlaps
+    assert solver._overlapping_pairs(first.positions, dims) == set()
+
+    aligned = solver.solve_layout(_plan(ids, create_alignment_constraint(ids[:2], 'h')), dims)
+    assert aligned.metadata['session_reused']
+    assert aligned.positions[ids[0]][1] == aligned.positions[ids[1]][1]
+
+    # The alignment was scoped with push()/pop(); the base model is back at level 0
+    session = next(iter(solver._sessions.values()))
+    assert session.solves == 2
+    assert session.solver.num_scopes() == 0
+
+
+def test_unsatisfiable_plan_reports_reason():
+    ids = ["a", "b"]
+    dims = {"a": (700.0, 500.0), "b": (700.0, 500.0)}
+    solution = Z3LayoutSolver(incremental=True).solve_layout(_plan(ids), dims)
+    assert not solution.satisfiable
+    assert solution.metadata['reason'] == 'unsatisfiable'
+
+
+def test_optimize_mode_reports_objective_and_gap():
+    ids = ["battery", "resistor", "capacitor"]
+    plan = _plan(ids)
+    plan.original_spec.relationships = [
+        {'subject': "battery", 'target': "resistor"},
+        {'subject': "resistor", 'target': "capacitor"},
+    ]
+    dims = {obj_id: (60.0, 40.0) for obj_id in ids}
+    solver = Z3LayoutSolver(optimize=True, objective_weights={'deviation': 0.0})
+
+    solution = solver.solve_layout(plan, dims, time_budget=10.0)
+
+    meta = solution.metadata
+    assert solution.satisfiable and meta['optimal'] and meta['optimality_gap'] == 0.0
+    # Optimum stacks the three 60x40 boxes vertically: 2 * 40 wire, 60 + 120 half-perimeter
+    assert meta['objective_terms']['wire_length'] == pytest.approx(80.0)
+    assert meta['objective'] == pytest.approx(80.0 + 0.25 * 180.0)
+    assert solver._overlapping_pairs(solution.positions, dims) == set()
+
+
+def test_optimize_mode_returns_best_so_far_when_budget_expires():
+    ids = [f"obj{i}" for i in range(14)]
+    plan = _plan(ids)
+    plan.original_spec.relationships = [{'subject': a, 'target': b} for a, b in zip(ids, ids[1:])]
+    dims = {obj_id: (60.0, 40.0) for obj_id in ids}
+
+    solution = Z3LayoutSolver(optimize=True).solve_layout(plan, dims, time_budget=0.5)
+
+    assert solution.satisfiable and len(solution.positions) == len(ids)
+    assert solution.metadata['budget_exhausted'] and 0.0 < solution.metadata['optimality_gap'] <= 1.0
+    assert solution.solve_time < 5.0
+
+
+@pytest.mark.parametrize("incremental", [False, True])
+def test_time_budget_applies_in_satisfy_modes(monkeypatch, incremental):
+    from core.solvers import z3_layout_solver
+
+    timeouts = []
+
+    class RecordingSolver(z3_layout_solver.Solver):
+        def set(self, *args, **kwargs):
+            if args and args[0] == "timeout":
+                self.current_timeout = args[1]
+            return super().set(*args, **kwargs)
+
+        def check(self, *args):
+            timeouts.append(self.current_timeout)  # Limit in effect for this check
+            return super().check(*args)
+
+    monkeypatch.setattr(z3_layout_solver, "Solver", RecordingSolver)
+    ids = ["a", "b", "c"]
+    solver = Z3LayoutSolver(timeout=30000, incremental=incremental)
+    solution = solver.solve_layout(_plan(ids), {obj_id: (50.0, 40.0) for obj_id in ids}, time_budget=0.5)
+
+    assert solution.satisfiable
+    assert timeouts and max(timeouts) <= 500
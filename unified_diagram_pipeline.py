@@ -26,17 +26,23 @@ import os
 import json
 import time
 import logging
-import copy
 import uuid
 import re
-from collections import OrderedDict
-from dataclasses import dataclass
-from typing import Dict, Optional, List, Any, Tuple
+import multiprocessing
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, Optional, List, Any, Tuple, Iterator
 from pathlib import Path
 import jsonschema
 
 # Pipeline tracing and logging
 from core.pipeline_tracer import PipelineTracer
+from core.nlp_result_cache import (
+    FrozenDict, create_nlp_cache, freeze, make_nlp_cache_key, normalize_results, tool_version
+)
+from core.layout_cache import create_layout_cache
+from core.stage_graph import Stage, StageCache, StageExecutor, StageGraph, StageRecord, StageRun
 
 # Original pipeline components
 from core.universal_ai_analyzer import (
@@ -55,6 +61,8 @@ from core.universal_validator import (
 )
 from core.universal_layout_engine import UniversalLayoutEngine
 from core.universal_renderer import UniversalRenderer
+from core.rasterizer import configure_rasterizer
+from core.svg_optimizer import SVGOptimizer
 from core.scene.schema_v1 import Scene, PrimitiveType, Position
 from core.domain_modules import DomainModuleRegistry
 from core.validation.structural_validator import compare_plan_scene
@@ -69,7 +77,8 @@ from core.pipeline_logger import PipelineLogger, ConsoleProgressLogger
 
 # NEW: Advanced pipeline components (with graceful degradation)
 try:
-    from core.property_graph import PropertyGraph, GraphNode, GraphEdge, NodeType, EdgeType
+    from core.property_graph import PropertyGraph, GraphNode, GraphEdge, NodeType, EdgeType, create_property_graph
+    from core.property_graph_io import BackgroundGraphWriter
     PROPERTY_GRAPH_AVAILABLE = True
 except ImportError:
     PROPERTY_GRAPH_AVAILABLE = False
@@ -136,21 +145,16 @@ except ImportError:
 
 try:
     from core.ontology.ontology_manager import OntologyManager, Domain
+    from core.ontology.ontology_pool import OntologyPool
     ONTOLOGY_AVAILABLE = True
 except ImportError:
     ONTOLOGY_AVAILABLE = False
 
 try:
-    from neo4j import GraphDatabase
-    NEO4J_AVAILABLE = True
-except ImportError:
-    NEO4J_AVAILABLE = False
-
-try:
-    from arango import ArangoClient
-    ARANGO_AVAILABLE = True
+    from core.graph_persistence import GraphPersistenceWorker, create_graph_store
+    GRAPH_PERSISTENCE_AVAILABLE = True
 except ImportError:
-    ARANGO_AVAILABLE = False
+    GRAPH_PERSISTENCE_AVAILABLE = False
 
 try:
     from core.auditor.diagram_auditor import DiagramAuditor
@@ -214,6 +218,7 @@ class PipelineConfig:
     # Feature flags - Original
     enable_ai_validation: bool = True  # VLM validation (Phase 9) [MANDATORY for roadmap compliance]
     enable_layout_optimization: bool = True
+    layout_relaxation_backend: str = "auto"  # Options: 'python', 'numpy' (vectorized), 'auto' (numpy for large scenes)
     enable_domain_embellishments: bool = True
 
     # Feature flags - NEW Advanced Features
@@ -224,10 +229,44 @@ class PipelineConfig:
     enable_strategic_planning: bool = True  # Phase 2: Strategy selection [MANDATORY]
     enable_ontology_validation: bool = True  # Phase 3: Semantic validation
     enable_z3_optimization: bool = True  # Phase 5: SMT-based layout [MANDATORY]
+    z3_incremental: bool = True  # Reuse the Z3 base model across calls (push/pop scoped plan constraints)
+    z3_mode: str = "satisfy"  # 'satisfy' (feasibility only) or 'optimize' (weighted objectives, anytime)
+    z3_time_budget: Optional[float] = None  # Per-request Z3 wall-clock budget in seconds (None = solver timeout)
+    z3_parallel_components: bool = False  # Solve connected components separately (process pool) and skyline-pack them
+    z3_component_workers: Optional[int] = None  # Component process pool size (None = CPU count)
     enable_llm_auditing: bool = True  # Phase 10: LLM-based quality audit [MANDATORY]
 
     # NLP tool selection (when enable_nlp_enrichment=True)
     nlp_tools: List[str] = None  # Options: 'openie', 'stanza', 'dygie', 'scibert', 'chemdataextractor', 'mathbert', 'amr'
+    nlp_parallel: bool = True  # Run enabled NLP tools concurrently (Phase 0)
+    nlp_max_workers: int = 4  # Shared pool size for batched NLP tools (single calls use one thread per tool)
+    nlp_tool_timeout: Optional[float] = 240.0  # Per-tool wall-clock limit in seconds (None = no limit); a timed-out tool keeps its thread until it returns
+    nlp_tool_timeouts: Optional[Dict[str, float]] = None  # Per-tool overrides, e.g. {'mathbert': 300}
+
+    # NLP result cache (content-addressed, shared across workers when backed by SQLite)
+    nlp_cache_backend: str = "memory"  # Options: 'memory', 'sqlite' (opt-in, shared on-disk store), 'none'
+    nlp_cache_path: str = "cache/nlp_results.sqlite3"  # Relative to the working directory (sqlite backend only)
+    nlp_cache_max_mb: float = 256.0  # On-disk size budget before LRU eviction
+    nlp_cache_memory_entries: int = 32  # In-process LRU of frozen results
+
+    # Layout solution cache (keyed by constraint topology, invariant to object ID renaming)
+    layout_cache_backend: str = "memory"  # Options: 'sqlite', 'memory', 'none'
+    layout_cache_path: str = "cache/layout_solutions.sqlite3"
+    layout_cache_max_mb: float = 64.0  # On-disk size budget before LRU eviction
+    layout_cache_memory_entries: int = 128  # In-process LRU of solved layouts
+
+    # Ontology pool (per-domain TBoxes with OWL-RL closures computed once at startup)
+    ontology_pool_enabled: bool = True  # Reuse closures and reason over each request's instances only
+    ontology_closure_cache_dir: Optional[str] = "cache/ontology"  # Persisted closures (None = memory only)
+
+    # Stage graph execution (generate)
+    enable_stage_parallelism: bool = True  # Overlap independent stages (e.g. ontology validation with layout)
+    stage_max_workers: int = 4
+    enable_stage_cache: bool = False  # Memoize deterministic stages on their inputs + config slice (LLM stages always run)
+    stage_cache_entries: int = 128  # Stage outputs kept in memory (roughly 15 per problem)
+
+    # Batch generation (generate_batch)
+    batch_max_workers: Optional[int] = None  # Worker processes for post-NLP phases (None = min(batch size, CPU count))
 
     # Model orchestration
     enable_model_orchestration: bool = True
@@ -253,32 +292,47 @@ class PipelineConfig:
 
     # Primitive library (Roadmap Layer 5)
     enable_primitive_library: bool = True  # [ENABLED] Roadmap Layer 5: Query primitive library first
-    primitive_library_backend: str = "memory"  # Options: 'milvus', 'qdrant', 'memory'
+    primitive_library_backend: str = "memory"  # Options: 'milvus', 'qdrant', 'memory', 'ann'
     primitive_library_host: str = "localhost:19530"  # Vector DB host
+    primitive_embedding_store_dir: Optional[str] = "data/primitive_library"  # mmap'd precomputed embeddings (None = embed at startup)
+    primitive_library_index_dir: Optional[str] = "data/primitive_library/ann"  # Persisted IVF index for the 'ann' backend
 
     # Additional solvers
     enable_sympy_solver: bool = False  # SymPy for symbolic physics
-    enable_svg_optimization: bool = False  # svgo/scour post-processing
+    enable_svg_optimization: bool = False  # In-process SVG optimizer post-pass (cached by content hash)
+    svg_precision: int = 2  # Decimal places for coordinates written by the streaming SVG writer
+    svg_symbol_reuse: bool = False  # Emit repeated glyphs once as <symbol> and instantiate with <use>
+    png_rasterizer_workers: Optional[int] = None  # Shared PNG rasterizer processes (None = auto, 0 = in-process)
     enable_structural_validation: bool = True
     enable_domain_rule_validation: bool = True
     auto_refinement_max_iterations: int = 2
     auto_refinement_min_score: float = 0.85
     enable_domain_modules: bool = True  # Pluggable domain builders (SchemDraw, RDKit, etc.)
 
+    # Property graph storage: 'networkx' or 'columnar' (compact columns + CSR)
+    property_graph_backend: str = "networkx"
+
     # Property graph persistence
     property_graph_persist_to_disk: bool = True
     property_graph_dump_dir: str = "output/property_graphs"
+    property_graph_dump_format: str = "json"  # 'json' (.json) or 'binary' (.pgb, see core.property_graph_io; smaller and faster, opt-in)
+    property_graph_async_persist: bool = True  # Write dumps on a background thread
     property_graph_graphdb_backend: Optional[str] = None  # 'neo4j' or 'arango'
     property_graph_graphdb_uri: Optional[str] = None
     property_graph_graphdb_username: Optional[str] = None
     property_graph_graphdb_password: Optional[str] = None
     property_graph_graphdb_database: Optional[str] = None
     property_graph_graphdb_collection: str = "diagram_property_graphs"
+    property_graph_graphdb_batch_size: int = 500  # Rows per UNWIND / import_bulk call
+    property_graph_graphdb_queue_size: int = 64  # Graphs waiting for the background writer
+    property_graph_graphdb_max_retries: int = 3
 
     def __post_init__(self):
         if self.nlp_tools is None:
             # Default: use all available tools
             self.nlp_tools = ['openie', 'stanza', 'dygie', 'scibert', 'chemdataextractor', 'mathbert', 'amr']
+        if self.nlp_tool_timeouts is None:
+            self.nlp_tool_timeouts = {}
 
 
 @dataclass
@@ -352,6 +406,30 @@ class DiagramResult:
         print(f"✅ Saved scene to: {output_path}")
 
 
+@dataclass
+class GenerationContext:
+    """Per-request bookkeeping shared by the stage methods (never part of stage cache keys)"""
+
+    request_id: str
+    trace: Dict[str, Any]
+    tracer: PipelineTracer
+
+
+@dataclass
+class BatchItemResult:
+    """Outcome of one problem in UnifiedDiagramPipeline.generate_batch"""
+
+    index: int  # Position of the problem in the submitted batch
+    problem_text: str
+    result: Optional[DiagramResult] = None
+    error: Optional[str] = None
+    duration: float = 0.0
+
+    @property
+    def success(self) -> bool:
+        return self.result is not None
+
+
 class UnifiedDiagramPipeline:
     """
     THE ONLY entry point for physics diagram generation
@@ -432,8 +510,25 @@ class UnifiedDiagramPipeline:
 
         # Track which advanced features are active
         self.active_features = []
-        self._nlp_cache: OrderedDict[str, Dict[str, Any]] = OrderedDict()
-        self._nlp_cache_max_entries = 32  # simple LRU cache for NLP outputs
+        self.nlp_cache = create_nlp_cache(
+            backend=config.nlp_cache_backend,
+            path=config.nlp_cache_path,
+            max_bytes=int(config.nlp_cache_max_mb * 1024 * 1024),
+            memory_entries=config.nlp_cache_memory_entries
+        )
+        self.layout_cache = create_layout_cache(
+            backend=config.layout_cache_backend,
+            path=config.layout_cache_path,
+            max_bytes=int(config.layout_cache_max_mb * 1024 * 1024),
+            memory_entries=config.layout_cache_memory_entries
+        )
+        self._nlp_tool_versions: Optional[Dict[str, str]] = None
+        self._nlp_executor: Optional[ThreadPoolExecutor] = None  # created lazily on first concurrent run
+        self._graph_writer: Optional['BackgroundGraphWriter'] = None  # created lazily on first async dump
+        self._graphdb_worker: Optional['GraphPersistenceWorker'] = None  # created lazily on first graph DB sync
+        self._graphdb_worker_error: Optional[str] = None
+        self.stage_cache = StageCache(config.stage_cache_entries) if config.enable_stage_cache else None
+        self._stage_graph: Optional[StageGraph] = None
         self._request_counter = 0
         self._ontology_keyword_index = self._build_ontology_keyword_index()
         self.logger: Optional[PipelineLogger] = None
@@ -471,7 +566,9 @@ class UnifiedDiagramPipeline:
         # Phase 5: Layout (Original)
         self.layout_engine = UniversalLayoutEngine(
             width=config.canvas_width,
-            height=config.canvas_height
+            height=config.canvas_height,
+            relaxation_backend=config.layout_relaxation_backend,
+            layout_cache=self.layout_cache
         )
         print("✓ Phase 5: UniversalLayoutEngine")
 
@@ -479,8 +576,13 @@ class UnifiedDiagramPipeline:
         self.renderer = UniversalRenderer(
             width=config.canvas_width,
             height=config.canvas_height,
-            domains_path=config.domains_path
+            domains_path=config.domains_path,
+            precision=config.svg_precision,
+            use_symbols=config.svg_symbol_reuse
         )
+        if config.png_rasterizer_workers is not None:
+            configure_rasterizer(workers=config.png_rasterizer_workers)
+        self.svg_optimizer = SVGOptimizer() if config.enable_svg_optimization else None
         print("✓ Phase 6: UniversalRenderer")
 
         # NEW: Phase 5.5 - Spatial Validation (Architecture Fix)
@@ -502,7 +604,7 @@ class UnifiedDiagramPipeline:
         # NEW: Phase 0 - Property Graph
         self.property_graph = None
         if config.enable_property_graph and PROPERTY_GRAPH_AVAILABLE:
-            self.property_graph = PropertyGraph()
+            self.property_graph = create_property_graph(config.property_graph_backend)
             self.active_features.append("Property Graph")
             print("✓ Phase 0: PropertyGraph [ACTIVE]")
         elif config.enable_property_graph:
@@ -608,13 +710,18 @@ class UnifiedDiagramPipeline:
                     host=self.config.primitive_library_host.split(':')[0]
                     if ':' in self.config.primitive_library_host else self.config.primitive_library_host,
                     port=int(self.config.primitive_library_host.split(':')[1])
-                    if ':' in self.config.primitive_library_host else 19530
+                    if ':' in self.config.primitive_library_host else 19530,
+                    embedding_store_dir=self.config.primitive_embedding_store_dir,
+                    index_dir=self.config.primitive_library_index_dir
                 )
                 stats = self.primitive_library.get_stats()
                 self.active_features.append(f"Primitive Library ({stats['backend']})")
                 print(f"✓ Primitive Library: {stats['backend']} backend with {stats.get('total_primitives', 0)} primitives [ACTIVE]")
             else:
-                self.primitive_library = PrimitiveLibrary(backend="memory")
+                self.primitive_library = PrimitiveLibrary(
+                    backend="memory",
+                    embedding_store_dir=self.config.primitive_embedding_store_dir
+                )
                 stats = self.primitive_library.get_stats()
                 print(f"✓ Primitive Library: memory backend with {stats.get('total_primitives', 0)} primitives [ACTIVE]")
         except Exception as exc:
@@ -638,15 +745,31 @@ class UnifiedDiagramPipeline:
 
         # NEW: Ontology Manager
         self.ontology_manager = None
+        self.ontology_pool = None
         if config.enable_ontology_validation and ONTOLOGY_AVAILABLE:
             # Will be initialized per-problem based on domain
             self.active_features.append("Ontology Validation")
             print("✓ Phase 3: Ontology Validation [ACTIVE]")
+            if config.ontology_pool_enabled:
+                try:
+                    self.ontology_pool = OntologyPool(cache_dir=config.ontology_closure_cache_dir)
+                    warm_timings = self.ontology_pool.warm([Domain.PHYSICS, Domain.CHEMISTRY, Domain.BIOLOGY])
+                    print(f"  ↪ Ontology pool: {len(warm_timings)} domain closures ready "
+                          f"({sum(warm_timings.values()):.2f}s)")
+                except Exception as exc:
+                    print(f"⚠️  Ontology pool initialization failed: {exc}")
+                    self.ontology_pool = None
 
         # NEW: Z3 Layout Solver
         self.z3_solver = None
         if config.enable_z3_optimization and Z3_AVAILABLE:
-            self.z3_solver = Z3LayoutSolver()
+            self.z3_solver = Z3LayoutSolver(
+                incremental=config.z3_incremental,
+                optimize=(config.z3_mode or "satisfy").lower() == "optimize",
+                parallel_components=config.z3_parallel_components,
+                component_workers=config.z3_component_workers,
+                cache=self.layout_cache
+            )
             self.active_features.append("Z3 Optimization")
             print("✓ Phase 5: Z3 Layout Solver [ACTIVE]")
 
@@ -833,37 +956,371 @@ class UnifiedDiagramPipeline:
         print("=" * 80, flush=True)
         print()
 
-        # Internal: simple per-request NLP cache helpers
+        # Internal: NLP result cache helpers (see core.nlp_result_cache)
 
     def _make_nlp_cache_key(self, text: str) -> str:
-        """Create cache key from text + active tools"""
+        """Create a stable cache key from text + active tools + tool versions"""
         if not text:
             return ""
-        tool_names = ",".join(sorted(self.nlp_tools.keys())) if self.nlp_tools else "none"
-        return f"{hash(text)}::{tool_names}"
+        if self._nlp_tool_versions is None:
+            self._nlp_tool_versions = {name: tool_version(tool) for name, tool in self.nlp_tools.items()}
+        return make_nlp_cache_key(text, self._nlp_tool_versions)
 
     def _get_cached_nlp_results(self, cache_key: Optional[str]) -> Optional[Dict[str, Any]]:
-        """Return a deep copy of cached NLP results if available"""
-        if not cache_key or cache_key not in self._nlp_cache:
+        """Return cached NLP results (frozen, shared) if available"""
+        if not cache_key or self.nlp_cache is None:
             return None
-        cached_value = copy.deepcopy(self._nlp_cache[cache_key])
-        # refresh LRU order
-        self._nlp_cache.move_to_end(cache_key)
-        for value in cached_value.values():
-            value['cached'] = True
-        return cached_value
-
-    def _store_nlp_results_in_cache(self, cache_key: Optional[str], results: Dict[str, Any]) -> None:
-        """Store NLP results in cache with LRU eviction"""
-        if not cache_key or not results:
-            return
-        snapshot = copy.deepcopy(results)
-        self._nlp_cache[cache_key] = snapshot
-        self._nlp_cache.move_to_end(cache_key)
-        while len(self._nlp_cache) > self._nlp_cache_max_entries:
-            self._nlp_cache.popitem(last=False)
+        cached_value = self.nlp_cache.get(cache_key)
+        if cached_value is None:
+            return None
+        # Shallow per-tool views: nested values stay shared and read-only
+        return {
+            tool_name: FrozenDict({**entry, 'cached': True})
+            for tool_name, entry in cached_value.items()
+        }
+
+    def _store_nlp_results_in_cache(self, cache_key: Optional[str], results: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalize and freeze NLP results, storing them when caching is enabled
+
+        Results are normalized even without a cache, so a fresh run returns
+        the same plain-data shapes as a memory or disk hit.
+        """
+        if not results:
+            return results
+        if not cache_key or self.nlp_cache is None:
+            return dict(freeze(normalize_results(results)))
+        return dict(self.nlp_cache.put(cache_key, results))
+
+    # Canonical execution/merge order for Phase 0 tools
+    _NLP_TOOL_ORDER = ('openie', 'stanza', 'scibert', 'chemdataextractor', 'mathbert', 'amr', 'dygie')
+    _NLP_TOOL_DISPLAY = {
+        'openie': 'OpenIE',
+        'stanza': 'Stanza',
+        'scibert': 'SciBERT',
+        'chemdataextractor': 'ChemDataExtractor',
+        'mathbert': 'MathBERT',
+        'amr': 'AMR',
+        'dygie': 'DyGIE++'
+    }
+
+    def _nlp_tool_timeout(self, tool_name: str) -> Optional[float]:
+        """Resolve the wall-clock limit (seconds) for a single NLP tool"""
+        overrides = getattr(self.config, 'nlp_tool_timeouts', None) or {}
+        if tool_name in overrides:
+            return overrides[tool_name]
+        return getattr(self.config, 'nlp_tool_timeout', None)
+
+    def _get_nlp_executor(self) -> ThreadPoolExecutor:
+        """
+        Return the shared thread pool used by batched NLP (no per-tool deadline)
+
+        Deadline-bound calls in _run_nlp_tools use their own executor: a timed-out
+        tool cannot be interrupted and keeps holding its thread until it returns,
+        which would otherwise shrink this bounded pool for every later request.
+        """
+        if self._nlp_executor is None:
+            max_workers = max(1, min(getattr(self.config, 'nlp_max_workers', 4), len(self.nlp_tools) or 1))
+            self._nlp_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="nlp-tool")
+        return self._nlp_executor
+
+    def _get_graph_writer(self) -> 'BackgroundGraphWriter':
+        """Return the background writer used for property graph dumps"""
+        if self._graph_writer is None:
+            self._graph_writer = BackgroundGraphWriter()
+        return self._graph_writer
+
+    def flush_property_graph_dumps(self, timeout: Optional[float] = None) -> bool:
+        """Wait for queued property graph dumps; returns False on timeout"""
+        if self._graph_writer is None:
+            return True
+        return self._graph_writer.flush(timeout)
+
+    def close(self) -> None:
+        """Release worker pools (Z3 component processes, shared NLP threads)"""
+        if getattr(self, 'z3_solver', None) is not None:
+            self.z3_solver.close()
+        if getattr(self, '_nlp_executor', None) is not None:
+            self._nlp_executor.shutdown(wait=False)
+            self._nlp_executor = None
+
+    # Per-tool entry points: single-text method and (optional) batched method
+    _NLP_TOOL_METHODS = {
+        'openie': ('extract', 'extract_batch'),
+        'stanza': ('analyze', None),
+        'scibert': ('embed', 'embed_batch'),
+        'chemdataextractor': ('parse', None),
+        'mathbert': ('extract', None),
+        'amr': ('parse', None),
+        'dygie': ('extract', 'extract_batch')
+    }
+
+    def _run_nlp_tool(self, tool_name: str, problem_text: str) -> Dict[str, Any]:
+        """
+        Run a single NLP tool and normalise its output into an nlp_results entry.
+
+        Exceptions propagate to the caller; runtime_ms is this tool's own wall clock.
+        """
+        if tool_name not in self._NLP_TOOL_METHODS:
+            raise ValueError(f"Unknown NLP tool: {tool_name}")
+        method_name = self._NLP_TOOL_METHODS[tool_name][0]
+        start_tool = time.time()
+        raw_output = getattr(self.nlp_tools[tool_name], method_name)(problem_text)
+        elapsed = (time.time() - start_tool) * 1000
+        entry, summary = self._format_nlp_result(tool_name, raw_output, elapsed)
+        print(f"  ✅ {self._NLP_TOOL_DISPLAY.get(tool_name, tool_name)}: {summary} in {elapsed:.0f}ms", flush=True)
+        return entry
+
+    def _format_nlp_result(self, tool_name: str, raw_output: Any, elapsed_ms: float) -> Tuple[Dict[str, Any], str]:
+        """Convert a tool's raw output into the nlp_results entry shape (plus a log summary)"""
+        if tool_name == 'openie':
+            entry = {
+                'triples': [(t.subject, t.relation, t.object) for t in raw_output.triples],  # FIXED: Store ALL triples
+                'raw_result': raw_output  # ADDED: Store full result object
+            }
+            summary = f"Extracted {len(raw_output.triples)} triples"
+        elif tool_name == 'stanza':
+            entry = {
+                'entities': raw_output.get('entities', []),  # FIXED: Store ALL entities
+                'dependencies': raw_output.get('dependencies', []),  # ADDED: Store dependency relations
+                'raw_result': raw_output  # ADDED: Store full result
+            }
+            summary = f"Found {len(entry['entities'])} entities, {len(entry['dependencies'])} dependencies"
+        elif tool_name == 'scibert':
+            embedding_dim = len(raw_output[0]) if isinstance(raw_output, list) and raw_output else (
+                len(raw_output) if hasattr(raw_output, '__len__') else 0
+            )
+            embedding_sample = None
+            try:
+                if hasattr(raw_output, 'tolist'):
+                    vector = raw_output.tolist()
+                    embedding_sample = vector[:10] if isinstance(vector, list) else None
+                elif isinstance(raw_output, list):
+                    embedding_sample = raw_output[0][:10] if raw_output and hasattr(raw_output[0], '__getitem__') else None
+            except Exception:
+                embedding_sample = None
+            entry = {
+                'embedding_dim': embedding_dim,
+                'embedding_sample': embedding_sample
+            }
+            summary = f"Generated embeddings (dim={embedding_dim})"
+        elif tool_name == 'chemdataextractor':
+            entry = {
+                'formulas': raw_output.formulas[:5],
+                'reactions': len(raw_output.reactions),
+                'properties': list(raw_output.properties.keys())[:5]
+            }
+            summary = f"Found {len(raw_output.formulas)} formulas, {len(raw_output.reactions)} reactions"
+        elif tool_name == 'mathbert':
+            entry = {
+                'variables': list(raw_output.variables)[:10],
+                'expressions': len(raw_output.expressions),
+                'constants': dict(list(raw_output.constants.items())[:5])
+            }
+            summary = f"Found {len(raw_output.variables)} variables, {len(raw_output.expressions)} expressions"
+        elif tool_name == 'amr':
+            entry = {
+                'concepts': list(raw_output.concepts)[:10],
+                'entities': dict(list(raw_output.entities.items())[:5]),
+                'relations': raw_output.relations[:5]
+            }
+            summary = f"Extracted {len(raw_output.concepts)} concepts, {len(raw_output.relations)} relations"
+        elif tool_name == 'dygie':
+            entry = {
+                'entities': raw_output.entities,  # FIXED: Store ALL entities
+                'relations': raw_output.relations,  # FIXED: Store ALL relations
+                'raw_result': raw_output  # ADDED: Store full result object
+            }
+            summary = f"Extracted {len(raw_output.entities)} entities, {len(raw_output.relations)} relations"
+        else:
+            raise ValueError(f"Unknown NLP tool: {tool_name}")
+
+        return {
+            'provenance': tool_name,
+            'runtime_ms': elapsed_ms,
+            'cached': False,
+            **entry
+        }, summary
+
+    def _run_nlp_tools(self, problem_text: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Phase 0: run every enabled NLP tool on the same text.
+
+        Tools are independent, so by default they run on a shared thread pool and the
+        stage latency is the slowest tool rather than the sum. Each tool gets its own
+        wall-clock budget (config.nlp_tool_timeout / nlp_tool_timeouts); a tool that
+        overruns is dropped from the results and its worker is left to finish in the
+        background. Results are merged in canonical tool order.
+
+        Each call runs on a dedicated executor (one thread per tool) rather than the
+        shared pool: Python threads cannot be killed, so a timed-out tool keeps
+        holding its thread until it returns. Those threads are abandoned with the
+        call's executor instead of starving the tools of later requests.
 
-    def generate(self, problem_text: str) -> DiagramResult:
+        Returns:
+            (nlp_results, timing) where timing holds per-tool runtimes, the stage wall
+            clock and the critical-path tool for the tracer.
+        """
+        tool_names = [name for name in self._NLP_TOOL_ORDER if name in self.nlp_tools]
+        tool_names += [name for name in self.nlp_tools if name not in tool_names]
+
+        collected: Dict[str, Dict[str, Any]] = {}
+        failed: Dict[str, str] = {}
+        timed_out: List[str] = []
+        parallel = getattr(self.config, 'nlp_parallel', True) and len(tool_names) > 1
+        stage_start = time.time()
+
+        def _report_failure(name: str, exc: BaseException, elapsed_ms: float) -> None:
+            failed[name] = f"{type(exc).__name__}: {str(exc)[:50]}"
+            print(f"  ⚠️  {self._NLP_TOOL_DISPLAY.get(name, name)}: Failed after {elapsed_ms:.0f}ms - {failed[name]}", flush=True)
+
+        if parallel:
+            executor = ThreadPoolExecutor(max_workers=len(tool_names), thread_name_prefix="nlp-tool")
+            print(f"  🔀 Running {len(tool_names)} NLP tools concurrently: {', '.join(tool_names)}", flush=True)
+            futures = {}
+            deadlines = {}
+            for name in tool_names:
+                future = executor.submit(self._run_nlp_tool, name, problem_text)
+                futures[future] = name
+                timeout = self._nlp_tool_timeout(name)
+                deadlines[future] = (time.time() + timeout) if timeout else None
+
+            pending = set(futures)
+            while pending:
+                finite = [deadlines[f] for f in pending if deadlines[f] is not None]
+                wait_for = max(0.0, min(finite) - time.time()) if finite else None
+                done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = futures[future]
+                    try:
+                        collected[name] = future.result()
+                    except Exception as exc:
+                        _report_failure(name, exc, (time.time() - stage_start) * 1000)
+                now = time.time()
+                for future in [f for f in pending if deadlines[f] is not None and deadlines[f] <= now]:
+                    pending.discard(future)
+                    future.cancel()
+                    name = futures[future]
+                    timed_out.append(name)
+                    print(f"  ⏱️  {self._NLP_TOOL_DISPLAY.get(name, name)}: Timed out after "
+                          f"{self._nlp_tool_timeout(name):.1f}s - result discarded", flush=True)
+            # Don't wait for timed-out tools; their threads exit once the tool returns
+            executor.shutdown(wait=False)
+        else:
+            for name in tool_names:
+                start_tool = time.time()
+                try:
+                    collected[name] = self._run_nlp_tool(name, problem_text)
+                except Exception as exc:
+                    _report_failure(name, exc, (time.time() - start_tool) * 1000)
+
+        nlp_results = {name: collected[name] for name in tool_names if name in collected}
+        tool_runtime_ms = {name: result.get('runtime_ms', 0.0) for name, result in nlp_results.items()}
+        # A timed-out tool held the stage open for its full budget, so it counts towards the critical path
+        path_ms = dict(tool_runtime_ms)
+        path_ms.update({name: self._nlp_tool_timeout(name) * 1000 for name in timed_out})
+        critical_path_tool = max(path_ms, key=path_ms.get) if path_ms else None
+        timing = {
+            'mode': 'concurrent' if parallel else 'sequential',
+            'wall_clock_ms': (time.time() - stage_start) * 1000,
+            'tool_runtime_ms': tool_runtime_ms,
+            'critical_path_tool': critical_path_tool,
+            'critical_path_ms': path_ms.get(critical_path_tool, 0.0) if critical_path_tool else 0.0,
+            'failed': failed,
+            'timed_out': timed_out
+        }
+        return nlp_results, timing
+
+    def _run_nlp_tools_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Phase 0 for a whole batch of problems.
+
+        Texts already in the NLP cache are skipped. For the rest, each tool processes
+        every pending text as one job (tools still run concurrently on the shared NLP
+        pool), and tools with a batched entry point (OpenIE/DyGIE++ extract_batch,
+        SciBERT embed_batch) receive all texts in a single call so model batching
+        amortises tokenisation and forward passes. Fresh results are written back to
+        the cache per text.
+
+        Returns:
+            One nlp_results dict per input text, in input order ({} when no tool succeeded)
+        """
+        batch_results: List[Dict[str, Any]] = [{} for _ in texts]
+        if not self.nlp_tools or not texts:
+            return batch_results
+
+        cache_keys = [self._make_nlp_cache_key(text) for text in texts]
+        pending: List[int] = []
+        for index, key in enumerate(cache_keys):
+            cached = self._get_cached_nlp_results(key)
+            if cached:
+                batch_results[index] = cached
+            else:
+                pending.append(index)
+        if not pending:
+            print(f"  ♻️  All {len(texts)} batch NLP results served from cache", flush=True)
+            return batch_results
+
+        pending_texts = [texts[index] for index in pending]
+        tool_names = [name for name in self._NLP_TOOL_ORDER if name in self.nlp_tools]
+        tool_names += [name for name in self.nlp_tools if name not in tool_names]
+
+        def _run_tool_over_batch(name: str) -> List[Optional[Dict[str, Any]]]:
+            batch_method = self._NLP_TOOL_METHODS.get(name, (None, None))[1]
+            tool = self.nlp_tools[name]
+            if batch_method and hasattr(tool, batch_method):
+                start_tool = time.time()
+                try:
+                    outputs = list(getattr(tool, batch_method)(pending_texts))
+                except Exception as exc:
+                    outputs = None
+                    print(f"  ⚠️  {self._NLP_TOOL_DISPLAY.get(name, name)}: {batch_method} failed "
+                          f"({type(exc).__name__}), falling back to per-text calls", flush=True)
+                if outputs is not None and len(outputs) == len(pending_texts):
+                    elapsed = (time.time() - start_tool) * 1000
+                    per_item_ms = elapsed / len(pending_texts)
+                    entries = []
+                    for raw_output in outputs:
+                        entry, _ = self._format_nlp_result(name, raw_output, per_item_ms)
+                        entry['batched'] = True
+                        entries.append(entry)
+                    print(f"  ✅ {self._NLP_TOOL_DISPLAY.get(name, name)}: {len(entries)} texts in one "
+                          f"{batch_method} call in {elapsed:.0f}ms", flush=True)
+                    return entries
+
+            entries: List[Optional[Dict[str, Any]]] = []
+            for text in pending_texts:
+                try:
+                    entries.append(self._run_nlp_tool(name, text))
+                except Exception as exc:
+                    entries.append(None)
+                    print(f"  ⚠️  {self._NLP_TOOL_DISPLAY.get(name, name)}: Failed - "
+                          f"{type(exc).__name__}: {str(exc)[:50]}", flush=True)
+            return entries
+
+        print(f"  📦 Batched NLP: {len(pending_texts)} uncached of {len(texts)} texts, "
+              f"{len(tool_names)} tools", flush=True)
+        per_tool: Dict[str, List[Optional[Dict[str, Any]]]] = {}
+        if getattr(self.config, 'nlp_parallel', True) and len(tool_names) > 1:
+            executor = self._get_nlp_executor()
+            futures = {executor.submit(_run_tool_over_batch, name): name for name in tool_names}
+            for future in as_completed(futures):
+                per_tool[futures[future]] = future.result()
+        else:
+            for name in tool_names:
+                per_tool[name] = _run_tool_over_batch(name)
+
+        for position, index in enumerate(pending):
+            merged = {
+                name: per_tool[name][position]
+                for name in tool_names
+                if per_tool.get(name) and per_tool[name][position] is not None
+            }
+            batch_results[index] = self._store_nlp_results_in_cache(cache_keys[index], merged)
+        return batch_results
+
+    def generate(self, problem_text: str, precomputed_nlp: Optional[Dict[str, Any]] = None,
+                 on_stage: Optional[Callable[[StageRecord], None]] = None,
+                 cancel_event: Optional[threading.Event] = None) -> DiagramResult:
         """
         Generate physics diagram from problem text
 
@@ -880,8 +1337,18 @@ class UnifiedDiagramPipeline:
         6. RENDERING (UniversalRenderer)
         7. POST-VALIDATION + LLM AUDITING [NEW]
 
+        The phases are declared as a stage graph (_get_stage_graph): independent
+        stages run concurrently and each stage is memoized on its inputs and
+        config slice, so re-running a problem after a config change recomputes
+        only the affected stages and everything downstream of them.
+
         Args:
             problem_text: Physics problem description
+            precomputed_nlp: Phase 0 results already produced for this text (e.g. by
+                generate_batch); when given, the NLP tools are not run again
+            on_stage: Called with a StageRecord as each stage starts and finishes
+                (per-phase progress for job APIs)
+            cancel_event: When set, no further stage starts and StageCancelled is raised
 
         Returns:
             DiagramResult with SVG and all artifacts including advanced features
@@ -889,6 +1356,7 @@ class UnifiedDiagramPipeline:
         Raises:
             IncompleteSpecsError: If AI cannot extract complete specs
             jsonschema.ValidationError: If the generated scene graph is invalid
+            StageCancelled: If cancel_event was set before generation finished
         """
 
         # Log initial request
@@ -912,18 +1380,6 @@ class UnifiedDiagramPipeline:
         # Initialize comprehensive pipeline tracer
         tracer = PipelineTracer(request_id=request_id, output_dir="logs")
 
-        # Track advanced pipeline results
-        nlp_results = {}
-        complexity_score = None
-        selected_strategy = None
-        ontology_validation = None
-        audit_report = None
-        domain_module_outputs: List[Dict[str, Any]] = []
-        structural_report = None
-        domain_rule_report = None
-        vlm_description = None
-        current_property_graph = None
-
         print("\n")
         print("╔" + "═"*78 + "╗")
         print("║" + " "*78 + "║")
@@ -933,1439 +1389,1607 @@ class UnifiedDiagramPipeline:
         print("╚" + "═"*78 + "╝")
         print()
 
+        # Phases 0-7 run as a stage graph: independent stages overlap and each
+        # stage is memoized on its inputs + config slice (see core.stage_graph)
+        ctx = GenerationContext(request_id=request_id, trace=trace, tracer=tracer)
+        run = StageRun(self._get_stage_graph(), {
+            'problem_text': problem_text,
+            'precomputed_nlp': precomputed_nlp
+        }, on_stage=on_stage, cancel_event=cancel_event)
         domain = None
         try:
-            # Phase 0: NLP Enrichment (NEW)
+            self._get_stage_executor().execute(run, context=ctx, config=self.config)
+            trace['stage_graph'] = run.summary()
+            cached_stages = [record['name'] for record in trace['stage_graph'] if record['status'] == 'cached']
+            if cached_stages:
+                print(f"♻️  Stages served from cache: {', '.join(cached_stages)}", flush=True)
+
+            nlp_results = run.get('nlp_results')
+            current_property_graph = run.get('property_graph')
+            if current_property_graph is not None:
+                self.property_graph = current_property_graph
+                # Per-request side effect: runs even when the graph stage was a cache hit
+                trace['property_graph_persistence'] = self._report_property_graph_persistence(
+                    self._persist_property_graph(current_property_graph, request_id=request_id))
+            diagram_plan = run.get('diagram_plan')
+            specs = run.get('specs')
+            domain = run.get('domain')
+            complexity_score = run.get('complexity_score')
+            domain_module_outputs = run.get('domain_module_outputs')
+            selected_strategy = run.get('selected_strategy')
+            llm_plan_result = run.get('llm_plan_result')
+            structural_report = run.get('structural_report')
+            ontology_validation = run.get('ontology_validation')
+            report = run.get('validation_report')
+            domain_rule_report = run.get('domain_rule_report')
+            validation_results = run.get('validation_results')
+            vlm_description = run.get('vlm_description')
+            audit_report = run.get('audit_report')
+            positioned_scene = run.get('final_scene')
+            svg = run.get('final_svg')
+
+            # Summary
+            print("\n" + "="*80)
+            print("✅ DIAGRAM GENERATION COMPLETE")
+            print("="*80)
+            print(f"   Request ID: {request_id}", flush=True)
+            print(f"   Domain: {domain.value if domain else 'unknown'}", flush=True)
+            print(f"   SVG Size: {len(svg):,} bytes", flush=True)
+            if complexity_score:
+                print(f"   Complexity: {complexity_score:.2f}", flush=True)
+            if selected_strategy:
+                print(f"   Strategy: {selected_strategy}", flush=True)
+            if self.active_features:
+                print(f"   Advanced Features: {len(self.active_features)} active", flush=True)
+            print("="*80)
+
+            # Log final response
+            if self.logger:
+                self.logger.log_response(
+                    success=True,
+                    result={
+                        'svg_size': len(svg),
+                        'domain': domain.value if domain else 'unknown',
+                        'total_objects': len(positioned_scene.objects),
+                        'complexity_score': complexity_score,
+                        'selected_strategy': selected_strategy
+                    }
+                )
+
+            result_metadata = self._compose_result_metadata(
+                trace=trace,
+                domain=domain,
+                scene=positioned_scene,
+                features=self.active_features,
+                request_id=request_id,
+                structural_report=structural_report,
+                domain_rule_report=domain_rule_report,
+                validation_results=validation_results,
+                ontology_validation=ontology_validation,
+                audit_report=audit_report,
+                vlm_description=vlm_description
+            )
+
+            # Return complete result with ALL advanced artifacts
+            return DiagramResult(
+                svg=svg,
+                scene=positioned_scene,
+                specs=specs,
+                validation_report=report,
+                quality_report=None,
+                # NEW: Advanced pipeline artifacts
+                property_graph=current_property_graph,
+                nlp_results=nlp_results if nlp_results else None,
+                complexity_score=complexity_score,
+                selected_strategy=selected_strategy,
+                llm_plan=llm_plan_result,
+                diagram_plan=diagram_plan.to_dict() if diagram_plan else None,
+                domain_module_outputs=domain_module_outputs if domain_module_outputs else None,
+                ontology_validation=ontology_validation,
+                audit_report=audit_report,
+                # Metadata
+                metadata=result_metadata
+            )
+
+        except Exception as e:
+            domain = run.get('domain')
+            trace['stage_graph'] = run.summary()
+            # Log error
+            if self.logger:
+                self.logger.log_error(e, {
+                    'domain': domain.value if domain else 'unknown',
+                    'phase': 'generation'
+                })
+                self.logger.log_response(
+                    success=False,
+                    error=str(e)
+                )
+            # Re-raise the exception
+            raise
+
+        finally:
+            # Export comprehensive trace
+            tracer.print_summary()
+            trace_file = tracer.export_trace()
+            print(f"\n📊 Detailed trace exported to: {trace_file}")
+
+            # Keep original trace for compatibility
+            with open('generation_trace.json', 'w') as f:
+                json.dump(trace, f, indent=2)
+
+    def _get_stage_graph(self) -> StageGraph:
+        """
+        Declare generate() as a stage graph.
+
+        Stages list the values they read and write plus the config fields they
+        depend on; the executor derives ordering, concurrency and cache keys from
+        these declarations. Stages that edit a scene in place list it in mutates
+        so memoized upstream outputs are never modified.
+
+        Stages that call an LLM (non-deterministic) are not cacheable and so is
+        everything downstream of them. Their cacheable predicates check whether
+        the LLM path is actually live, so with LLMs off (or unavailable) the whole
+        graph stays memoizable and a render-only config change reuses the layout.
+        Property graph persistence is a per-request side effect and runs in
+        generate(), outside the stage.
+        """
+        if self._stage_graph is None:
+            self._stage_graph = StageGraph([
+                Stage('nlp', self._stage_nlp,
+                      inputs=('problem_text', 'precomputed_nlp'),
+                      outputs=('nlp_results',),
+                      config_keys=('enable_nlp_enrichment', 'nlp_tools', 'nlp_parallel', 'nlp_max_workers',
+                                   'nlp_tool_timeout', 'nlp_tool_timeouts', 'nlp_cache_backend', 'nlp_cache_path')),
+                Stage('property_graph', self._stage_property_graph,
+                      inputs=('problem_text', 'nlp_results'),
+                      outputs=('property_graph',),
+                      config_keys=('enable_property_graph', 'property_graph_backend')),
+                Stage('deepseek_enrichment', self._stage_deepseek_enrichment,
+                      inputs=('problem_text', 'property_graph'),
+                      outputs=('enrichment_result',),
+                      config_keys=('enable_deepseek_enrichment', 'deepseek_model', 'deepseek_base_url'),
+                      cacheable=lambda cfg: not (self.deepseek_client and cfg.enable_deepseek_enrichment)),
+                Stage('planning', self._stage_planning,
+                      inputs=('problem_text', 'property_graph'),
+                      outputs=('diagram_plan', 'specs', 'domain', 'domain_hint',
+                               'complexity_score', 'domain_module_outputs'),
+                      config_keys=('enable_strategic_planning', 'enable_complexity_assessment', 'enable_domain_modules',
+                                   'enable_llm_planning', 'llm_planner_local_model', 'llm_planner_api_model', 'api_model'),
+                      # The analyzer fallback only calls the API without a graph-driven planner
+                      cacheable=lambda cfg: not cfg.api_key or (self.diagram_planner is not None and cfg.enable_property_graph)),
+                Stage('scene_synthesis', self._stage_scene_synthesis,
+                      inputs=('problem_text', 'nlp_results', 'property_graph', 'diagram_plan', 'specs',
+                              'domain', 'domain_hint', 'complexity_score', 'domain_module_outputs'),
+                      outputs=('scene', 'selected_strategy', 'llm_plan_result'),
+                      config_keys=('enable_deepseek_audit', 'enable_primitive_library', 'primitive_library_backend',
+                                   'enable_llm_planning', 'llm_planner_local_model', 'llm_planner_api_model',
+                                   'llm_planner_ollama_url', 'deepseek_model', 'auditor_backend'),
+                      cacheable=lambda cfg: self.llm_planner is None),
+                Stage('structural_validation', self._stage_structural_validation,
+                      inputs=('diagram_plan', 'scene'),
+                      outputs=('structural_report',),
+                      config_keys=('enable_structural_validation',)),
+                Stage('ontology_validation', self._stage_ontology_validation,
+                      inputs=('specs', 'domain', 'property_graph'),
+                      outputs=('ontology_validation',),
+                      config_keys=('enable_ontology_validation',)),
+                Stage('physics_validation', self._stage_physics_validation,
+                      inputs=('scene', 'specs'),
+                      outputs=('validation_report', 'validated_scene'),
+                      config_keys=('validation_mode',),
+                      mutates=('scene',)),
+                Stage('domain_rules', self._stage_domain_rules,
+                      inputs=('validated_scene', 'specs', 'domain'),
+                      outputs=('domain_rule_report',),
+                      config_keys=('enable_domain_rule_validation',)),
+                Stage('layout', self._stage_layout,
+                      inputs=('validated_scene', 'specs', 'diagram_plan'),
+                      outputs=('positioned_scene',),
+                      config_keys=('enable_layout_optimization', 'enable_z3_optimization', 'z3_incremental',
+                                   'z3_mode', 'z3_time_budget', 'z3_parallel_components', 'z3_component_workers',
+                                   'layout_cache_backend',
+                                   'enable_sympy_solver', 'layout_relaxation_backend', 'canvas_width', 'canvas_height',
+                                   'enable_model_orchestration', 'enable_model_orchestrator'),
+                      mutates=('validated_scene',)),
+                Stage('label_placement', self._stage_label_placement,
+                      inputs=('positioned_scene',),
+                      outputs=('labeled_scene',),
+                      mutates=('positioned_scene',)),
+                Stage('spatial_validation', self._stage_spatial_validation,
+                      inputs=('labeled_scene',),
+                      outputs=('spatial_report',),
+                      config_keys=('validation_mode',)),
+                Stage('render', self._stage_render,
+                      inputs=('labeled_scene', 'specs', 'domain', 'spatial_report'),
+                      outputs=('svg',),
+                      config_keys=('enable_svg_optimization', 'svg_precision', 'svg_symbol_reuse', 'enable_domain_embellishments')),
+                Stage('refinement', self._stage_refinement,
+                      inputs=('problem_text', 'svg', 'labeled_scene', 'specs', 'diagram_plan', 'domain_rule_report'),
+                      outputs=('validation_results', 'final_svg', 'final_scene', 'vlm_description'),
+                      config_keys=('enable_ai_validation', 'enable_deepseek_validation', 'enable_structural_validation',
+                                   'enable_domain_rule_validation', 'auto_refinement_max_iterations',
+                                   'auto_refinement_min_score', 'deepseek_model', 'deepseek_base_url'),
+                      mutates=('labeled_scene',),
+                      cacheable=lambda cfg: self.vlm_validator is None and not (
+                          self.deepseek_client and cfg.enable_deepseek_validation)),
+                Stage('audit', self._stage_audit,
+                      inputs=('specs', 'final_svg', 'structural_report', 'domain_rule_report',
+                              'validation_results', 'vlm_description'),
+                      outputs=('audit_report',),
+                      config_keys=('enable_llm_auditing', 'auditor_backend', 'api_model', 'deepseek_model'),
+                      cacheable=lambda cfg: self.auditor is None),
+            ], root_inputs=('problem_text', 'precomputed_nlp'))
+        return self._stage_graph
+
+    def _get_stage_executor(self) -> StageExecutor:
+        """Executor honouring the stage parallelism / cache settings"""
+        max_workers = getattr(self.config, 'stage_max_workers', 4) if getattr(self.config, 'enable_stage_parallelism', True) else 1
+        return StageExecutor(cache=self.stage_cache, max_workers=max_workers)
+
+    def _stage_nlp(self, ctx: 'GenerationContext', problem_text: str, precomputed_nlp: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Phase 0: NLP enrichment (tools, NLP cache, or precomputed batch results)"""
+        nlp_results: Dict[str, Any] = {}
+        if precomputed_nlp is not None:
+            nlp_cache_key = None
+            cached_nlp = precomputed_nlp
+        else:
             nlp_cache_key = self._make_nlp_cache_key(problem_text) if self.nlp_tools else None
             cached_nlp = self._get_cached_nlp_results(nlp_cache_key) if self.nlp_tools else None
 
-            if self.nlp_tools:
-                stage_start_time = time.time()
+        if self.nlp_tools or precomputed_nlp:
+            stage_start_time = time.time()
 
-                # Start tracer for NLP phase
-                tracer.start_component("NLP Enrichment", "Phase 0", {
-                    'tools': list(self.nlp_tools.keys()),
-                    'problem_length': len(problem_text)
-                })
-                tracer.log_input(problem_text, "problem_text")
+            # Start tracer for NLP phase
+            ctx.tracer.start_component("NLP Enrichment", "Phase 0", {
+                'tools': list(self.nlp_tools.keys()) or list(precomputed_nlp.keys()),
+                'problem_length': len(problem_text)
+            })
+            ctx.tracer.log_input(problem_text, "problem_text")
 
-                if self.logger:
-                    self.logger.start_phase("NLP Enrichment", 0, "Extract entities, relations, and scientific concepts")
-                    self.logger.log_phase_input(problem_text, f"Problem text ({len(problem_text)} chars)")
-                if self.progress:
-                    self.progress.start_phase("NLP Enrichment", 0)
-                print("┌─ PHASE 0: NLP ENRICHMENT ─────────────────────────────────────┐")
+            if self.logger:
+                self.logger.start_phase("NLP Enrichment", 0, "Extract entities, relations, and scientific concepts")
+                self.logger.log_phase_input(problem_text, f"Problem text ({len(problem_text)} chars)")
+            if self.progress:
+                self.progress.start_phase("NLP Enrichment", 0)
+            print("┌─ PHASE 0: NLP ENRICHMENT ─────────────────────────────────────┐")
+
+            total_nlp_time = 0.0
+            nlp_timing: Dict[str, Any] = {}
+            if cached_nlp:
+                nlp_results = cached_nlp
+                source = "batched" if precomputed_nlp is not None else "cached"
+                print(f"  ♻️  Using {source} NLP outputs from {len(nlp_results)} tools", flush=True)
+            else:
+                # Log text complexity metrics
+                text_length = len(problem_text)
+                formula_chars = sum(1 for c in problem_text if c in 'μ₁₂₃₄₅₆₇₈₉₀×÷±√∫∑∏')
+                special_chars = sum(1 for c in problem_text if not c.isalnum() and not c.isspace())
+                print(f"  📊 Text Complexity: {text_length} chars, {formula_chars} formula chars, {special_chars} special chars", flush=True)
+                
+
+                # Run the enabled NLP tools (concurrently unless disabled) with per-tool timeouts
+                nlp_results, nlp_timing = self._run_nlp_tools(problem_text)
+
+                # Cache for future identical prompts
+                nlp_results = self._store_nlp_results_in_cache(nlp_cache_key, nlp_results)
+
+                # Log summary of NLP enrichment with timing breakdown
+                total_nlp_time = sum(result.get('runtime_ms', 0) for result in nlp_results.values())
+                print()
+                print("  📊 NLP Enrichment Summary:", flush=True)
+                print(f"     Total tool time: {total_nlp_time:.0f}ms ({total_nlp_time/1000:.1f}s)", flush=True)
+                print(f"     Wall-clock time: {nlp_timing['wall_clock_ms']:.0f}ms "
+                      f"({nlp_timing['mode']}, critical path: {nlp_timing['critical_path_tool'] or 'n/a'})", flush=True)
+                print(f"     Tools executed: {len(nlp_results)}", flush=True)
+                if nlp_timing['timed_out']:
+                    print(f"     Timed out: {', '.join(nlp_timing['timed_out'])}", flush=True)
+                if nlp_results:
+                    print(f"     Timing breakdown:", flush=True)
+                    for tool_name, result in sorted(nlp_results.items(), key=lambda x: x[1].get('runtime_ms', 0), reverse=True):
+                        tool_time = result.get('runtime_ms', 0)
+                        percentage = (tool_time / total_nlp_time * 100) if total_nlp_time > 0 else 0
+                        print(f"       - {tool_name}: {tool_time:.0f}ms ({percentage:.1f}%)", flush=True)
 
-                if cached_nlp:
-                    nlp_results = cached_nlp
-                    print(f"  ♻️  Using cached NLP outputs from {len(nlp_results)} tools", flush=True)
-                else:
-                    # Log text complexity metrics
-                    text_length = len(problem_text)
-                    formula_chars = sum(1 for c in problem_text if c in 'μ₁₂₃₄₅₆₇₈₉₀×÷±√∫∑∏')
-                    special_chars = sum(1 for c in problem_text if not c.isalnum() and not c.isspace())
-                    print(f"  📊 Text Complexity: {text_length} chars, {formula_chars} formula chars, {special_chars} special chars", flush=True)
-                    
-
-                    # Run each NLP tool with error handling to prevent hangs
-                    if 'openie' in self.nlp_tools:
-                        print("  🔄 OpenIE: Starting extraction...", flush=True)
-                        start_tool = time.time()
-                        try:
-                            openie_result = self.nlp_tools['openie'].extract(problem_text)
-                            elapsed = (time.time() - start_tool) * 1000
-                            nlp_results['openie'] = {
-                                'provenance': 'openie',
-                                'runtime_ms': elapsed,
-                                'cached': False,
-                                'triples': [(t.subject, t.relation, t.object) for t in openie_result.triples],  # FIXED: Store ALL triples
-                                'raw_result': openie_result  # ADDED: Store full result object
-                            }
-                            print(f"  ✅ OpenIE: Extracted {len(openie_result.triples)} triples in {elapsed:.0f}ms", flush=True)
-                        except Exception as e:
-                            elapsed = (time.time() - start_tool) * 1000
-                            print(f"  ⚠️  OpenIE: Failed after {elapsed:.0f}ms - {type(e).__name__}: {str(e)[:50]}", flush=True)
-
-                    if 'stanza' in self.nlp_tools:
-                        print("  🔄 Stanza: Starting NLP analysis...", flush=True)
-                        start_tool = time.time()
-                        try:
-                            stanza_result = self.nlp_tools['stanza'].analyze(problem_text)
-                            elapsed = (time.time() - start_tool) * 1000
-                            nlp_results['stanza'] = {
-                                'provenance': 'stanza',
-                                'runtime_ms': elapsed,
-                                'cached': False,
-                                'entities': stanza_result.get('entities', []),  # FIXED: Store ALL entities
-                                'dependencies': stanza_result.get('dependencies', []),  # ADDED: Store dependency relations
-                                'raw_result': stanza_result  # ADDED: Store full result
-                            }
-                            entity_count = len(stanza_result.get('entities', []))
-                            dep_count = len(stanza_result.get('dependencies', []))
-                            print(f"  ✅ Stanza: Found {entity_count} entities, {dep_count} dependencies in {elapsed:.0f}ms", flush=True)
-                        except Exception as e:
-                            elapsed = (time.time() - start_tool) * 1000
-                            print(f"  ⚠️  Stanza: Failed after {elapsed:.0f}ms - {type(e).__name__}: {str(e)[:50]}", flush=True)
-
-                    if 'scibert' in self.nlp_tools:
-                        print("  🔄 SciBERT: Starting embedding generation...", flush=True)
-                        start_tool = time.time()
-                        try:
-                            scibert_result = self.nlp_tools['scibert'].embed(problem_text)
-                            elapsed = (time.time() - start_tool) * 1000
-                            embedding_dim = len(scibert_result[0]) if isinstance(scibert_result, list) and scibert_result else (
-                                len(scibert_result) if hasattr(scibert_result, '__len__') else 0
-                            )
-                            embedding_sample = None
-                            try:
-                                if hasattr(scibert_result, 'tolist'):
-                                    vector = scibert_result.tolist()
-                                    embedding_sample = vector[:10] if isinstance(vector, list) else None
-                                elif isinstance(scibert_result, list):
-                                    embedding_sample = scibert_result[0][:10] if scibert_result and hasattr(scibert_result[0], '__getitem__') else None
-                            except Exception:
-                                embedding_sample = None
-                            nlp_results['scibert'] = {
-                                'provenance': 'scibert',
-                                'runtime_ms': elapsed,
-                                'cached': False,
-                                'embedding_dim': embedding_dim,
-                                'embedding_sample': embedding_sample
-                            }
-                            print(f"  ✅ SciBERT: Generated embeddings (dim={embedding_dim}) in {elapsed:.0f}ms", flush=True)
-                        except Exception as e:
-                            elapsed = (time.time() - start_tool) * 1000
-                            print(f"  ⚠️  SciBERT: Failed after {elapsed:.0f}ms - {type(e).__name__}: {str(e)[:50]}", flush=True)
-
-                    if 'chemdataextractor' in self.nlp_tools:
-                        print("  🔄 ChemDataExtractor: Starting chemical entity extraction...", flush=True)
-                        start_tool = time.time()
-                        try:
-                            chem_result = self.nlp_tools['chemdataextractor'].parse(problem_text)
-                            elapsed = (time.time() - start_tool) * 1000
-                            nlp_results['chemdataextractor'] = {
-                                'provenance': 'chemdataextractor',
-                                'runtime_ms': elapsed,
-                                'cached': False,
-                                'formulas': chem_result.formulas[:5],
-                                'reactions': len(chem_result.reactions),
-                                'properties': list(chem_result.properties.keys())[:5]
-                            }
-                            print(f"  ✅ ChemDataExtractor: Found {len(chem_result.formulas)} formulas, {len(chem_result.reactions)} reactions in {elapsed:.0f}ms", flush=True)
-                        except Exception as e:
-                            elapsed = (time.time() - start_tool) * 1000
-                            print(f"  ⚠️  ChemDataExtractor: Failed after {elapsed:.0f}ms - {type(e).__name__}: {str(e)[:50]}", flush=True)
-
-                    if 'mathbert' in self.nlp_tools:
-                        print("  🔄 MathBERT: Starting mathematical expression extraction...", flush=True)
-                        print("     ⏱️  Note: MathBERT can take 60-180+ seconds for complex text with formulas", flush=True)
-                        start_tool = time.time()
-                        try:
-                            math_result = self.nlp_tools['mathbert'].extract(problem_text)
-                            elapsed = (time.time() - start_tool) * 1000
-                            nlp_results['mathbert'] = {
-                                'provenance': 'mathbert',
-                                'runtime_ms': elapsed,
-                                'cached': False,
-                                'variables': list(math_result.variables)[:10],
-                                'expressions': len(math_result.expressions),
-                                'constants': dict(list(math_result.constants.items())[:5])
-                            }
-                            print(f"  ✅ MathBERT: Found {len(math_result.variables)} variables, {len(math_result.expressions)} expressions in {elapsed:.0f}ms ({elapsed/1000:.1f}s)", flush=True)
-                        except Exception as e:
-                            elapsed = (time.time() - start_tool) * 1000
-                            print(f"  ⚠️  MathBERT: Failed after {elapsed:.0f}ms ({elapsed/1000:.1f}s) - {type(e).__name__}: {str(e)[:50]}", flush=True)
-
-                    if 'amr' in self.nlp_tools:
-                        print("  🔄 AMR Parser: Starting Abstract Meaning Representation parsing...", flush=True)
-                        print("     ⏱️  Note: AMR Parser can take 60-120+ seconds for complex dependency graphs", flush=True)
-                        start_tool = time.time()
-                        try:
-                            amr_result = self.nlp_tools['amr'].parse(problem_text)
-                            elapsed = (time.time() - start_tool) * 1000
-                            nlp_results['amr'] = {
-                                'provenance': 'amr',
-                                'runtime_ms': elapsed,
-                                'cached': False,
-                                'concepts': list(amr_result.concepts)[:10],
-                                'entities': dict(list(amr_result.entities.items())[:5]),
-                                'relations': amr_result.relations[:5]
-                            }
-                            print(f"  ✅ AMR: Extracted {len(amr_result.concepts)} concepts, {len(amr_result.relations)} relations in {elapsed:.0f}ms ({elapsed/1000:.1f}s)", flush=True)
-                        except Exception as e:
-                            elapsed = (time.time() - start_tool) * 1000
-                            print(f"  ⚠️  AMR: Failed after {elapsed:.0f}ms ({elapsed/1000:.1f}s) - {type(e).__name__}: {str(e)[:50]}", flush=True)
-
-                    if 'dygie' in self.nlp_tools:
-                        print("  🔄 DyGIE++: Starting entity and relation extraction...", flush=True)
-                        start_tool = time.time()
-                        try:
-                            dygie_result = self.nlp_tools['dygie'].extract(problem_text)
-                            elapsed = (time.time() - start_tool) * 1000
-                            nlp_results['dygie'] = {
-                                'provenance': 'dygie',
-                                'runtime_ms': elapsed,
-                                'cached': False,
-                                'entities': dygie_result.entities,  # FIXED: Store ALL entities
-                                'relations': dygie_result.relations,  # FIXED: Store ALL relations
-                                'raw_result': dygie_result  # ADDED: Store full result object
-                            }
-                            print(f"  ✅ DyGIE++: Extracted {len(dygie_result.entities)} entities, {len(dygie_result.relations)} relations in {elapsed:.0f}ms", flush=True)
-                        except Exception as e:
-                            elapsed = (time.time() - start_tool) * 1000
-                            print(f"  ⚠️  DyGIE++: Failed after {elapsed:.0f}ms - {type(e).__name__}: {str(e)[:50]}", flush=True)
-
-                    # Cache for future identical prompts
-                    self._store_nlp_results_in_cache(nlp_cache_key, nlp_results)
-
-                    # Log summary of NLP enrichment with timing breakdown
-                    total_nlp_time = sum(result.get('runtime_ms', 0) for result in nlp_results.values())
-                    print()
-                    print("  📊 NLP Enrichment Summary:", flush=True)
-                    print(f"     Total time: {total_nlp_time:.0f}ms ({total_nlp_time/1000:.1f}s)", flush=True)
-                    print(f"     Tools executed: {len(nlp_results)}", flush=True)
-                    if nlp_results:
-                        print(f"     Timing breakdown:", flush=True)
-                        for tool_name, result in sorted(nlp_results.items(), key=lambda x: x[1].get('runtime_ms', 0), reverse=True):
-                            tool_time = result.get('runtime_ms', 0)
-                            percentage = (tool_time / total_nlp_time * 100) if total_nlp_time > 0 else 0
-                            print(f"       - {tool_name}: {tool_time:.0f}ms ({percentage:.1f}%)", flush=True)
-
-                print("└───────────────────────────────────────────────────────────────┘\n")
-
-                # Complete tracer for NLP phase
-                tracer.log_output(nlp_results, "nlp_results")
-                tracer.log_transformation("NLP Extraction", {
-                    'tools_used': list(nlp_results.keys()),
-                    'total_time_ms': total_nlp_time,
-                    'cached': cached_nlp is not None
-                })
-                tracer.complete_component()
+            print("└───────────────────────────────────────────────────────────────┘\n")
 
-                if self.logger:
-                    self.logger.log_phase_output(nlp_results, f"Extracted data using {len(nlp_results)} NLP tools")
-                    self.logger.end_phase("success")
-                if self.progress:
-                    self.progress.end_phase(True)
-                trace['stages'].append({
-                    'name': 'NLP Enrichment',
-                    'duration': time.time() - stage_start_time,
-                    'output': {'tools_used': list(nlp_results.keys())}
-                })
+            # Complete tracer for NLP phase
+            ctx.tracer.log_output(nlp_results, "nlp_results")
+            ctx.tracer.log_transformation("NLP Extraction", {
+                'tools_used': list(nlp_results.keys()),
+                'total_time_ms': total_nlp_time,
+                'cached': cached_nlp is not None,
+                'cache_stats': self.nlp_cache.stats() if self.nlp_cache is not None else None
+            })
+            if nlp_timing:
+                ctx.tracer.log_transformation("NLP Critical Path", nlp_timing)
+                for tool_name, tool_ms in nlp_timing['tool_runtime_ms'].items():
+                    ctx.tracer.phase_times[f"Phase 0 / {tool_name}"] = tool_ms
+                ctx.tracer.phase_times["Phase 0 / critical path"] = nlp_timing['critical_path_ms']
+            ctx.tracer.complete_component()
 
-            # Phase 0.5: Property Graph Construction (ENHANCED - Multi-source integration)
-            if self.property_graph is not None:
-                stage_start_time = time.time()
+            if self.logger:
+                self.logger.log_phase_output(nlp_results, f"Extracted data using {len(nlp_results)} NLP tools")
+                self.logger.end_phase("success")
+            if self.progress:
+                self.progress.end_phase(True)
+            ctx.trace['stages'].append({
+                'name': 'NLP Enrichment',
+                'duration': time.time() - stage_start_time,
+                'output': {'tools_used': list(nlp_results.keys())}
+            })
 
-                # Start tracer for Property Graph phase
-                tracer.start_component("Property Graph Construction", "Phase 0.5", {
-                    'nlp_tools_used': list(nlp_results.keys()) if nlp_results else []
-                })
-                tracer.log_input(nlp_results, "nlp_results")
+        return {'nlp_results': nlp_results}
 
-                if self.logger:
-                    self.logger.start_phase("Property Graph Construction", 1, "Build knowledge graph from NLP results")
-                    self.logger.log_phase_input(nlp_results, "NLP extraction results")
-                if self.progress:
-                    self.progress.start_phase("Property Graph", 1)
-                print("┌─ PHASE 0.5: PROPERTY GRAPH CONSTRUCTION (Multi-source) ───────┐")
-
-                # ✅ FIX 1: Use self.property_graph (instance variable) instead of local variable
-                # Reset property graph for this problem
-                self.property_graph = PropertyGraph()
-
-                # Counter for tracking sources
-                sources_used = []
-
-                # Source 0: Direct text parsing for canonical quantities/components
-                text_measurements = self._extract_quantities_from_text(problem_text)
-                if text_measurements:
-                    sources_used.append('text_pattern')
-                    for measurement in text_measurements:
-                        quantity_id = measurement['quantity_id']
-                        text_metadata = {
-                            'sources': ['text_pattern'],
-                            'raw_text': measurement['raw_text'],
-                            'confidence': measurement.get('confidence', 0.95)
-                        }
+    def _stage_property_graph(self, ctx: 'GenerationContext', problem_text: str, nlp_results: Dict[str, Any]) -> Dict[str, Any]:
+        """Phase 0.5: Multi-source property graph construction"""
+        current_property_graph = None
+        if self.property_graph is not None:
+            stage_start_time = time.time()
+
+            # Start tracer for Property Graph phase
+            ctx.tracer.start_component("Property Graph Construction", "Phase 0.5", {
+                'nlp_tools_used': list(nlp_results.keys()) if nlp_results else []
+            })
+            ctx.tracer.log_input(nlp_results, "nlp_results")
+
+            if self.logger:
+                self.logger.start_phase("Property Graph Construction", 1, "Build knowledge graph from NLP results")
+                self.logger.log_phase_input(nlp_results, "NLP extraction results")
+            if self.progress:
+                self.progress.start_phase("Property Graph", 1)
+            print("┌─ PHASE 0.5: PROPERTY GRAPH CONSTRUCTION (Multi-source) ───────┐")
+
+            # ✅ FIX 1: Use self.property_graph (instance variable) instead of local variable
+            # Reset property graph for this problem
+            self.property_graph = create_property_graph(self.config.property_graph_backend)
+
+            # Counter for tracking sources
+            sources_used = []
+
+            # Source 0: Direct text parsing for canonical quantities/components
+            text_measurements = self._extract_quantities_from_text(problem_text)
+            if text_measurements:
+                sources_used.append('text_pattern')
+                for measurement in text_measurements:
+                    quantity_id = measurement['quantity_id']
+                    text_metadata = {
+                        'sources': ['text_pattern'],
+                        'raw_text': measurement['raw_text'],
+                        'confidence': measurement.get('confidence', 0.95)
+                    }
 
-                        if not self.property_graph.has_node(quantity_id):
-                            quantity_node = GraphNode(
-                                id=quantity_id,
-                                type=NodeType.QUANTITY,
-                                label=measurement['quantity_label'],
+                    if not self.property_graph.has_node(quantity_id):
+                        quantity_node = GraphNode(
+                            id=quantity_id,
+                            type=NodeType.QUANTITY,
+                            label=measurement['quantity_label'],
+                            properties={
+                                'quantity_type': measurement['quantity_type'],
+                                'value': measurement['value'],
+                                'value_si': measurement['value_si'],
+                                'unit': measurement['unit_display'],
+                                'unit_base': measurement.get('unit_base'),
+                                'symbol': measurement.get('symbol')
+                            },
+                            metadata=text_metadata
+                        )
+                        self.property_graph.add_node(quantity_node)
+
+                    component_id = measurement.get('component_id')
+                    if component_id:
+                        if not self.property_graph.has_node(component_id):
+                            component_node = GraphNode(
+                                id=component_id,
+                                type=NodeType.COMPONENT,
+                                label=measurement['component_label'],
                                 properties={
-                                    'quantity_type': measurement['quantity_type'],
-                                    'value': measurement['value'],
-                                    'value_si': measurement['value_si'],
-                                    'unit': measurement['unit_display'],
-                                    'unit_base': measurement.get('unit_base'),
+                                    'component_type': measurement['component_type'],
                                     'symbol': measurement.get('symbol')
                                 },
                                 metadata=text_metadata
                             )
-                            self.property_graph.add_node(quantity_node)
-
-                        component_id = measurement.get('component_id')
-                        if component_id:
-                            if not self.property_graph.has_node(component_id):
-                                component_node = GraphNode(
-                                    id=component_id,
-                                    type=NodeType.COMPONENT,
-                                    label=measurement['component_label'],
-                                    properties={
-                                        'component_type': measurement['component_type'],
-                                        'symbol': measurement.get('symbol')
-                                    },
-                                    metadata=text_metadata
-                                )
-                                self.property_graph.add_node(component_node)
-
-                            self.property_graph.add_edge(GraphEdge(
-                                source=component_id,
-                                target=quantity_id,
-                                type=EdgeType.HAS_VALUE,
-                                label=f"{measurement['quantity_type']} value",
-                                metadata={'source': 'text_pattern'},
-                                properties={'unit': measurement['unit_display'], 'raw': measurement['raw_text']}
-                            ))
-
-                        unit_base = measurement.get('unit_base')
-                        if unit_base:
-                            unit_node_id = f"unit_{unit_base.lower()}"
-                            if not self.property_graph.has_node(unit_node_id):
-                                unit_node = GraphNode(
-                                    id=unit_node_id,
-                                    type=NodeType.CONCEPT,
-                                    label=unit_base,
-                                    properties={'unit': unit_base},
-                                    metadata={'sources': ['text_pattern']}
-                                )
-                                self.property_graph.add_node(unit_node)
-
-                            self.property_graph.add_edge(GraphEdge(
-                                source=quantity_id,
-                                target=unit_node_id,
-                                type=EdgeType.HAS_UNIT,
-                                label='has_unit',
-                                metadata={'source': 'text_pattern'}
-                            ))
-
-                # ✅ FIX 2: Integrate ALL NLP tool outputs (not just OpenIE)
-
-                # Source 1: OpenIE - Extract subject-relation-object triples
-                if 'openie' in nlp_results:
-                    sources_used.append('OpenIE')
-                    for subject, relation, obj in nlp_results['openie']['triples']:
-                        # Add nodes (check if already exists to avoid duplicates)
-                        if not self.property_graph.has_node(subject):
-                            subj_node = GraphNode(id=subject, type=NodeType.OBJECT, label=subject)
-                            self.property_graph.add_node(subj_node)
-                            # Trace entity addition
-                            tracer.log_entity_added(subject, {
-                                'source': 'OpenIE',
-                                'type': 'OBJECT',
-                                'label': subject,
-                                'relation_role': 'subject',
-                                'relation': relation
-                            })
-                        if not self.property_graph.has_node(obj):
-                            obj_node = GraphNode(id=obj, type=NodeType.OBJECT, label=obj)
-                            self.property_graph.add_node(obj_node)
-                            # Trace entity addition
-                            tracer.log_entity_added(obj, {
-                                'source': 'OpenIE',
-                                'type': 'OBJECT',
-                                'label': obj,
-                                'relation_role': 'object',
-                                'relation': relation
-                            })
-
-                        # Add edge
-                        edge = GraphEdge(
-                            source=subject,
-                            target=obj,
-                            type=EdgeType.RELATED_TO,
-                            label=relation,
-                            metadata={'source': 'openie'}
-                        )
-                        self.property_graph.add_edge(edge)
+                            self.property_graph.add_node(component_node)
+
+                        self.property_graph.add_edge(GraphEdge(
+                            source=component_id,
+                            target=quantity_id,
+                            type=EdgeType.HAS_VALUE,
+                            label=f"{measurement['quantity_type']} value",
+                            metadata={'source': 'text_pattern'},
+                            properties={'unit': measurement['unit_display'], 'raw': measurement['raw_text']}
+                        ))
 
-                # Source 2: Stanza - Add NER entities as nodes + dependency relations as edges
-                if 'stanza' in nlp_results and 'entities' in nlp_results['stanza']:
-                    sources_used.append('Stanza')
-                    for entity in nlp_results['stanza']['entities']:
-                        entity_text = entity.get('text', entity) if isinstance(entity, dict) else entity
-                        entity_type = entity.get('type', 'OBJECT') if isinstance(entity, dict) else 'OBJECT'
+                    unit_base = measurement.get('unit_base')
+                    if unit_base:
+                        unit_node_id = f"unit_{unit_base.lower()}"
+                        if not self.property_graph.has_node(unit_node_id):
+                            unit_node = GraphNode(
+                                id=unit_node_id,
+                                type=NodeType.CONCEPT,
+                                label=unit_base,
+                                properties={'unit': unit_base},
+                                metadata={'sources': ['text_pattern']}
+                            )
+                            self.property_graph.add_node(unit_node)
+
+                        self.property_graph.add_edge(GraphEdge(
+                            source=quantity_id,
+                            target=unit_node_id,
+                            type=EdgeType.HAS_UNIT,
+                            label='has_unit',
+                            metadata={'source': 'text_pattern'}
+                        ))
 
-                        if not self.property_graph.has_node(entity_text):
-                            # Map entity type to NodeType
-                            node_type = NodeType.OBJECT  # Default
-                            if 'QUANTITY' in entity_type.upper():
-                                node_type = NodeType.QUANTITY
-                            elif 'FORCE' in entity_type.upper():
-                                node_type = NodeType.FORCE
+            # ✅ FIX 2: Integrate ALL NLP tool outputs (not just OpenIE)
+
+            # Source 1: OpenIE - Extract subject-relation-object triples
+            if 'openie' in nlp_results:
+                sources_used.append('OpenIE')
+                for subject, relation, obj in nlp_results['openie']['triples']:
+                    # Add nodes (check if already exists to avoid duplicates)
+                    if not self.property_graph.has_node(subject):
+                        subj_node = GraphNode(id=subject, type=NodeType.OBJECT, label=subject)
+                        self.property_graph.add_node(subj_node)
+                        # Trace entity addition
+                        ctx.tracer.log_entity_added(subject, {
+                            'source': 'OpenIE',
+                            'type': 'OBJECT',
+                            'label': subject,
+                            'relation_role': 'subject',
+                            'relation': relation
+                        })
+                    if not self.property_graph.has_node(obj):
+                        obj_node = GraphNode(id=obj, type=NodeType.OBJECT, label=obj)
+                        self.property_graph.add_node(obj_node)
+                        # Trace entity addition
+                        ctx.tracer.log_entity_added(obj, {
+                            'source': 'OpenIE',
+                            'type': 'OBJECT',
+                            'label': obj,
+                            'relation_role': 'object',
+                            'relation': relation
+                        })
+
+                    # Add edge
+                    edge = GraphEdge(
+                        source=subject,
+                        target=obj,
+                        type=EdgeType.RELATED_TO,
+                        label=relation,
+                        metadata={'source': 'openie'}
+                    )
+                    self.property_graph.add_edge(edge)
+
+            # Source 2: Stanza - Add NER entities as nodes + dependency relations as edges
+            if 'stanza' in nlp_results and 'entities' in nlp_results['stanza']:
+                sources_used.append('Stanza')
+                for entity in nlp_results['stanza']['entities']:
+                    entity_text = entity.get('text', entity) if isinstance(entity, dict) else entity
+                    entity_type = entity.get('type', 'OBJECT') if isinstance(entity, dict) else 'OBJECT'
+
+                    if not self.property_graph.has_node(entity_text):
+                        # Map entity type to NodeType
+                        node_type = NodeType.OBJECT  # Default
+                        if 'QUANTITY' in entity_type.upper():
+                            node_type = NodeType.QUANTITY
+                        elif 'FORCE' in entity_type.upper():
+                            node_type = NodeType.FORCE
+
+                        node = GraphNode(
+                            id=entity_text,
+                            type=node_type,
+                            label=entity_text,
+                            properties={'ner_type': entity_type},
+                            metadata={'source': 'stanza'}
+                        )
+                        self.property_graph.add_node(node)
+
+                # ADDED: Add Stanza dependency relations as edges
+                if 'dependencies' in nlp_results['stanza']:
+                    for dep in nlp_results['stanza']['dependencies']:
+                        if isinstance(dep, dict):
+                            head = dep.get('head')
+                            dependent = dep.get('dependent')
+                            relation = dep.get('relation', 'depends_on')
+
+                            if head and dependent:
+                                # Ensure nodes exist (create if needed)
+                                if not self.property_graph.has_node(head):
+                                    self.property_graph.add_node(GraphNode(
+                                        id=head, type=NodeType.OBJECT, label=head,
+                                        metadata={'source': 'stanza_dep'}
+                                    ))
+                                if not self.property_graph.has_node(dependent):
+                                    self.property_graph.add_node(GraphNode(
+                                        id=dependent, type=NodeType.OBJECT, label=dependent,
+                                        metadata={'source': 'stanza_dep'}
+                                    ))
+
+                                # Add edge
+                                edge = GraphEdge(
+                                    source=dependent,
+                                    target=head,
+                                    type=EdgeType.RELATED_TO,
+                                    label=relation,
+                                    metadata={'source': 'stanza_dep', 'relation_type': 'dependency'}
+                                )
+                                self.property_graph.add_edge(edge)
+
+            # Source 3: ChemDataExtractor - Add chemical entities
+            if 'chemdataextractor' in nlp_results:
+                sources_used.append('ChemDataExtractor')
+                if 'formulas' in nlp_results['chemdataextractor']:
+                    for formula in nlp_results['chemdataextractor']['formulas']:
+                        formula_text = formula if isinstance(formula, str) else str(formula)
+                        if not self.property_graph.has_node(formula_text):
+                            node = GraphNode(
+                                id=formula_text,
+                                type=NodeType.OBJECT,
+                                label=formula_text,
+                                properties={'type': 'chemical'},
+                                metadata={'source': 'chemdataextractor'}
+                            )
+                            self.property_graph.add_node(node)
 
+            # Source 4: MathBERT - Add mathematical entities
+            if 'mathbert' in nlp_results:
+                sources_used.append('MathBERT')
+                if 'variables' in nlp_results['mathbert']:
+                    for variable in nlp_results['mathbert']['variables']:
+                        if not self.property_graph.has_node(variable):
                             node = GraphNode(
-                                id=entity_text,
-                                type=node_type,
-                                label=entity_text,
-                                properties={'ner_type': entity_type},
-                                metadata={'source': 'stanza'}
+                                id=variable,
+                                type=NodeType.PARAMETER,
+                                label=variable,
+                                properties={'type': 'variable'},
+                                metadata={'source': 'mathbert'}
                             )
                             self.property_graph.add_node(node)
 
-                    # ADDED: Add Stanza dependency relations as edges
-                    if 'dependencies' in nlp_results['stanza']:
-                        for dep in nlp_results['stanza']['dependencies']:
-                            if isinstance(dep, dict):
-                                head = dep.get('head')
-                                dependent = dep.get('dependent')
-                                relation = dep.get('relation', 'depends_on')
-
-                                if head and dependent:
-                                    # Ensure nodes exist (create if needed)
-                                    if not self.property_graph.has_node(head):
-                                        self.property_graph.add_node(GraphNode(
-                                            id=head, type=NodeType.OBJECT, label=head,
-                                            metadata={'source': 'stanza_dep'}
-                                        ))
-                                    if not self.property_graph.has_node(dependent):
-                                        self.property_graph.add_node(GraphNode(
-                                            id=dependent, type=NodeType.OBJECT, label=dependent,
-                                            metadata={'source': 'stanza_dep'}
-                                        ))
-
-                                    # Add edge
-                                    edge = GraphEdge(
-                                        source=dependent,
-                                        target=head,
-                                        type=EdgeType.RELATED_TO,
-                                        label=relation,
-                                        metadata={'source': 'stanza_dep', 'relation_type': 'dependency'}
-                                    )
-                                    self.property_graph.add_edge(edge)
-
-                # Source 3: ChemDataExtractor - Add chemical entities
-                if 'chemdataextractor' in nlp_results:
-                    sources_used.append('ChemDataExtractor')
-                    if 'formulas' in nlp_results['chemdataextractor']:
-                        for formula in nlp_results['chemdataextractor']['formulas']:
-                            formula_text = formula if isinstance(formula, str) else str(formula)
-                            if not self.property_graph.has_node(formula_text):
-                                node = GraphNode(
-                                    id=formula_text,
-                                    type=NodeType.OBJECT,
-                                    label=formula_text,
-                                    properties={'type': 'chemical'},
-                                    metadata={'source': 'chemdataextractor'}
-                                )
-                                self.property_graph.add_node(node)
-
-                # Source 4: MathBERT - Add mathematical entities
-                if 'mathbert' in nlp_results:
-                    sources_used.append('MathBERT')
-                    if 'variables' in nlp_results['mathbert']:
-                        for variable in nlp_results['mathbert']['variables']:
-                            if not self.property_graph.has_node(variable):
-                                node = GraphNode(
-                                    id=variable,
-                                    type=NodeType.PARAMETER,
-                                    label=variable,
-                                    properties={'type': 'variable'},
-                                    metadata={'source': 'mathbert'}
-                                )
-                                self.property_graph.add_node(node)
-
-                # Source 5: AMR - Add semantic concepts and relations
-                if 'amr' in nlp_results:
-                    sources_used.append('AMR')
-                    if 'concepts' in nlp_results['amr']:
-                        for concept in nlp_results['amr']['concepts']:
-                            if not self.property_graph.has_node(concept):
-                                node = GraphNode(
-                                    id=concept,
-                                    type=NodeType.CONCEPT,
-                                    label=concept,
+            # Source 5: AMR - Add semantic concepts and relations
+            if 'amr' in nlp_results:
+                sources_used.append('AMR')
+                if 'concepts' in nlp_results['amr']:
+                    for concept in nlp_results['amr']['concepts']:
+                        if not self.property_graph.has_node(concept):
+                            node = GraphNode(
+                                id=concept,
+                                type=NodeType.CONCEPT,
+                                label=concept,
+                                metadata={'source': 'amr'}
+                            )
+                            self.property_graph.add_node(node)
+
+                # Add AMR relations as edges
+                if 'relations' in nlp_results['amr']:
+                    for rel in nlp_results['amr']['relations']:
+                        if isinstance(rel, (list, tuple)) and len(rel) >= 3:
+                            subj, relation, obj = rel[0], rel[1], rel[2]
+                            # Ensure nodes exist
+                            if self.property_graph.has_node(subj) and self.property_graph.has_node(obj):
+                                edge = GraphEdge(
+                                    source=subj,
+                                    target=obj,
+                                    type=EdgeType.RELATED_TO,
+                                    label=relation,
                                     metadata={'source': 'amr'}
                                 )
-                                self.property_graph.add_node(node)
+                                self.property_graph.add_edge(edge)
+
+            # Source 6: SciBERT - Add scientific entities if available
+            if 'scibert' in nlp_results and 'entities' in nlp_results['scibert']:
+                sources_used.append('SciBERT')
+                for entity in nlp_results['scibert']['entities']:
+                    entity_text = entity.get('text', entity) if isinstance(entity, dict) else entity
+                    if not self.property_graph.has_node(entity_text):
+                        node = GraphNode(
+                            id=entity_text,
+                            type=NodeType.OBJECT,
+                            label=entity_text,
+                            properties={'scientific': True},
+                            metadata={'source': 'scibert'}
+                        )
+                        self.property_graph.add_node(node)
 
-                    # Add AMR relations as edges
-                    if 'relations' in nlp_results['amr']:
-                        for rel in nlp_results['amr']['relations']:
-                            if isinstance(rel, (list, tuple)) and len(rel) >= 3:
-                                subj, relation, obj = rel[0], rel[1], rel[2]
-                                # Ensure nodes exist
-                                if self.property_graph.has_node(subj) and self.property_graph.has_node(obj):
-                                    edge = GraphEdge(
-                                        source=subj,
-                                        target=obj,
-                                        type=EdgeType.RELATED_TO,
-                                        label=relation,
-                                        metadata={'source': 'amr'}
-                                    )
-                                    self.property_graph.add_edge(edge)
-
-                # Source 6: SciBERT - Add scientific entities if available
-                if 'scibert' in nlp_results and 'entities' in nlp_results['scibert']:
-                    sources_used.append('SciBERT')
-                    for entity in nlp_results['scibert']['entities']:
+            # Source 7: DyGIE++ - Add entities and relations if available
+            if 'dygie' in nlp_results:
+                sources_used.append('DyGIE++')
+                if 'entities' in nlp_results['dygie']:
+                    for entity in nlp_results['dygie']['entities']:
                         entity_text = entity.get('text', entity) if isinstance(entity, dict) else entity
+                        entity_type = entity.get('type', 'OBJECT') if isinstance(entity, dict) else 'OBJECT'
+
                         if not self.property_graph.has_node(entity_text):
                             node = GraphNode(
                                 id=entity_text,
                                 type=NodeType.OBJECT,
                                 label=entity_text,
-                                properties={'scientific': True},
-                                metadata={'source': 'scibert'}
+                                properties={'entity_type': entity_type},
+                                metadata={'source': 'dygie'}
                             )
                             self.property_graph.add_node(node)
 
-                # Source 7: DyGIE++ - Add entities and relations if available
-                if 'dygie' in nlp_results:
-                    sources_used.append('DyGIE++')
-                    if 'entities' in nlp_results['dygie']:
-                        for entity in nlp_results['dygie']['entities']:
-                            entity_text = entity.get('text', entity) if isinstance(entity, dict) else entity
-                            entity_type = entity.get('type', 'OBJECT') if isinstance(entity, dict) else 'OBJECT'
-
-                            if not self.property_graph.has_node(entity_text):
-                                node = GraphNode(
-                                    id=entity_text,
-                                    type=NodeType.OBJECT,
-                                    label=entity_text,
-                                    properties={'entity_type': entity_type},
-                                    metadata={'source': 'dygie'}
-                                )
-                                self.property_graph.add_node(node)
-
-                    # ADDED: Add DyGIE++ relations as edges
-                    if 'relations' in nlp_results['dygie']:
-                        for rel in nlp_results['dygie']['relations']:
-                            if isinstance(rel, dict):
-                                subj = rel.get('subject') or rel.get('head')
-                                obj = rel.get('object') or rel.get('tail')
-                                rel_type = rel.get('type', 'related_to')
-
-                                if subj and obj:
-                                    # Ensure nodes exist
-                                    if not self.property_graph.has_node(subj):
-                                        self.property_graph.add_node(GraphNode(
-                                            id=subj, type=NodeType.OBJECT, label=subj,
-                                            metadata={'source': 'dygie_rel'}
-                                        ))
-                                    if not self.property_graph.has_node(obj):
-                                        self.property_graph.add_node(GraphNode(
-                                            id=obj, type=NodeType.OBJECT, label=obj,
-                                            metadata={'source': 'dygie_rel'}
-                                        ))
-
-                                    # Map relation type to EdgeType
-                                    edge_type = EdgeType.RELATED_TO
-                                    if 'part' in rel_type.lower():
-                                        edge_type = EdgeType.PART_OF
-                                    elif 'cause' in rel_type.lower():
-                                        edge_type = EdgeType.CAUSES
-                                    elif 'contain' in rel_type.lower():
-                                        edge_type = EdgeType.CONTAINS
-
-                                    # Add edge
-                                    edge = GraphEdge(
-                                        source=subj,
-                                        target=obj,
-                                        type=edge_type,
-                                        label=rel_type,
-                                        metadata={'source': 'dygie', 'relation_type': 'scientific'}
-                                    )
-                                    self.property_graph.add_edge(edge)
-
-                # Get graph statistics
-                all_nodes = self.property_graph.get_all_nodes()
-                all_edges = self.property_graph.get_edges()
-                connected_components = self.property_graph.get_connected_components()
-
-                # Count node types
-                node_type_counts = {}
-                for node in all_nodes:
-                    node_type = node.type.value if hasattr(node.type, 'value') else str(node.type)
-                    node_type_counts[node_type] = node_type_counts.get(node_type, 0) + 1
-
-                # Count edge types
-                edge_type_counts = {}
-                for edge in all_edges:
-                    edge_type = edge.type.value if hasattr(edge.type, 'value') else str(edge.type)
-                    edge_type_counts[edge_type] = edge_type_counts.get(edge_type, 0) + 1
-
-                print(f"  ✅ Built multi-source knowledge graph:", flush=True)
-                print(f"     • Sources: {', '.join(sources_used) if sources_used else 'none'}", flush=True)
-                print(f"     • Nodes: {len(all_nodes)} ({', '.join(f'{k}:{v}' for k, v in node_type_counts.items())})", flush=True)
-                print(f"     • Edges: {len(all_edges)} ({', '.join(f'{k}:{v}' for k, v in edge_type_counts.items())})", flush=True)
-                print(f"     • Connected components: {len(connected_components)}", flush=True)
-
-                ontology_enrichment_summary = self._enrich_property_graph_with_ontologies(self.property_graph)
-                gap_summary = self._run_property_graph_gap_queries(self.property_graph)
-
-                if gap_summary.get('missing_units', {}).get('count'):
-                    print(f"     • ⚠ Quantities missing unit: {gap_summary['missing_units']['count']}", flush=True)
-                if gap_summary.get('dielectric_missing_kappa', {}).get('count'):
-                    print(f"     • ⚠ Dielectrics missing κ: {gap_summary['dielectric_missing_kappa']['count']}", flush=True)
-
-                # ✅ FIX 3: Rich output (full graph structure, not just counts)
-                graph_output = {
-                    'request_id': request_id,
-                    'summary': {
-                        'node_count': len(all_nodes),
-                        'edge_count': len(all_edges),
-                        'connected_components': len(connected_components),
-                        'sources_used': sources_used
-                    },
-                    'node_types': node_type_counts,
-                    'edge_types': edge_type_counts,
-                    'nodes': [node.to_dict() for node in all_nodes[:10]],  # First 10 nodes
-                    'edges': [edge.to_dict() for edge in all_edges[:10]],  # First 10 edges
-                }
-                if ontology_enrichment_summary:
-                    graph_output['ontology_tags'] = ontology_enrichment_summary
-                if gap_summary:
-                    graph_output['gap_analysis'] = gap_summary
-
-                persistence_details = self._persist_property_graph(self.property_graph, request_id=request_id)
-                graph_output.update(persistence_details)
-
-                disk_info = persistence_details.get('disk_persistence')
-                if disk_info and disk_info.get('status') == 'success':
-                    print(f"  💾 Graph snapshot: {disk_info['path']}", flush=True)
-                elif disk_info and disk_info.get('status') == 'error':
-                    print(f"  ⚠️  Disk persistence failed: {disk_info.get('error')}", flush=True)
-
-                graphdb_info = persistence_details.get('graphdb_persistence')
-                if graphdb_info:
-                    status = graphdb_info.get('status')
-                    if status == 'success':
-                        print(f"  🗄  Graph DB sync: {graphdb_info.get('backend')} ({graphdb_info.get('nodes_synced')} nodes)", flush=True)
-                    else:
-                        print(f"  ⚠️  Graph DB sync skipped: {graphdb_info.get('reason', 'unknown reason')}", flush=True)
-
-                print("└───────────────────────────────────────────────────────────────┘\n")
-
-                # Complete tracer for Property Graph phase
-                tracer.log_output(graph_output, "property_graph")
-                tracer.track_entity_flow("Property Graph Construction", [
-                    {'id': node[0], 'label': node[1].get('label', ''), 'type': node[1].get('type', '')}
-                    for node in all_nodes
-                ])
-                tracer.log_transformation("Property Graph Construction", {
-                    'sources_used': sources_used,
-                    'total_nodes': len(all_nodes),
-                    'total_edges': len(all_edges),
-                    'node_types': list(graph_output.get('node_types', {}).keys()),
-                    'edge_types': list(graph_output.get('edge_types', {}).keys())
-                })
-                tracer.complete_component()
-
-                if self.logger:
-                    self.logger.log_phase_output(graph_output, f"Built graph with {len(all_nodes)} nodes from {len(sources_used)} sources")
-                    self.logger.end_phase("success")
-                if self.progress:
-                    self.progress.end_phase(True)
-                trace['stages'].append({
-                    'name': 'Property Graph Construction',
-                    'duration': time.time() - stage_start_time,
-                    'output': graph_output
-                })
-                current_property_graph = self.property_graph
-
-            # Phase 0.6: DeepSeek Enrichment (Roadmap API Call #1)
-            enrichment_result = None
-            if self.deepseek_client and self.config.enable_deepseek_enrichment and self.property_graph:
-                stage_start_time = time.time()
-                if self.logger:
-                    self.logger.start_phase("DeepSeek Enrichment", 1, "Validate and enrich entities with LLM")
-                if self.progress:
-                    self.progress.start_phase("DeepSeek Enrichment", 1)
-                print("┌─ PHASE 0.6: DEEPSEEK ENRICHMENT (Roadmap Call #1) ────────────┐")
+                # ADDED: Add DyGIE++ relations as edges
+                if 'relations' in nlp_results['dygie']:
+                    for rel in nlp_results['dygie']['relations']:
+                        if isinstance(rel, dict):
+                            subj = rel.get('subject') or rel.get('head')
+                            obj = rel.get('object') or rel.get('tail')
+                            rel_type = rel.get('type', 'related_to')
 
-                try:
-                    # Get all nodes from property graph
-                    all_nodes = list(self.property_graph.get_all_nodes())
-
-                    # Call DeepSeek for enrichment
-                    enrichment_result = self.deepseek_client.enrich_entities(
-                        entities=all_nodes,
-                        context=problem_text,
-                        domain=None  # Will be determined in Phase 1
-                    )
+                            if subj and obj:
+                                # Ensure nodes exist
+                                if not self.property_graph.has_node(subj):
+                                    self.property_graph.add_node(GraphNode(
+                                        id=subj, type=NodeType.OBJECT, label=subj,
+                                        metadata={'source': 'dygie_rel'}
+                                    ))
+                                if not self.property_graph.has_node(obj):
+                                    self.property_graph.add_node(GraphNode(
+                                        id=obj, type=NodeType.OBJECT, label=obj,
+                                        metadata={'source': 'dygie_rel'}
+                                    ))
+
+                                # Map relation type to EdgeType
+                                edge_type = EdgeType.RELATED_TO
+                                if 'part' in rel_type.lower():
+                                    edge_type = EdgeType.PART_OF
+                                elif 'cause' in rel_type.lower():
+                                    edge_type = EdgeType.CAUSES
+                                elif 'contain' in rel_type.lower():
+                                    edge_type = EdgeType.CONTAINS
+
+                                # Add edge
+                                edge = GraphEdge(
+                                    source=subj,
+                                    target=obj,
+                                    type=edge_type,
+                                    label=rel_type,
+                                    metadata={'source': 'dygie', 'relation_type': 'scientific'}
+                                )
+                                self.property_graph.add_edge(edge)
+
+            # Get graph statistics
+            all_nodes = self.property_graph.get_all_nodes()
+            all_edges = self.property_graph.get_edges()
+            connected_components = self.property_graph.get_connected_components()
+
+            # Count node types
+            node_type_counts = {}
+            for node in all_nodes:
+                node_type = node.type.value if hasattr(node.type, 'value') else str(node.type)
+                node_type_counts[node_type] = node_type_counts.get(node_type, 0) + 1
+
+            # Count edge types
+            edge_type_counts = {}
+            for edge in all_edges:
+                edge_type = edge.type.value if hasattr(edge.type, 'value') else str(edge.type)
+                edge_type_counts[edge_type] = edge_type_counts.get(edge_type, 0) + 1
+
+            print(f"  ✅ Built multi-source knowledge graph:", flush=True)
+            print(f"     • Sources: {', '.join(sources_used) if sources_used else 'none'}", flush=True)
+            print(f"     • Nodes: {len(all_nodes)} ({', '.join(f'{k}:{v}' for k, v in node_type_counts.items())})", flush=True)
+            print(f"     • Edges: {len(all_edges)} ({', '.join(f'{k}:{v}' for k, v in edge_type_counts.items())})", flush=True)
+            print(f"     • Connected components: {len(connected_components)}", flush=True)
+
+            ontology_enrichment_summary = self._enrich_property_graph_with_ontologies(self.property_graph)
+            gap_summary = self._run_property_graph_gap_queries(self.property_graph)
+
+            if gap_summary.get('missing_units', {}).get('count'):
+                print(f"     • ⚠ Quantities missing unit: {gap_summary['missing_units']['count']}", flush=True)
+            if gap_summary.get('dielectric_missing_kappa', {}).get('count'):
+                print(f"     • ⚠ Dielectrics missing κ: {gap_summary['dielectric_missing_kappa']['count']}", flush=True)
+
+            # ✅ FIX 3: Rich output (full graph structure, not just counts)
+            graph_output = {
+                'request_id': ctx.request_id,
+                'summary': {
+                    'node_count': len(all_nodes),
+                    'edge_count': len(all_edges),
+                    'connected_components': len(connected_components),
+                    'sources_used': sources_used
+                },
+                'node_types': node_type_counts,
+                'edge_types': edge_type_counts,
+                'nodes': [node.to_dict() for node in all_nodes[:10]],  # First 10 nodes
+                'edges': [edge.to_dict() for edge in all_edges[:10]],  # First 10 edges
+            }
+            if ontology_enrichment_summary:
+                graph_output['ontology_tags'] = ontology_enrichment_summary
+            if gap_summary:
+                graph_output['gap_analysis'] = gap_summary
 
-                    if 'error' not in enrichment_result:
-                        print(f"  ✅ DeepSeek enriched {len(enrichment_result.get('validated_entities', []))} entities", flush=True)
-                        if enrichment_result.get('missing_entities'):
-                            print(f"  ℹ️  Identified {len(enrichment_result['missing_entities'])} missing entities", flush=True)
-                        if enrichment_result.get('corrections'):
-                            print(f"  ✏️  Made {len(enrichment_result['corrections'])} corrections", flush=True)
-                        if enrichment_result.get('warnings'):
-                            print(f"  ⚠️  {len(enrichment_result['warnings'])} warnings", flush=True)
-
-                        # Report cost
-                        cost = enrichment_result.get('cost_usd', 0)
-                        print(f"  💰 API cost: ${cost:.4f}", flush=True)
-                    else:
-                        print(f"  ⚠️  Enrichment failed: {enrichment_result['error']}", flush=True)
+            print("└───────────────────────────────────────────────────────────────┘\n")
 
-                except Exception as e:
-                    print(f"  ⚠️  DeepSeek enrichment error: {type(e).__name__}: {str(e)[:100]}", flush=True)
-                    enrichment_result = {'error': str(e)}
+            # Complete tracer for Property Graph phase
+            ctx.tracer.log_output(graph_output, "property_graph")
+            ctx.tracer.track_entity_flow("Property Graph Construction", [
+                {'id': node[0], 'label': node[1].get('label', ''), 'type': node[1].get('type', '')}
+                for node in all_nodes
+            ])
+            ctx.tracer.log_transformation("Property Graph Construction", {
+                'sources_used': sources_used,
+                'total_nodes': len(all_nodes),
+                'total_edges': len(all_edges),
+                'node_types': list(graph_output.get('node_types', {}).keys()),
+                'edge_types': list(graph_output.get('edge_types', {}).keys())
+            })
+            ctx.tracer.complete_component()
 
-                print("└───────────────────────────────────────────────────────────────┘\n")
+            if self.logger:
+                self.logger.log_phase_output(graph_output, f"Built graph with {len(all_nodes)} nodes from {len(sources_used)} sources")
+                self.logger.end_phase("success")
+            if self.progress:
+                self.progress.end_phase(True)
+            ctx.trace['stages'].append({
+                'name': 'Property Graph Construction',
+                'duration': time.time() - stage_start_time,
+                'output': graph_output
+            })
+            current_property_graph = self.property_graph
 
-                if self.logger:
-                    self.logger.log_phase_output(enrichment_result, "DeepSeek entity enrichment")
-                    self.logger.end_phase("success" if 'error' not in enrichment_result else "warning")
-                if self.progress:
-                    self.progress.end_phase(True)
-                trace['stages'].append({
-                    'name': 'DeepSeek Enrichment',
-                    'duration': time.time() - stage_start_time,
-                    'output': {
-                        'validated_entities': len(enrichment_result.get('validated_entities', [])) if enrichment_result else 0,
-                        'missing_entities': len(enrichment_result.get('missing_entities', [])) if enrichment_result else 0,
-                        'corrections': len(enrichment_result.get('corrections', [])) if enrichment_result else 0,
-                        'cost_usd': enrichment_result.get('cost_usd', 0) if enrichment_result else 0
-                    }
-                })
+        return {'property_graph': current_property_graph}
 
-            # Phase 1: Diagram Planning (NEW: Property Graph-Driven Architecture)
+    def _stage_deepseek_enrichment(self, ctx: 'GenerationContext', problem_text: str, property_graph: Optional[Any]) -> Dict[str, Any]:
+        """Phase 0.6: DeepSeek entity enrichment (Roadmap API Call #1)"""
+        enrichment_result = None
+        if self.deepseek_client and self.config.enable_deepseek_enrichment and property_graph:
             stage_start_time = time.time()
             if self.logger:
-                self.logger.start_phase("Diagram Planning (Property Graph-Driven)", 2, "Create diagram plan from property graph")
-                self.logger.log_phase_input(problem_text, "Original request + Property graph")
+                self.logger.start_phase("DeepSeek Enrichment", 1, "Validate and enrich entities with LLM")
             if self.progress:
-                self.progress.start_phase("Diagram Planning", 2)
-
-            print("┌─ PHASE 1: DIAGRAM PLANNING (Property Graph-Driven) ───────────┐")
+                self.progress.start_phase("DeepSeek Enrichment", 1)
+            print("┌─ PHASE 0.6: DEEPSEEK ENRICHMENT (Roadmap Call #1) ────────────┐")
 
-            # NEW ARCHITECTURE: Plan from property graph WITHOUT LLM extraction
-            diagram_plan = None
-            specs = None
-            domain = None
-
-            if self.diagram_planner and self.property_graph:
-                # Try to infer domain from property graph
-                domain_hint = self._infer_domain_from_graph(self.property_graph)
-
-                # Use NEW property graph-driven planner
-                diagram_plan = self.diagram_planner.plan_from_property_graph(
-                    property_graph=self.property_graph,
-                    problem_text=problem_text,
-                    domain=domain_hint
-                )
-
-                complexity_score = diagram_plan.complexity_score
-
-                print(f"  ✅ Property Graph-Driven Planning Complete:", flush=True)
-                print(f"     • Entities: {len(diagram_plan.extracted_entities)}", flush=True)
-                print(f"     • Relations: {len(diagram_plan.extracted_relations)}", flush=True)
-                print(f"     • Constraints: {len(diagram_plan.global_constraints)}", flush=True)
-                print(f"     • Complexity: {complexity_score:.2f}", flush=True)
-                print(f"     • Strategy: {diagram_plan.strategy.value}", flush=True)
-                print(f"     • Solver: {diagram_plan.layout_hints.get('solver', 'heuristic')}", flush=True)
-                print(f"     • Z3 Used: {diagram_plan.layout_hints.get('z3_used', False)}", flush=True)
-
-                # Convert DiagramPlan to CanonicalProblemSpec (for backward compatibility)
-                specs = self._diagram_plan_to_canonical_spec(diagram_plan)
-                domain = specs.domain if specs.domain else PhysicsDomain.MECHANICS
-                resolved_domain = domain.value if domain else domain_hint
-                domain_module_outputs = self._build_domain_modules(
-                    resolved_domain,
-                    diagram_plan,
-                    specs,
-                    current_property_graph
+            try:
+                # Get all nodes from property graph
+                all_nodes = list(property_graph.get_all_nodes())
+
+                # Call DeepSeek for enrichment
+                enrichment_result = self.deepseek_client.enrich_entities(
+                    entities=all_nodes,
+                    context=problem_text,
+                    domain=None  # Will be determined in Phase 1
                 )
-                if domain_module_outputs:
-                    specs.diagram_plan_metadata.setdefault('domain_modules', domain_module_outputs)
 
-            else:
-                # FALLBACK: Use old LLM extraction if property graph unavailable
-                print("  ⚠️  Property graph unavailable, falling back to LLM extraction")
-                specs = self.ai_analyzer.analyze(problem_text)
-                domain = specs.domain
-
-                # Assess complexity from specs
-                if self.diagram_planner:
-                    complexity_score = self.diagram_planner.assess_complexity(specs)
+                if 'error' not in enrichment_result:
+                    print(f"  ✅ DeepSeek enriched {len(enrichment_result.get('validated_entities', []))} entities", flush=True)
+                    if enrichment_result.get('missing_entities'):
+                        print(f"  ℹ️  Identified {len(enrichment_result['missing_entities'])} missing entities", flush=True)
+                    if enrichment_result.get('corrections'):
+                        print(f"  ✏️  Made {len(enrichment_result['corrections'])} corrections", flush=True)
+                    if enrichment_result.get('warnings'):
+                        print(f"  ⚠️  {len(enrichment_result['warnings'])} warnings", flush=True)
+
+                    # Report cost
+                    cost = enrichment_result.get('cost_usd', 0)
+                    print(f"  💰 API cost: ${cost:.4f}", flush=True)
                 else:
-                    complexity_score = 0.5  # Default medium complexity
+                    print(f"  ⚠️  Enrichment failed: {enrichment_result['error']}", flush=True)
 
-                print(f"  Domain: {domain.value}", flush=True)
-                print(f"  Objects: {len(specs.objects)}", flush=True)
-                print(f"  Constraints: {len(specs.constraints)}", flush=True)
+            except Exception as e:
+                print(f"  ⚠️  DeepSeek enrichment error: {type(e).__name__}: {str(e)[:100]}", flush=True)
+                enrichment_result = {'error': str(e)}
 
             print("└───────────────────────────────────────────────────────────────┘\n")
 
-            phase1_output = {
-                'planning_mode': 'property_graph_driven' if diagram_plan else 'llm_extraction',
-                'domain': domain.value if hasattr(domain, 'value') else str(domain),
-                'entity_count': len(diagram_plan.extracted_entities) if diagram_plan else len(specs.objects),
-                'relation_count': len(diagram_plan.extracted_relations) if diagram_plan else 0,
-                'constraint_count': len(diagram_plan.global_constraints) if diagram_plan else len(specs.constraints),
-                'complexity_score': complexity_score,
-                'z3_used': diagram_plan.layout_hints.get('z3_used', False) if diagram_plan else False,
-                'sympy_used': diagram_plan.layout_hints.get('sympy_used', False) if diagram_plan else False
-            }
             if self.logger:
-                self.logger.log_phase_output(phase1_output, f"Planning mode: {phase1_output['planning_mode']}")
-                self.logger.end_phase("success")
+                self.logger.log_phase_output(enrichment_result, "DeepSeek entity enrichment")
+                self.logger.end_phase("success" if 'error' not in enrichment_result else "warning")
             if self.progress:
                 self.progress.end_phase(True)
-            trace['stages'].append({
-                'name': 'Diagram Planning',
+            ctx.trace['stages'].append({
+                'name': 'DeepSeek Enrichment',
                 'duration': time.time() - stage_start_time,
-                'output': phase1_output
+                'output': {
+                    'validated_entities': len(enrichment_result.get('validated_entities', [])) if enrichment_result else 0,
+                    'missing_entities': len(enrichment_result.get('missing_entities', [])) if enrichment_result else 0,
+                    'corrections': len(enrichment_result.get('corrections', [])) if enrichment_result else 0,
+                    'cost_usd': enrichment_result.get('cost_usd', 0) if enrichment_result else 0
+                }
             })
 
-            # Phase 2: Scene Synthesis (Enhanced with Strategic Planning)
-            stage_start_time = time.time()
-            if self.logger:
-                self.logger.start_phase("Scene Synthesis + Strategic Planning", 3, "Build scene graph and select strategy")
-                self.logger.log_phase_input(specs, f"Problem specs with {len(specs.objects)} objects")
-            if self.progress:
-                self.progress.start_phase("Scene Synthesis", 3)
-            print("┌─ PHASE 2: SCENE SYNTHESIS + STRATEGIC PLANNING ───────────────┐")
-
-            # NEW: Strategic Planning
-            if self.diagram_planner and complexity_score is not None:
-                strategy = self.diagram_planner.select_strategy(specs, complexity_score)
-                selected_strategy = strategy.value
-                print(f"  Selected Strategy: {selected_strategy}", flush=True)
-
-            # NEW: LLM-based Planning (if enabled)
-            llm_plan_result = None
-            if self.llm_planner:
-                try:
-                    print("  LLM Planning: Generating diagram plan...", flush=True)
-                    llm_plan = self.llm_planner.generate_plan(
-                        description=problem_text,
-                        domain=domain.value if domain else (diagram_plan.metadata.get('domain_hint') if diagram_plan else 'general'),
-                        use_local=True,
-                        deepseek_client=self.deepseek_client,
-                        verify_with_deepseek=getattr(self.config, 'enable_deepseek_audit', False)
-                    )
-                    llm_plan_result = llm_plan.to_dict()
-                    llm_plan_result['verifier'] = 'deepseek' if self.deepseek_client else ('api' if self.llm_planner.api_client else 'none')
-                    print(f"  LLM Plan: {len(llm_plan.entities)} entities, {len(llm_plan.relationships)} relationships", flush=True)
-                except Exception as e:
-                    print(f"  LLM Planning failed: {e}", flush=True)
-                    llm_plan_result = {'error': str(e)}
-
-            # NEW: Query primitive library for relevant components
-            retrieved_primitives = []
-            if self.primitive_library and diagram_plan:
-                print("  🔍 Primitive Library: Searching for reusable components...", flush=True)
-
-                # Search based on extracted entities
-                for entity in diagram_plan.extracted_entities[:10]:  # Top 10 entities
-                    entity_label = entity.label if hasattr(entity, 'label') else str(entity)
-                    entity_type = entity.type if hasattr(entity, 'type') else 'object'
-
-                    # Semantic search query
-                    query_text = f"{domain_hint if domain_hint else 'physics'} {entity_label} {entity_type}"
-                    results = self.primitive_library.query(
-                        text=query_text,
-                        top_k=2,
-                        category=None,  # Could map domain_hint to PrimitiveCategory if needed
-                        min_score=0.0
-                    )
+        return {'enrichment_result': enrichment_result}
+
+    def _stage_planning(self, ctx: 'GenerationContext', problem_text: str, property_graph: Optional[Any]) -> Dict[str, Any]:
+        """Phase 1: Property-graph-driven diagram planning (LLM extraction fallback)"""
+        complexity_score = None
+        domain_hint = None
+        domain_module_outputs: List[Dict[str, Any]] = []
+        stage_start_time = time.time()
+        if self.logger:
+            self.logger.start_phase("Diagram Planning (Property Graph-Driven)", 2, "Create diagram plan from property graph")
+            self.logger.log_phase_input(problem_text, "Original request + Property graph")
+        if self.progress:
+            self.progress.start_phase("Diagram Planning", 2)
 
-                    if results:
-                        retrieved_primitives.extend(results[:1])  # Take top result
+        print("┌─ PHASE 1: DIAGRAM PLANNING (Property Graph-Driven) ───────────┐")
 
-                if retrieved_primitives:
-                    print(f"  ✅ Found {len(retrieved_primitives)} reusable primitive(s)", flush=True)
-                else:
-                    print(f"  ℹ️  No matching primitives found (will use procedural generation)", flush=True)
+        # NEW ARCHITECTURE: Plan from property graph WITHOUT LLM extraction
+        diagram_plan = None
+        specs = None
+        domain = None
+
+        if self.diagram_planner and property_graph:
+            # Try to infer domain from property graph
+            domain_hint = self._infer_domain_from_graph(property_graph)
+
+            # Use NEW property graph-driven planner
+            diagram_plan = self.diagram_planner.plan_from_property_graph(
+                property_graph=property_graph,
+                problem_text=problem_text,
+                domain=domain_hint
+            )
 
-            # Pass NLP context, property graph, strategy, and primitives to scene builder
-            scene = self.scene_builder.build(
+            complexity_score = diagram_plan.complexity_score
+
+            print(f"  ✅ Property Graph-Driven Planning Complete:", flush=True)
+            print(f"     • Entities: {len(diagram_plan.extracted_entities)}", flush=True)
+            print(f"     • Relations: {len(diagram_plan.extracted_relations)}", flush=True)
+            print(f"     • Constraints: {len(diagram_plan.global_constraints)}", flush=True)
+            print(f"     • Complexity: {complexity_score:.2f}", flush=True)
+            print(f"     • Strategy: {diagram_plan.strategy.value}", flush=True)
+            print(f"     • Solver: {diagram_plan.layout_hints.get('solver', 'heuristic')}", flush=True)
+            print(f"     • Z3 Used: {diagram_plan.layout_hints.get('z3_used', False)}", flush=True)
+
+            # Convert DiagramPlan to CanonicalProblemSpec (for backward compatibility)
+            specs = self._diagram_plan_to_canonical_spec(diagram_plan)
+            domain = specs.domain if specs.domain else PhysicsDomain.MECHANICS
+            resolved_domain = domain.value if domain else domain_hint
+            domain_module_outputs = self._build_domain_modules(
+                resolved_domain,
+                diagram_plan,
                 specs,
-                nlp_context={
-                    'entities': nlp_results.get('stanza', {}).get('entities', []) if nlp_results else [],
-                    'triples': nlp_results.get('openie', {}).get('triples', []) if nlp_results else [],
-                    'embeddings': nlp_results.get('scibert', {}).get('embeddings', []) if nlp_results else [],
-                    'primitives': retrieved_primitives  # ADDED: Pass retrieved primitives
-                } if nlp_results else {'primitives': retrieved_primitives},
-                property_graph=current_property_graph if current_property_graph else None,
-                strategy=selected_strategy if self.diagram_planner else "DIRECT",
-                diagram_plan=diagram_plan if diagram_plan else getattr(specs, 'diagram_plan', None)
+                property_graph
             )
             if domain_module_outputs:
-                scene.metadata.setdefault('domain_modules', domain_module_outputs)
-            print(f"  Scene Objects: {len(scene.objects)}", flush=True)
-            print("└───────────────────────────────────────────────────────────────┘\n")
-            phase2_output = {
-                'object_count': len(scene.objects),
-                'selected_strategy': selected_strategy,
-                'domain_modules': len(domain_module_outputs)
-            }
-            if diagram_plan:
-                phase2_output['diagram_plan'] = {
-                    'entities': len(diagram_plan.extracted_entities),
-                    'relations': len(diagram_plan.extracted_relations),
-                    'constraints': len(diagram_plan.global_constraints),
-                    'solver': diagram_plan.layout_hints.get('solver', 'unknown') if hasattr(diagram_plan, 'layout_hints') else 'unknown'
-                }
-            if self.logger:
-                self.logger.log_phase_output(phase2_output, f"Scene with {len(scene.objects)} objects")
-                self.logger.end_phase("success")
-            if self.progress:
-                self.progress.end_phase(True)
-            trace['stages'].append({
-                'name': 'Scene Synthesis',
-                'duration': time.time() - stage_start_time,
-                'output': phase2_output
-            })
-
-            # Phase 2.5: Structural Plan vs Scene Validation
-            if diagram_plan and self.config.enable_structural_validation:
-                stage_start_time = time.time()
-                if self.logger:
-                    self.logger.start_phase("Structural Consistency", 3, "Compare plan vs scene")
-                    self.logger.log_phase_input({'entities': len(diagram_plan.extracted_entities)}, "Diagram Plan")
-                structural_comparison = compare_plan_scene(diagram_plan, scene)
-                structural_report = structural_comparison.to_dict()
-                missing = len(structural_report['missing_in_scene'])
-                relation_gaps = len(structural_report['relation_gaps'])
-                print("┌─ PHASE 2.5: STRUCTURAL CONSISTENCY ──────────────────────────┐")
-                print(f"  Structural score: {structural_report['score']:.2f}", flush=True)
-                print(f"  Missing in scene: {missing}", flush=True)
-                if missing:
-                    print(f"    IDs: {', '.join(structural_report['missing_in_scene'][:3])}", flush=True)
-                if relation_gaps:
-                    print(f"  Relation gaps: {relation_gaps}", flush=True)
-                print("└───────────────────────────────────────────────────────────────┘\n")
-                if self.logger:
-                    self.logger.log_phase_output(structural_report, "Structural comparison report")
-                    self.logger.end_phase("success")
-                if self.progress:
-                    self.progress.end_phase(True)
-                trace['stages'].append({
-                    'name': 'Structural Consistency',
-                    'duration': time.time() - stage_start_time,
-                    'output': structural_report
-                })
+                specs.diagram_plan_metadata.setdefault('domain_modules', domain_module_outputs)
 
-            # Phase 3: Ontology Validation (NEW)
-            if ONTOLOGY_AVAILABLE and self.config.enable_ontology_validation:
-                stage_start_time = time.time()
-                if self.logger:
-                    self.logger.start_phase("Ontology Validation", 4, "Validate semantic consistency")
-                    self.logger.log_phase_input(specs, f"Specs with {len(specs.objects)} objects")
-                if self.progress:
-                    self.progress.start_phase("Ontology Validation", 4)
-                print("┌─ PHASE 3: ONTOLOGY VALIDATION ────────────────────────────────┐")
-
-                # Map domain to ontology domain
-                ontology_domain_map = {
-                    'physics': Domain.PHYSICS,
-                    'chemistry': Domain.CHEMISTRY,
-                    'biology': Domain.BIOLOGY
-                }
-                ont_domain = ontology_domain_map.get(domain.value.lower(), Domain.PHYSICS)
+        else:
+            # FALLBACK: Use old LLM extraction if property graph unavailable
+            print("  ⚠️  Property graph unavailable, falling back to LLM extraction")
+            specs = self.ai_analyzer.analyze(problem_text)
+            domain = specs.domain
+
+            # Assess complexity from specs
+            if self.diagram_planner:
+                complexity_score = self.diagram_planner.assess_complexity(specs)
+            else:
+                complexity_score = 0.5  # Default medium complexity
+
+            print(f"  Domain: {domain.value}", flush=True)
+            print(f"  Objects: {len(specs.objects)}", flush=True)
+            print(f"  Constraints: {len(specs.constraints)}", flush=True)
+
+        print("└───────────────────────────────────────────────────────────────┘\n")
+
+        phase1_output = {
+            'planning_mode': 'property_graph_driven' if diagram_plan else 'llm_extraction',
+            'domain': domain.value if hasattr(domain, 'value') else str(domain),
+            'entity_count': len(diagram_plan.extracted_entities) if diagram_plan else len(specs.objects),
+            'relation_count': len(diagram_plan.extracted_relations) if diagram_plan else 0,
+            'constraint_count': len(diagram_plan.global_constraints) if diagram_plan else len(specs.constraints),
+            'complexity_score': complexity_score,
+            'z3_used': diagram_plan.layout_hints.get('z3_used', False) if diagram_plan else False,
+            'sympy_used': diagram_plan.layout_hints.get('sympy_used', False) if diagram_plan else False
+        }
+        if self.logger:
+            self.logger.log_phase_output(phase1_output, f"Planning mode: {phase1_output['planning_mode']}")
+            self.logger.end_phase("success")
+        if self.progress:
+            self.progress.end_phase(True)
+        ctx.trace['stages'].append({
+            'name': 'Diagram Planning',
+            'duration': time.time() - stage_start_time,
+            'output': phase1_output
+        })
 
-                try:
-                    ontology_mgr = OntologyManager(domain=ont_domain)
-                    ontology_source = "property_graph" if current_property_graph else "specs"
-                    ontology_input_stats = {}
-
-                    if current_property_graph:
-                        ontology_mgr.from_property_graph(current_property_graph)
-                        ontology_input_stats = {
-                            'nodes': len(current_property_graph.get_all_nodes()),
-                            'edges': len(current_property_graph.get_edges())
-                        }
-                    else:
-                        for obj in specs.objects:
-                            obj_id = obj.get('id') if isinstance(obj, dict) else getattr(obj, 'id', None)
-                            if not obj_id:
-                                continue
-                            class_uri = f"{ont_domain.value.lower()}:Object"
-                            ontology_mgr.add_instance(obj_id, class_uri)
-                        ontology_input_stats = {
-                            'nodes': len(specs.objects),
-                            'edges': 0
-                        }
+        return {
+            'diagram_plan': diagram_plan,
+            'specs': specs,
+            'domain': domain,
+            'domain_hint': domain_hint,
+            'complexity_score': complexity_score,
+            'domain_module_outputs': domain_module_outputs
+        }
 
-                    validation_result = ontology_mgr.validate()
-                    self.ontology_manager = ontology_mgr
-                    ontology_validation = {
-                        'source': ontology_source,
-                        'input_stats': ontology_input_stats,
-                        'consistent': validation_result.is_valid,
-                        'errors': validation_result.errors,
-                        'warnings': validation_result.warnings,
-                        'inferences': len(validation_result.inferences)
-                    }
-                    print(f"  Ontology Source: {ontology_source} ({ontology_input_stats.get('nodes', 0)} nodes)", flush=True)
-                    print(f"  Ontology Consistent: {validation_result.is_valid}", flush=True)
-                    if validation_result.errors:
-                        print(f"  ⚠ Errors: {len(validation_result.errors)}", flush=True)
-                    if validation_result.inferences:
-                        print(f"  ↪ Inferences: {len(validation_result.inferences)}", flush=True)
-
-                except ImportError as e:
-                    print(f"  ⚠️  RDFLib not available - skipping ontology validation", flush=True)
-                    print(f"     Install with: pip install rdflib owlrl", flush=True)
-                    ontology_validation = {
-                        'consistent': None,
-                        'errors': [f'RDFLib not installed: {str(e)}'],
-                        'warnings': ['Ontology validation skipped - RDFLib not available']
-                    }
+    def _stage_scene_synthesis(self, ctx: 'GenerationContext', problem_text: str, nlp_results: Dict[str, Any], property_graph: Optional[Any],
+                               diagram_plan: Optional[Any], specs: CanonicalProblemSpec, domain: Optional[PhysicsDomain],
+                               domain_hint: Optional[str], complexity_score: Optional[float],
+                               domain_module_outputs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Phase 2: Strategy selection, LLM planning, primitive retrieval and scene building"""
+        selected_strategy = None
+        stage_start_time = time.time()
+        if self.logger:
+            self.logger.start_phase("Scene Synthesis + Strategic Planning", 3, "Build scene graph and select strategy")
+            self.logger.log_phase_input(specs, f"Problem specs with {len(specs.objects)} objects")
+        if self.progress:
+            self.progress.start_phase("Scene Synthesis", 3)
+        print("┌─ PHASE 2: SCENE SYNTHESIS + STRATEGIC PLANNING ───────────────┐")
+
+        # NEW: Strategic Planning
+        if self.diagram_planner and complexity_score is not None:
+            strategy = self.diagram_planner.select_strategy(specs, complexity_score)
+            selected_strategy = strategy.value
+            print(f"  Selected Strategy: {selected_strategy}", flush=True)
+
+        # NEW: LLM-based Planning (if enabled)
+        llm_plan_result = None
+        if self.llm_planner:
+            try:
+                print("  LLM Planning: Generating diagram plan...", flush=True)
+                llm_plan = self.llm_planner.generate_plan(
+                    description=problem_text,
+                    domain=domain.value if domain else (diagram_plan.metadata.get('domain_hint') if diagram_plan else 'general'),
+                    use_local=True,
+                    deepseek_client=self.deepseek_client,
+                    verify_with_deepseek=getattr(self.config, 'enable_deepseek_audit', False)
+                )
+                llm_plan_result = llm_plan.to_dict()
+                llm_plan_result['verifier'] = 'deepseek' if self.deepseek_client else ('api' if self.llm_planner.api_client else 'none')
+                print(f"  LLM Plan: {len(llm_plan.entities)} entities, {len(llm_plan.relationships)} relationships", flush=True)
+            except Exception as e:
+                print(f"  LLM Planning failed: {e}", flush=True)
+                llm_plan_result = {'error': str(e)}
+
+        # NEW: Query primitive library for relevant components
+        retrieved_primitives = []
+        if self.primitive_library and diagram_plan:
+            print("  🔍 Primitive Library: Searching for reusable components...", flush=True)
+
+            # Search based on extracted entities
+            query_texts = []
+            for entity in diagram_plan.extracted_entities[:10]:  # Top 10 entities
+                entity_label = entity.label if hasattr(entity, 'label') else str(entity)
+                entity_type = entity.type if hasattr(entity, 'type') else 'object'
+
+                # Semantic search query
+                query_texts.append(f"{domain_hint if domain_hint else 'physics'} {entity_label} {entity_type}")
+
+            # One encoder call and one matrix product for every query of the problem
+            batch_results = self.primitive_library.query_batch(
+                query_texts,
+                top_k=2,
+                category=None,  # Could map domain_hint to PrimitiveCategory if needed
+                min_score=0.0
+            )
 
-                print("└───────────────────────────────────────────────────────────────┘\n")
-                if self.logger:
-                    self.logger.log_phase_output(ontology_validation, f"Consistent: {ontology_validation.get('consistent', 'N/A')}")
-                    self.logger.end_phase("success")
-                if self.progress:
-                    self.progress.end_phase(True)
-                trace['stages'].append({
-                    'name': 'Ontology Validation',
-                    'duration': time.time() - stage_start_time,
-                    'output': ontology_validation
-                })
+            for results in batch_results:
+                if results:
+                    retrieved_primitives.extend(results[:1])  # Take top result
 
-            # Phase 4: Physics Validation
+            if retrieved_primitives:
+                print(f"  ✅ Found {len(retrieved_primitives)} reusable primitive(s)", flush=True)
+            else:
+                print(f"  ℹ️  No matching primitives found (will use procedural generation)", flush=True)
+
+        # Pass NLP context, property graph, strategy, and primitives to scene builder
+        scene = self.scene_builder.build(
+            specs,
+            nlp_context={
+                'entities': nlp_results.get('stanza', {}).get('entities', []) if nlp_results else [],
+                'triples': nlp_results.get('openie', {}).get('triples', []) if nlp_results else [],
+                'embeddings': nlp_results.get('scibert', {}).get('embeddings', []) if nlp_results else [],
+                'primitives': retrieved_primitives  # ADDED: Pass retrieved primitives
+            } if nlp_results else {'primitives': retrieved_primitives},
+            property_graph=property_graph if property_graph else None,
+            strategy=selected_strategy if self.diagram_planner else "DIRECT",
+            diagram_plan=diagram_plan if diagram_plan else getattr(specs, 'diagram_plan', None)
+        )
+        if domain_module_outputs:
+            scene.metadata.setdefault('domain_modules', domain_module_outputs)
+        print(f"  Scene Objects: {len(scene.objects)}", flush=True)
+        print("└───────────────────────────────────────────────────────────────┘\n")
+        phase2_output = {
+            'object_count': len(scene.objects),
+            'selected_strategy': selected_strategy,
+            'domain_modules': len(domain_module_outputs)
+        }
+        if diagram_plan:
+            phase2_output['diagram_plan'] = {
+                'entities': len(diagram_plan.extracted_entities),
+                'relations': len(diagram_plan.extracted_relations),
+                'constraints': len(diagram_plan.global_constraints),
+                'solver': diagram_plan.layout_hints.get('solver', 'unknown') if hasattr(diagram_plan, 'layout_hints') else 'unknown'
+            }
+        if self.logger:
+            self.logger.log_phase_output(phase2_output, f"Scene with {len(scene.objects)} objects")
+            self.logger.end_phase("success")
+        if self.progress:
+            self.progress.end_phase(True)
+        ctx.trace['stages'].append({
+            'name': 'Scene Synthesis',
+            'duration': time.time() - stage_start_time,
+            'output': phase2_output
+        })
+
+        return {'scene': scene, 'selected_strategy': selected_strategy, 'llm_plan_result': llm_plan_result}
+
+    def _stage_structural_validation(self, ctx: 'GenerationContext', diagram_plan: Optional[Any], scene: Scene) -> Dict[str, Any]:
+        """Phase 2.5: Structural plan vs scene comparison"""
+        structural_report = None
+        if diagram_plan and self.config.enable_structural_validation:
             stage_start_time = time.time()
             if self.logger:
-                self.logger.start_phase("Physics Validation", 5, "Validate physics constraints and relationships")
-                self.logger.log_phase_input(scene, f"Scene with {len(scene.objects)} objects")
-            if self.progress:
-                self.progress.start_phase("Physics Validation", 5)
-            print("┌─ PHASE 4: PHYSICS VALIDATION ─────────────────────────────────────┐")
-            report, scene = self.validator.validate(scene, specs)
-            print("└───────────────────────────────────────────────────────────────────┘\n")
-            phase4_output = {
-                'errors': len(report.errors),
-                'warnings': len(report.warnings)
-            }
+                self.logger.start_phase("Structural Consistency", 3, "Compare plan vs scene")
+                self.logger.log_phase_input({'entities': len(diagram_plan.extracted_entities)}, "Diagram Plan")
+            structural_comparison = compare_plan_scene(diagram_plan, scene)
+            structural_report = structural_comparison.to_dict()
+            missing = len(structural_report['missing_in_scene'])
+            relation_gaps = len(structural_report['relation_gaps'])
+            print("┌─ PHASE 2.5: STRUCTURAL CONSISTENCY ──────────────────────────┐")
+            print(f"  Structural score: {structural_report['score']:.2f}", flush=True)
+            print(f"  Missing in scene: {missing}", flush=True)
+            if missing:
+                print(f"    IDs: {', '.join(structural_report['missing_in_scene'][:3])}", flush=True)
+            if relation_gaps:
+                print(f"  Relation gaps: {relation_gaps}", flush=True)
+            print("└───────────────────────────────────────────────────────────────┘\n")
             if self.logger:
-                self.logger.log_phase_output(phase4_output, f"Errors: {len(report.errors)}, Warnings: {len(report.warnings)}")
+                self.logger.log_phase_output(structural_report, "Structural comparison report")
                 self.logger.end_phase("success")
             if self.progress:
                 self.progress.end_phase(True)
-            trace['stages'].append({
-                'name': 'Physics Validation',
+            ctx.trace['stages'].append({
+                'name': 'Structural Consistency',
                 'duration': time.time() - stage_start_time,
-                'output': phase4_output
+                'output': structural_report
             })
 
-            if not report.is_valid and self.config.validation_mode == 'strict':
-                raise Exception(f"Validation failed in strict mode: {report.errors}")
+        return {'structural_report': structural_report}
 
-            if self.config.enable_domain_rule_validation:
-                stage_start_time = time.time()
-                if self.logger:
-                    self.logger.start_phase("Domain Rule Validation", 5, "Run Kirchhoff/Newton/Geometry checks")
-                    self.logger.log_phase_input({'domain': domain.value if domain else 'unknown'}, "Domain context")
-                domain_rule_report = run_domain_rules(domain.value if domain else None, scene, specs)
-                errors = domain_rule_report['errors']
-                warnings = domain_rule_report['warnings']
-                print("┌─ PHASE 4.5: DOMAIN RULE VALIDATION ─────────────────────────┐")
-                print(f"  Errors: {errors}, Warnings: {warnings}", flush=True)
-                if errors:
-                    for entry in domain_rule_report['checks']:
-                        if not entry['passed'] and entry['severity'] == 'error':
-                            print(f"    ❌ {entry['name']}: {entry['details']}", flush=True)
-                if warnings:
-                    for entry in domain_rule_report['checks']:
-                        if not entry['passed'] and entry['severity'] == 'warning':
-                            print(f"    ⚠️  {entry['name']}: {entry['details']}", flush=True)
-                print("└───────────────────────────────────────────────────────────────┘\n")
-                if self.logger:
-                    self.logger.log_phase_output(domain_rule_report, "Domain rule evaluation")
-                    self.logger.end_phase("success")
-                if self.progress:
-                    self.progress.end_phase(True)
-                trace['stages'].append({
-                    'name': 'Domain Rule Validation',
-                    'duration': time.time() - stage_start_time,
-                    'output': domain_rule_report
-                })
-
-            # Pre-Layout Validation
-            # ...
-
-            # Phase 5: Layout Optimization (Model Orchestrator + Z3/SymPy)
+    def _stage_ontology_validation(self, ctx: 'GenerationContext', specs: CanonicalProblemSpec, domain: Optional[PhysicsDomain], property_graph: Optional[Any]) -> Dict[str, Any]:
+        """Phase 3: Ontology (OWL/RDF) semantic validation"""
+        ontology_validation = None
+        if ONTOLOGY_AVAILABLE and self.config.enable_ontology_validation:
             stage_start_time = time.time()
             if self.logger:
-                self.logger.start_phase("Layout Optimization + Z3/SymPy", 6, "Compute optimal object positions")
-                self.logger.log_phase_input(scene, f"Scene with {len(scene.objects)} unpositioned objects")
+                self.logger.start_phase("Ontology Validation", 4, "Validate semantic consistency")
+                self.logger.log_phase_input(specs, f"Specs with {len(specs.objects)} objects")
             if self.progress:
-                self.progress.start_phase("Layout Optimization", 6)
-            print("┌─ PHASE 5: LAYOUT OPTIMIZATION + Z3 ───────────────────────────┐")
-
-            plan_for_layout = diagram_plan
-            if plan_for_layout is None and self.diagram_planner:
-                try:
-                    plan_for_layout = self.diagram_planner.plan(specs)
-                except Exception as e:
-                    if self.logger:
-                        self.logger.log_phase_detail(f"Fallback plan generation failed: {e}")
-                    plan_for_layout = None
+                self.progress.start_phase("Ontology Validation", 4)
+            print("┌─ PHASE 3: ONTOLOGY VALIDATION ────────────────────────────────┐")
+
+            # Map domain to ontology domain
+            ontology_domain_map = {
+                'physics': Domain.PHYSICS,
+                'chemistry': Domain.CHEMISTRY,
+                'biology': Domain.BIOLOGY
+            }
+            ont_domain = ontology_domain_map.get(domain.value.lower(), Domain.PHYSICS)
 
-            orchestrated_model = ModelType.HEURISTIC
-            orchestrator_meta = {}
-            if self.model_orchestrator and plan_for_layout:
-                try:
-                    orchestrated_model = self.model_orchestrator.select_model(specs, plan_for_layout)
-                    orchestrator_meta = {
-                        'model': orchestrated_model.value,
-                        'complexity': plan_for_layout.complexity_score
+            try:
+                if self.ontology_pool is not None:
+                    ontology_mgr = self.ontology_pool.acquire(ont_domain)
+                else:
+                    ontology_mgr = OntologyManager(domain=ont_domain)
+                ontology_source = "property_graph" if property_graph else "specs"
+                ontology_input_stats = {}
+
+                if property_graph:
+                    ontology_mgr.from_property_graph(property_graph)
+                    ontology_input_stats = {
+                        'nodes': len(property_graph.get_all_nodes()),
+                        'edges': len(property_graph.get_edges())
+                    }
+                else:
+                    for obj in specs.objects:
+                        obj_id = obj.get('id') if isinstance(obj, dict) else getattr(obj, 'id', None)
+                        if not obj_id:
+                            continue
+                        class_uri = f"{ont_domain.value.lower()}:Object"
+                        ontology_mgr.add_instance(obj_id, class_uri)
+                    ontology_input_stats = {
+                        'nodes': len(specs.objects),
+                        'edges': 0
                     }
-                except Exception as e:
-                    orchestrator_meta = {'model': 'heuristic', 'error': str(e)}
-                    orchestrated_model = ModelType.HEURISTIC
-            if orchestrator_meta:
-                print(f"  Model Orchestrator Strategy: {orchestrated_model.value} (complexity {orchestrator_meta.get('complexity', 0):.2f})", flush=True)
-
-            z3_used = False
-            sympy_used = False
-            pre_positions = 0
-            solver_notes = []
-
-            if plan_for_layout:
-                if orchestrated_model in (ModelType.CONSTRAINT_SOLVER, ModelType.HYBRID):
-                    positions_applied, z3_success = self._apply_z3_layout(plan_for_layout, scene)
-                    pre_positions += positions_applied
-                    z3_used = z3_success
-                    solver_notes.append('z3' if z3_success else 'z3_failed')
-
-                    if orchestrated_model == ModelType.HYBRID and (not z3_success) and self.config.enable_sympy_solver:
-                        positions_applied, sympy_success = self._apply_sympy_layout(plan_for_layout, scene)
-                        pre_positions += positions_applied
-                        sympy_used = sympy_success
-                        solver_notes.append('sympy' if sympy_success else 'sympy_failed')
-
-                elif orchestrated_model == ModelType.SYMBOLIC_PHYSICS and self.config.enable_sympy_solver:
-                    positions_applied, sympy_success = self._apply_sympy_layout(plan_for_layout, scene)
-                    pre_positions += positions_applied
-                    sympy_used = sympy_success
-                    solver_notes.append('sympy' if sympy_success else 'sympy_failed')
 
-            if pre_positions:
-                print(f"  ⚙️  Pre-layout solver positioned {pre_positions} objects ({', '.join(solver_notes)})", flush=True)
+                validation_result = ontology_mgr.validate()
+                self.ontology_manager = ontology_mgr
+                ontology_validation = {
+                    'source': ontology_source,
+                    'input_stats': ontology_input_stats,
+                    'consistent': validation_result.is_valid,
+                    'errors': validation_result.errors,
+                    'warnings': validation_result.warnings,
+                    'inferences': len(validation_result.inferences)
+                }
+                print(f"  Ontology Source: {ontology_source} ({ontology_input_stats.get('nodes', 0)} nodes)", flush=True)
+                print(f"  Ontology Consistent: {validation_result.is_valid}", flush=True)
+                if validation_result.errors:
+                    print(f"  ⚠ Errors: {len(validation_result.errors)}", flush=True)
+                if validation_result.inferences:
+                    print(f"  ↪ Inferences: {len(validation_result.inferences)}", flush=True)
+
+            except ImportError as e:
+                print(f"  ⚠️  RDFLib not available - skipping ontology validation", flush=True)
+                print(f"     Install with: pip install rdflib owlrl", flush=True)
+                ontology_validation = {
+                    'consistent': None,
+                    'errors': [f'RDFLib not installed: {str(e)}'],
+                    'warnings': ['Ontology validation skipped - RDFLib not available']
+                }
 
-            # Use standard layout engine for final positioning
-            positioned_scene = self.layout_engine.solve(scene, specs)
-            print(f"  Positioned Objects: {len(positioned_scene.objects)}", flush=True)
             print("└───────────────────────────────────────────────────────────────┘\n")
-            phase5_output = {
-                'object_count': len(positioned_scene.objects),
-                'z3_used': z3_used,
-                'sympy_used': sympy_used,
-                'pre_solver_positions': pre_positions,
-                'model_strategy': orchestrated_model.value,
-                'model_orchestrator': orchestrator_meta
-            }
             if self.logger:
-                self.logger.log_phase_output(phase5_output, f"Positioned {len(positioned_scene.objects)} objects")
+                self.logger.log_phase_output(ontology_validation, f"Consistent: {ontology_validation.get('consistent', 'N/A')}")
                 self.logger.end_phase("success")
             if self.progress:
                 self.progress.end_phase(True)
-            trace['stages'].append({
-                'name': 'Layout Optimization',
+            ctx.trace['stages'].append({
+                'name': 'Ontology Validation',
                 'duration': time.time() - stage_start_time,
-                'output': phase5_output
+                'output': ontology_validation
             })
 
-            # NEW Phase 5.5: Intelligent Label Placement
+        return {'ontology_validation': ontology_validation}
+
+    def _stage_physics_validation(self, ctx: 'GenerationContext', scene: Scene, specs: CanonicalProblemSpec) -> Dict[str, Any]:
+        """Phase 4: Physics validation (raises in strict mode)"""
+        stage_start_time = time.time()
+        if self.logger:
+            self.logger.start_phase("Physics Validation", 5, "Validate physics constraints and relationships")
+            self.logger.log_phase_input(scene, f"Scene with {len(scene.objects)} objects")
+        if self.progress:
+            self.progress.start_phase("Physics Validation", 5)
+        print("┌─ PHASE 4: PHYSICS VALIDATION ─────────────────────────────────────┐")
+        report, scene = self.validator.validate(scene, specs)
+        print("└───────────────────────────────────────────────────────────────────┘\n")
+        phase4_output = {
+            'errors': len(report.errors),
+            'warnings': len(report.warnings)
+        }
+        if self.logger:
+            self.logger.log_phase_output(phase4_output, f"Errors: {len(report.errors)}, Warnings: {len(report.warnings)}")
+            self.logger.end_phase("success")
+        if self.progress:
+            self.progress.end_phase(True)
+        ctx.trace['stages'].append({
+            'name': 'Physics Validation',
+            'duration': time.time() - stage_start_time,
+            'output': phase4_output
+        })
+
+        if not report.is_valid and self.config.validation_mode == 'strict':
+            raise Exception(f"Validation failed in strict mode: {report.errors}")
+
+        return {'validation_report': report, 'validated_scene': scene}
+
+    def _stage_domain_rules(self, ctx: 'GenerationContext', validated_scene: Scene, specs: CanonicalProblemSpec, domain: Optional[PhysicsDomain]) -> Dict[str, Any]:
+        """Phase 4.5: Domain rule validation (Kirchhoff/Newton/Geometry)"""
+        scene = validated_scene
+        domain_rule_report = None
+        if self.config.enable_domain_rule_validation:
             stage_start_time = time.time()
             if self.logger:
-                self.logger.start_phase("Intelligent Label Placement", 7, "Optimize label positions to avoid overlaps")
-                self.logger.log_phase_input(positioned_scene, "Positioned scene")
-            if self.progress:
-                self.progress.start_phase("Label Placement", 7)
-            print("┌─ PHASE 5.5: INTELLIGENT LABEL PLACEMENT ──────────────────────┐")
-            positioned_scene = self.label_placer.place_labels(positioned_scene)
+                self.logger.start_phase("Domain Rule Validation", 5, "Run Kirchhoff/Newton/Geometry checks")
+                self.logger.log_phase_input({'domain': domain.value if domain else 'unknown'}, "Domain context")
+            domain_rule_report = run_domain_rules(domain.value if domain else None, scene, specs)
+            errors = domain_rule_report['errors']
+            warnings = domain_rule_report['warnings']
+            print("┌─ PHASE 4.5: DOMAIN RULE VALIDATION ─────────────────────────┐")
+            print(f"  Errors: {errors}, Warnings: {warnings}", flush=True)
+            if errors:
+                for entry in domain_rule_report['checks']:
+                    if not entry['passed'] and entry['severity'] == 'error':
+                        print(f"    ❌ {entry['name']}: {entry['details']}", flush=True)
+            if warnings:
+                for entry in domain_rule_report['checks']:
+                    if not entry['passed'] and entry['severity'] == 'warning':
+                        print(f"    ⚠️  {entry['name']}: {entry['details']}", flush=True)
             print("└───────────────────────────────────────────────────────────────┘\n")
             if self.logger:
-                self.logger.log_phase_output({}, "Labels placed")
+                self.logger.log_phase_output(domain_rule_report, "Domain rule evaluation")
                 self.logger.end_phase("success")
             if self.progress:
                 self.progress.end_phase(True)
-            trace['stages'].append({
-                'name': 'Label Placement',
+            ctx.trace['stages'].append({
+                'name': 'Domain Rule Validation',
                 'duration': time.time() - stage_start_time,
-                'output': {}
+                'output': domain_rule_report
             })
 
-            # NEW Phase 5.6: Spatial Validation
-            stage_start_time = time.time()
-            if self.logger:
-                self.logger.start_phase("Spatial Validation", 8, "Check for overlaps and positioning errors")
-                self.logger.log_phase_input(positioned_scene, "Final positioned scene")
-            if self.progress:
-                self.progress.start_phase("Spatial Validation", 8)
-            print("┌─ PHASE 5.6: SPATIAL VALIDATION ───────────────────────────────┐")
-            spatial_report = self.spatial_validator.validate(positioned_scene)
-            print(f"  {spatial_report.summary()}", flush=True)
-
-            if spatial_report.has_errors():
-                print(f"  ❌ Found {len(spatial_report.errors)} spatial errors:", flush=True)
-                for i, error in enumerate(spatial_report.errors[:3], 1):
-                    print(f"     {i}. {error}", flush=True)
-                if len(spatial_report.errors) > 3:
-                    print(f"     ... and {len(spatial_report.errors) - 3} more", flush=True)
-
-                # In strict mode, fail on spatial errors
-                if self.config.validation_mode == 'strict':
-                    raise Exception(f"Spatial validation failed: {spatial_report.errors}")
-
-            if spatial_report.has_warnings():
-                print(f"  ⚠️  Found {len(spatial_report.warnings)} spatial warnings:", flush=True)
-                for i, warning in enumerate(spatial_report.warnings[:2], 1):
-                    print(f"     {i}. {warning}", flush=True)
-                if len(spatial_report.warnings) > 2:
-                    print(f"     ... and {len(spatial_report.warnings) - 2} more", flush=True)
+        return {'domain_rule_report': domain_rule_report}
 
-            print("└───────────────────────────────────────────────────────────────┘\n")
-            spatial_output = {
-                'errors': len(spatial_report.errors),
-                'warnings': len(spatial_report.warnings),
-                'is_valid': spatial_report.is_valid()
-            }
-            if self.logger:
-                self.logger.log_phase_output(spatial_output, f"Errors: {len(spatial_report.errors)}, Warnings: {len(spatial_report.warnings)}")
-                self.logger.end_phase("success")
-            if self.progress:
-                self.progress.end_phase(True)
-            trace['stages'].append({
-                'name': 'Spatial Validation',
-                'duration': time.time() - stage_start_time,
-                'output': spatial_output
-            })
+    def _stage_layout(self, ctx: 'GenerationContext', validated_scene: Scene, specs: CanonicalProblemSpec, diagram_plan: Optional[Any]) -> Dict[str, Any]:
+        """Phase 5: Layout optimization (model orchestrator + Z3/SymPy pre-solve)"""
+        scene = validated_scene
+        stage_start_time = time.time()
+        if self.logger:
+            self.logger.start_phase("Layout Optimization + Z3/SymPy", 6, "Compute optimal object positions")
+            self.logger.log_phase_input(scene, f"Scene with {len(scene.objects)} unpositioned objects")
+        if self.progress:
+            self.progress.start_phase("Layout Optimization", 6)
+        print("┌─ PHASE 5: LAYOUT OPTIMIZATION + Z3 ───────────────────────────┐")
+
+        plan_for_layout = diagram_plan
+        if plan_for_layout is None and self.diagram_planner:
+            try:
+                plan_for_layout = self.diagram_planner.plan(specs)
+            except Exception as e:
+                if self.logger:
+                    self.logger.log_phase_detail(f"Fallback plan generation failed: {e}")
+                plan_for_layout = None
 
-            # Phase 6: Rendering
+        orchestrated_model = ModelType.HEURISTIC
+        orchestrator_meta = {}
+        if self.model_orchestrator and plan_for_layout:
+            try:
+                orchestrated_model = self.model_orchestrator.select_model(specs, plan_for_layout)
+                orchestrator_meta = {
+                    'model': orchestrated_model.value,
+                    'complexity': plan_for_layout.complexity_score
+                }
+            except Exception as e:
+                orchestrator_meta = {'model': 'heuristic', 'error': str(e)}
+                orchestrated_model = ModelType.HEURISTIC
+        if orchestrator_meta:
+            print(f"  Model Orchestrator Strategy: {orchestrated_model.value} (complexity {orchestrator_meta.get('complexity', 0):.2f})", flush=True)
+
+        z3_used = False
+        sympy_used = False
+        pre_positions = 0
+        solver_notes = []
+
+        if plan_for_layout:
+            if orchestrated_model in (ModelType.CONSTRAINT_SOLVER, ModelType.HYBRID):
+                positions_applied, z3_success = self._apply_z3_layout(plan_for_layout, scene)
+                pre_positions += positions_applied
+                z3_used = z3_success
+                solver_notes.append('z3' if z3_success else 'z3_failed')
+
+                if orchestrated_model == ModelType.HYBRID and (not z3_success) and self.config.enable_sympy_solver:
+                    positions_applied, sympy_success = self._apply_sympy_layout(plan_for_layout, scene)
+                    pre_positions += positions_applied
+                    sympy_used = sympy_success
+                    solver_notes.append('sympy' if sympy_success else 'sympy_failed')
+
+            elif orchestrated_model == ModelType.SYMBOLIC_PHYSICS and self.config.enable_sympy_solver:
+                positions_applied, sympy_success = self._apply_sympy_layout(plan_for_layout, scene)
+                pre_positions += positions_applied
+                sympy_used = sympy_success
+                solver_notes.append('sympy' if sympy_success else 'sympy_failed')
+
+        if pre_positions:
+            print(f"  ⚙️  Pre-layout solver positioned {pre_positions} objects ({', '.join(solver_notes)})", flush=True)
+
+        # Use standard layout engine for final positioning
+        positioned_scene = self.layout_engine.solve(scene, specs)
+        print(f"  Positioned Objects: {len(positioned_scene.objects)}", flush=True)
+        print("└───────────────────────────────────────────────────────────────┘\n")
+        phase5_output = {
+            'object_count': len(positioned_scene.objects),
+            'z3_used': z3_used,
+            'sympy_used': sympy_used,
+            'pre_solver_positions': pre_positions,
+            'model_strategy': orchestrated_model.value,
+            'model_orchestrator': orchestrator_meta
+        }
+        if self.logger:
+            self.logger.log_phase_output(phase5_output, f"Positioned {len(positioned_scene.objects)} objects")
+            self.logger.end_phase("success")
+        if self.progress:
+            self.progress.end_phase(True)
+        ctx.trace['stages'].append({
+            'name': 'Layout Optimization',
+            'duration': time.time() - stage_start_time,
+            'output': phase5_output
+        })
+
+        return {'positioned_scene': positioned_scene}
+
+    def _stage_label_placement(self, ctx: 'GenerationContext', positioned_scene: Scene) -> Dict[str, Any]:
+        """Phase 5.5: Intelligent label placement"""
+        stage_start_time = time.time()
+        if self.logger:
+            self.logger.start_phase("Intelligent Label Placement", 7, "Optimize label positions to avoid overlaps")
+            self.logger.log_phase_input(positioned_scene, "Positioned scene")
+        if self.progress:
+            self.progress.start_phase("Label Placement", 7)
+        print("┌─ PHASE 5.5: INTELLIGENT LABEL PLACEMENT ──────────────────────┐")
+        positioned_scene = self.label_placer.place_labels(positioned_scene)
+        print("└───────────────────────────────────────────────────────────────┘\n")
+        if self.logger:
+            self.logger.log_phase_output({}, "Labels placed")
+            self.logger.end_phase("success")
+        if self.progress:
+            self.progress.end_phase(True)
+        ctx.trace['stages'].append({
+            'name': 'Label Placement',
+            'duration': time.time() - stage_start_time,
+            'output': {}
+        })
+
+        return {'labeled_scene': positioned_scene}
+
+    def _stage_spatial_validation(self, ctx: 'GenerationContext', labeled_scene: Scene) -> Dict[str, Any]:
+        """Phase 5.6: Spatial validation (raises in strict mode)"""
+        positioned_scene = labeled_scene
+        stage_start_time = time.time()
+        if self.logger:
+            self.logger.start_phase("Spatial Validation", 8, "Check for overlaps and positioning errors")
+            self.logger.log_phase_input(positioned_scene, "Final positioned scene")
+        if self.progress:
+            self.progress.start_phase("Spatial Validation", 8)
+        print("┌─ PHASE 5.6: SPATIAL VALIDATION ───────────────────────────────┐")
+        spatial_report = self.spatial_validator.validate(positioned_scene)
+        print(f"  {spatial_report.summary()}", flush=True)
+
+        if spatial_report.has_errors():
+            print(f"  ❌ Found {len(spatial_report.errors)} spatial errors:", flush=True)
+            for i, error in enumerate(spatial_report.errors[:3], 1):
+                print(f"     {i}. {error}", flush=True)
+            if len(spatial_report.errors) > 3:
+                print(f"     ... and {len(spatial_report.errors) - 3} more", flush=True)
+
+            # In strict mode, fail on spatial errors
+            if self.config.validation_mode == 'strict':
+                raise Exception(f"Spatial validation failed: {spatial_report.errors}")
+
+        if spatial_report.has_warnings():
+            print(f"  ⚠️  Found {len(spatial_report.warnings)} spatial warnings:", flush=True)
+            for i, warning in enumerate(spatial_report.warnings[:2], 1):
+                print(f"     {i}. {warning}", flush=True)
+            if len(spatial_report.warnings) > 2:
+                print(f"     ... and {len(spatial_report.warnings) - 2} more", flush=True)
+
+        print("└───────────────────────────────────────────────────────────────┘\n")
+        spatial_output = {
+            'errors': len(spatial_report.errors),
+            'warnings': len(spatial_report.warnings),
+            'is_valid': spatial_report.is_valid()
+        }
+        if self.logger:
+            self.logger.log_phase_output(spatial_output, f"Errors: {len(spatial_report.errors)}, Warnings: {len(spatial_report.warnings)}")
+            self.logger.end_phase("success")
+        if self.progress:
+            self.progress.end_phase(True)
+        ctx.trace['stages'].append({
+            'name': 'Spatial Validation',
+            'duration': time.time() - stage_start_time,
+            'output': spatial_output
+        })
+
+        return {'spatial_report': spatial_report}
+
+    def _stage_render(self, ctx: 'GenerationContext', labeled_scene: Scene, specs: CanonicalProblemSpec, domain: Optional[PhysicsDomain],
+                      spatial_report: SpatialValidationReport) -> Dict[str, Any]:
+        """Phase 6: SVG rendering (ordered after spatial validation)"""
+        positioned_scene = labeled_scene
+        stage_start_time = time.time()
+        if self.logger:
+            self.logger.start_phase("Rendering", 9, "Generate SVG output")
+            self.logger.log_phase_input(positioned_scene, f"Positioned scene with {len(positioned_scene.objects)} objects")
+        if self.progress:
+            self.progress.start_phase("Rendering", 9)
+        print("┌─ PHASE 6: RENDERING ──────────────────────────────────────────────┐")
+        svg = self.renderer.render(positioned_scene, specs)
+        if self.svg_optimizer:
+            svg = self.svg_optimizer.optimize(svg, {'precision': self.config.svg_precision})
+        print("└───────────────────────────────────────────────────────────────────┘\n")
+        phase6_output = {'svg_size': len(svg)}
+        if self.logger:
+            self.logger.log_phase_output(phase6_output, f"SVG generated ({len(svg):,} bytes)")
+            self.logger.end_phase("success")
+        if self.progress:
+            self.progress.end_phase(True)
+        ctx.trace['stages'].append({
+            'name': 'Rendering',
+            'duration': time.time() - stage_start_time,
+            'output': phase6_output
+        })
+
+        print("✅ UNIVERSAL RENDERER COMPLETE")
+        print(f"   SVG size: {len(svg):,} bytes", flush=True)
+        print(f"   Domain: {domain.value if domain else 'unknown'}", flush=True)
+
+        return {'svg': svg}
+
+    def _stage_refinement(self, ctx: 'GenerationContext', problem_text: str, svg: str, labeled_scene: Scene, specs: CanonicalProblemSpec,
+                          diagram_plan: Optional[Any], domain_rule_report: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Phase 6.5: Validation refinement loop"""
+        positioned_scene = labeled_scene
+        vlm_description = None
+        run_validation_loop = any([
+            self.diagram_validator,
+            self.vlm_validator,
+            (self.deepseek_client and self.config.enable_deepseek_validation),
+            self.config.enable_structural_validation,
+            self.config.enable_domain_rule_validation
+        ])
+        validation_results = {}
+        if run_validation_loop:
             stage_start_time = time.time()
             if self.logger:
-                self.logger.start_phase("Rendering", 9, "Generate SVG output")
-                self.logger.log_phase_input(positioned_scene, f"Positioned scene with {len(positioned_scene.objects)} objects")
-            if self.progress:
-                self.progress.start_phase("Rendering", 9)
-            print("┌─ PHASE 6: RENDERING ──────────────────────────────────────────────┐")
-            svg = self.renderer.render(positioned_scene, specs)
-            print("└───────────────────────────────────────────────────────────────────┘\n")
-            phase6_output = {'svg_size': len(svg)}
-            if self.logger:
-                self.logger.log_phase_output(phase6_output, f"SVG generated ({len(svg):,} bytes)")
-                self.logger.end_phase("success")
+                self.logger.start_phase("Validation Refinement", 7, "Iterative quality improvement")
+                self.logger.log_phase_input({'svg_size': len(svg)}, "SVG and scene")
             if self.progress:
-                self.progress.end_phase(True)
-            trace['stages'].append({
-                'name': 'Rendering',
-                'duration': time.time() - stage_start_time,
-                'output': phase6_output
-            })
-
-            print("✅ UNIVERSAL RENDERER COMPLETE")
-            print(f"   SVG size: {len(svg):,} bytes", flush=True)
-            print(f"   Domain: {domain.value if domain else 'unknown'}", flush=True)
-
-            # Phase 6.5: Validation Refinement Loop (NEW)
-            run_validation_loop = any([
-                self.diagram_validator,
-                self.vlm_validator,
-                (self.deepseek_client and self.config.enable_deepseek_validation),
-                self.config.enable_structural_validation,
-                self.config.enable_domain_rule_validation
-            ])
-            validation_results = {}
-            if run_validation_loop:
-                stage_start_time = time.time()
-                if self.logger:
-                    self.logger.start_phase("Validation Refinement", 7, "Iterative quality improvement")
-                    self.logger.log_phase_input({'svg_size': len(svg)}, "SVG and scene")
-                if self.progress:
-                    self.progress.start_phase("Refinement", 7)
-                print("\n┌─ PHASE 6.5: VALIDATION REFINEMENT ─────────────────────────────┐")
-
-                try:
-                    validation_results, svg = self._post_validate(
-                        svg,
-                        positioned_scene,
-                        specs,
-                        problem_text,
-                        diagram_plan,
-                        domain_rule_report
-                    )
-                    vlm_description = validation_results.get('vlm_description')
-
-                    # Log refinement iterations
-                    print(f"  Refinement Iterations: {validation_results['refinement_iterations']}", flush=True)
-                    print(f"  Overall Confidence: {validation_results['overall_confidence']:.2f}", flush=True)
-                    print(f"  Issues Found: {len(validation_results['issues'])}", flush=True)
-
-                    refinement_output = {
-                        'refinement_iterations': validation_results['refinement_iterations'],
-                        'overall_confidence': validation_results['overall_confidence'],
-                        'issue_count': len(validation_results['issues']),
-                        'suggestions': len(validation_results.get('suggestions', []))
-                    }
+                self.progress.start_phase("Refinement", 7)
+            print("\n┌─ PHASE 6.5: VALIDATION REFINEMENT ─────────────────────────────┐")
 
-                    print("└───────────────────────────────────────────────────────────────────┘\n")
+            try:
+                validation_results, svg = self._post_validate(
+                    svg,
+                    positioned_scene,
+                    specs,
+                    problem_text,
+                    diagram_plan,
+                    domain_rule_report
+                )
+                vlm_description = validation_results.get('vlm_description')
+
+                # Log refinement iterations
+                print(f"  Refinement Iterations: {validation_results['refinement_iterations']}", flush=True)
+                print(f"  Overall Confidence: {validation_results['overall_confidence']:.2f}", flush=True)
+                print(f"  Issues Found: {len(validation_results['issues'])}", flush=True)
+
+                refinement_output = {
+                    'refinement_iterations': validation_results['refinement_iterations'],
+                    'overall_confidence': validation_results['overall_confidence'],
+                    'issue_count': len(validation_results['issues']),
+                    'suggestions': len(validation_results.get('suggestions', []))
+                }
 
-                    if self.logger:
-                        self.logger.log_phase_output(refinement_output,
-                            f"Refined {validation_results['refinement_iterations']} times")
-                        self.logger.end_phase("success")
-                    if self.progress:
-                        self.progress.end_phase(True)
-
-                    trace['stages'].append({
-                        'name': 'Validation Refinement',
-                        'duration': time.time() - stage_start_time,
-                        'output': refinement_output
-                    })
+                print("└───────────────────────────────────────────────────────────────────┘\n")
 
-                except Exception as e:
-                    print(f"  ⚠️  Refinement skipped: {e}", flush=True)
-                    print("└───────────────────────────────────────────────────────────────────┘\n")
-                    if self.logger:
-                        self.logger.log_phase_detail(f"Refinement error: {e}")
-                        self.logger.end_phase("skipped")
-                    if self.progress:
-                        self.progress.end_phase(True)
-
-            # Phase 7: LLM Auditing (NEW)
-            if self.auditor:
-                stage_start_time = time.time()
                 if self.logger:
-                    self.logger.start_phase("LLM Quality Auditing", 10, "Audit diagram quality with LLM")
-                    self.logger.log_phase_input({'specs': specs, 'svg_size': len(svg)}, "Specs and SVG")
+                    self.logger.log_phase_output(refinement_output,
+                        f"Refined {validation_results['refinement_iterations']} times")
+                    self.logger.end_phase("success")
                 if self.progress:
-                    self.progress.start_phase("LLM Auditing", 10)
-                print("\n┌─ PHASE 7: LLM QUALITY AUDITING ───────────────────────────────┐")
-
-                try:
-                    audit_result = self.auditor.audit(
-                        specs,
-                        svg_output=svg,
-                        structural_report=structural_report,
-                        domain_rule_report=domain_rule_report,
-                        validation_results=validation_results,
-                        vlm_description=vlm_description
-                    )
-                    audit_report = {
-                        'overall_score': audit_result.overall_score,
-                        'issue_count': len(audit_result.issues),
-                        'critical_issues': [i for i in audit_result.issues if i.severity == 'CRITICAL'],
-                        'suggestions': audit_result.suggestions[:3]  # Top 3
-                    }
-                    print(f"  Overall Score: {audit_result.overall_score:.1f}/10", flush=True)
-                    print(f"  Issues Found: {len(audit_result.issues)}", flush=True)
-                    if audit_result.suggestions:
-                        print(f"  Suggestions: {len(audit_result.suggestions)}", flush=True)
+                    self.progress.end_phase(True)
 
-                except Exception as e:
-                    print(f"  Auditing skipped: {e}", flush=True)
-                    audit_report = {'error': str(e)}
+                ctx.trace['stages'].append({
+                    'name': 'Validation Refinement',
+                    'duration': time.time() - stage_start_time,
+                    'output': refinement_output
+                })
 
-                print("└───────────────────────────────────────────────────────────────┘\n")
+            except Exception as e:
+                print(f"  ⚠️  Refinement skipped: {e}", flush=True)
+                print("└───────────────────────────────────────────────────────────────────┘\n")
                 if self.logger:
-                    self.logger.log_phase_output(audit_report, f"Audit completed")
-                    self.logger.end_phase("success")
+                    self.logger.log_phase_detail(f"Refinement error: {e}")
+                    self.logger.end_phase("skipped")
                 if self.progress:
                     self.progress.end_phase(True)
-                trace['stages'].append({
-                    'name': 'LLM Auditing',
-                    'duration': time.time() - stage_start_time,
-                    'output': audit_report
-                })
 
-            # Summary
-            print("\n" + "="*80)
-            print("✅ DIAGRAM GENERATION COMPLETE")
-            print("="*80)
-            print(f"   Request ID: {request_id}", flush=True)
-            print(f"   Domain: {domain.value if domain else 'unknown'}", flush=True)
-            print(f"   SVG Size: {len(svg):,} bytes", flush=True)
-            if complexity_score:
-                print(f"   Complexity: {complexity_score:.2f}", flush=True)
-            if selected_strategy:
-                print(f"   Strategy: {selected_strategy}", flush=True)
-            if self.active_features:
-                print(f"   Advanced Features: {len(self.active_features)} active", flush=True)
-            print("="*80)
+        return {
+            'validation_results': validation_results,
+            'final_svg': svg,
+            'final_scene': positioned_scene,
+            'vlm_description': vlm_description
+        }
 
-            # Log final response
+    def _stage_audit(self, ctx: 'GenerationContext', specs: CanonicalProblemSpec, final_svg: str, structural_report: Optional[Dict[str, Any]],
+                     domain_rule_report: Optional[Dict[str, Any]], validation_results: Dict[str, Any],
+                     vlm_description: Optional[str]) -> Dict[str, Any]:
+        """Phase 7: LLM quality auditing"""
+        svg = final_svg
+        audit_report = None
+        if self.auditor:
+            stage_start_time = time.time()
             if self.logger:
-                self.logger.log_response(
-                    success=True,
-                    result={
-                        'svg_size': len(svg),
-                        'domain': domain.value if domain else 'unknown',
-                        'total_objects': len(positioned_scene.objects),
-                        'complexity_score': complexity_score,
-                        'selected_strategy': selected_strategy
-                    }
-                )
+                self.logger.start_phase("LLM Quality Auditing", 10, "Audit diagram quality with LLM")
+                self.logger.log_phase_input({'specs': specs, 'svg_size': len(svg)}, "Specs and SVG")
+            if self.progress:
+                self.progress.start_phase("LLM Auditing", 10)
+            print("\n┌─ PHASE 7: LLM QUALITY AUDITING ───────────────────────────────┐")
 
-            result_metadata = self._compose_result_metadata(
-                trace=trace,
-                domain=domain,
-                scene=positioned_scene,
-                features=self.active_features,
-                request_id=request_id,
-                structural_report=structural_report,
-                domain_rule_report=domain_rule_report,
-                validation_results=validation_results,
-                ontology_validation=ontology_validation,
-                audit_report=audit_report,
-                vlm_description=vlm_description
-            )
+            try:
+                audit_result = self.auditor.audit(
+                    specs,
+                    svg_output=svg,
+                    structural_report=structural_report,
+                    domain_rule_report=domain_rule_report,
+                    validation_results=validation_results,
+                    vlm_description=vlm_description
+                )
+                audit_report = {
+                    'overall_score': audit_result.overall_score,
+                    'issue_count': len(audit_result.issues),
+                    'critical_issues': [i for i in audit_result.issues if i.severity == 'CRITICAL'],
+                    'suggestions': audit_result.suggestions[:3]  # Top 3
+                }
+                print(f"  Overall Score: {audit_result.overall_score:.1f}/10", flush=True)
+                print(f"  Issues Found: {len(audit_result.issues)}", flush=True)
+                if audit_result.suggestions:
+                    print(f"  Suggestions: {len(audit_result.suggestions)}", flush=True)
 
-            # Return complete result with ALL advanced artifacts
-            return DiagramResult(
-                svg=svg,
-                scene=positioned_scene,
-                specs=specs,
-                validation_report=report,
-                quality_report=None,
-                # NEW: Advanced pipeline artifacts
-                property_graph=current_property_graph,
-                nlp_results=nlp_results if nlp_results else None,
-                complexity_score=complexity_score,
-                selected_strategy=selected_strategy,
-                llm_plan=llm_plan_result,
-                diagram_plan=diagram_plan.to_dict() if diagram_plan else None,
-                domain_module_outputs=domain_module_outputs if domain_module_outputs else None,
-                ontology_validation=ontology_validation,
-                audit_report=audit_report,
-                # Metadata
-                metadata=result_metadata
-            )
+            except Exception as e:
+                print(f"  Auditing skipped: {e}", flush=True)
+                audit_report = {'error': str(e)}
 
-        except Exception as e:
-            # Log error
+            print("└───────────────────────────────────────────────────────────────┘\n")
             if self.logger:
-                self.logger.log_error(e, {
-                    'domain': domain.value if domain else 'unknown',
-                    'phase': 'generation'
-                })
-                self.logger.log_response(
-                    success=False,
-                    error=str(e)
-                )
-            # Re-raise the exception
-            raise
+                self.logger.log_phase_output(audit_report, f"Audit completed")
+                self.logger.end_phase("success")
+            if self.progress:
+                self.progress.end_phase(True)
+            ctx.trace['stages'].append({
+                'name': 'LLM Auditing',
+                'duration': time.time() - stage_start_time,
+                'output': audit_report
+            })
 
-        finally:
-            # Export comprehensive trace
-            tracer.print_summary()
-            trace_file = tracer.export_trace()
-            print(f"\n📊 Detailed trace exported to: {trace_file}")
+        return {'audit_report': audit_report}
 
-            # Keep original trace for compatibility
-            with open('generation_trace.json', 'w') as f:
-                json.dump(trace, f, indent=2)
+    def generate_batch(self, problem_texts: List[str],
+                       max_workers: Optional[int] = None) -> Iterator[BatchItemResult]:
+        """
+        Generate diagrams for many problems, yielding results as they complete.
+
+        Phase 0 runs once for the whole batch in this process (see
+        _run_nlp_tools_batch), so each NLP model sees every text in a single
+        batched call instead of one call per request. The remaining phases are
+        CPU-bound and independent per problem; they are fanned out to a pool of
+        worker processes, each holding its own warm pipeline (built once per
+        worker, with NLP disabled since it receives precomputed results).
+
+        Args:
+            problem_texts: Problems to generate
+            max_workers: Worker processes for the post-NLP phases. None uses
+                config.batch_max_workers or min(batch size, CPU count); 1 runs
+                every problem in this process.
+
+        Yields:
+            BatchItemResult per problem in completion order (use .index to
+            restore input order). A failing problem yields an error entry and
+            does not abort the batch.
+        """
+        texts = list(problem_texts)
+        if not texts:
+            return
+
+        print(f"\n📦 Batch generation: {len(texts)} problems", flush=True)
+        batch_nlp = self._run_nlp_tools_batch(texts)
+
+        if max_workers is None:
+            max_workers = getattr(self.config, 'batch_max_workers', None) or (os.cpu_count() or 1)
+        max_workers = max(1, min(max_workers, len(texts)))
+
+        if max_workers == 1:
+            for index, text in enumerate(texts):
+                yield self._generate_batch_item(index, text, batch_nlp[index])
+            return
+
+        # Live tool objects stay in this process; workers only need the plain entries
+        portable_nlp = [
+            {tool: {key: value for key, value in entry.items() if key != 'raw_result'}
+             for tool, entry in nlp.items()}
+            for nlp in batch_nlp
+        ]
+        worker_config = replace(self.config, enable_nlp_enrichment=False, enable_nlp_warmup=False)
+        print(f"  🔀 Fanning out post-NLP phases to {max_workers} worker processes", flush=True)
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_batch_worker,
+                                 initargs=(type(self), worker_config)) as executor:
+            futures = {
+                executor.submit(_run_batch_worker, index, text, portable_nlp[index]): index
+                for index, text in enumerate(texts)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    yield future.result()
+                except Exception as exc:
+                    yield BatchItemResult(index=index, problem_text=texts[index],
+                                          error=f"{type(exc).__name__}: {exc}")
+
+    def _generate_batch_item(self, index: int, problem_text: str,
+                             precomputed_nlp: Optional[Dict[str, Any]]) -> BatchItemResult:
+        """Run generate() for one batch entry, capturing failures instead of raising"""
+        start = time.time()
+        try:
+            result = self.generate(problem_text, precomputed_nlp=precomputed_nlp or None)
+            result.metadata['batch_index'] = index
+            return BatchItemResult(index=index, problem_text=problem_text,
+                                   result=result, duration=time.time() - start)
+        except Exception as exc:
+            return BatchItemResult(index=index, problem_text=problem_text,
+                                   error=f"{type(exc).__name__}: {exc}",
+                                   duration=time.time() - start)
 
     def _post_validate(self,
                        svg: str,
@@ -2518,7 +3142,7 @@ class UnifiedDiagramPipeline:
         """Generate monotonic request identifier"""
         self._request_counter += 1
         timestamp = int(time.time() * 1000)
-        return f"req_{timestamp}_{self._request_counter}"
+        return f"req_{timestamp}_{os.getpid()}_{self._request_counter}"
 
     @staticmethod
     def _compose_result_metadata(
@@ -2559,6 +3183,29 @@ class UnifiedDiagramPipeline:
 
         return metadata
 
+    def _report_property_graph_persistence(self, persistence_details: Dict[str, Any]) -> Dict[str, Any]:
+        """Print the outcome of _persist_property_graph (disk snapshot, graph DB sync)"""
+        disk_info = persistence_details.get('disk_persistence')
+        if disk_info and disk_info.get('status') == 'success':
+            print(f"  💾 Graph snapshot: {disk_info['path']}", flush=True)
+        elif disk_info and disk_info.get('status') == 'queued':
+            print(f"  💾 Graph snapshot (background): {disk_info['path']}", flush=True)
+        elif disk_info and disk_info.get('status') == 'error':
+            print(f"  ⚠️  Disk persistence failed: {disk_info.get('error')}", flush=True)
+
+        graphdb_info = persistence_details.get('graphdb_persistence')
+        if graphdb_info:
+            status = graphdb_info.get('status')
+            if status == 'success':
+                print(f"  🗄  Graph DB sync: {graphdb_info.get('backend')} ({graphdb_info.get('nodes_synced')} nodes)", flush=True)
+            elif status == 'queued':
+                print(f"  🗄  Graph DB sync queued: {graphdb_info.get('backend')} ({graphdb_info.get('nodes_queued')} nodes, "
+                      f"queue depth {graphdb_info.get('queue_depth')})", flush=True)
+            else:
+                print(f"  ⚠️  Graph DB sync skipped: {graphdb_info.get('reason', 'unknown reason')}", flush=True)
+
+        return persistence_details
+
     def _persist_property_graph(self, property_graph: Optional['PropertyGraph'], request_id: str) -> Dict[str, Any]:
         """Persist property graph to disk and optional graph database"""
         result: Dict[str, Any] = {}
@@ -2570,11 +3217,23 @@ class UnifiedDiagramPipeline:
             try:
                 dump_dir = Path(getattr(self.config, 'property_graph_dump_dir', self.config.output_dir))
                 dump_dir.mkdir(parents=True, exist_ok=True)
-                output_path = dump_dir / f"{request_id}_property_graph.json"
-                property_graph.to_json(str(output_path))
+                dump_format = getattr(self.config, 'property_graph_dump_format', 'json')
+                suffix = 'pgb' if dump_format == 'binary' else 'json'
+                output_path = dump_dir / f"{request_id}_property_graph.{suffix}"
+                if getattr(self.config, 'property_graph_async_persist', False):
+                    # Snapshot now, encode and write on the background thread
+                    self._get_graph_writer().submit(property_graph, str(output_path), format=dump_format)
+                    status = 'queued'
+                elif dump_format == 'binary':
+                    property_graph.to_binary(str(output_path))
+                    status = 'success'
+                else:
+                    property_graph.to_json(str(output_path))
+                    status = 'success'
                 disk_info = {
-                    'status': 'success',
-                    'path': str(output_path)
+                    'status': status,
+                    'path': str(output_path),
+                    'format': dump_format
                 }
             except Exception as exc:
                 disk_info = {
@@ -2587,176 +3246,58 @@ class UnifiedDiagramPipeline:
         uri = getattr(self.config, 'property_graph_graphdb_uri', None)
 
         if backend and uri:
-            backend = backend.lower()
-            if backend == 'neo4j':
-                graphdb_info = self._persist_graph_to_neo4j(property_graph, request_id)
-            elif backend == 'arango':
-                graphdb_info = self._persist_graph_to_arango(property_graph, request_id)
+            if not GRAPH_PERSISTENCE_AVAILABLE:
+                graphdb_info = {'status': 'skipped', 'reason': 'graph persistence module not available'}
             else:
-                graphdb_info = {
-                    'status': 'skipped',
-                    'reason': f'Unknown backend "{backend}"'
-                }
+                worker, reason = self._get_graphdb_worker()
+                if worker is None:
+                    graphdb_info = {'status': 'skipped', 'backend': backend.lower(), 'reason': reason}
+                else:
+                    # Request path only snapshots and enqueues; the worker batches and retries
+                    queued = worker.submit(property_graph, request_id)
+                    metrics = worker.metrics()
+                    graphdb_info = {
+                        'status': 'queued' if queued else 'dropped',
+                        'backend': worker.store.name,
+                        'nodes_queued': property_graph.count_nodes(),
+                        'queue_depth': metrics['queue_depth']
+                    }
+                    if not queued:
+                        graphdb_info['reason'] = f"persistence queue full ({metrics['max_queue']})"
             result['graphdb_persistence'] = graphdb_info
 
         return result
 
-    def _persist_graph_to_neo4j(self, property_graph: 'PropertyGraph', request_id: str) -> Dict[str, Any]:
-        """Persist graph to Neo4j if driver is available"""
-        if not NEO4J_AVAILABLE:
-            return {'status': 'skipped', 'reason': 'neo4j driver not installed'}
-
-        uri = self.config.property_graph_graphdb_uri
-        username = self.config.property_graph_graphdb_username
-        password = self.config.property_graph_graphdb_password
-        database = self.config.property_graph_graphdb_database
-
-        auth = None
-        if username:
-            auth = (username, password or "")
-
-        driver = None
-        try:
-            driver = GraphDatabase.driver(uri, auth=auth)
-
-            def _clear_existing(tx):
-                tx.run(
-                    "MATCH (n:DiagramNode {request_id: $request_id}) DETACH DELETE n",
-                    request_id=request_id
-                )
-
-            def _merge_node(tx, node: 'GraphNode'):
-                tx.run(
-                    """
-                    MERGE (n:DiagramNode {request_id: $request_id, node_id: $node_id})
-                    SET n += $props
-                    """,
-                    request_id=request_id,
-                    node_id=node.id,
-                    props={
-                        'label': node.label,
-                        'type': node.type.value if hasattr(node.type, 'value') else str(node.type),
-                        'properties': node.properties,
-                        'metadata': node.metadata
-                    }
+    def _get_graphdb_worker(self) -> Tuple[Optional['GraphPersistenceWorker'], Optional[str]]:
+        """Return the shared graph DB persistence worker (or a reason it is unavailable)"""
+        if self._graphdb_worker is None and self._graphdb_worker_error is None:
+            try:
+                store = create_graph_store(
+                    self.config.property_graph_graphdb_backend,
+                    self.config.property_graph_graphdb_uri,
+                    username=self.config.property_graph_graphdb_username,
+                    password=self.config.property_graph_graphdb_password,
+                    database=self.config.property_graph_graphdb_database,
+                    collection=getattr(self.config, 'property_graph_graphdb_collection', 'diagram_property_graphs'),
+                    batch_size=self.config.property_graph_graphdb_batch_size
                 )
-
-            def _merge_edge(tx, edge: 'GraphEdge'):
-                tx.run(
-                    """
-                    MATCH (source:DiagramNode {request_id: $request_id, node_id: $source_id})
-                    MATCH (target:DiagramNode {request_id: $request_id, node_id: $target_id})
-                    MERGE (source)-[r:DIAGRAM_RELATION {
-                        request_id: $request_id,
-                        relation_id: $relation_id
-                    }]->(target)
-                    SET r += $props
-                    """,
-                    request_id=request_id,
-                    source_id=edge.source,
-                    target_id=edge.target,
-                    relation_id=f"{edge.source}->{edge.target}:{edge.label}",
-                    props={
-                        'type': edge.type.value if hasattr(edge.type, 'value') else str(edge.type),
-                        'label': edge.label,
-                        'properties': edge.properties,
-                        'metadata': edge.metadata,
-                        'confidence': edge.confidence
-                    }
+                self._graphdb_worker = GraphPersistenceWorker(
+                    store,
+                    max_queue=self.config.property_graph_graphdb_queue_size,
+                    max_retries=self.config.property_graph_graphdb_max_retries
                 )
+            except ImportError as exc:
+                self._graphdb_worker_error = str(exc)
+            except Exception as exc:
+                # Connection/config errors: retry on the next request
+                return None, str(exc)
+        return self._graphdb_worker, self._graphdb_worker_error
 
-            with driver.session(database=database) if database else driver.session() as session:
-                session.write_transaction(_clear_existing)
-                for node in property_graph.get_all_nodes():
-                    session.write_transaction(_merge_node, node)
-                for edge in property_graph.get_edges():
-                    session.write_transaction(_merge_edge, edge)
-
-            return {
-                'status': 'success',
-                'backend': 'neo4j',
-                'nodes_synced': len(property_graph.get_all_nodes()),
-                'edges_synced': len(property_graph.get_edges())
-            }
-        except Exception as exc:
-            return {
-                'status': 'error',
-                'backend': 'neo4j',
-                'reason': str(exc)
-            }
-        finally:
-            if driver:
-                driver.close()
-
-    def _persist_graph_to_arango(self, property_graph: 'PropertyGraph', request_id: str) -> Dict[str, Any]:
-        """Persist graph to ArangoDB if python-arango is available"""
-        if not ARANGO_AVAILABLE:
-            return {'status': 'skipped', 'reason': 'python-arango not installed'}
-
-        uri = self.config.property_graph_graphdb_uri
-        username = self.config.property_graph_graphdb_username
-        password = self.config.property_graph_graphdb_password
-        database = self.config.property_graph_graphdb_database or "_system"
-        collection_base = getattr(self.config, 'property_graph_graphdb_collection', 'diagram_property_graphs')
-
-        try:
-            client = ArangoClient(hosts=uri)
-            db = client.db(database, username=username, password=password, verify=True)
-
-            vertex_collection_name = f"{collection_base}_nodes"
-            edge_collection_name = f"{collection_base}_edges"
-
-            if not db.has_collection(vertex_collection_name):
-                db.create_collection(vertex_collection_name)
-            if not db.has_collection(edge_collection_name):
-                db.create_collection(edge_collection_name, edge=True)
-
-            vertex_coll = db.collection(vertex_collection_name)
-            edge_coll = db.collection(edge_collection_name)
-
-            node_count = 0
-            edge_count = 0
-
-            for node in property_graph.get_all_nodes():
-                doc_key = f"{request_id}_{node.id}"
-                vertex_coll.insert({
-                    '_key': doc_key,
-                    'request_id': request_id,
-                    'original_id': node.id,
-                    'label': node.label,
-                    'type': node.type.value if hasattr(node.type, 'value') else str(node.type),
-                    'properties': node.properties,
-                    'metadata': node.metadata
-                }, overwrite=True)
-                node_count += 1
-
-            for idx, edge in enumerate(property_graph.get_edges()):
-                edge_key = f"{request_id}_{idx}"
-                edge_coll.insert({
-                    '_key': edge_key,
-                    '_from': f"{vertex_collection_name}/{request_id}_{edge.source}",
-                    '_to': f"{vertex_collection_name}/{request_id}_{edge.target}",
-                    'request_id': request_id,
-                    'type': edge.type.value if hasattr(edge.type, 'value') else str(edge.type),
-                    'label': edge.label,
-                    'properties': edge.properties,
-                    'metadata': edge.metadata,
-                    'confidence': edge.confidence
-                }, overwrite=True)
-                edge_count += 1
-
-            return {
-                'status': 'success',
-                'backend': 'arango',
-                'nodes_synced': node_count,
-                'edges_synced': edge_count
-            }
-        except Exception as exc:
-            return {
-                'status': 'error',
-                'backend': 'arango',
-                'reason': str(exc)
-            }
+    def get_graphdb_persistence_metrics(self) -> Dict[str, Any]:
+        """Queue depth, lag and counters of the graph DB persistence worker"""
+        if self._graphdb_worker is None:
+            return {}
+        return self._graphdb_worker.metrics()
 
     def _build_ontology_keyword_index(self) -> Dict[str, Dict[str, str]]:
         """Build lightweight keyword -> ontology URI map for enrichment"""
@@ -3156,8 +3697,17 @@ class UnifiedDiagramPipeline:
             return 0, False
         try:
             object_dims = self._compute_object_dimensions(scene)
-            solution = self.z3_solver.solve_layout(plan, object_dims)
+            hints = {
+                obj.id: (obj.position.get('x'), obj.position.get('y'))
+                for obj in scene.objects
+                if isinstance(obj.position, dict) and obj.position.get('x') is not None and obj.position.get('y') is not None
+            }
+            solution = self.z3_solver.solve_layout(plan, object_dims, hints=hints,
+                                                   time_budget=self.config.z3_time_budget)
             if solution and getattr(solution, 'satisfiable', False):
+                if 'objective' in solution.metadata:
+                    print(f"     • Z3 objective: {solution.metadata['objective']:.1f} "
+                          f"(gap {solution.metadata['optimality_gap']:.1%}, {solution.solve_time:.2f}s)", flush=True)
                 self._apply_positions_to_scene(scene, solution.positions)
                 return len(solution.positions), True
         except Exception as exc:
@@ -3310,3 +3860,18 @@ class UnifiedDiagramPipeline:
             property_graph=property_graph
         )
         return [artifact.to_dict() for artifact in artifacts]
+
+
+# Per-process pipeline used by generate_batch worker processes
+_BATCH_WORKER_PIPELINE: Optional[UnifiedDiagramPipeline] = None
+
+
+def _init_batch_worker(pipeline_cls: type, config: PipelineConfig) -> None:
+    """ProcessPoolExecutor initializer: build one warm pipeline (of the caller's class) per worker"""
+    global _BATCH_WORKER_PIPELINE
+    _BATCH_WORKER_PIPELINE = pipeline_cls(config)
+
+
+def _run_batch_worker(index: int, problem_text: str, precomputed_nlp: Dict[str, Any]) -> BatchItemResult:
+    """Run the post-NLP phases for one batch entry inside a worker process"""
+    return _BATCH_WORKER_PIPELINE._generate_batch_item(index, problem_text, precomputed_nlp)
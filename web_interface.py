@@ -19,10 +19,12 @@ Date: November 5, 2025
 
 from flask import Flask, render_template_string, render_template, request, jsonify, send_file
 from flask_cors import CORS
+import base64
 import os
 from pathlib import Path
 import json
 from unified_diagram_generator import UnifiedDiagramGenerator
+from core.rasterizer import get_rasterizer
 
 # Import UnifiedPipeline (new integrated pipeline)
 try:
@@ -858,7 +860,7 @@ def editor_generate():
 
 @app.route('/api/editor/render', methods=['POST'])
 def editor_render():
-    """Render a scene to SVG"""
+    """Render a scene to SVG (plus base64 PNG with format='png')"""
     if not ENHANCED_AVAILABLE:
         return jsonify({'success': False, 'error': 'Enhanced Pipeline not available'}), 503
 
@@ -866,6 +868,9 @@ def editor_render():
         data = request.json
         scene_dict = data.get('scene', {})
         style = data.get('style', 'modern')
+        export_format = data.get('format', 'svg').lower()
+        if export_format not in ('svg', 'png'):
+            return jsonify({'success': False, 'error': f'Unsupported format: {export_format}'}), 400
 
         # Reconstruct scene from JSON
         scene = UniversalScene.from_dict(scene_dict)
@@ -874,11 +879,19 @@ def editor_render():
         component_library.set_style(style)
         renderer = EnhancedSVGRenderer(component_library)
         svg_content = renderer.render(scene)
-
-        return jsonify({
+        response = {
             'success': True,
             'svg': svg_content
-        })
+        }
+
+        if export_format == 'png':
+            # Same shared service as export: previewing then exporting rasterizes once
+            png_bytes = get_rasterizer().rasterize(svg_content)
+            if png_bytes is None:
+                return jsonify({'success': False, 'error': 'PNG rendering requires cairosvg'}), 503
+            response['png'] = base64.b64encode(png_bytes).decode('ascii')
+
+        return jsonify(response)
 
     except Exception as e:
         import traceback
@@ -1044,7 +1057,7 @@ def editor_load():
 
 @app.route('/api/editor/export', methods=['POST'])
 def editor_export():
-    """Export diagram to SVG file"""
+    """Export diagram to SVG (or PNG with format='png') file"""
     if not ENHANCED_AVAILABLE:
         return jsonify({'success': False, 'error': 'Enhanced Pipeline not available'}), 503
 
@@ -1053,6 +1066,9 @@ def editor_export():
         scene_dict = data.get('scene', {})
         filename = data.get('filename', 'diagram')
         style = data.get('style', 'modern')
+        export_format = data.get('format', 'svg').lower()
+        if export_format not in ('svg', 'png'):
+            return jsonify({'success': False, 'error': f'Unsupported format: {export_format}'}), 400
 
         # Reconstruct scene from JSON
         scene = UniversalScene.from_dict(scene_dict)
@@ -1066,10 +1082,18 @@ def editor_export():
         output_dir = Path('output/web_editor')
         output_dir.mkdir(parents=True, exist_ok=True)
 
-        # Save SVG
-        filepath = output_dir / f"{filename}.svg"
-        with open(filepath, 'w') as f:
-            f.write(svg_content)
+        if export_format == 'png':
+            # Shared rasterization service: repeated exports of a scene are cache hits
+            png_bytes = get_rasterizer().rasterize(svg_content)
+            if png_bytes is None:
+                return jsonify({'success': False, 'error': 'PNG export requires cairosvg'}), 503
+            filepath = output_dir / f"{filename}.png"
+            filepath.write_bytes(png_bytes)
+        else:
+            # Save SVG
+            filepath = output_dir / f"{filename}.svg"
+            with open(filepath, 'w') as f:
+                f.write(svg_content)
 
         return jsonify({
             'success': True,